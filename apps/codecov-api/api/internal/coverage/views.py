@@ -10,7 +10,7 @@ import services.components as components_service
 from api.shared.mixins import RepoPropertyMixin
 from api.shared.permissions import RepositoryArtifactPermissions
 from api.shared.report.serializers import TreeSerializer
-from services.path import ReportPaths
+from services.path import ReportPaths, get_directory_tree
 
 
 class CoverageViewSet(viewsets.ViewSet, RepoPropertyMixin):
@@ -57,7 +57,9 @@ class CoverageViewSet(viewsets.ViewSet, RepoPropertyMixin):
         flags = self.request.query_params.getlist("flags")
 
         paths = ReportPaths(
-            report=report, filter_flags=flags, filter_paths=component_paths
+            report=None,
+            filter_paths=component_paths,
+            tree=get_directory_tree(commit, report, flags),
         )
 
         return paths
@@ -106,6 +106,10 @@ GRAPHQL_RATE_LIMIT_ENABLED = get_config(
 
 GRAPHQL_RATE_LIMIT_RPM = get_config("setup", "graphql", "rate_limit_rpm", default=300)
 
+API_RATE_LIMIT_ENABLED = get_config("setup", "api", "rate_limit_enabled", default=False)
+
+API_RATE_LIMIT_RPM = get_config("setup", "api", "rate_limit_rpm", default=600)
+
 GRAPHQL_INTROSPECTION_ENABLED = False
 
 GRAPHQL_MAX_DEPTH = get_config("setup", "graphql", "max_depth", default=20)
@@ -120,6 +124,14 @@ DATABASE_ROUTERS = ["codecov.db.DatabaseRouter"]
 # GCS
 GCS_BUCKET_NAME = get_config("services", "minio", "bucket", default="codecov")
 
+# Test Analytics
+TEST_ANALYTICS_RESULTS_CACHE_MAX_BYTES = get_config(
+    "setup", "test_analytics", "results_cache_max_bytes", default=256 * 1024 * 1024
+)
+TEST_ANALYTICS_RESULTS_CACHE_REVALIDATE_SECONDS = get_config(
+    "setup", "test_analytics", "results_cache_revalidate_seconds", default=5
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.1/ref/settings/#auth-password-validators
@@ -146,6 +158,7 @@ REST_FRAMEWORK = {
     ),
     "DEFAULT_PAGINATION_CLASS": "api.shared.pagination.StandardPageNumberPagination",
     "DEFAULT_FILTER_BACKENDS": ("django_filters.rest_framework.DjangoFilterBackend",),
+    "DEFAULT_THROTTLE_CLASSES": ("services.rate_limits.APIRateLimitThrottle",),
     "PAGE_SIZE": 20,
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
@@ -388,6 +401,15 @@ UPLOAD_THROTTLING_ENABLED = get_config(
     "setup", "upload_throttling_enabled", default=True
 )
 
+UPLOAD_RATE_LIMIT_ENABLED = get_config(
+    "setup", "upload_rate_limit", "enabled", default=False
+)
+
+UPLOAD_RATE_LIMIT_RPM = get_config("setup", "upload_rate_limit", "rpm", default=300)
+
+# GitHub webhooks are queued and handled by the `process_webhooks` command
+WEBHOOK_QUEUE_ENABLED = get_config("setup", "webhooks", "queue_enabled", default=False)
+
 HIDE_ALL_CODECOV_TOKENS = get_config("setup", "hide_all_codecov_tokens", default=False)
 
 SENTRY_JWT_SHARED_SECRET = get_config(
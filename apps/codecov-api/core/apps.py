@@ -4,7 +4,7 @@ from django.apps import AppConfig
 
 from shared.helpers.cache import RedisBackend, cache
 from shared.helpers.redis import get_redis_connection
-from utils.config import RUN_ENV
+from utils.config import RUN_ENV, get_config
 
 logger = logging.getLogger(__name__)
 
@@ -17,4 +17,9 @@ class CoreConfig(AppConfig):
 
         if RUN_ENV not in ["DEV", "TESTING"]:
             cache_backend = RedisBackend(get_redis_connection())
-            cache.configure(cache_backend)
+            cache.configure(
+                cache_backend,
+                local_maxsize=get_config(
+                    "setup", "cache", "local_maxsize", default=1024
+                ),
+            )
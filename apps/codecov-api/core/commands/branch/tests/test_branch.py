@@ -13,12 +13,6 @@ class BranchCommandsTest(TestCase):
         self.repository = RepositoryFactory()
         self.command = BranchCommands(self.owner, "github")
 
-    @patch("core.commands.branch.branch.FetchBranchInteractor.execute")
-    def test_fetch_branch_delegate_to_interactor(self, interactor_mock):
-        branch_name = "main"
-        self.command.fetch_branch(self.repository, branch_name)
-        interactor_mock.assert_called_once_with(self.repository, branch_name)
-
     @patch("core.commands.branch.branch.FetchRepoBranchesInteractor.execute")
     def test_fetch_branches_delegate_to_interactor(self, interactor_mock):
         filters = {}
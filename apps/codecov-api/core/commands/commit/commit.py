@@ -1,20 +1,14 @@
 from codecov.commands.base import BaseCommand
 
-from .interactors.fetch_totals import FetchTotalsInteractor
 from .interactors.get_commit_errors import GetCommitErrorsInteractor
 from .interactors.get_file_content import GetFileContentInteractor
 from .interactors.get_final_yaml import GetFinalYamlInteractor
-from .interactors.get_latest_upload_error import GetLatestUploadErrorInteractor
-from .interactors.get_uploads_number import GetUploadsNumberInteractor
 
 
 class CommitCommands(BaseCommand):
     def get_file_content(self, commit, path):
         return self.get_interactor(GetFileContentInteractor).execute(commit, path)
 
-    def fetch_totals(self, commit):
-        return self.get_interactor(FetchTotalsInteractor).execute(commit)
-
     def get_final_yaml(self, commit):
         return self.get_interactor(GetFinalYamlInteractor).execute(commit)
 
@@ -22,9 +16,3 @@ class CommitCommands(BaseCommand):
         return self.get_interactor(GetCommitErrorsInteractor).execute(
             commit, error_type
         )
-
-    def get_uploads_number(self, commit):
-        return self.get_interactor(GetUploadsNumberInteractor).execute(commit)
-
-    def get_latest_upload_error(self, commit):
-        return self.get_interactor(GetLatestUploadErrorInteractor).execute(commit)
@@ -1,36 +0,0 @@
-from asgiref.sync import async_to_sync
-from django.test import TestCase
-
-from reports.tests.factories import UploadFactory
-from shared.django_apps.core.tests.factories import CommitFactory
-
-from ..get_uploads_number import GetUploadsNumberInteractor
-
-
-class GetUploadsNumberInteractorTest(TestCase):
-    def setUp(self):
-        self.commit_with_no_upload = CommitFactory()
-        self.upload_one = UploadFactory()
-        self.upload_two = UploadFactory(report=self.upload_one.report)
-        self.commit_with_upload = self.upload_two.report.commit
-
-        # making sure everything is public
-        self.commit_with_no_upload.repository.private = False
-        self.commit_with_no_upload.repository.save()
-        self.commit_with_upload.repository.private = False
-        self.commit_with_upload.repository.save()
-
-    # helper to execute the interactor
-    def execute(self, owner, *args):
-        service = owner.service if owner else "github"
-        return GetUploadsNumberInteractor(owner, service).execute(*args)
-
-    async def test_fetch_when_no_reports(self):
-        uploads_number = await self.execute(None, self.commit_with_no_upload)
-        assert uploads_number == 0
-
-    def test_fetch_when_reports(self):
-        # self.execute returns a lazy queryset so we need to wrap it with
-        # async_to_sync
-        uploads_number = async_to_sync(self.execute)(None, self.commit_with_upload)
-        assert uploads_number == 2
@@ -34,13 +34,3 @@ class CommitCommandsTest(TestCase):
     def test_get_commit_errors_delegate_to_interactor(self, interactor_mock):
         self.command.get_commit_errors(self.commit, "YAML_ERROR")
         interactor_mock.assert_called_once_with(self.commit, "YAML_ERROR")
-
-    @patch("core.commands.commit.commit.GetUploadsNumberInteractor.execute")
-    def test_get_uploads_number_delegate_to_interactor(self, interactor_mock):
-        self.command.get_uploads_number(self.commit)
-        interactor_mock.assert_called_once_with(self.commit)
-
-    @patch("core.commands.commit.commit.GetLatestUploadErrorInteractor.execute")
-    def test_get_latest_upload_error_delegate_to_interactor(self, interactor_mock):
-        self.command.get_latest_upload_error(self.commit)
-        interactor_mock.assert_called_once_with(self.commit)
@@ -0,0 +1,37 @@
+import socket
+import uuid
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from webhook_handlers.consumer import WebhookConsumer
+from webhook_handlers.queue import get_webhook_queue
+
+
+class Command(BaseCommand):
+    help = "Processes the webhooks queued by the webhook views, in batches."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--block-ms",
+            type=int,
+            default=5000,
+            help="How long to wait for new webhooks when there are none",
+        )
+        # processes a single batch, e.g. to drain the queue once
+        parser.add_argument("--once", action="store_true")
+
+    def handle(self, *args, **options):
+        queue = get_webhook_queue()
+        consumer = WebhookConsumer(
+            queue,
+            name=f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}",
+            batch_size=options["batch_size"],
+            block_ms=options["block_ms"],
+        )
+        if options["once"]:
+            queue.ensure_group()
+            count = consumer.run_once()
+            self.stdout.write(f"Processed {count} webhooks")
+        else:
+            consumer.run()
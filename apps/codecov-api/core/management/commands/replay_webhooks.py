@@ -0,0 +1,36 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from webhook_handlers.consumer import process_webhooks
+from webhook_handlers.queue import QueuedWebhook, get_webhook_queue
+
+
+class Command(BaseCommand):
+    help = (
+        "Replays recorded webhooks, one JSON object per line as written by "
+        "`QueuedWebhook.to_record`. They are handled right away, in order and "
+        "coalesced as in a batch, or added to the queue with --enqueue."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("path")
+        parser.add_argument("--enqueue", action="store_true")
+
+    def handle(self, *args, **options):
+        with open(options["path"]) as f:
+            webhooks = [
+                QueuedWebhook.from_record(json.loads(line))
+                for line in f
+                if line.strip()
+            ]
+
+        if options["enqueue"]:
+            queue = get_webhook_queue()
+            queued = sum(queue.enqueue(webhook) for webhook in webhooks)
+            self.stdout.write(
+                f"Queued {queued} webhooks, {len(webhooks) - queued} already queued"
+            )
+        else:
+            process_webhooks(webhooks)
+            self.stdout.write(f"Replayed {len(webhooks)} webhooks")
@@ -0,0 +1,15 @@
+from core.models import Branch
+
+from .loader import BaseLoader
+
+
+class BranchLoader(BaseLoader):
+    @classmethod
+    def key(cls, branch):
+        return (branch.repository_id, branch.name)
+
+    def batch_queryset(self, keys):
+        repository_ids = {repository_id for repository_id, _ in keys}
+        names = {name for _, name in keys}
+        # the branches matching the repository of another key are left out by `key`
+        return Branch.objects.filter(repository_id__in=repository_ids, name__in=names)
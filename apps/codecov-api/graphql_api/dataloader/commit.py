@@ -6,6 +6,16 @@ from reports.models import CommitReport
 from .loader import BaseLoader
 
 
+def coverage_reports_prefetch() -> Prefetch:
+    """Prefetches the coverage `CommitReport` of commits, with its `ReportLevelTotals`."""
+    return Prefetch(
+        "reports",
+        queryset=CommitReport.objects.coverage_reports()
+        .filter(code=None)
+        .select_related("reportleveltotals"),
+    )
+
+
 class CommitLoader(BaseLoader):
     @classmethod
     def key(cls, commit):
@@ -19,16 +29,31 @@ class CommitLoader(BaseLoader):
         # We don't select the `report` column here b/c then can be
         # very large JSON blobs and cause performance issues
 
-        # prefetch the CommitReport with the ReportLevelTotals
-        prefetch = Prefetch(
-            "reports",
-            queryset=CommitReport.objects.coverage_reports()
-            .filter(code=None)
-            .select_related("reportleveltotals"),
+        return (
+            Commit.objects.filter(commitid__in=keys, repository_id=self.repository_id)
+            .defer("_report")
+            .prefetch_related(coverage_reports_prefetch())
         )
 
+
+class RepositoryCommitLoader(BaseLoader):
+    """
+    Loads the commits of any repository by `(repository_id, commitid)`, for lists
+    spanning several repositories (like the head commits of their branches).
+    """
+
+    @classmethod
+    def key(cls, commit):
+        return (commit.repository_id, commit.commitid)
+
+    def batch_queryset(self, keys):
+        repository_ids = {repository_id for repository_id, _ in keys}
+        commitids = {commitid for _, commitid in keys}
+        # the commits matching the repository of another key are left out by `key`
         return (
-            Commit.objects.filter(commitid__in=keys, repository_id=self.repository_id)
+            Commit.objects.filter(
+                repository_id__in=repository_ids, commitid__in=commitids
+            )
             .defer("_report")
-            .prefetch_related(prefetch)
+            .prefetch_related(coverage_reports_prefetch())
         )
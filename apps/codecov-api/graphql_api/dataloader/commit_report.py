@@ -0,0 +1,75 @@
+from asgiref.sync import sync_to_async
+from django.db.models import Count, F
+from graphql import GraphQLResolveInfo
+
+from core.models import Commit
+from reports.models import CommitReport, UploadError
+
+from .loader import BaseLoader
+
+
+class CommitReportLoader(BaseLoader):
+    """Loads the coverage `CommitReport` of commits, with its totals, by commit id."""
+
+    @classmethod
+    def key(cls, commit_report):
+        return commit_report.commit_id
+
+    def batch_queryset(self, keys):
+        return (
+            CommitReport.objects.coverage_reports()
+            .filter(code=None, commit_id__in=keys)
+            .select_related("reportleveltotals")
+        )
+
+
+async def load_commit_report(
+    info: GraphQLResolveInfo, commit: Commit
+) -> CommitReport | None:
+    """
+    The coverage `CommitReport` of `commit`, from the reports prefetched with it
+    when they were (see `coverage_reports_prefetch`), or from `CommitReportLoader`.
+    """
+    prefetched = getattr(commit, "_prefetched_objects_cache", {})
+    if "reports" in prefetched or "commitreport" in commit.__dict__:
+        return commit.commitreport
+    return await CommitReportLoader.loader(info).load(commit.id)
+
+
+class UploadCountLoader(BaseLoader):
+    """Loads the number of coverage uploads of commits, by commit id."""
+
+    def batch_queryset(self, keys):
+        return (
+            CommitReport.objects.coverage_reports()
+            .filter(code=None, commit_id__in=keys)
+            .values_list("commit_id")
+            .annotate(upload_count=Count("sessions"))
+        )
+
+    @sync_to_async
+    def batch_load_fn(self, keys):
+        upload_counts = dict(self.batch_queryset(keys))
+        return [upload_counts.get(key, 0) for key in keys]
+
+
+class LatestUploadErrorLoader(BaseLoader):
+    """Loads the latest error of the test results uploads of commits, by commit id."""
+
+    @classmethod
+    def key(cls, upload_error):
+        return upload_error.commit_id
+
+    def batch_queryset(self, keys):
+        return (
+            UploadError.objects.filter(
+                report_session__report__commit_id__in=keys,
+                report_session__report__report_type=CommitReport.ReportType.TEST_RESULTS,
+            )
+            .exclude(error_code="warning")
+            .annotate(commit_id=F("report_session__report__commit_id"))
+            .only("error_code", "error_params")
+            # the latest error of each commit
+            .order_by("report_session__report__commit_id", "-created_at")
+            .distinct("report_session__report__commit_id")
+        )
@@ -0,0 +1,53 @@
+from django.test import TestCase
+
+from graphql_api.dataloader.branch import BranchLoader
+from graphql_api.dataloader.commit import RepositoryCommitLoader
+from shared.django_apps.core.tests.factories import (
+    BranchFactory,
+    CommitFactory,
+    RepositoryFactory,
+)
+
+
+class GraphQLResolveInfo:
+    def __init__(self):
+        self.context = {}
+
+
+class BranchLoaderTestCase(TestCase):
+    def setUp(self):
+        self.repositories = [RepositoryFactory(), RepositoryFactory()]
+        self.commits = [
+            CommitFactory(repository=repository) for repository in self.repositories
+        ]
+        self.branches = [
+            BranchFactory(
+                repository=commit.repository, name="main", head=commit.commitid
+            )
+            for commit in self.commits
+        ]
+        BranchFactory(repository=self.repositories[0], name="other")
+        self.info = GraphQLResolveInfo()
+
+    async def test_branches_of_several_repositories(self):
+        loader = BranchLoader.loader(self.info)
+        branches = await loader.load_many(
+            [
+                (self.repositories[1].repoid, "main"),
+                (self.repositories[0].repoid, "main"),
+                (self.repositories[1].repoid, "other"),
+            ]
+        )
+        assert branches == [self.branches[1], self.branches[0], None]
+
+    async def test_commits_of_several_repositories(self):
+        loader = RepositoryCommitLoader.loader(self.info)
+        commits = await loader.load_many(
+            [
+                (self.repositories[0].repoid, self.commits[0].commitid),
+                (self.repositories[1].repoid, self.commits[1].commitid),
+                # a commit of another repository
+                (self.repositories[0].repoid, self.commits[1].commitid),
+            ]
+        )
+        assert commits == [self.commits[0], self.commits[1], None]
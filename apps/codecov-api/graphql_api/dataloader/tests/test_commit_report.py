@@ -0,0 +1,71 @@
+import asyncio
+
+from django.test import TestCase
+
+from graphql_api.dataloader.commit_report import (
+    CommitReportLoader,
+    LatestUploadErrorLoader,
+    UploadCountLoader,
+)
+from reports.models import CommitReport
+from reports.tests.factories import (
+    CommitReportFactory,
+    ReportLevelTotalsFactory,
+    UploadErrorFactory,
+    UploadFactory,
+)
+from shared.django_apps.core.tests.factories import CommitFactory, RepositoryFactory
+
+
+class GraphQLResolveInfo:
+    def __init__(self):
+        self.context = {}
+
+
+class CommitReportLoadersTestCase(TestCase):
+    def setUp(self):
+        self.repository = RepositoryFactory()
+        self.commits = [CommitFactory(repository=self.repository) for _ in range(3)]
+        self.commit_report = CommitReportFactory(commit=self.commits[0])
+        self.totals = ReportLevelTotalsFactory(report=self.commit_report)
+        UploadFactory(report=self.commit_report)
+        UploadFactory(report=self.commit_report)
+        UploadFactory(report=CommitReportFactory(commit=self.commits[1]))
+
+        test_results_upload = UploadFactory(
+            report=CommitReportFactory(
+                commit=self.commits[1],
+                report_type=CommitReport.ReportType.TEST_RESULTS,
+            )
+        )
+        UploadErrorFactory(report_session=test_results_upload, error_code="old")
+        self.latest_error = UploadErrorFactory(
+            report_session=test_results_upload,
+            error_code="file_not_in_storage",
+            error_params={"error_message": "missing"},
+        )
+        UploadErrorFactory(report_session=test_results_upload, error_code="warning")
+        self.info = GraphQLResolveInfo()
+
+    async def test_commit_reports(self):
+        loader = CommitReportLoader.loader(self.info)
+        commit_reports = await asyncio.gather(
+            *(loader.load(commit.id) for commit in self.commits)
+        )
+        assert commit_reports[0] == self.commit_report
+        assert commit_reports[0].reportleveltotals == self.totals
+        assert commit_reports[1].commit_id == self.commits[1].id
+        assert commit_reports[2] is None
+
+    async def test_upload_counts(self):
+        loader = UploadCountLoader.loader(self.info)
+        counts = await loader.load_many([commit.id for commit in self.commits])
+        assert counts == [2, 1, 0]
+
+    async def test_latest_upload_errors(self):
+        loader = LatestUploadErrorLoader.loader(self.info)
+        errors = await loader.load_many([commit.id for commit in self.commits])
+        assert errors[0] is None
+        assert errors[1].error_code == "file_not_in_storage"
+        assert errors[1].error_params == {"error_message": "missing"}
+        assert errors[2] is None
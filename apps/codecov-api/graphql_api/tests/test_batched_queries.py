@@ -0,0 +1,243 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from reports.models import CommitReport
+from reports.tests.factories import (
+    CommitReportFactory,
+    ReportLevelTotalsFactory,
+    UploadErrorFactory,
+    UploadFactory,
+)
+from shared.django_apps.core.tests.factories import (
+    BranchFactory,
+    CommitFactory,
+    OwnerFactory,
+    PullFactory,
+    RepositoryFactory,
+)
+
+from .helper import GraphQLTestHelper
+
+PAGE_SIZE = 100
+
+query_pulls = """
+    query Pulls($org: String!, $repo: String!) {
+        owner(username: $org) {
+            repository(name: $repo) {
+                ... on Repository {
+                    pulls(first: 100) {
+                        edges {
+                            node {
+                                pullId
+                                author { username }
+                                head {
+                                    commitid
+                                    totalUploads
+                                    latestUploadError { errorCode }
+                                    coverageAnalytics { totals { coverage } }
+                                }
+                                comparedTo { commitid }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+"""
+
+query_pull_commits = """
+    query PullCommits($org: String!, $repo: String!, $pullid: Int!) {
+        owner(username: $org) {
+            repository(name: $repo) {
+                ... on Repository {
+                    pull(id: $pullid) {
+                        commits(first: 100) {
+                            edges {
+                                node {
+                                    commitid
+                                    totalUploads
+                                    coverageAnalytics { totals { coverage } }
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+"""
+
+query_branches = """
+    query Branches($org: String!, $repo: String!) {
+        owner(username: $org) {
+            repository(name: $repo) {
+                ... on Repository {
+                    branches(first: 100) {
+                        edges {
+                            node {
+                                name
+                                head {
+                                    commitid
+                                    coverageAnalytics { totals { coverage } }
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+"""
+
+query_repositories = """
+    query Repositories($org: String!) {
+        owner(username: $org) {
+            repositories(first: 100) {
+                edges {
+                    node {
+                        name
+                        branch(name: "main") {
+                            head {
+                                commitid
+                                coverageAnalytics { totals { coverage } }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+"""
+
+
+def create_commit(repository, **kwargs):
+    """A commit with a coverage report, its totals, an upload and an upload error."""
+    commit = CommitFactory(repository=repository, **kwargs)
+    commit_report = CommitReportFactory(commit=commit)
+    ReportLevelTotalsFactory(report=commit_report)
+    UploadFactory(report=commit_report)
+    test_results_upload = UploadFactory(
+        report=CommitReportFactory(
+            commit=commit, report_type=CommitReport.ReportType.TEST_RESULTS
+        )
+    )
+    UploadErrorFactory(report_session=test_results_upload)
+    return commit
+
+
+class BatchedQueriesTest(GraphQLTestHelper, TestCase):
+    """
+    The lists of items load their relations in batches, so their number of queries
+    doesn't depend on their number of items.
+    """
+
+    def setUp(self):
+        self.owner = OwnerFactory(username="batched-queries-user")
+
+    def count_queries(self, query: str, variables: dict) -> tuple[int, dict]:
+        with CaptureQueriesContext(connection) as context:
+            data = self.gql_request(query, owner=self.owner, variables=variables)
+        return len(context.captured_queries), data
+
+    def assert_same_query_count(self, query, small_variables, large_variables):
+        # the first request of a test makes some one-off queries (e.g. for the session)
+        self.gql_request(query, owner=self.owner, variables=small_variables)
+        small_count, _ = self.count_queries(query, small_variables)
+        large_count, data = self.count_queries(query, large_variables)
+        assert large_count == small_count
+        return data
+
+    def create_repository(self, name: str):
+        return RepositoryFactory(
+            author=self.owner, active=True, private=True, name=name
+        )
+
+    def create_pulls(self, repository, count: int):
+        base = create_commit(repository)
+        for pullid in range(1, count + 1):
+            PullFactory(
+                repository=repository,
+                pullid=pullid,
+                author=self.owner,
+                head=create_commit(repository).commitid,
+                compared_to=base.commitid,
+            )
+
+    def test_pulls(self):
+        self.create_pulls(self.create_repository("small"), 1)
+        self.create_pulls(self.create_repository("large"), PAGE_SIZE)
+
+        data = self.assert_same_query_count(
+            query_pulls,
+            {"org": self.owner.username, "repo": "small"},
+            {"org": self.owner.username, "repo": "large"},
+        )
+        pulls = data["owner"]["repository"]["pulls"]["edges"]
+        assert len(pulls) == PAGE_SIZE
+        head = pulls[0]["node"]["head"]
+        assert head["totalUploads"] == 1
+        assert head["latestUploadError"] is not None
+        assert head["coverageAnalytics"]["totals"]["coverage"] is not None
+
+    def test_pull_commits(self):
+        for name, count in (("small", 1), ("large", PAGE_SIZE)):
+            repository = self.create_repository(name)
+            PullFactory(repository=repository, pullid=1)
+            for _ in range(count):
+                create_commit(repository, pullid=1)
+
+        data = self.assert_same_query_count(
+            query_pull_commits,
+            {"org": self.owner.username, "repo": "small", "pullid": 1},
+            {"org": self.owner.username, "repo": "large", "pullid": 1},
+        )
+        commits = data["owner"]["repository"]["pull"]["commits"]["edges"]
+        assert len(commits) == PAGE_SIZE
+        assert commits[0]["node"]["totalUploads"] == 1
+        assert commits[0]["node"]["coverageAnalytics"]["totals"] is not None
+
+    def test_branches(self):
+        for name, count in (("small", 1), ("large", PAGE_SIZE)):
+            repository = self.create_repository(name)
+            for i in range(count):
+                BranchFactory(
+                    repository=repository,
+                    name=f"branch-{i}",
+                    head=create_commit(repository).commitid,
+                )
+
+        data = self.assert_same_query_count(
+            query_branches,
+            {"org": self.owner.username, "repo": "small"},
+            {"org": self.owner.username, "repo": "large"},
+        )
+        branches = data["owner"]["repository"]["branches"]["edges"]
+        assert len(branches) == PAGE_SIZE
+        assert branches[0]["node"]["head"]["coverageAnalytics"]["totals"] is not None
+
+    def test_repositories_branch_heads(self):
+        other_owner = OwnerFactory(username="batched-queries-org")
+        self.owner.organizations = [other_owner.ownerid]
+        self.owner.save()
+        for owner, count in ((self.owner, 1), (other_owner, PAGE_SIZE)):
+            for i in range(count):
+                repository = RepositoryFactory(
+                    author=owner, active=True, private=False, name=f"repo-{i}"
+                )
+                BranchFactory(
+                    repository=repository,
+                    name="main",
+                    head=create_commit(repository).commitid,
+                )
+
+        data = self.assert_same_query_count(
+            query_repositories,
+            {"org": self.owner.username},
+            {"org": other_owner.username},
+        )
+        repositories = data["owner"]["repositories"]["edges"]
+        assert len(repositories) == PAGE_SIZE
+        head = repositories[0]["node"]["branch"]["head"]
+        assert head["coverageAnalytics"]["totals"] is not None
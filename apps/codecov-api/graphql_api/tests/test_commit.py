@@ -3437,3 +3437,34 @@ class TestCommit(GraphQLTestHelper, TestCase):
             "errorCode": "UNKNOWN_PROCESSING",
             "errorMessage": "Unknown processing error",
         }
+
+    @patch(
+        "graphql_api.dataloader.commit_report.LatestUploadErrorLoader.batch_queryset",
+        side_effect=Exception("Test error"),
+    )
+    def test_latest_upload_error_when_loading_fails(self, batch_queryset_mock):
+        commit = CommitFactory(repository=self.repo)
+
+        query = """
+            query FetchCommit($org: String!, $repo: String!, $commit: String!) {
+                owner(username: $org) {
+                    repository(name: $repo) {
+                        ... on Repository {
+                            commit(id: $commit) {
+                                latestUploadError {
+                                    errorCode
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        """
+
+        variables = {
+            "org": self.org.username,
+            "repo": self.repo.name,
+            "commit": commit.commitid,
+        }
+        data = self.gql_request(query, variables=variables)
+        assert data["owner"]["repository"]["commit"]["latestUploadError"] is None
@@ -8,6 +8,7 @@ from django.urls import ResolverMatch
 from prometheus_client import REGISTRY
 
 from codecov.commands.exceptions import Unauthorized
+from shared.rate_limits.limiter import InMemoryRateLimitBackend, RateLimitResult
 
 from ..views import AsyncGraphqlView, QueryMetricsExtension
 from .helper import GraphQLTestHelper
@@ -239,7 +240,9 @@ class AriadneViewTestCase(GraphQLTestHelper, TestCase):
         self, mocked_check_ratelimit, mocked_error_counter, mocked_request_counter
     ):
         schema = generate_cost_test_schema()
-        mocked_check_ratelimit.return_value = True
+        mocked_check_ratelimit.return_value = RateLimitResult(
+            allowed=False, limit=1000, remaining=0, retry_after=12
+        )
         response = await self.do_query(schema, " { stuff }")
 
         assert response["status"] == 429
@@ -262,7 +265,28 @@ class AriadneViewTestCase(GraphQLTestHelper, TestCase):
         request = Mock()
 
         result = view._check_ratelimit(request)
-        assert result == False
+        assert result is None
+
+    @override_settings(
+        DEBUG=False, GRAPHQL_RATE_LIMIT_RPM=2, GRAPHQL_RATE_LIMIT_ENABLED=True
+    )
+    @patch("graphql_api.views.get_rate_limit_backend")
+    def test_rate_limit_by_user_or_ip(self, mocked_backend):
+        mocked_backend.return_value = InMemoryRateLimitBackend()
+        view = AsyncGraphqlView()
+        user_request = Mock()
+        user_request.user.pk = 12
+        anonymous_request = Mock()
+        anonymous_request.user = None
+        anonymous_request.META = {"REMOTE_ADDR": "127.0.0.1"}
+
+        assert view._check_ratelimit(user_request).allowed
+        assert view._check_ratelimit(user_request).allowed
+        result = view._check_ratelimit(user_request)
+        assert not result.allowed
+        assert result.headers["Retry-After"] == "60"
+
+        assert view._check_ratelimit(anonymous_request).allowed
 
     def test_client_ip_from_x_forwarded_for(self):
         view = AsyncGraphqlView()
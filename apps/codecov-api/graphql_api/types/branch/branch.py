@@ -2,7 +2,7 @@ from ariadne import ObjectType
 from graphql import GraphQLResolveInfo
 
 from core.models import Branch, Commit
-from graphql_api.dataloader.commit import CommitLoader
+from graphql_api.dataloader.commit import RepositoryCommitLoader
 
 branch_bindable = ObjectType("Branch")
 
@@ -19,5 +19,6 @@ async def resolve_head_commit(
 ) -> Commit | None:
     head = branch.head
     if head:
-        loader = CommitLoader.loader(info, branch.repository_id)
-        return await loader.load(head)
+        # the branches of a list may be from several repositories
+        loader = RepositoryCommitLoader.loader(info)
+        return await loader.load((branch.repository_id, head))
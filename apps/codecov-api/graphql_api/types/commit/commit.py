@@ -20,6 +20,11 @@ from graphql_api.dataloader.bundle_analysis import (
     load_bundle_analysis_report,
 )
 from graphql_api.dataloader.commit import CommitLoader
+from graphql_api.dataloader.commit_report import (
+    LatestUploadErrorLoader,
+    UploadCountLoader,
+    load_commit_report,
+)
 from graphql_api.dataloader.comparison import ComparisonLoader
 from graphql_api.dataloader.owner import OwnerLoader
 from graphql_api.helpers.connection import (
@@ -156,7 +161,7 @@ def get_sorted_path_contents(
     list[File | Dir] | MissingHeadReport | MissingCoverage | UnknownFlags | UnknownPath
 ):
     # TODO: Might need to add reports here filtered by flags in the future
-    report = report_service.build_report_from_commit(
+    report = report_service.get_cached_report_from_commit(
         commit, report_class=ReadOnlyReport
     )
     if not report:
@@ -201,14 +206,14 @@ def get_sorted_path_contents(
         return UnknownFlags(f"No coverage with chosen flags: {flags_filter}")
 
     report_paths = ReportPaths(
-        report=report,
+        report=None,
         path=path,
         search_term=search_value,
-        filter_flags=flags_filter,
         filter_paths=component_paths,
+        tree=path_service.get_directory_tree(commit, report, flags_filter),
     )
 
-    if len(report_paths.paths) == 0:
+    if not report_paths.has_paths:
         # we do not know about this path
 
         if path_service.provider_path_exists(path, commit, current_owner) is False:
@@ -295,8 +300,7 @@ async def resolve_errors(commit, info, error_type):
 
 @commit_bindable.field("totalUploads")
 async def resolve_total_uploads(commit, info):
-    command = info.context["executor"].get_command("commit")
-    return await command.get_uploads_number(commit)
+    return await UploadCountLoader.loader(info).load(commit.id)
 
 
 @commit_bindable.field("bundleStatus")
@@ -328,11 +332,12 @@ def resolve_commit_bundle_analysis(commit, info):
 
 @commit_coverage_analytics_bindable.field("totals")
 @sentry_sdk.trace
-def resolve_coverage_totals(
+async def resolve_coverage_totals(
     commit: Commit, info: GraphQLResolveInfo
 ) -> ReportTotals | None:
-    command = info.context["executor"].get_command("commit")
-    return command.fetch_totals(commit)
+    commit_report = await load_commit_report(info, commit)
+    if commit_report and hasattr(commit_report, "reportleveltotals"):
+        return commit_report.reportleveltotals
 
 
 @commit_coverage_analytics_bindable.field("flagNames")
@@ -411,12 +416,12 @@ async def resolve_commit_bundle_analysis_compare_with_parent(
         info.context[
             "request"
         ].bundle_analysis_base_report_db_path = (
-            bundle_analysis_comparison.comparison.base_report.db_path
+            bundle_analysis_comparison.comparison.base_report_db_path
         )
         info.context[
             "request"
         ].bundle_analysis_head_report_db_path = (
-            bundle_analysis_comparison.comparison.head_report.db_path
+            bundle_analysis_comparison.comparison.head_report_db_path
         )
 
     return bundle_analysis_comparison
@@ -442,5 +447,14 @@ def resolve_commit_bundle_analysis_report(commit: Commit, info) -> BundleAnalysi
 
 @commit_bindable.field("latestUploadError")
 async def resolve_latest_upload_error(commit, info):
-    command = info.context["executor"].get_command("commit")
-    return await command.get_latest_upload_error(commit)
+    try:
+        latest_error = await LatestUploadErrorLoader.loader(info).load(commit.id)
+    except Exception:
+        log.exception("Error fetching upload error")
+        return None
+    if not latest_error:
+        return None
+    return {
+        "error_code": latest_error.error_code,
+        "error_message": latest_error.error_params.get("error_message"),
+    }
@@ -90,13 +90,12 @@ async def resolve_compare_with_base(
 
 
 @pull_bindable.field("bundleAnalysisCompareWithBase")
-@sync_to_async
 @sentry_sdk.trace
-def resolve_bundle_analysis_compare_with_base(
+async def resolve_bundle_analysis_compare_with_base(
     pull: Pull, info: GraphQLResolveInfo, **kwargs: Any
 ) -> BundleAnalysisComparison | Any:
     if not pull.compared_to:
-        if pull.repository.pull_requests.order_by("id").first() == pull:
+        if await is_first_pull_request(pull):
             return FirstPullRequest()
         else:
             return MissingBaseCommit()
@@ -107,13 +106,12 @@ def resolve_bundle_analysis_compare_with_base(
     # over to the head commit
     head_commit_sha = pull.head if pull.head else pull.compared_to
 
-    bundle_analysis_comparison = load_bundle_analysis_comparison(
-        Commit.objects.filter(
-            commitid=pull.compared_to, repository=pull.repository
-        ).first(),
-        Commit.objects.filter(
-            commitid=head_commit_sha, repository=pull.repository
-        ).first(),
+    commit_loader = CommitLoader.loader(info, pull.repository_id)
+    base_commit, head_commit = await commit_loader.load_many(
+        [pull.compared_to, head_commit_sha]
+    )
+    bundle_analysis_comparison = await sync_to_async(load_bundle_analysis_comparison)(
+        base_commit, head_commit
     )
 
     # Store the created SQLite DB path in info.context
@@ -122,12 +120,12 @@ def resolve_bundle_analysis_compare_with_base(
         info.context[
             "request"
         ].bundle_analysis_base_report_db_path = (
-            bundle_analysis_comparison.comparison.base_report.db_path
+            bundle_analysis_comparison.comparison.base_report_db_path
         )
         info.context[
             "request"
         ].bundle_analysis_head_report_db_path = (
-            bundle_analysis_comparison.comparison.head_report.db_path
+            bundle_analysis_comparison.comparison.head_report_db_path
         )
 
     return bundle_analysis_comparison
@@ -13,6 +13,7 @@ import shared.rate_limits as rate_limits
 from codecov_auth.models import SERVICE_GITHUB, SERVICE_GITHUB_ENTERPRISE, Owner
 from core.models import Branch, Commit, Pull, Repository
 from graphql_api.actions.commits import load_commit_statuses, repo_commits
+from graphql_api.dataloader.branch import BranchLoader
 from graphql_api.dataloader.commit import CommitLoader
 from graphql_api.dataloader.owner import OwnerLoader
 from graphql_api.helpers.connection import queryset_to_connection
@@ -64,8 +65,7 @@ def resolve_oldest_commit_at(
 def resolve_branch(
     repository: Repository, info: GraphQLResolveInfo, name: str
 ) -> Branch:
-    command = info.context["executor"].get_command("branch")
-    return command.fetch_branch(repository, name)
+    return BranchLoader.loader(info).load((repository.repoid, name))
 
 
 @repository_bindable.field("author")
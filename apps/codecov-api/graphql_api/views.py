@@ -28,8 +28,14 @@ from codecov.commands.exceptions import BaseException
 from codecov.commands.executor import get_executor_from_request
 from codecov_auth.middleware import jwt_middleware
 from services import ServiceException
-from shared.helpers.redis import get_redis_connection
+from services.rate_limits import get_client_ip, user_or_ip_key
 from shared.metrics import Counter, Histogram, inc_counter
+from shared.rate_limits.limiter import (
+    RateLimit,
+    RateLimiter,
+    RateLimitResult,
+    get_rate_limit_backend,
+)
 
 from .schema import schema
 from .validation import (
@@ -257,7 +263,8 @@ class AsyncGraphqlView(GraphQLAsyncView):
         }
         log.info("GraphQL Request", extra=log_data)
         inc_counter(GQL_REQUEST_MADE_COUNTER, labels={"path": req_path})
-        if self._check_ratelimit(request=request):
+        rate_limit = self._check_ratelimit(request=request)
+        if rate_limit is not None and not rate_limit.allowed:
             inc_counter(
                 GQL_ERROR_TYPE_COUNTER,
                 labels={"error_type": "rate_limit", "path": req_path},
@@ -268,6 +275,7 @@ class AsyncGraphqlView(GraphQLAsyncView):
                     "detail": f"It looks like you've hit the rate limit of {settings.GRAPHQL_RATE_LIMIT_RPM} req/min. Try again later.",
                 },
                 status=429,
+                headers=rate_limit.headers,
             )
 
         with RequestFinalizer(request):
@@ -369,65 +377,19 @@ class AsyncGraphqlView(GraphQLAsyncView):
         if request.user:
             request.user.pk
 
-    def _check_ratelimit(self, request: WSGIRequest) -> bool:
+    def _check_ratelimit(self, request: WSGIRequest) -> RateLimitResult | None:
+        """Records the request with the rate limiter, unless it is disabled."""
         if not settings.GRAPHQL_RATE_LIMIT_ENABLED:
-            return False
-
-        redis = get_redis_connection()
-
-        try:
-            # eagerly try to get user_id from request object
-            user_id = request.user.pk
-        except AttributeError:
-            user_id = None
+            return None
 
-        if user_id:
-            key = f"rl-user:{user_id}"
-        else:
-            user_ip = self.get_client_ip(request)
-            key = f"rl-ip:{user_ip}"
-
-        limit = settings.GRAPHQL_RATE_LIMIT_RPM
-        window = 60  # in seconds
-
-        current_count = redis.get(key)
-        if current_count is None:
-            log.info(
-                "[GQL Rate Limit] - Setting new key",
-                extra={"key": key, "user_id": user_id},
-            )
-            redis.set(name=key, ex=window, value=1)
-        elif int(current_count) >= limit:
-            log.warning(
-                "[GQL Rate Limit] - Rate limit reached for key",
-                extra={
-                    "key": key,
-                    "limit": limit,
-                    "count": current_count,
-                    "user_id": user_id,
-                },
-            )
-            return True
-        else:
-            log.warning(
-                "[GQL Rate Limit] - Incrementing rate limit for key",
-                extra={
-                    "key": key,
-                    "limit": limit,
-                    "count": current_count,
-                    "user_id": user_id,
-                },
-            )
-            redis.incr(key)
-        return False
+        limiter = RateLimiter(
+            get_rate_limit_backend(),
+            RateLimit(limit=settings.GRAPHQL_RATE_LIMIT_RPM, window=60),
+        )
+        return limiter.check(user_or_ip_key("graphql", request))
 
     def get_client_ip(self, request: WSGIRequest) -> str:
-        x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(",")[0]
-        else:
-            ip = request.META.get("REMOTE_ADDR")
-        return ip
+        return get_client_ip(request)
 
 
 BaseAriadneView = AsyncGraphqlView.as_view()
@@ -380,16 +380,21 @@ class BundleAnalysisComparison:
             head_report_key,
             repository,
         )
-        self.head_report = self.comparison.head_report
+        # Resolved upfront so that any report downloaded to compute it is known
+        # to the resolver creating this comparison, which schedules its cleanup
+        self.computed = self.comparison.computed
+
+    @cached_property
+    def head_report(self) -> SharedBundleAnalysisReport:
+        return self.comparison.head_report
 
     @cached_property
     def bundles(self) -> list["BundleComparison"]:
         bundle_comparisons = []
         for bundle_change in self.comparison.bundle_changes():
-            head_bundle_report = self.comparison.head_report.bundle_report(
-                bundle_change.bundle_name
+            head_size = self.computed.head_bundle_sizes.get(
+                bundle_change.bundle_name, 0
             )
-            head_size = head_bundle_report.total_size() if head_bundle_report else 0
             bundle_comparisons.append(BundleComparison(bundle_change, head_size))
         return bundle_comparisons
 
@@ -399,7 +404,7 @@ class BundleAnalysisComparison:
 
     @cached_property
     def size_total(self) -> int:
-        return BundleAnalysisReport(self.head_report).size_total
+        return sum(self.computed.head_bundle_sizes.values())
 
 
 @dataclass
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-from collections import defaultdict
-from collections.abc import Iterable
+import logging
 from dataclasses import dataclass
 from functools import cached_property
 
@@ -12,11 +11,23 @@ from django.conf import settings
 from codecov_auth.models import Owner
 from core.models import Commit
 from services.repo_providers import RepoProviderService
+from shared.api_archive.archive import ArchiveService
+from shared.reports.directory_tree import (
+    DirectoryTree,
+    Node,
+    directory_tree_fingerprint,
+    directory_tree_name,
+    directory_trees_enabled,
+    is_file_node,
+)
 from shared.reports.filtered import FilteredReport, FilteredReportFile
 from shared.reports.resources import Report
 from shared.reports.types import ReportTotals
+from shared.storage.exceptions import FileNotInStorageError
 from shared.torngit.exceptions import TorngitClientError
 
+log = logging.getLogger(__name__)
+
 
 class PathNode:
     """
@@ -62,7 +73,7 @@ class File(PathNode):
     totals: ReportTotals
 
 
-@dataclass
+@dataclass(eq=False)
 class Dir(PathNode):
     """
     Directory node in a file/directory tree.
@@ -71,6 +82,12 @@ class Dir(PathNode):
     full_path: str
     children: list[File | Dir]
 
+    def __eq__(self, other: object) -> bool:
+        # any kind of `Dir` is equal to another with the same contents
+        if not isinstance(other, Dir):
+            return NotImplemented
+        return (self.full_path, self.children) == (other.full_path, other.children)
+
     @cached_property
     def totals(self) -> ReportTotals:
         # A dir's totals are sum of its children's totals
@@ -83,6 +100,37 @@ class Dir(PathNode):
         return totals
 
 
+class TreeDir(Dir):
+    """
+    Directory node of a `DirectoryTree`, with the totals aggregated in the
+    tree. Its children are only listed when needed.
+    """
+
+    def __init__(self, tree: DirectoryTree, full_path: str, node: Node):
+        self.full_path = full_path
+        self._tree = tree
+        self._node = node
+
+    @cached_property
+    def children(self) -> list[File | Dir]:
+        return tree_nodes(self._tree, self._tree.children(self.full_path))
+
+    @cached_property
+    def totals(self) -> ReportTotals:
+        return DirectoryTree.totals(self._node)
+
+
+def tree_nodes(
+    tree: DirectoryTree, children: list[tuple[str, Node]]
+) -> list[File | Dir]:
+    return [
+        File(full_path=full_path, totals=DirectoryTree.totals(node))
+        if is_file_node(node)
+        else TreeDir(tree, full_path, node)
+        for full_path, node in children
+    ]
+
+
 @dataclass
 class PrefixedPath:
     full_path: str
@@ -141,44 +189,45 @@ def dashboard_commit_file_url(
 class ReportPaths:
     """
     Contains methods for getting path information out of a single report.
+
+    Paths are looked up in the `DirectoryTree` of the report: either `tree`
+    when given (already filtered by `filter_flags`), or one built from the
+    filtered report.
     """
 
     @sentry_sdk.trace
     def __init__(
         self,
-        report: Report,
+        report: Report | None,
         path: str | None = None,
         search_term: str | None = None,
         filter_flags: list[str] = None,
         filter_paths: list[str] = None,
+        tree: DirectoryTree | None = None,
     ):
-        self.report: Report | FilteredReport = report
+        self.report: Report | FilteredReport | None = report
         self.filter_flags = filter_flags or []
         self.filter_paths = filter_paths or []
         self.prefix = path or ""
+        self.search_term = search_term.lower() if search_term else None
 
-        # Filter report if flags or paths exist
-        if self.filter_flags or self.filter_paths:
-            self.report = self.report.filter(
-                paths=self.filter_paths, flags=self.filter_flags
+        if tree is not None:
+            self.tree = tree.filter(self.filter_paths)
+        else:
+            # Filter report if flags or paths exist
+            if self.filter_flags or self.filter_paths:
+                self.report = self.report.filter(
+                    paths=self.filter_paths, flags=self.filter_flags
+                )
+            self.tree = DirectoryTree.build(
+                (full_path, self._totals(full_path)) for full_path in self.files
             )
 
-        self._paths = [
-            PrefixedPath(full_path=full_path, prefix=self.prefix)
-            for full_path in self.files
-            if is_subpath(full_path, self.prefix)
-        ]
-
-        if search_term:
-            search_term = search_term.lower()
-            self._paths = [
-                path
-                for path in self._paths
-                if search_term in path.relative_path.lower()
-            ]
-
     @cached_property
     def files(self) -> list[str]:
+        if self.report is None:
+            return self.tree.files()
+
         # No flags filtering, just return (path-filtered) files in Report
         if not self.filter_flags:
             return self.report.files
@@ -201,9 +250,32 @@ class ReportPaths:
             files.append(file.name)
         return files
 
+    @cached_property
+    def _file_nodes(self) -> list[tuple[str, list]]:
+        file_nodes = self.tree.iter_files(self.prefix)
+        if self.search_term:
+            return [
+                (full_path, node)
+                for full_path, node in file_nodes
+                if self.search_term
+                in PrefixedPath(full_path, self.prefix).relative_path.lower()
+            ]
+        return list(file_nodes)
+
     @property
     def paths(self) -> list[PrefixedPath]:
-        return self._paths
+        return [
+            PrefixedPath(full_path=full_path, prefix=self.prefix)
+            for full_path, _node in self._file_nodes
+        ]
+
+    @property
+    def has_paths(self) -> bool:
+        """Whether there are any `paths`, without listing them."""
+        if self.search_term:
+            return len(self._file_nodes) > 0
+        node = self.tree.node(self.prefix)
+        return node is not None and (is_file_node(node) or bool(node["c"]))
 
     @sentry_sdk.trace
     def full_filelist(self) -> list[File | Dir]:
@@ -211,8 +283,8 @@ class ReportPaths:
         Return a flat file list of all files under the specified `path` prefix/directory.
         """
         return [
-            File(full_path=path.full_path, totals=self._totals(path))
-            for path in self.paths
+            File(full_path=full_path, totals=DirectoryTree.totals(node))
+            for full_path, node in self._file_nodes
         ]
 
     @sentry_sdk.trace
@@ -220,44 +292,74 @@ class ReportPaths:
         """
         Return a single directory (specified by `path`) of mixed file/directory results.
         """
-        return self._single_directory_recursive(self.paths)
+        tree = self.tree
+        if self.search_term:
+            # a directory of only the files matching the search
+            tree = DirectoryTree.build(
+                (full_path, DirectoryTree.totals(node))
+                for full_path, node in self._file_nodes
+            )
+        node = tree.node(self.prefix)
+        if node is not None and is_file_node(node):
+            return [File(full_path=self.prefix, totals=DirectoryTree.totals(node))]
+        return tree_nodes(tree, tree.children(self.prefix))
 
-    def _totals(self, path: PrefixedPath) -> ReportTotals:
+    def _totals(self, full_path: str) -> ReportTotals:
         """
-        Returns the report totals for a given prefixed path.
+        Returns the report totals for a given path.
         """
         # Fixes an issue when filtering by flags does not work in the case where
         # one flag covers half of the file and another flag covers another half.
         # Using get_file_totals will return the totals for coverage of all flags
         # applied to the file instead of just the filter flags being queried
         if self.filter_flags:
-            return self.report.get(path.full_path).totals
+            return self.report.get(full_path).totals
         else:
-            return self.report.get_file_totals(path.full_path)
-
-    def _single_directory_recursive(
-        self, paths: Iterable[PrefixedPath]
-    ) -> list[File | Dir]:
-        grouped = defaultdict(list)
-        for path in paths:
-            grouped[path.basename].append(path)
-
-        results: list[File | Dir] = []
-
-        for basename, paths in grouped.items():
-            if len(paths) == 1 and paths[0].is_file:
-                path = paths[0]
-                results.append(
-                    File(full_path=path.full_path, totals=self._totals(path))
-                )
-            else:
-                children = self._single_directory_recursive(
-                    PrefixedPath(full_path=path.full_path, prefix=basename)
-                    for path in paths
-                )
-                results.append(Dir(full_path=basename, children=children))
+            return self.report.get_file_totals(full_path)
+
 
-        return results
+@sentry_sdk.trace
+def get_directory_tree(
+    commit: Commit, report: Report, flags: list[str] | None = None
+) -> DirectoryTree:
+    """
+    The `DirectoryTree` of the report of `commit`, filtered by `flags`.
+
+    When enabled, trees are stored next to the report: the worker stores the
+    one of the whole report when saving it, and the ones filtered by flags
+    are stored here the first time they are built. A tree that is missing or
+    was built from a previous version of the report is built from `report`.
+    """
+    if not directory_trees_enabled():
+        return ReportPaths(report, filter_flags=flags).tree
+
+    fingerprint = directory_tree_fingerprint(
+        commit.totals, (commit.report or {}).get("sessions")
+    )
+    tree_name = directory_tree_name(flags)
+    archive_service = ArchiveService(commit.repository)
+    try:
+        tree = DirectoryTree.deserialize(
+            archive_service.read_directory_tree(commit.commitid, tree_name)
+        )
+        if tree is not None and tree.fingerprint == fingerprint:
+            return tree
+    except FileNotInStorageError:
+        pass
+
+    tree = ReportPaths(report, filter_flags=flags).tree
+    tree.fingerprint = fingerprint
+    try:
+        archive_service.write_directory_tree(
+            commit.commitid, tree.serialize(), tree_name
+        )
+    except Exception:
+        log.warning(
+            "Failed to store directory tree",
+            extra={"commit": commit.commitid, "tree_name": tree_name},
+            exc_info=True,
+        )
+    return tree
 
 
 def provider_path_exists(path: str, commit: Commit, owner: Owner) -> bool | None:
@@ -0,0 +1,86 @@
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.http import HttpRequest
+from rest_framework.throttling import BaseThrottle
+
+from shared.rate_limits.limiter import (
+    RateLimit,
+    RateLimiter,
+    RateLimitResult,
+    get_rate_limit_backend,
+    ip_key,
+    user_key,
+)
+
+if TYPE_CHECKING:
+    # the views load the default throttles, `APIRateLimitThrottle` among them
+    from rest_framework.views import APIView
+
+
+def get_client_ip(request: HttpRequest) -> str:
+    x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
+    if x_forwarded_for:
+        ip = x_forwarded_for.split(",")[0]
+    else:
+        ip = request.META.get("REMOTE_ADDR")
+    return ip
+
+
+def user_or_ip_key(scope: str, request: HttpRequest) -> str:
+    """Requests are limited by user, or by IP when anonymous."""
+    try:
+        # eagerly try to get user_id from request object
+        user_id = request.user.pk
+    except AttributeError:
+        user_id = None
+    if user_id:
+        return user_key(scope, user_id)
+    return ip_key(scope, get_client_ip(request))
+
+
+class RateLimitThrottle(BaseThrottle):
+    """
+    Throttles requests with the rate limiter shared by the API, GraphQL and
+    uploads. DRF answers throttled requests with a 429, and a `Retry-After`
+    header from `wait`.
+    """
+
+    scope: str
+
+    def is_enabled(self) -> bool:
+        raise NotImplementedError()
+
+    def get_rate_limit(self) -> RateLimit:
+        raise NotImplementedError()
+
+    def get_key(self, request: HttpRequest, view: "APIView") -> str | None:
+        """The key of the requests to limit together, if any."""
+        raise NotImplementedError()
+
+    def allow_request(self, request: HttpRequest, view: "APIView") -> bool:
+        self.result: RateLimitResult | None = None
+        if not self.is_enabled():
+            return True
+        key = self.get_key(request, view)
+        if key is None:
+            return True
+        limiter = RateLimiter(get_rate_limit_backend(), self.get_rate_limit())
+        self.result = limiter.check(key)
+        return self.result.allowed
+
+    def wait(self) -> int | None:
+        return self.result.retry_after if self.result else None
+
+
+class APIRateLimitThrottle(RateLimitThrottle):
+    scope = "api"
+
+    def is_enabled(self) -> bool:
+        return settings.API_RATE_LIMIT_ENABLED
+
+    def get_rate_limit(self) -> RateLimit:
+        return RateLimit(limit=settings.API_RATE_LIMIT_RPM, window=60)
+
+    def get_key(self, request: HttpRequest, view: "APIView") -> str | None:
+        return user_or_ip_key(self.scope, request)
@@ -9,11 +9,15 @@ from services.path import (
     File,
     PrefixedPath,
     ReportPaths,
+    TreeDir,
     dashboard_commit_file_url,
+    get_directory_tree,
     provider_path_exists,
 )
+from shared.api_archive.archive import ArchiveService
 from shared.django_apps.core.tests.factories import CommitFactory, OwnerFactory
 from shared.reports.api_report_service import SerializableReport
+from shared.reports.directory_tree import DirectoryTree, directory_tree_fingerprint
 from shared.reports.resources import Report, ReportFile
 from shared.reports.types import ReportLine, ReportTotals
 from shared.torngit.exceptions import TorngitClientGeneralError
@@ -231,6 +235,51 @@ class TestReportPaths(TestCase):
         report_paths = ReportPaths(report=report, filter_flags=flags)
         assert report_paths.files == ["foo/file1.py"]
 
+    def test_has_paths(self):
+        assert ReportPaths(self.report).has_paths
+        assert ReportPaths(self.report, path="dir/subdir").has_paths
+        assert ReportPaths(self.report, path="dir/file1.py").has_paths
+        assert not ReportPaths(self.report, path="wrong").has_paths
+        assert ReportPaths(self.report, search_term="ile2").has_paths
+        assert not ReportPaths(self.report, search_term="ile4").has_paths
+        assert not ReportPaths(Report()).has_paths
+
+    def test_single_directory_search(self):
+        report_paths = ReportPaths(self.report, path="dir", search_term="ile3")
+        assert report_paths.single_directory() == [
+            Dir(
+                full_path="dir/subdir",
+                children=[
+                    File(full_path="dir/subdir/file3.py", totals=totals3),
+                ],
+            ),
+        ]
+
+    def test_tree(self):
+        tree = DirectoryTree.from_report(self.report)
+        report_paths = ReportPaths(
+            report=None, path="dir", filter_paths=[".*subdir.*"], tree=tree
+        )
+
+        assert report_paths.files == ["dir/subdir/file2.py", "dir/subdir/file3.py"]
+        assert report_paths.full_filelist() == [
+            File(full_path="dir/subdir/file2.py", totals=totals2),
+            File(full_path="dir/subdir/file3.py", totals=totals3),
+        ]
+
+        [subdir] = report_paths.single_directory()
+        assert isinstance(subdir, TreeDir)
+        # the totals of the directory come from the tree, without its children
+        assert (subdir.lines, subdir.hits, subdir.misses) == (20, 11, 4)
+        assert "children" not in subdir.__dict__
+        assert subdir == Dir(
+            full_path="dir/subdir",
+            children=[
+                File(full_path="dir/subdir/file2.py", totals=totals2),
+                File(full_path="dir/subdir/file3.py", totals=totals3),
+            ],
+        )
+
 
 class TestReportPathsNested(TestCase):
     def setUp(self):
@@ -274,6 +323,83 @@ class TestReportPathsNested(TestCase):
         ]
 
 
+@pytest.fixture
+def directory_trees_enabled(mocker):
+    mocker.patch("services.path.directory_trees_enabled", return_value=True)
+
+
+def test_get_directory_tree(mock_storage, directory_trees_enabled, mocker):
+    report = SerializableReport(
+        files={"dir/file1.py": file_data1, "dir/subdir/file2.py": file_data2}
+    )
+    commit = MagicMock(
+        commitid="abc",
+        totals={"f": 2, "n": 20, "s": 1},
+        report={"sessions": {"0": {"d": 1}}},
+    )
+    build_tree = mocker.spy(DirectoryTree, "build")
+
+    tree = get_directory_tree(commit, report)
+    assert tree.files() == ["dir/file1.py", "dir/subdir/file2.py"]
+    assert build_tree.call_count == 1
+
+    # read back from storage afterwards
+    stored_tree = get_directory_tree(commit, report)
+    assert stored_tree.root == tree.root
+    assert build_tree.call_count == 1
+
+    # until the report changes
+    commit.totals = {"f": 2, "n": 20, "s": 2}
+    get_directory_tree(commit, report)
+    assert build_tree.call_count == 2
+
+    # even when its totals don't
+    commit.report = {"sessions": {"0": {"d": 2}}}
+    get_directory_tree(commit, report)
+    assert build_tree.call_count == 3
+
+
+def test_get_directory_tree_stored_by_worker(mock_storage, directory_trees_enabled):
+    commit = MagicMock(
+        commitid="abc", totals={"f": 1, "n": 10, "s": 1}, report={"sessions": {}}
+    )
+    stored_tree = DirectoryTree.build(
+        [("stored.py", totals1)],
+        directory_tree_fingerprint(commit.totals, commit.report["sessions"]),
+    )
+    ArchiveService(commit.repository).write_directory_tree(
+        commit.commitid, stored_tree.serialize()
+    )
+
+    tree = get_directory_tree(commit, report=MagicMock())
+
+    assert tree.files() == ["stored.py"]
+
+
+def test_get_directory_tree_with_flags(mock_storage, directory_trees_enabled):
+    report = Report()
+    session_a_id, _ = report.add_session(Session(flags=["flag-a"]))
+    session_b_id, _ = report.add_session(Session(flags=["flag-b"]))
+    file_a = ReportFile("foo/file1.py")
+    file_a.append(1, ReportLine.create(1, sessions=[[session_a_id, 1]]))
+    report.append(file_a)
+    file_b = ReportFile("foo/file2.py")
+    file_b.append(1, ReportLine.create(1, sessions=[[session_b_id, 1]]))
+    report.append(file_b)
+    commit = MagicMock(
+        commitid="abc", totals={"f": 2, "n": 2, "s": 2}, report={"sessions": {}}
+    )
+
+    assert get_directory_tree(commit, report, ["flag-a"]).files() == ["foo/file1.py"]
+    assert get_directory_tree(commit, report).files() == [
+        "foo/file1.py",
+        "foo/file2.py",
+    ]
+    assert get_directory_tree(commit, MagicMock(), ["flag-a"]).files() == [
+        "foo/file1.py"
+    ]
+
+
 class MockedProviderAdapter:
     async def list_files(self, *args, **kwargs):
         return []
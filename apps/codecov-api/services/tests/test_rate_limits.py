@@ -0,0 +1,45 @@
+from unittest.mock import MagicMock, patch
+
+from django.test import RequestFactory, override_settings
+
+from services.rate_limits import APIRateLimitThrottle, get_client_ip, user_or_ip_key
+from shared.rate_limits.limiter import InMemoryRateLimitBackend
+
+
+def test_get_client_ip():
+    request = RequestFactory().get(
+        "/", HTTP_X_FORWARDED_FOR="10.0.0.1,10.0.0.2", REMOTE_ADDR="10.0.0.3"
+    )
+    assert get_client_ip(request) == "10.0.0.1"
+    assert get_client_ip(RequestFactory().get("/", REMOTE_ADDR="10.0.0.3")) == (
+        "10.0.0.3"
+    )
+
+
+def test_user_or_ip_key():
+    request = RequestFactory().get("/", REMOTE_ADDR="10.0.0.3")
+    request.user = MagicMock(pk=12)
+    assert user_or_ip_key("api", request) == "rate_limit:api:user:12"
+
+    request.user = MagicMock(pk=None)
+    assert user_or_ip_key("api", request) == "rate_limit:api:ip:10.0.0.3"
+
+
+@override_settings(API_RATE_LIMIT_ENABLED=True, API_RATE_LIMIT_RPM=1)
+@patch("services.rate_limits.get_rate_limit_backend")
+def test_api_rate_limit(mocked_backend):
+    mocked_backend.return_value = InMemoryRateLimitBackend()
+    request = RequestFactory().get("/", REMOTE_ADDR="10.0.0.3")
+    request.user = MagicMock(pk=12)
+
+    throttle = APIRateLimitThrottle()
+    assert throttle.allow_request(request, MagicMock())
+    assert not throttle.allow_request(request, MagicMock())
+    assert throttle.wait() == 60
+
+
+@override_settings(API_RATE_LIMIT_ENABLED=False, API_RATE_LIMIT_RPM=0)
+def test_api_rate_limit_disabled():
+    throttle = APIRateLimitThrottle()
+    assert throttle.allow_request(RequestFactory().get("/"), MagicMock())
+    assert throttle.wait() is None
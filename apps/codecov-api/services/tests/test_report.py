@@ -9,7 +9,12 @@ from shared.django_apps.core.tests.factories import (
     CommitFactory,
     CommitWithReportFactory,
 )
-from shared.reports.api_report_service import build_report_from_commit
+from shared.reports.api_report_service import (
+    ReadOnlyReport,
+    build_report_from_commit,
+    get_cached_report_from_commit,
+    get_parsed_report_cache,
+)
 from shared.reports.resources import Report, ReportFile
 from shared.reports.types import ReportLine
 from shared.storage.exceptions import FileNotInStorageError
@@ -212,6 +217,33 @@ class ReportServiceTest(TestCase):
             == "56e05fced214c44a37759efa2dfc25a65d8ae98d"
         )
 
+    @patch(
+        "shared.reports.api_report_service.get_parsed_report_cache_config",
+        return_value={"enabled": True, "max_size": 10 * 1024 * 1024},
+    )
+    @patch("shared.api_archive.archive.ArchiveService.read_chunks")
+    def test_get_cached_report_from_commit(self, read_chunks_mock, _config_mock):
+        get_parsed_report_cache(10 * 1024 * 1024).clear()
+        f = open(current_file.parent / "samples" / "chunks.txt")
+        read_chunks_mock.return_value = f.read()
+        commit = CommitWithReportFactory.create(message="aaaaa", commitid="abf6d4d")
+
+        report = get_cached_report_from_commit(commit, report_class=ReadOnlyReport)
+        assert isinstance(report, ReadOnlyReport)
+        assert len(report.files) == 3
+        assert (
+            get_cached_report_from_commit(commit, report_class=ReadOnlyReport) is report
+        )
+        assert read_chunks_mock.call_count == 1
+
+        # a new upload changes the totals of the commit, and so its report
+        commit.totals = {**commit.totals, "s": commit.totals["s"] + 1}
+        assert (
+            get_cached_report_from_commit(commit, report_class=ReadOnlyReport)
+            is not report
+        )
+        assert read_chunks_mock.call_count == 2
+
     def test_build_report_from_commit_no_report(self):
         commit = CommitFactory()
         report = build_report_from_commit(commit)
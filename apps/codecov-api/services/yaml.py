@@ -11,6 +11,7 @@ from core.models import Commit
 from services.repo_providers import RepoProviderService
 from shared.helpers.cache import cache
 from shared.yaml import UserYaml, fetch_current_yaml_from_provider_via_reference
+from shared.yaml.cache import get_validated_yaml
 from shared.yaml.validation import validate_yaml
 
 
@@ -44,8 +45,11 @@ def fetch_commit_yaml(commit: Commit, owner: Owner | None) -> dict | None:
         yaml_str = async_to_sync(fetch_current_yaml_from_provider_via_reference)(
             commit.commitid, repository_service
         )
-        yaml_dict = safe_load(yaml_str)
-        return validate_yaml(yaml_dict, show_secrets_for=None)
+        return get_validated_yaml(
+            yaml_str,
+            None,
+            lambda: validate_yaml(safe_load(yaml_str), show_secrets_for=None),
+        )
     except Exception as e:
         # fetching, parsing, validating the yaml inside the commit can
         # have various exceptions, which we do not care about to get the final
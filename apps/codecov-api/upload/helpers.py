@@ -12,7 +12,7 @@ from django.core.exceptions import ObjectDoesNotExist
 from django.db.models import Q
 from django.http import HttpRequest
 from django.utils import timezone
-from jwt import PyJWKClient, PyJWTError
+from jwt import PyJWTError
 from redis import Redis
 from rest_framework.exceptions import NotFound, Throttled, ValidationError
 
@@ -37,6 +37,7 @@ from shared.torngit.base import TorngitBaseAdapter
 from shared.torngit.exceptions import TorngitClientError, TorngitObjectNotFoundError
 from shared.typings.oauth_token_types import OauthConsumerToken
 from shared.upload.utils import query_monthly_coverage_measurements
+from upload.jwks import jwks_cache
 from upload.tokenless.tokenless import TokenlessUploadHandler
 from utils import is_uuid
 from utils.config import get_config
@@ -249,8 +250,7 @@ def get_repo_with_github_actions_oidc_token(token: str) -> Repository:
         # remove trailing slashes if present
         github_enterprise_url = re.sub(r"/+$", "", github_enterprise_url)
         jwks_url = f"{github_enterprise_url}/_services/token/.well-known/jwks"
-    jwks_client = PyJWKClient(jwks_url)
-    signing_key = jwks_client.get_signing_key_from_jwt(token)
+    signing_key = jwks_cache.get_signing_key_from_jwt(jwks_url, token)
     data = jwt.decode(
         token,
         signing_key.key,
@@ -0,0 +1,128 @@
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+import jwt
+from jwt import PyJWK, PyJWKClient, PyJWKClientError, PyJWTError
+
+from upload.metrics import OIDC_JWKS_FETCH_COUNTER
+
+log = logging.getLogger(__name__)
+
+JWKS_CACHE_TTL = 300  # seconds
+# a token signed by a key we don't know about triggers a refresh, but no more
+# often than this, so that made up `kid`s can't be used to hammer the issuer
+JWKS_MIN_REFRESH_INTERVAL = 30  # seconds
+JWKS_FETCH_TIMEOUT = 10  # seconds
+
+
+def fetch_signing_keys(jwks_url: str) -> dict[str, PyJWK]:
+    jwk_set = PyJWKClient(
+        jwks_url, cache_jwk_set=False, timeout=JWKS_FETCH_TIMEOUT
+    ).get_jwk_set()
+    return {
+        jwk.key_id: jwk
+        for jwk in jwk_set.keys
+        if jwk.key_id and jwk.public_key_use in ("sig", None)
+    }
+
+
+@dataclass
+class _JWKSEntry:
+    keys: dict[str, PyJWK] | None = None
+    fetched_at: float = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class JWKSCache:
+    """
+    The signing keys of the JWKS endpoints of OIDC token issuers, shared by all
+    the requests of the process.
+
+    Keys are kept for `ttl` seconds, and a token signed by an unknown key
+    refreshes the keys of its issuer early, to pick up rotated keys. Every
+    issuer is fetched separately, and only one request at a time fetches the
+    keys of a given issuer: concurrent requests wait for that fetch instead of
+    making their own.
+
+    When a refresh fails, the keys fetched last are used for a while longer.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], dict[str, PyJWK]] = fetch_signing_keys,
+        ttl: float = JWKS_CACHE_TTL,
+        min_refresh_interval: float = JWKS_MIN_REFRESH_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.clock = clock
+        self._entries: dict[str, _JWKSEntry] = {}
+        self._lock = threading.Lock()
+
+    def _get_entry(self, jwks_url: str) -> _JWKSEntry:
+        with self._lock:
+            return self._entries.setdefault(jwks_url, _JWKSEntry())
+
+    def get_signing_key(self, jwks_url: str, kid: str) -> PyJWK:
+        entry = self._get_entry(jwks_url)
+        keys = entry.keys
+        if keys is not None and self.clock() - entry.fetched_at < self.ttl:
+            if kid in keys:
+                return keys[kid]
+
+        with entry.lock:
+            # the keys may have been refreshed while waiting for the lock
+            age = self.clock() - entry.fetched_at
+            if entry.keys is not None and age < self.ttl:
+                if kid in entry.keys:
+                    return entry.keys[kid]
+                if age < self.min_refresh_interval:
+                    raise PyJWKClientError(
+                        f'Unable to find a signing key that matches: "{kid}"'
+                    )
+            self._refresh(jwks_url, entry)
+
+        if kid not in entry.keys:
+            raise PyJWKClientError(
+                f'Unable to find a signing key that matches: "{kid}"'
+            )
+        return entry.keys[kid]
+
+    def _refresh(self, jwks_url: str, entry: _JWKSEntry):
+        host = urlparse(jwks_url).hostname or ""
+        try:
+            keys = self.fetch(jwks_url)
+        except PyJWTError:
+            OIDC_JWKS_FETCH_COUNTER.labels(host=host, result="error").inc()
+            if entry.keys is None:
+                raise
+            log.warning(
+                "Failed to refresh JWKS, using the keys fetched before",
+                extra={"jwks_url": jwks_url},
+                exc_info=True,
+            )
+            # don't retry on every request while the issuer is unavailable
+            entry.fetched_at = self.clock() - self.ttl + self.min_refresh_interval
+            return
+        OIDC_JWKS_FETCH_COUNTER.labels(host=host, result="success").inc()
+        entry.keys = keys
+        entry.fetched_at = self.clock()
+
+    def get_signing_key_from_jwt(self, jwks_url: str, token: str) -> PyJWK:
+        kid = jwt.get_unverified_header(token).get("kid")
+        if not kid:
+            raise PyJWKClientError("Token is missing the `kid` header")
+        return self.get_signing_key(jwks_url, kid)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+jwks_cache = JWKSCache()
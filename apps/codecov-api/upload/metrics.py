@@ -14,3 +14,9 @@ API_UPLOAD_COUNTER = Counter(
         "upload_version",
     ],
 )
+
+OIDC_JWKS_FETCH_COUNTER = Counter(
+    "api_upload_oidc_jwks_fetches",
+    "Fetches of the JWKS of OIDC token issuers, to verify upload tokens",
+    ["host", "result"],
+)
@@ -0,0 +1,177 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt import PyJWKClientConnectionError, PyJWKClientError
+from jwt.algorithms import RSAAlgorithm
+
+from upload.jwks import JWKSCache
+
+
+def generate_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def to_jwk(private_key, kid):
+    return {
+        **json.loads(RSAAlgorithm.to_jwk(private_key.public_key())),
+        "kid": kid,
+        "use": "sig",
+        "alg": "RS256",
+    }
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class JWKSServer:
+    """A local stand-in for the JWKS endpoint of token issuers."""
+
+    def __init__(self):
+        self.keys: dict[str, list[dict]] = {}
+        self.requests: list[str] = []
+        self.delay = 0
+        self.status = 200
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append(self.path)
+                time.sleep(server.delay)
+                body = json.dumps({"keys": server.keys.get(self.path, [])}).encode()
+                self.send_response(server.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.httpd.server_port}{path}"
+
+
+@pytest.fixture
+def jwks_server():
+    server = JWKSServer()
+    server.thread.start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+
+@pytest.fixture
+def signing_key():
+    return generate_key()
+
+
+def test_keys_are_cached(jwks_server, signing_key):
+    jwks_server.keys["/jwks"] = [to_jwk(signing_key, "key-1")]
+    clock = FakeClock()
+    cache = JWKSCache(ttl=300, clock=clock)
+    token = jwt.encode(
+        {"sub": "repo"}, signing_key, algorithm="RS256", headers={"kid": "key-1"}
+    )
+
+    for _ in range(3):
+        key = cache.get_signing_key_from_jwt(jwks_server.url("/jwks"), token)
+        assert jwt.decode(token, key.key, algorithms=["RS256"]) == {"sub": "repo"}
+    assert len(jwks_server.requests) == 1
+
+    clock.now += 301
+    cache.get_signing_key_from_jwt(jwks_server.url("/jwks"), token)
+    assert len(jwks_server.requests) == 2
+
+
+def test_unknown_kid_refreshes_keys(jwks_server, signing_key):
+    rotated_key = generate_key()
+    jwks_server.keys["/jwks"] = [to_jwk(signing_key, "key-1")]
+    clock = FakeClock()
+    cache = JWKSCache(ttl=300, min_refresh_interval=30, clock=clock)
+    url = jwks_server.url("/jwks")
+
+    cache.get_signing_key(url, "key-1")
+    jwks_server.keys["/jwks"].append(to_jwk(rotated_key, "key-2"))
+
+    # too soon after the last fetch to refresh again
+    with pytest.raises(PyJWKClientError):
+        cache.get_signing_key(url, "key-2")
+    assert len(jwks_server.requests) == 1
+
+    clock.now += 31
+    assert cache.get_signing_key(url, "key-2").key_id == "key-2"
+    assert len(jwks_server.requests) == 2
+
+    # a kid that doesn't exist doesn't refresh the keys right away again
+    with pytest.raises(PyJWKClientError):
+        cache.get_signing_key(url, "made-up")
+    assert len(jwks_server.requests) == 2
+
+
+def test_concurrent_requests_fetch_once(jwks_server, signing_key):
+    jwks_server.keys["/jwks"] = [to_jwk(signing_key, "key-1")]
+    jwks_server.delay = 0.2
+    cache = JWKSCache()
+    url = jwks_server.url("/jwks")
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        keys = list(
+            executor.map(lambda _: cache.get_signing_key(url, "key-1"), range(10))
+        )
+
+    assert {key.key_id for key in keys} == {"key-1"}
+    assert jwks_server.requests == ["/jwks"]
+
+
+def test_issuers_are_cached_separately(jwks_server, signing_key):
+    other_key = generate_key()
+    jwks_server.keys["/github"] = [to_jwk(signing_key, "key-1")]
+    jwks_server.keys["/ghe"] = [to_jwk(other_key, "key-1")]
+    cache = JWKSCache()
+
+    github_key = cache.get_signing_key(jwks_server.url("/github"), "key-1")
+    ghe_key = cache.get_signing_key(jwks_server.url("/ghe"), "key-1")
+
+    assert github_key.key is not ghe_key.key
+    assert github_key.key.public_numbers() == signing_key.public_key().public_numbers()
+    assert ghe_key.key.public_numbers() == other_key.public_key().public_numbers()
+    assert sorted(jwks_server.requests) == ["/ghe", "/github"]
+
+
+def test_failed_refresh_uses_previous_keys(jwks_server, signing_key):
+    jwks_server.keys["/jwks"] = [to_jwk(signing_key, "key-1")]
+    clock = FakeClock()
+    cache = JWKSCache(ttl=300, min_refresh_interval=30, clock=clock)
+    url = jwks_server.url("/jwks")
+    cache.get_signing_key(url, "key-1")
+
+    jwks_server.status = 503
+    clock.now += 301
+    assert cache.get_signing_key(url, "key-1").key_id == "key-1"
+    assert cache.get_signing_key(url, "key-1").key_id == "key-1"
+    # retried once the refresh interval is over
+    assert len(jwks_server.requests) == 2
+    clock.now += 31
+    cache.get_signing_key(url, "key-1")
+    assert len(jwks_server.requests) == 3
+
+
+def test_failed_first_fetch(jwks_server):
+    jwks_server.status = 503
+    cache = JWKSCache()
+    with pytest.raises(PyJWKClientConnectionError):
+        cache.get_signing_key(jwks_server.url("/jwks"), "key-1")
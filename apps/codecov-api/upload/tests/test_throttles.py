@@ -1,6 +1,6 @@
-from unittest.mock import MagicMock, Mock
+from unittest.mock import MagicMock, Mock, patch
 
-from django.test import override_settings
+from django.test import RequestFactory, override_settings
 from rest_framework.test import APITestCase
 
 from billing.helpers import mock_all_plans_and_tiers
@@ -13,8 +13,13 @@ from shared.django_apps.core.tests.factories import (
 from shared.django_apps.reports.models import ReportType
 from shared.helpers.redis import get_redis_connection
 from shared.plan.constants import DEFAULT_FREE_PLAN
+from shared.rate_limits.limiter import InMemoryRateLimitBackend
 from shared.upload.utils import UploaderType, insert_coverage_measurement
-from upload.throttles import UploadsPerCommitThrottle, UploadsPerWindowThrottle
+from upload.throttles import (
+    UploadsPerCommitThrottle,
+    UploadsPerWindowThrottle,
+    UploadsRateLimitThrottle,
+)
 
 
 class ThrottlesUnitTests(APITestCase):
@@ -200,3 +205,33 @@ class ThrottlesUnitTests(APITestCase):
         self.request_should_not_throttle(commit)
         assert redis.get(cache_key) == b"1"
         redis.delete(cache_key)
+
+
+@override_settings(UPLOAD_RATE_LIMIT_ENABLED=True, UPLOAD_RATE_LIMIT_RPM=2)
+@patch("services.rate_limits.get_rate_limit_backend")
+def test_uploads_rate_limit(mocked_backend):
+    mocked_backend.return_value = InMemoryRateLimitBackend()
+    view = MagicMock()
+    view.get_repo.return_value.author_id = 1
+    request = RequestFactory().post("/upload", HTTP_AUTHORIZATION="token abc")
+    other_request = RequestFactory().post("/upload", HTTP_AUTHORIZATION="token def")
+    tokenless_request = RequestFactory().post("/upload")
+
+    throttle = UploadsRateLimitThrottle()
+    assert throttle.allow_request(request, view)
+    assert throttle.allow_request(request, view)
+    assert not throttle.allow_request(request, view)
+    assert throttle.wait() == 30
+
+    # limited by upload token, or by owner when tokenless
+    assert throttle.allow_request(other_request, view)
+    assert throttle.allow_request(tokenless_request, view)
+    assert throttle.allow_request(tokenless_request, view)
+    assert not throttle.allow_request(tokenless_request, view)
+
+
+@override_settings(UPLOAD_RATE_LIMIT_ENABLED=False, UPLOAD_RATE_LIMIT_RPM=0)
+def test_uploads_rate_limit_disabled():
+    throttle = UploadsRateLimitThrottle()
+    assert throttle.allow_request(RequestFactory().post("/upload"), MagicMock())
+    assert throttle.wait() is None
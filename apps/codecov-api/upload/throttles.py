@@ -4,13 +4,21 @@ from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
 from django.db.models import Q
 from django.http import HttpRequest
+from rest_framework.authentication import get_authorization_header
 from rest_framework.exceptions import ValidationError
 from rest_framework.throttling import BaseThrottle
 from rest_framework.views import APIView
 
 from reports.models import ReportSession
+from services.rate_limits import RateLimitThrottle
 from shared.helpers.redis import get_redis_connection
 from shared.plan.service import PlanService
+from shared.rate_limits.limiter import (
+    RateLimit,
+    RateLimitAlgorithm,
+    owner_key,
+    upload_token_key,
+)
 from shared.reports.enums import UploadType
 from shared.upload.utils import query_monthly_coverage_measurements
 from upload.helpers import _determine_responsible_owner
@@ -77,3 +85,33 @@ class UploadsPerWindowThrottle(BaseThrottle):
             return True
         except (ObjectDoesNotExist, ValidationError):
             return True
+
+
+class UploadsRateLimitThrottle(RateLimitThrottle):
+    """
+    Limits the uploads made with an upload token, or to the repositories of an
+    owner when tokenless. CI bursts are allowed up to the limit, by a token
+    bucket refilling over a minute.
+    """
+
+    scope = "upload"
+
+    def is_enabled(self) -> bool:
+        return settings.UPLOAD_RATE_LIMIT_ENABLED
+
+    def get_rate_limit(self) -> RateLimit:
+        return RateLimit(
+            limit=settings.UPLOAD_RATE_LIMIT_RPM,
+            window=60,
+            algorithm=RateLimitAlgorithm.token_bucket,
+        )
+
+    def get_key(self, request: HttpRequest, view: APIView) -> str | None:
+        auth = get_authorization_header(request).split()
+        if len(auth) == 2:
+            return upload_token_key(self.scope, auth[1].decode(errors="replace"))
+        try:
+            repository = view.get_repo()
+        except (ObjectDoesNotExist, ValidationError):
+            return None
+        return owner_key(self.scope, repository.author_id)
@@ -24,7 +24,11 @@ from upload.serializers import (
     CommitSerializer,
     UploadSerializer,
 )
-from upload.throttles import UploadsPerCommitThrottle, UploadsPerWindowThrottle
+from upload.throttles import (
+    UploadsPerCommitThrottle,
+    UploadsPerWindowThrottle,
+    UploadsRateLimitThrottle,
+)
 from upload.views.base import GetterMixin
 from upload.views.commits import create_commit
 from upload.views.reports import create_report
@@ -47,7 +51,11 @@ class UploadCoverageView(APIView, GetterMixin):
         RepositoryLegacyTokenAuthentication,
         TokenlessAuthentication,
     ]
-    throttle_classes = [UploadsPerCommitThrottle, UploadsPerWindowThrottle]
+    throttle_classes = [
+        UploadsRateLimitThrottle,
+        UploadsPerCommitThrottle,
+        UploadsPerWindowThrottle,
+    ]
 
     def get_exception_handler(self):
         return repo_auth_custom_exception_handler
@@ -39,7 +39,11 @@ from upload.helpers import (
 )
 from upload.metrics import API_UPLOAD_COUNTER
 from upload.serializers import UploadSerializer
-from upload.throttles import UploadsPerCommitThrottle, UploadsPerWindowThrottle
+from upload.throttles import (
+    UploadsPerCommitThrottle,
+    UploadsPerWindowThrottle,
+    UploadsRateLimitThrottle,
+)
 from upload.views.base import GetterMixin
 
 log = logging.getLogger(__name__)
@@ -218,7 +222,11 @@ class UploadViews(ListCreateAPIView, GetterMixin):
         TokenlessAuthentication,
     ]
 
-    throttle_classes = [UploadsPerCommitThrottle, UploadsPerWindowThrottle]
+    throttle_classes = [
+        UploadsRateLimitThrottle,
+        UploadsPerCommitThrottle,
+        UploadsPerWindowThrottle,
+    ]
 
     def get_exception_handler(self) -> Callable[[Exception, dict[str, Any]], Response]:
         return repo_auth_custom_exception_handler
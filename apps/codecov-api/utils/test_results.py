@@ -1,20 +1,33 @@
+import json
+import os
 import tempfile
-from datetime import date, timedelta
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import UTC, date, timedelta
 
 import polars as pl
 from django.conf import settings
 
-from rollouts import READ_NEW_TA
+from rollouts import READ_NEW_TA, TA_INCREMENTAL_ROLLUPS
 from services.task import TaskService
 from shared.helpers.redis import get_redis_connection
-from shared.metrics import Summary
+from shared.metrics import Counter, Summary
 from shared.storage import get_appropriate_storage_service
+from shared.storage.base import BaseStorageService
 from shared.storage.exceptions import FileNotInStorageError
 
 get_results_summary = Summary(
     "test_results_get_results", "Time it takes to download results from GCS", ["impl"]
 )
 
+results_cache_counter = Counter(
+    "test_results_results_cache",
+    "Lookups of aggregated test results in the process-local cache",
+    ["result"],  # hit, revalidated, miss
+)
+
 
 def redis_key(
     repoid: int,
@@ -152,6 +165,38 @@ def rollup_blob_path(repoid: int, branch: str | None = None) -> str:
     )
 
 
+def rollup_segments_prefix(repoid: int, branch: str | None = None) -> str:
+    return (
+        f"test_analytics/branch_rollup_segments/{repoid}/{branch}"
+        if branch
+        else f"test_analytics/repo_rollup_segments/{repoid}"
+    )
+
+
+def rollup_manifest_path(repoid: int, branch: str | None = None) -> str:
+    return f"{rollup_segments_prefix(repoid, branch)}/manifest.json"
+
+
+def rollup_segment_path(repoid: int, branch: str | None, day: date) -> str:
+    return f"{rollup_segments_prefix(repoid, branch)}/{day.isoformat()}.arrow"
+
+
+V1_ROLLUP_SCHEMA = {
+    "computed_name": pl.String,
+    "testsuite": pl.String,
+    "flags": pl.List(pl.String),
+    "failing_commits": pl.Int64,
+    "last_duration": pl.Float64,
+    "avg_duration": pl.Float64,
+    "pass_count": pl.Int64,
+    "fail_count": pl.Int64,
+    "flaky_fail_count": pl.Int64,
+    "skip_count": pl.Int64,
+    "updated_at": pl.Datetime(time_zone=UTC),
+    "timestamp_bin": pl.Date(),
+}
+
+
 def no_version_agg_table(table: pl.LazyFrame) -> pl.LazyFrame:
     failure_rate_expr = (pl.col("fail_count")).sum() / (
         pl.col("fail_count") + pl.col("pass_count")
@@ -221,42 +266,210 @@ def v1_agg_table(table: pl.LazyFrame) -> pl.LazyFrame:
     return table
 
 
+ResultsCacheKey = tuple[int, str | None, int, int | None, date]
+
+
+@dataclass
+class ResultsCacheEntry:
+    etag: str
+    table: pl.DataFrame
+    size: int
+    validated_at: float
+
+
+class ResultsCache:
+    """
+    Process-local LRU cache of aggregated test results tables, bounded by the
+    estimated in-memory size of the cached tables.
+
+    Entries remember the ETag of the rollup they were aggregated from and are only
+    reused while that ETag is unchanged. A validated entry is trusted for
+    `revalidate_after` seconds without checking the ETag again, which lets all the
+    resolvers of a single request share it without any round trip to storage.
+    """
+
+    def __init__(self, max_bytes: int, revalidate_after: float):
+        self.max_bytes = max_bytes
+        self.revalidate_after = revalidate_after
+        self.size = 0
+        self._entries: OrderedDict[ResultsCacheKey, ResultsCacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: ResultsCacheKey) -> ResultsCacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def is_fresh(self, entry: ResultsCacheEntry) -> bool:
+        return time.monotonic() - entry.validated_at < self.revalidate_after
+
+    def revalidated(self, entry: ResultsCacheEntry) -> None:
+        entry.validated_at = time.monotonic()
+
+    def set(self, key: ResultsCacheKey, etag: str, table: pl.DataFrame) -> None:
+        size = int(table.estimated_size())
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = ResultsCacheEntry(
+                etag=etag, table=table, size=size, validated_at=time.monotonic()
+            )
+            self.size += size
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= evicted.size
+
+    def discard(self, key: ResultsCacheKey) -> None:
+        with self._lock:
+            self._discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _discard(self, key: ResultsCacheKey) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.size
+
+
+results_cache = ResultsCache(
+    max_bytes=settings.TEST_ANALYTICS_RESULTS_CACHE_MAX_BYTES,
+    revalidate_after=settings.TEST_ANALYTICS_RESULTS_CACHE_REVALIDATE_SECONDS,
+)
+
+
+def _rollup_source(
+    storage_service: BaseStorageService, repoid: int, branch: str | None
+) -> tuple[str, str, bool]:
+    """
+    Returns the storage key and ETag of the rollup to read results from, and
+    whether it is the manifest of incrementally maintained daily segments or
+    a single rollup file.
+    """
+    if TA_INCREMENTAL_ROLLUPS.check_value(repoid):
+        key = rollup_manifest_path(repoid, branch)
+        try:
+            return (
+                key,
+                storage_service.get_file_etag(settings.GCS_BUCKET_NAME, key),
+                True,
+            )
+        except FileNotInStorageError:
+            # segments are not written yet, the full rollup is still up to date
+            pass
+
+    key = rollup_blob_path(repoid, branch)
+    return key, storage_service.get_file_etag(settings.GCS_BUCKET_NAME, key), False
+
+
+def _scan_segments(
+    storage_service: BaseStorageService,
+    repoid: int,
+    branch: str | None,
+    start_date: date,
+    end_date: date,
+    tmpdir: str,
+) -> tuple[pl.LazyFrame, str | None]:
+    metadata = {}
+    manifest = json.loads(
+        storage_service.read_file(
+            settings.GCS_BUCKET_NAME,
+            rollup_manifest_path(repoid, branch),
+            metadata_container=metadata,
+        )
+    )
+
+    paths = []
+    for day_str, rows in manifest["segments"].items():
+        day = date.fromisoformat(day_str)
+        if not rows or not start_date <= day <= end_date:
+            continue
+
+        path = os.path.join(tmpdir, f"{day_str}.arrow")
+        with open(path, "wb") as segment_file:
+            storage_service.read_file(
+                bucket_name=settings.GCS_BUCKET_NAME,
+                path=rollup_segment_path(repoid, branch, day),
+                file_obj=segment_file,
+            )
+        paths.append(path)
+
+    if not paths:
+        return pl.LazyFrame(schema=V1_ROLLUP_SCHEMA), metadata.get("version")
+    return pl.scan_ipc(paths), metadata.get("version")
+
+
 def new_get_results(
     repoid: int,
     branch: str | None,
     interval_start: int,
     interval_end: int | None = None,
 ) -> pl.DataFrame | None:
+    # the interval is relative to today, so the same rollup aggregates differently
+    # from one day to the next
+    cache_key = (repoid, branch, interval_start, interval_end, date.today())
+    entry = results_cache.get(cache_key)
+    if entry is not None and results_cache.is_fresh(entry):
+        results_cache_counter.labels("hit").inc()
+        return entry.table
+
     storage_service = get_appropriate_storage_service(repoid)
-    key = rollup_blob_path(repoid, branch)
+    start_date = date.today() - timedelta(days=interval_start)
+    end_date = (
+        date.today() - timedelta(days=interval_end)
+        if interval_end is not None
+        else date.today()
+    )
     try:
-        with tempfile.TemporaryFile() as tmp:
-            metadata = {}
-            storage_service.read_file(
-                bucket_name=settings.GCS_BUCKET_NAME,
-                path=key,
-                file_obj=tmp,
-                metadata_container=metadata,
-            )
-
-            table = pl.scan_ipc(tmp)
+        # the ETag is read before the rollup itself, so that a rollup written in
+        # between is cached with the older ETag and gets re-read next time
+        key, etag, segmented = _rollup_source(storage_service, repoid, branch)
+        if entry is not None and entry.etag == etag:
+            results_cache.revalidated(entry)
+            results_cache_counter.labels("revalidated").inc()
+            return entry.table
+
+        results_cache_counter.labels("miss").inc()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            if segmented:
+                table, version = _scan_segments(
+                    storage_service, repoid, branch, start_date, end_date, tmpdir
+                )
+            else:
+                path = os.path.join(tmpdir, "rollup.arrow")
+                metadata = {}
+                with open(path, "wb") as rollup_file:
+                    storage_service.read_file(
+                        bucket_name=settings.GCS_BUCKET_NAME,
+                        path=key,
+                        file_obj=rollup_file,
+                        metadata_container=metadata,
+                    )
+                table, version = pl.scan_ipc(path), metadata.get("version")
 
             # filter start
-            start_date = date.today() - timedelta(days=interval_start)
             table = table.filter(pl.col("timestamp_bin") >= start_date)
 
             # filter end
             if interval_end is not None:
-                end_date = date.today() - timedelta(days=interval_end)
                 table = table.filter(pl.col("timestamp_bin") <= end_date)
 
             # aggregate
-            match metadata.get("version"):
+            match version:
                 case "1":
                     table = v1_agg_table(table)
                 case _:  # no version is missding
                     table = no_version_agg_table(table)
 
-            return table.collect()
+            result = table.collect()
+            results_cache.set(cache_key, etag, result)
+            return result
     except FileNotInStorageError:
+        results_cache.discard(cache_key)
         return None
@@ -0,0 +1,167 @@
+import json
+from datetime import date, timedelta
+
+import polars as pl
+import pytest
+from django.conf import settings
+
+from rollouts import TA_INCREMENTAL_ROLLUPS
+from shared.storage.memory import MemoryStorageService
+from utils.test_results import (
+    ResultsCache,
+    new_get_results,
+    results_cache,
+    rollup_blob_path,
+    rollup_manifest_path,
+    rollup_segment_path,
+)
+
+
+def rollup(pass_count: int) -> bytes:
+    return (
+        pl.DataFrame(
+            {
+                "computed_name": ["test_a", "test_b"],
+                "testsuite": ["suite", "suite"],
+                "flags": [["unit"], ["unit"]],
+                "failing_commits": [0, 1],
+                "last_duration": [1.0, 2.0],
+                "avg_duration": [1.0, 2.0],
+                "pass_count": [pass_count, pass_count],
+                "fail_count": [0, 1],
+                "flaky_fail_count": [0, 0],
+                "skip_count": [0, 0],
+                "updated_at": [date.today(), date.today()],
+                "timestamp_bin": [date.today(), date.today() - timedelta(days=1)],
+            }
+        )
+        .write_ipc(None)
+        .getvalue()
+    )
+
+
+@pytest.fixture
+def storage(mocker):
+    storage = MemoryStorageService({})
+    mocker.patch(
+        "utils.test_results.get_appropriate_storage_service", return_value=storage
+    )
+    mocker.patch.object(TA_INCREMENTAL_ROLLUPS, "check_value", return_value=False)
+    results_cache.clear()
+    yield storage
+    results_cache.clear()
+
+
+def test_new_get_results_is_cached(storage, mocker):
+    path = rollup_blob_path(1, "main")
+    storage.write_file(settings.GCS_BUCKET_NAME, path, rollup(3))
+    read_file = mocker.spy(storage, "read_file")
+    get_file_etag = mocker.spy(storage, "get_file_etag")
+
+    table = new_get_results(1, "main", 7)
+    assert table["total_pass_count"].sum() == 6
+
+    # shared as-is while fresh, without touching storage
+    assert new_get_results(1, "main", 7) is table
+    assert read_file.call_count == 1
+    assert get_file_etag.call_count == 1
+
+    # other intervals are cached separately
+    assert new_get_results(1, "main", 7, 1)["total_pass_count"].sum() == 3
+    assert read_file.call_count == 2
+
+
+def test_new_get_results_revalidates_etag(storage, mocker):
+    mocker.patch.object(results_cache, "revalidate_after", 0)
+    path = rollup_blob_path(1, "main")
+    storage.write_file(settings.GCS_BUCKET_NAME, path, rollup(3))
+    read_file = mocker.spy(storage, "read_file")
+
+    table = new_get_results(1, "main", 7)
+    assert new_get_results(1, "main", 7) is table
+    assert read_file.call_count == 1
+
+    # a new rollup is picked up as soon as its ETag changes
+    storage.write_file(settings.GCS_BUCKET_NAME, path, rollup(5))
+    assert new_get_results(1, "main", 7)["total_pass_count"].sum() == 10
+    assert read_file.call_count == 2
+
+    storage.delete_file(settings.GCS_BUCKET_NAME, path)
+    assert new_get_results(1, "main", 7) is None
+
+
+def test_results_cache_evicts_least_recently_used():
+    table = pl.DataFrame({"a": list(range(100))})
+    size = int(table.estimated_size())
+    cache = ResultsCache(max_bytes=size * 2, revalidate_after=60)
+
+    cache.set("a", "etag", table)
+    cache.set("b", "etag", table)
+    assert cache.get("a") is not None
+    cache.set("c", "etag", table)
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+    assert cache.size == size * 2
+
+    # tables larger than the whole cache are never cached
+    cache.set("d", "etag", pl.DataFrame({"a": list(range(1000))}))
+    assert cache.get("d") is None
+    assert cache.size == size * 2
+
+
+def write_segments(storage: MemoryStorageService, pass_counts: dict[date, int]):
+    for day, pass_count in pass_counts.items():
+        segment = (
+            pl.read_ipc(rollup(pass_count))
+            .with_columns(timestamp_bin=pl.lit(day))
+            .write_ipc(None)
+            .getvalue()
+        )
+        storage.write_file(
+            settings.GCS_BUCKET_NAME, rollup_segment_path(1, "main", day), segment
+        )
+
+    storage.write_file(
+        settings.GCS_BUCKET_NAME,
+        rollup_manifest_path(1, "main"),
+        json.dumps({"segments": {day.isoformat(): 2 for day in pass_counts}}).encode(),
+        metadata={"version": "1"},
+    )
+
+
+def test_new_get_results_stitches_segments(storage, mocker):
+    mocker.patch.object(TA_INCREMENTAL_ROLLUPS, "check_value", return_value=True)
+    today = date.today()
+    # the full rollup is ignored once segments are available
+    storage.write_file(
+        settings.GCS_BUCKET_NAME, rollup_blob_path(1, "main"), rollup(100)
+    )
+    write_segments(
+        storage,
+        {
+            today: 1,
+            today - timedelta(days=1): 2,
+            today - timedelta(days=10): 4,
+        },
+    )
+    read_file = mocker.spy(storage, "read_file")
+
+    assert new_get_results(1, "main", 7)["total_pass_count"].sum() == 6
+    # the manifest and the two segments within the interval
+    assert read_file.call_count == 3
+
+    assert new_get_results(1, "main", 30)["total_pass_count"].sum() == 14
+    assert new_get_results(1, "main", 14, 7)["total_pass_count"].sum() == 8
+
+    table = new_get_results(1, "main", 60, 30)
+    assert table is not None
+    assert table.height == 0
+
+
+def test_new_get_results_falls_back_to_full_rollup(storage, mocker):
+    mocker.patch.object(TA_INCREMENTAL_ROLLUPS, "check_value", return_value=True)
+    storage.write_file(settings.GCS_BUCKET_NAME, rollup_blob_path(1, "main"), rollup(3))
+
+    assert new_get_results(1, "main", 7)["total_pass_count"].sum() == 6
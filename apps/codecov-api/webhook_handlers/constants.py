@@ -5,6 +5,9 @@ class GitHubHTTPHeaders:
     SIGNATURE_256 = "HTTP_X_HUB_SIGNATURE_256"
     HOOK_INSTALLATION_TARGET_ID = "HTTP_X_GITHUB_HOOK_INSTALLATION_TARGET_ID"
 
+    # the headers kept with queued webhooks, for their handlers
+    queued_headers = [EVENT, DELIVERY_TOKEN, HOOK_INSTALLATION_TARGET_ID]
+
 
 class GitHubWebhookEvents:
     PULL_REQUEST = "pull_request"
@@ -0,0 +1,147 @@
+import logging
+import time
+from collections.abc import Callable
+from enum import Enum
+
+from django.db import InterfaceError, OperationalError, close_old_connections
+from redis import RedisError
+from rest_framework.exceptions import APIException
+
+from webhook_handlers.queue import QueuedWebhook, WebhookQueue, coalesce
+from webhook_handlers.views import (
+    WEBHOOKS_COALESCED,
+    WEBHOOKS_ERRORED,
+    WEBHOOKS_QUEUE_LAG,
+)
+from webhook_handlers.views.github import (
+    GithubEnterpriseWebhookHandler,
+    GithubWebhookHandler,
+)
+
+log = logging.getLogger(__name__)
+
+HANDLERS = {
+    handler.service_name: handler
+    for handler in (GithubWebhookHandler, GithubEnterpriseWebhookHandler)
+}
+
+
+# errors of the services webhooks are handled with, after which they are retried
+UNAVAILABLE_ERRORS = (OperationalError, InterfaceError, RedisError)
+
+
+class WebhookOutcome(Enum):
+    # handled, or answered with an error as it would have been right away
+    handled = "handled"
+    # failed, and can only be delivered again
+    failed = "failed"
+    # to be processed again once the services it needs are back
+    retry = "retry"
+
+
+def process_webhook(webhook: QueuedWebhook) -> WebhookOutcome:
+    handler = HANDLERS[webhook.service]
+    extra = {
+        "service": webhook.service,
+        "github_webhook_event": webhook.event,
+        "delivery": webhook.delivery_id,
+    }
+    try:
+        handler.handle_queued_webhook(webhook)
+    except APIException as e:
+        # what the handler would have answered with, e.g. for unknown repos
+        log.info("Queued webhook not handled", extra={**extra, "reason": str(e)})
+    except UNAVAILABLE_ERRORS:
+        log.warning(
+            "Unable to handle queued webhook, retrying it later",
+            extra=extra,
+            exc_info=True,
+        )
+        WEBHOOKS_ERRORED.labels(
+            service=webhook.service,
+            event=webhook.event,
+            action="",
+            error_reason="processing_retried",
+        ).inc()
+        return WebhookOutcome.retry
+    except Exception:
+        # the webhook is dropped, but GitHub can deliver it again
+        log.exception("Failed to handle queued webhook", extra=extra)
+        WEBHOOKS_ERRORED.labels(
+            service=webhook.service,
+            event=webhook.event,
+            action="",
+            error_reason="processing_failed",
+        ).inc()
+        return WebhookOutcome.failed
+    return WebhookOutcome.handled
+
+
+def process_webhooks(
+    webhooks: list[QueuedWebhook],
+) -> list[tuple[QueuedWebhook, WebhookOutcome]]:
+    """
+    Handles a batch of webhooks in order, coalescing their pushes. Returns the
+    webhooks that were processed, coalesced, along with their outcome.
+    """
+    coalesced = coalesce(webhooks)
+    outcomes = []
+    for webhook in coalesced:
+        if len(webhook.entry_ids) > 1:
+            WEBHOOKS_COALESCED.labels(service=webhook.service, event=webhook.event).inc(
+                len(webhook.entry_ids) - 1
+            )
+        outcomes.append((webhook, process_webhook(webhook)))
+    return outcomes
+
+
+class WebhookConsumer:
+    def __init__(
+        self,
+        queue: WebhookQueue,
+        name: str,
+        batch_size: int = 100,
+        block_ms: int = 5000,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.queue = queue
+        self.name = name
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.clock = clock
+
+    def run_once(self) -> int:
+        """Processes a batch of webhooks, returning how many were in it."""
+        webhooks = self.queue.read(self.name, self.batch_size, self.block_ms)
+        if not webhooks:
+            return 0
+        now = self.clock()
+        for webhook in webhooks:
+            WEBHOOKS_QUEUE_LAG.labels(service=webhook.service).observe(
+                max(0.0, now - webhook.queued_at)
+            )
+        outcomes = process_webhooks(webhooks)
+        self.queue.forget_deliveries(
+            [
+                webhook
+                for webhook, outcome in outcomes
+                if outcome == WebhookOutcome.failed
+            ]
+        )
+        # those to retry are left pending, to be claimed after `claim_idle_ms`
+        self.queue.ack(
+            [
+                webhook
+                for webhook, outcome in outcomes
+                if outcome != WebhookOutcome.retry
+            ]
+        )
+        return len(webhooks)
+
+    def run(self, should_stop: Callable[[], bool] = lambda: False):
+        self.queue.ensure_group()
+        log.info("Processing queued webhooks", extra={"consumer": self.name})
+        while not should_stop():
+            # the connections of a long running process are closed over time
+            close_old_connections()
+            self.run_once()
@@ -0,0 +1,283 @@
+"""
+Deferred processing of webhooks.
+
+When `WEBHOOK_QUEUE_ENABLED`, the GitHub webhook views only verify the
+signature of a webhook and add it, as it was received, to a Redis stream. They
+answer right away, and the `process_webhooks` command handles the queued
+webhooks in batches (see `webhook_handlers.consumer`).
+
+Webhooks are deduplicated by their delivery id, so a redelivery of a webhook
+that was already queued is dropped, unless processing it failed. They are read
+through a consumer group and only removed from the stream once processed: those
+read by a consumer that died before processing them, or that couldn't process
+them for lack of the database or Redis, are claimed by another one after
+`claim_idle_ms`.
+"""
+
+import json
+import logging
+from contextlib import suppress
+from dataclasses import dataclass, field, replace
+from functools import cache, cached_property
+
+from redis import Redis, RedisError, ResponseError
+
+from shared.helpers.redis import get_redis_connection
+
+log = logging.getLogger(__name__)
+
+WEBHOOK_STREAM = "webhooks:queue"
+WEBHOOK_CONSUMER_GROUP = "webhooks"
+DELIVERY_KEY_PREFIX = "webhooks:delivery"
+
+# GitHub lets deliveries of the past 3 days be redelivered
+DELIVERY_DEDUP_TTL = 3 * 24 * 60 * 60
+
+DEFAULT_CLAIM_IDLE_MS = 5 * 60 * 1000
+
+
+@dataclass
+class QueuedWebhook:
+    service: str
+    event: str
+    delivery_id: str | None
+    # the `request.META` headers read by the handlers
+    headers: dict[str, str]
+    body: bytes
+    # the ids of the stream entries the webhook stands for, several of them
+    # once coalesced
+    entry_ids: tuple[str, ...] = field(default=())
+    # the delivery ids of the webhooks coalesced into this one
+    coalesced_delivery_ids: tuple[str, ...] = field(default=())
+
+    @cached_property
+    def data(self) -> dict:
+        return json.loads(self.body)
+
+    @property
+    def delivery_ids(self) -> tuple[str, ...]:
+        """The delivery ids of the webhook and of those coalesced into it."""
+        if self.delivery_id is None:
+            return self.coalesced_delivery_ids
+        return self.coalesced_delivery_ids + (self.delivery_id,)
+
+    @property
+    def queued_at(self) -> float | None:
+        """When the webhook was queued, from the timestamp of its first entry."""
+        if not self.entry_ids:
+            return None
+        return int(self.entry_ids[0].split("-")[0]) / 1000
+
+    def to_fields(self) -> dict[str, str | bytes]:
+        return {
+            "service": self.service,
+            "event": self.event,
+            "delivery_id": self.delivery_id or "",
+            "headers": json.dumps(self.headers),
+            "body": self.body,
+        }
+
+    @classmethod
+    def from_entry(cls, entry_id: bytes, fields: dict[bytes, bytes]) -> "QueuedWebhook":
+        return cls(
+            service=fields[b"service"].decode(),
+            event=fields[b"event"].decode(),
+            delivery_id=fields[b"delivery_id"].decode() or None,
+            headers=json.loads(fields[b"headers"]),
+            body=fields[b"body"],
+            entry_ids=(entry_id.decode(),),
+        )
+
+    def to_record(self) -> dict:
+        """The webhook as a JSON object, as replayed by `replay_webhooks`."""
+        return {
+            "service": self.service,
+            "event": self.event,
+            "delivery_id": self.delivery_id,
+            "headers": self.headers,
+            "body": self.body.decode(),
+        }
+
+    @classmethod
+    def from_record(cls, record: dict) -> "QueuedWebhook":
+        body = record["body"]
+        if not isinstance(body, str):
+            body = json.dumps(body)
+        return cls(
+            service=record["service"],
+            event=record["event"],
+            delivery_id=record.get("delivery_id"),
+            headers=record.get("headers", {}),
+            body=body.encode(),
+        )
+
+    @property
+    def push_key(self) -> tuple | None:
+        """What the pushes that can be coalesced with this one have in common."""
+        if self.event != "push":
+            return None
+        try:
+            return (self.service, self.data["repository"]["id"], self.data["ref"])
+        except (ValueError, TypeError, KeyError):
+            return None
+
+    def merge_push(self, later: "QueuedWebhook") -> "QueuedWebhook":
+        """A push standing for this push followed by the `later` one."""
+        data = dict(later.data)
+        data["before"] = self.data.get("before")
+        data["commits"] = self.data.get("commits", []) + later.data.get("commits", [])
+        return replace(
+            later,
+            body=json.dumps(data, separators=(",", ":")).encode(),
+            entry_ids=self.entry_ids + later.entry_ids,
+            coalesced_delivery_ids=self.delivery_ids + later.coalesced_delivery_ids,
+        )
+
+
+class QueuedWebhookRequest:
+    """
+    The request handed to the handlers of a queued webhook. Handlers only read
+    the data and headers of their requests, which were checked when queued.
+    """
+
+    def __init__(self, webhook: QueuedWebhook):
+        self.data = webhook.data
+        self.META = webhook.headers
+        self.body = webhook.body
+
+
+def coalesce(webhooks: list[QueuedWebhook]) -> list[QueuedWebhook]:
+    """
+    Collapses the pushes to the same branch of a batch into the last of them.
+
+    The coalesced push holds the commits of all the pushes, in order, so all of
+    them are marked as merged. Only the head commit of the last push is checked
+    for `[ci skip]` and given a pending status though: the heads of the earlier
+    pushes, superseded by then, get no pending status of their own.
+    """
+    coalesced: list[QueuedWebhook | None] = []
+    pushes: dict[tuple, int] = {}
+    for webhook in webhooks:
+        key = webhook.push_key
+        if key in pushes:
+            index = pushes[key]
+            webhook = coalesced[index].merge_push(webhook)
+            # the coalesced push is handled where the last of them was received
+            coalesced[index] = None
+        if key is not None:
+            pushes[key] = len(coalesced)
+        coalesced.append(webhook)
+    return [webhook for webhook in coalesced if webhook is not None]
+
+
+class WebhookQueue:
+    def __init__(
+        self,
+        redis_connection: Redis,
+        stream: str = WEBHOOK_STREAM,
+        group: str = WEBHOOK_CONSUMER_GROUP,
+        claim_idle_ms: int = DEFAULT_CLAIM_IDLE_MS,
+    ):
+        self.redis_connection = redis_connection
+        self.stream = stream
+        self.group = group
+        self.claim_idle_ms = claim_idle_ms
+
+    def _delivery_key(self, service: str, delivery_id: str) -> str:
+        return f"{DELIVERY_KEY_PREFIX}:{service}:{delivery_id}"
+
+    def enqueue(self, webhook: QueuedWebhook) -> bool:
+        """
+        Adds `webhook` to the stream, unless its delivery was already queued.
+        Returns whether it was added.
+        """
+        delivery_key = None
+        if webhook.delivery_id:
+            delivery_key = self._delivery_key(webhook.service, webhook.delivery_id)
+            if not self.redis_connection.set(
+                delivery_key, 1, nx=True, ex=DELIVERY_DEDUP_TTL
+            ):
+                return False
+        try:
+            self.redis_connection.xadd(self.stream, webhook.to_fields())
+        except RedisError:
+            # let the webhook be handled right away instead, or delivered again
+            if delivery_key is not None:
+                with suppress(RedisError):
+                    self.redis_connection.delete(delivery_key)
+            raise
+        return True
+
+    def ensure_group(self):
+        try:
+            self.redis_connection.xgroup_create(
+                self.stream, self.group, id="0", mkstream=True
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def read(
+        self, consumer: str, count: int, block_ms: int | None = None
+    ) -> list[QueuedWebhook]:
+        """
+        Up to `count` webhooks for `consumer` to process: first those left by
+        other consumers for longer than `claim_idle_ms`, then new ones, waiting
+        up to `block_ms` for them.
+        """
+        _, entries, *_ = self.redis_connection.xautoclaim(
+            self.stream,
+            self.group,
+            consumer,
+            min_idle_time=self.claim_idle_ms,
+            start_id="0-0",
+            count=count,
+        )
+        if entries:
+            log.info(
+                "Claimed webhooks left by another consumer",
+                extra={"consumer": consumer, "count": len(entries)},
+            )
+        else:
+            response = self.redis_connection.xreadgroup(
+                self.group, consumer, {self.stream: ">"}, count=count, block=block_ms
+            )
+            entries = response[0][1] if response else []
+        return [
+            QueuedWebhook.from_entry(entry_id, fields)
+            for entry_id, fields in entries
+            if fields
+        ]
+
+    def forget_deliveries(self, webhooks: list[QueuedWebhook]):
+        """Lets the deliveries of `webhooks` be queued again, e.g. once they failed."""
+        delivery_keys = [
+            self._delivery_key(webhook.service, delivery_id)
+            for webhook in webhooks
+            for delivery_id in webhook.delivery_ids
+        ]
+        if not delivery_keys:
+            return
+        try:
+            self.redis_connection.delete(*delivery_keys)
+        except RedisError:
+            log.warning(
+                "Unable to forget webhook deliveries",
+                extra={"count": len(delivery_keys)},
+                exc_info=True,
+            )
+
+    def ack(self, webhooks: list[QueuedWebhook]):
+        """Removes processed webhooks from the stream."""
+        entry_ids = [entry_id for webhook in webhooks for entry_id in webhook.entry_ids]
+        if not entry_ids:
+            return
+        pipeline = self.redis_connection.pipeline()
+        pipeline.xack(self.stream, self.group, *entry_ids)
+        pipeline.xdel(self.stream, *entry_ids)
+        pipeline.execute()
+
+
+@cache
+def get_webhook_queue() -> WebhookQueue:
+    return WebhookQueue(get_redis_connection())
@@ -0,0 +1,100 @@
+from unittest.mock import MagicMock
+
+import fakeredis
+import pytest
+from django.db import OperationalError
+from rest_framework.exceptions import NotFound
+
+from webhook_handlers import consumer as consumer_module
+from webhook_handlers.consumer import WebhookConsumer
+from webhook_handlers.queue import WebhookQueue
+from webhook_handlers.tests.test_queue import make_push, make_webhook
+
+
+@pytest.fixture
+def queue():
+    queue = WebhookQueue(fakeredis.FakeStrictRedis())
+    queue.ensure_group()
+    return queue
+
+
+@pytest.fixture
+def handler(mocker):
+    handler = MagicMock()
+    mocker.patch.dict(consumer_module.HANDLERS, {"github": handler})
+    return handler
+
+
+def pending(queue):
+    return queue.redis_connection.xpending(queue.stream, queue.group)["pending"]
+
+
+def test_run_once(queue, handler):
+    queue.enqueue(make_webhook("pull_request", "1", action="opened"))
+    queue.enqueue(make_webhook("pull_request", "2", action="closed"))
+
+    consumer = WebhookConsumer(queue, name="consumer", block_ms=None)
+    assert consumer.run_once() == 2
+    assert [
+        call.args[0].delivery_id
+        for call in handler.handle_queued_webhook.call_args_list
+    ] == ["1", "2"]
+    assert queue.redis_connection.xlen(queue.stream) == 0
+    # handled deliveries are still deduplicated
+    assert not queue.enqueue(make_webhook("pull_request", "1", action="opened"))
+
+
+def test_failed_webhook_can_be_delivered_again(queue, handler):
+    handler.handle_queued_webhook.side_effect = [ValueError, None]
+    queue.enqueue(make_webhook("pull_request", "1", action="opened"))
+
+    consumer = WebhookConsumer(queue, name="consumer", block_ms=None)
+    assert consumer.run_once() == 1
+    assert queue.redis_connection.xlen(queue.stream) == 0
+
+    # e.g. a redelivery from the GitHub UI
+    assert queue.enqueue(make_webhook("pull_request", "1", action="opened"))
+    assert consumer.run_once() == 1
+    assert handler.handle_queued_webhook.call_count == 2
+    assert queue.redis_connection.xlen(queue.stream) == 0
+
+
+def test_failed_coalesced_pushes_can_be_delivered_again(queue, handler):
+    handler.handle_queued_webhook.side_effect = ValueError
+    queue.enqueue(make_push("1", commits=["a"]))
+    queue.enqueue(make_push("2", commits=["b"]))
+
+    consumer = WebhookConsumer(queue, name="consumer", block_ms=None)
+    assert consumer.run_once() == 2
+    assert handler.handle_queued_webhook.call_count == 1
+    assert queue.enqueue(make_push("1", commits=["a"]))
+    assert queue.enqueue(make_push("2", commits=["b"]))
+
+
+def test_unanswered_webhook_is_not_retried(queue, handler):
+    handler.handle_queued_webhook.side_effect = NotFound
+    queue.enqueue(make_webhook("pull_request", "1", action="opened"))
+
+    consumer = WebhookConsumer(queue, name="consumer", block_ms=None)
+    assert consumer.run_once() == 1
+    assert queue.redis_connection.xlen(queue.stream) == 0
+    assert not queue.enqueue(make_webhook("pull_request", "1", action="opened"))
+
+
+def test_webhook_is_retried_when_database_is_unavailable(queue, handler):
+    handler.handle_queued_webhook.side_effect = [OperationalError, None, None]
+    queue.enqueue(make_webhook("pull_request", "1", action="opened"))
+    queue.enqueue(make_webhook("pull_request", "2", action="closed"))
+
+    consumer = WebhookConsumer(queue, name="consumer", block_ms=None)
+    assert consumer.run_once() == 2
+    # the first one is left pending, and its delivery still deduplicated
+    assert pending(queue) == 1
+    assert not queue.enqueue(make_webhook("pull_request", "1", action="opened"))
+
+    queue.claim_idle_ms = 0
+    assert consumer.run_once() == 1
+    retried = handler.handle_queued_webhook.call_args_list[-1].args[0]
+    assert retried.delivery_id == "1"
+    assert pending(queue) == 0
+    assert queue.redis_connection.xlen(queue.stream) == 0
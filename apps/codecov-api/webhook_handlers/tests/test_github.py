@@ -2,10 +2,13 @@ import hmac
 import json
 import uuid
 from hashlib import sha1, sha256
-from unittest.mock import call, patch
+from unittest.mock import MagicMock, call, patch
 
+import fakeredis
 import pytest
+from django.test import override_settings
 from freezegun import freeze_time
+from redis import RedisError
 from rest_framework import status
 from rest_framework.reverse import reverse
 from rest_framework.test import APITestCase
@@ -31,6 +34,8 @@ from webhook_handlers.constants import (
     GitHubWebhookEvents,
     WebhookHandlerErrorMessages,
 )
+from webhook_handlers.consumer import WebhookConsumer
+from webhook_handlers.queue import WebhookQueue
 
 
 class MockedSubscription:
@@ -67,12 +72,14 @@ class GithubWebhookHandlerTests(APITestCase):
     def mock_default_app_id(self, mocker):
         mock_config_helper(mocker, configs={"github.integration.id": DEFAULT_APP_ID})
 
-    def _post_event_data(self, event, data={}, app_id=DEFAULT_APP_ID):
+    def _post_event_data(
+        self, event, data={}, app_id=DEFAULT_APP_ID, delivery=uuid.UUID(int=5)
+    ):
         return self.client.post(
             reverse("github-webhook"),
             **{
                 GitHubHTTPHeaders.EVENT: event,
-                GitHubHTTPHeaders.DELIVERY_TOKEN: uuid.UUID(int=5),
+                GitHubHTTPHeaders.DELIVERY_TOKEN: delivery,
                 GitHubHTTPHeaders.HOOK_INSTALLATION_TARGET_ID: app_id,
                 GitHubHTTPHeaders.SIGNATURE_256: "sha256="
                 + hmac.new(
@@ -1521,3 +1528,141 @@ class GithubWebhookHandlerTests(APITestCase):
             app_id=9999,
         )
         assert response.data == {"auto_review_enabled": False}
+
+    def _mock_webhook_queue(self):
+        queue = WebhookQueue(fakeredis.FakeStrictRedis())
+        queue.ensure_group()
+        self.mocker.patch(
+            "webhook_handlers.views.github.get_webhook_queue", return_value=queue
+        )
+        return queue
+
+    @override_settings(WEBHOOK_QUEUE_ENABLED=True)
+    @patch("services.task.TaskService.pulls_sync")
+    def test_queue_enabled_queues_webhooks_without_handling_them(self, pulls_sync_mock):
+        queue = self._mock_webhook_queue()
+        data = {
+            "repository": {"id": self.repo.service_id},
+            "action": "opened",
+            "number": 1,
+        }
+
+        response = self._post_event_data(
+            event=GitHubWebhookEvents.PULL_REQUEST, data=data
+        )
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        pulls_sync_mock.assert_not_called()
+
+        [webhook] = queue.read("consumer", count=10)
+        assert webhook.event == GitHubWebhookEvents.PULL_REQUEST
+        assert webhook.delivery_id == str(uuid.UUID(int=5))
+        assert webhook.data == data
+        assert webhook.headers[GitHubHTTPHeaders.HOOK_INSTALLATION_TARGET_ID] == str(
+            DEFAULT_APP_ID
+        )
+
+        # redeliveries are accepted but not queued again
+        response = self._post_event_data(
+            event=GitHubWebhookEvents.PULL_REQUEST, data=data
+        )
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert queue.redis_connection.xlen(queue.stream) == 1
+
+    @override_settings(WEBHOOK_QUEUE_ENABLED=True)
+    def test_queue_enabled_still_verifies_signatures(self):
+        queue = self._mock_webhook_queue()
+
+        response = self.client.post(
+            reverse("github-webhook"),
+            **{
+                GitHubHTTPHeaders.EVENT: GitHubWebhookEvents.PUSH,
+                GitHubHTTPHeaders.SIGNATURE_256: "sha256=bad",
+            },
+            data={},
+            format="json",
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert queue.redis_connection.xlen(queue.stream) == 0
+
+    @override_settings(WEBHOOK_QUEUE_ENABLED=True)
+    def test_queue_enabled_handles_webhooks_right_away_if_redis_fails(self):
+        self.mocker.patch(
+            "webhook_handlers.views.github.get_webhook_queue",
+            return_value=WebhookQueue(MagicMock(set=MagicMock(side_effect=RedisError))),
+        )
+
+        response = self._post_event_data(
+            event=GitHubWebhookEvents.REPOSITORY,
+            data={"action": "privatized", "repository": {"id": self.repo.service_id}},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        self.repo.refresh_from_db()
+        assert self.repo.private is True
+
+    @override_settings(WEBHOOK_QUEUE_ENABLED=True)
+    @patch("redis.Redis.sismember", lambda x, y, z: True)
+    @patch("services.task.TaskService.status_set_pending")
+    def test_queued_pushes_to_a_branch_are_handled_once(self, set_pending_mock):
+        queue = self._mock_webhook_queue()
+        self.repo.branch = "main"
+        self.repo.save()
+        commits = [
+            CommitFactory(merged=False, repository=self.repo, branch="feature")
+            for _ in range(3)
+        ]
+        for i, commit in enumerate(commits):
+            self._post_event_data(
+                event=GitHubWebhookEvents.PUSH,
+                data={
+                    "ref": "refs/heads/main",
+                    "repository": {"id": self.repo.service_id},
+                    "commits": [{"id": commit.commitid, "message": commit.message}],
+                },
+                delivery=uuid.UUID(int=i),
+            )
+
+        consumer = WebhookConsumer(queue, name="consumer", block_ms=None)
+        assert consumer.run_once() == 3
+
+        for commit in commits:
+            commit.refresh_from_db()
+            assert commit.merged is True
+            assert commit.branch == "main"
+        set_pending_mock.assert_called_once_with(
+            repoid=self.repo.repoid,
+            commitid=commits[-1].commitid,
+            branch="main",
+            on_a_pull_request=False,
+        )
+        assert queue.redis_connection.xlen(queue.stream) == 0
+
+    @override_settings(WEBHOOK_QUEUE_ENABLED=True)
+    @patch("redis.Redis.sismember", lambda x, y, z: True)
+    @patch("services.task.TaskService.status_set_pending")
+    def test_queued_pushes_ci_skip_last_push(self, set_pending_mock):
+        queue = self._mock_webhook_queue()
+        self.repo.branch = "main"
+        self.repo.save()
+        commits = [
+            CommitFactory(merged=False, repository=self.repo, branch="feature")
+            for _ in range(2)
+        ]
+        for i, (commit, message) in enumerate(zip(commits, ["first", "[ci skip]"])):
+            self._post_event_data(
+                event=GitHubWebhookEvents.PUSH,
+                data={
+                    "ref": "refs/heads/main",
+                    "repository": {"id": self.repo.service_id},
+                    "commits": [{"id": commit.commitid, "message": message}],
+                },
+                delivery=uuid.UUID(int=i),
+            )
+
+        consumer = WebhookConsumer(queue, name="consumer", block_ms=None)
+        assert consumer.run_once() == 2
+
+        for commit in commits:
+            commit.refresh_from_db()
+            assert commit.merged is True
+        # the head of the first push is superseded by the skipped one
+        set_pending_mock.assert_not_called()
@@ -0,0 +1,151 @@
+import json
+from unittest.mock import MagicMock
+
+import fakeredis
+import pytest
+from redis import RedisError
+
+from webhook_handlers.queue import QueuedWebhook, WebhookQueue, coalesce
+
+
+def make_webhook(event="push", delivery_id="delivery", **data) -> QueuedWebhook:
+    return QueuedWebhook(
+        service="github",
+        event=event,
+        delivery_id=delivery_id,
+        headers={"HTTP_X_GITHUB_EVENT": event},
+        body=json.dumps(data).encode(),
+    )
+
+
+def make_push(delivery_id, repo_id=1, ref="refs/heads/main", commits=()):
+    return make_webhook(
+        "push",
+        delivery_id,
+        ref=ref,
+        before=f"before-{delivery_id}",
+        repository={"id": repo_id},
+        commits=[{"id": commit} for commit in commits],
+    )
+
+
+@pytest.fixture
+def queue():
+    queue = WebhookQueue(fakeredis.FakeStrictRedis())
+    queue.ensure_group()
+    return queue
+
+
+def test_enqueue_and_read(queue):
+    webhook = make_webhook("pull_request", action="opened")
+    assert queue.enqueue(webhook)
+
+    [read] = queue.read("consumer", count=10)
+    assert read.service == "github"
+    assert read.event == "pull_request"
+    assert read.delivery_id == "delivery"
+    assert read.headers == webhook.headers
+    assert read.data == {"action": "opened"}
+    assert len(read.entry_ids) == 1
+    assert read.queued_at is not None
+
+    # each webhook is read once
+    assert queue.read("other", count=10) == []
+
+
+def test_enqueue_drops_redeliveries(queue):
+    assert queue.enqueue(make_webhook(delivery_id="1"))
+    assert not queue.enqueue(make_webhook(delivery_id="1"))
+    assert queue.enqueue(make_webhook(delivery_id="2"))
+    # webhooks without a delivery id can't be deduplicated
+    assert queue.enqueue(make_webhook(delivery_id=None))
+    assert queue.enqueue(make_webhook(delivery_id=None))
+
+    assert len(queue.read("consumer", count=10)) == 4
+
+
+def test_enqueue_forgets_delivery_if_not_queued():
+    redis = fakeredis.FakeStrictRedis()
+    queue = WebhookQueue(redis)
+    redis.xadd = MagicMock(side_effect=RedisError)
+
+    with pytest.raises(RedisError):
+        queue.enqueue(make_webhook(delivery_id="1"))
+    assert redis.keys("webhooks:delivery:*") == []
+
+
+def test_ack_removes_webhooks(queue):
+    queue.enqueue(make_webhook(delivery_id="1"))
+    queue.enqueue(make_webhook(delivery_id="2"))
+    webhooks = queue.read("consumer", count=10)
+
+    queue.ack(webhooks)
+    assert queue.redis_connection.xlen(queue.stream) == 0
+    assert queue.redis_connection.xpending(queue.stream, queue.group)["pending"] == 0
+
+
+def test_read_claims_webhooks_of_dead_consumers(queue):
+    queue.enqueue(make_webhook(delivery_id="1"))
+    [webhook] = queue.read("dead", count=10)
+
+    # not before they were left for `claim_idle_ms`
+    assert queue.read("alive", count=10) == []
+    queue.claim_idle_ms = 0
+    [claimed] = queue.read("alive", count=10)
+    assert claimed.entry_ids == webhook.entry_ids
+
+
+def test_forget_deliveries(queue):
+    first, second = make_push("1", commits=["a"]), make_push("2", commits=["b"])
+    queue.enqueue(first)
+    queue.enqueue(second)
+    queue.enqueue(make_webhook(delivery_id="3"))
+
+    queue.forget_deliveries([first.merge_push(second)])
+    assert queue.enqueue(make_push("1", commits=["a"]))
+    assert queue.enqueue(make_push("2", commits=["b"]))
+    assert not queue.enqueue(make_webhook(delivery_id="3"))
+
+
+def test_ensure_group_is_idempotent(queue):
+    queue.ensure_group()
+    queue.enqueue(make_webhook())
+    assert len(queue.read("consumer", count=10)) == 1
+
+
+def test_coalesce_pushes_to_the_same_branch():
+    webhooks = [
+        make_push("1", commits=["a", "b"]),
+        make_webhook("pull_request", "2", action="opened"),
+        make_push("3", ref="refs/heads/other", commits=["c"]),
+        make_push("4", commits=["d"]),
+        make_push("5", repo_id=2, commits=["e"]),
+        make_push("6", commits=["f"]),
+    ]
+    for i, webhook in enumerate(webhooks):
+        webhook.entry_ids = (f"{i}-0",)
+
+    coalesced = coalesce(webhooks)
+    assert [webhook.delivery_id for webhook in coalesced] == ["2", "3", "5", "6"]
+    push = coalesced[-1]
+    assert [commit["id"] for commit in push.data["commits"]] == ["a", "b", "d", "f"]
+    assert push.data["before"] == "before-1"
+    assert push.entry_ids == ("0-0", "3-0", "5-0")
+    assert push.delivery_ids == ("1", "4", "6")
+    # the other webhooks are left as they were
+    assert coalesced[:3] == [webhooks[1], webhooks[2], webhooks[4]]
+
+
+def test_coalesce_leaves_unknown_pushes():
+    webhooks = [make_webhook("push", "1"), make_webhook("push", "2")]
+    assert coalesce(webhooks) == webhooks
+
+
+def test_record_round_trip():
+    webhook = make_push("1", commits=["a"])
+    record = json.loads(json.dumps(webhook.to_record()))
+    assert QueuedWebhook.from_record(record) == webhook
+
+    # bodies can be recorded as objects as well
+    record["body"] = webhook.data
+    assert QueuedWebhook.from_record(record).data == webhook.data
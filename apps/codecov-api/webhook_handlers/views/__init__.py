@@ -1,4 +1,4 @@
-from shared.metrics import Counter
+from shared.metrics import Counter, Histogram
 
 WEBHOOKS_RECEIVED = Counter(
     "api_webhooks_received",
@@ -20,3 +20,29 @@ WEBHOOKS_ERRORED = Counter(
         "error_reason",
     ],
 )
+
+WEBHOOKS_QUEUED = Counter(
+    "api_webhooks_queued",
+    "Webhooks queued for deferred processing, broken down by service, event type, and result",
+    [
+        "service",
+        "event",
+        "result",  # queued, duplicate, failed
+    ],
+)
+
+WEBHOOKS_COALESCED = Counter(
+    "api_webhooks_coalesced",
+    "Queued webhooks handled together with a later one, broken down by service and event type",
+    [
+        "service",
+        "event",
+    ],
+)
+
+WEBHOOKS_QUEUE_LAG = Histogram(
+    "api_webhooks_queue_lag_seconds",
+    "Time between the queueing of webhooks and their processing",
+    ["service"],
+    buckets=[0.1, 0.5, 1, 2, 5, 10, 30, 60, 300, 900],
+)
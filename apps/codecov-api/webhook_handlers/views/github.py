@@ -4,9 +4,11 @@ import re
 from contextlib import suppress
 from hashlib import sha1, sha256
 
+from django.conf import settings
 from django.db.models import Q
 from django.utils import timezone
 from django.utils.crypto import constant_time_compare
+from redis import RedisError
 from rest_framework import status
 from rest_framework.exceptions import NotFound, PermissionDenied
 from rest_framework.permissions import AllowAny
@@ -29,8 +31,13 @@ from webhook_handlers.constants import (
     GitHubWebhookEvents,
     WebhookHandlerErrorMessages,
 )
+from webhook_handlers.queue import (
+    QueuedWebhook,
+    QueuedWebhookRequest,
+    get_webhook_queue,
+)
 
-from . import WEBHOOKS_ERRORED, WEBHOOKS_RECEIVED
+from . import WEBHOOKS_ERRORED, WEBHOOKS_QUEUED, WEBHOOKS_RECEIVED
 
 log = logging.getLogger(__name__)
 
@@ -792,6 +799,54 @@ class GithubWebhookHandler(APIView):
 
         return Response()
 
+    def _enqueue(self, request) -> bool:
+        """
+        Queues the webhook for the `process_webhooks` command. Returns False
+        when it could not be queued, and must be handled right away instead.
+        """
+        webhook = QueuedWebhook(
+            service=self.service_name,
+            event=self.event,
+            delivery_id=str(request.META.get(GitHubHTTPHeaders.DELIVERY_TOKEN, ""))
+            or None,
+            headers={
+                header: str(request.META[header])
+                for header in GitHubHTTPHeaders.queued_headers
+                if header in request.META
+            },
+            body=request.body,
+        )
+        try:
+            queued = get_webhook_queue().enqueue(webhook)
+        except RedisError:
+            log.warning(
+                "Unable to queue webhook, handling it right away",
+                extra={
+                    "github_webhook_event": self.event,
+                    "delivery": webhook.delivery_id,
+                },
+                exc_info=True,
+            )
+            WEBHOOKS_QUEUED.labels(
+                service=self.service_name, event=self.event, result="failed"
+            ).inc()
+            return False
+        WEBHOOKS_QUEUED.labels(
+            service=self.service_name,
+            event=self.event,
+            result="queued" if queued else "duplicate",
+        ).inc()
+        return True
+
+    @classmethod
+    def handle_queued_webhook(cls, webhook: QueuedWebhook) -> Response:
+        """Handles a webhook queued by `post`, whose signature was verified then."""
+        view = cls()
+        view.request = QueuedWebhookRequest(webhook)
+        view.event = webhook.event
+        view._inc_recv()
+        return getattr(view, view.event)(view.request)
+
     def post(self, request, *args, **kwargs):
         self.event = self.request.META.get(GitHubHTTPHeaders.EVENT)
         log.info(
@@ -804,6 +859,12 @@ class GithubWebhookHandler(APIView):
         self.validate_signature(request)
 
         if handler := getattr(self, self.event, None):
+            if (
+                settings.WEBHOOK_QUEUE_ENABLED
+                and self.event != GitHubWebhookEvents.PING
+                and self._enqueue(request)
+            ):
+                return Response(status=status.HTTP_202_ACCEPTED)
             self._inc_recv()
             return handler(request, *args, **kwargs)
         else:
@@ -45,7 +45,10 @@ def initialize_logging(loglevel=logging.INFO, **kwargs):
 def initialize_cache(**kwargs):
     log.info("Initialized cache")
     redis_cache_backend = RedisBackend(get_redis_connection())
-    cache.configure(redis_cache_backend)
+    cache.configure(
+        redis_cache_backend,
+        local_maxsize=get_config("setup", "cache", "local_maxsize", default=1024),
+    )
 
 
 hourly_check_task_name = "app.cron.hourly_check.HourlyCheckTask"
@@ -1,36 +1,59 @@
+import threading
+from typing import NamedTuple
+
+from cachetools import TTLCache
+
 import shared.celery_config as shared_celery_config
 from database.engine import get_db_session
 from database.models.core import Commit, CompareCommit, Owner, Repository
 from shared.celery_router import route_tasks_based_on_user_plan
+from shared.config import get_config
+from shared.metrics import Counter
 from shared.plan.constants import DEFAULT_FREE_PLAN
 
+ROUTING_CONTEXT_LOOKUPS = Counter(
+    "worker_task_routing_context_lookups",
+    "Lookups of the plan and owner used to route tasks",
+    ["result"],  # hit, miss
+)
 
-def _get_user_plan_from_ownerid(db_session, ownerid, *args, **kwargs) -> str:
+
+class RoutingContext(NamedTuple):
+    user_plan: str
+    ownerid: int | None
+
+
+UNKNOWN_ROUTING_CONTEXT = RoutingContext(user_plan=DEFAULT_FREE_PLAN, ownerid=None)
+
+
+def _get_routing_context_from_ownerid(
+    db_session, ownerid, *args, **kwargs
+) -> RoutingContext:
     result = db_session.query(Owner.plan).filter(Owner.ownerid == ownerid).first()
     if result:
-        return result.plan
-    return DEFAULT_FREE_PLAN
+        return RoutingContext(user_plan=result.plan, ownerid=ownerid)
+    return RoutingContext(user_plan=DEFAULT_FREE_PLAN, ownerid=ownerid)
 
 
-def _get_user_plan_from_repoid(db_session, repoid, *args, **kwargs) -> str:
+def _get_routing_context_from_repoid(
+    db_session, repoid, *args, **kwargs
+) -> RoutingContext:
     result = (
-        db_session.query(Owner.plan)
+        db_session.query(Owner.plan, Owner.ownerid)
         .join(Repository.owner)
         .filter(Repository.repoid == repoid)
         .first()
     )
     if result:
-        return result.plan
-    return DEFAULT_FREE_PLAN
+        return RoutingContext(user_plan=result.plan, ownerid=result.ownerid)
+    return UNKNOWN_ROUTING_CONTEXT
 
 
-def _get_user_plan_from_org_ownerid(dbsession, org_ownerid, *args, **kwargs) -> str:
-    return _get_user_plan_from_ownerid(dbsession, ownerid=org_ownerid)
-
-
-def _get_user_plan_from_comparison_id(dbsession, comparison_id, *args, **kwargs) -> str:
+def _get_routing_context_from_comparison_id(
+    db_session, comparison_id, *args, **kwargs
+) -> RoutingContext:
     result = (
-        dbsession.query(Owner.plan)
+        db_session.query(Owner.plan, Owner.ownerid)
         .join(CompareCommit.compare_commit)
         .join(Commit.repository)
         .join(Repository.owner)
@@ -38,8 +61,24 @@ def _get_user_plan_from_comparison_id(dbsession, comparison_id, *args, **kwargs)
         .first()
     )
     if result:
-        return result.plan
-    return DEFAULT_FREE_PLAN
+        return RoutingContext(user_plan=result.plan, ownerid=result.ownerid)
+    return UNKNOWN_ROUTING_CONTEXT
+
+
+def _get_user_plan_from_ownerid(db_session, ownerid, *args, **kwargs) -> str:
+    return _get_routing_context_from_ownerid(db_session, ownerid).user_plan
+
+
+def _get_user_plan_from_repoid(db_session, repoid, *args, **kwargs) -> str:
+    return _get_routing_context_from_repoid(db_session, repoid).user_plan
+
+
+def _get_user_plan_from_org_ownerid(dbsession, org_ownerid, *args, **kwargs) -> str:
+    return _get_user_plan_from_ownerid(dbsession, ownerid=org_ownerid)
+
+
+def _get_user_plan_from_comparison_id(dbsession, comparison_id, *args, **kwargs) -> str:
+    return _get_routing_context_from_comparison_id(dbsession, comparison_id).user_plan
 
 
 def _get_ownerid_from_ownerid(dbsession, ownerid, *args, **kwargs) -> int:
@@ -51,89 +90,142 @@ def _get_ownerid_from_org_ownerid(dbsession, org_ownerid, *args, **kwargs) -> in
 
 
 def _get_ownerid_from_repoid(dbsession, repoid, *args, **kwargs) -> int | None:
-    result = (
-        dbsession.query(Owner.ownerid)
-        .join(Repository.owner)
-        .filter(Repository.repoid == repoid)
-        .first()
-    )
-    if result:
-        return result.ownerid
-    return None
+    return _get_routing_context_from_repoid(dbsession, repoid).ownerid
 
 
 def _get_ownerid_from_comparison_id(
     dbsession, comparison_id, *args, **kwargs
 ) -> int | None:
-    result = (
-        dbsession.query(Owner.ownerid)
-        .join(CompareCommit.compare_commit)
-        .join(Commit.repository)
-        .join(Repository.owner)
-        .filter(CompareCommit.id_ == comparison_id)
-        .first()
-    )
-    if result:
-        return result.ownerid
-    return None
+    return _get_routing_context_from_comparison_id(dbsession, comparison_id).ownerid
+
+
+# The kwarg of each task identifying the owner it runs for
+ROUTING_KEYS = {
+    # from ownerid
+    shared_celery_config.delete_owner_task_name: "ownerid",
+    shared_celery_config.send_email_task_name: "ownerid",
+    shared_celery_config.sync_repos_task_name: "ownerid",
+    shared_celery_config.sync_teams_task_name: "ownerid",
+    # from org_ownerid
+    shared_celery_config.new_user_activated_task_name: "org_ownerid",
+    # from repoid
+    shared_celery_config.pre_process_upload_task_name: "repoid",
+    shared_celery_config.upload_task_name: "repoid",
+    shared_celery_config.upload_processor_task_name: "repoid",
+    shared_celery_config.notify_task_name: "repoid",
+    shared_celery_config.commit_update_task_name: "repoid",
+    shared_celery_config.flush_repo_task_name: "repoid",
+    shared_celery_config.status_set_error_task_name: "repoid",
+    shared_celery_config.status_set_pending_task_name: "repoid",
+    shared_celery_config.pulls_task_name: "repoid",
+    shared_celery_config.upload_finisher_task_name: "repoid",  # didn't want to directly import the task module
+    shared_celery_config.manual_upload_completion_trigger_task_name: "repoid",
+    # from comparison_id
+    shared_celery_config.compute_comparison_task_name: "comparison_id",
+}
+
+ROUTING_CONTEXT_LOOKUP_FUNCS = {
+    "ownerid": _get_routing_context_from_ownerid,
+    "repoid": _get_routing_context_from_repoid,
+    "comparison_id": _get_routing_context_from_comparison_id,
+}
+
+
+def _get_routing_key(task_name: str, task_kwargs: dict | None) -> tuple | None:
+    kwarg = ROUTING_KEYS.get(task_name)
+    if kwarg is None or not task_kwargs or task_kwargs.get(kwarg) is None:
+        return None
+    # `org_ownerid` is an `ownerid` all the same
+    kind = "ownerid" if kwarg == "org_ownerid" else kwarg
+    return (kind, task_kwargs[kwarg])
+
+
+class RoutingContextCache:
+    """
+    The routing contexts of the recently published tasks, by their routing key.
+
+    Tasks are published in bursts for the same repos and owners, so their plan
+    rarely needs to be looked up more than once every `ttl` seconds. Changes
+    to a plan made by this process invalidate the contexts of its owner (see
+    `database.events`), and the `ttl` bounds how long other processes route
+    with the previous plan.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._contexts: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> RoutingContext | None:
+        with self._lock:
+            return self._contexts.get(key)
+
+    def set(self, key: tuple, context: RoutingContext):
+        with self._lock:
+            self._contexts[key] = context
+
+    def invalidate(self, ownerid: int | None = None, repoid: int | None = None):
+        """Forgets the contexts of an owner or repo, or all of them if neither."""
+        with self._lock:
+            if ownerid is None and repoid is None:
+                self._contexts.clear()
+                return
+            if repoid is not None:
+                self._contexts.pop(("repoid", repoid), None)
+            if ownerid is not None:
+                for key, context in list(self._contexts.items()):
+                    if context.ownerid == ownerid:
+                        del self._contexts[key]
+
+
+routing_context_cache = RoutingContextCache(
+    maxsize=get_config("setup", "task_routing", "cache_size", default=10000),
+    ttl=get_config("setup", "task_routing", "cache_ttl", default=60),
+)
+
+
+def get_routing_context(
+    task_name: str, task_kwargs: dict | None, db_session=None
+) -> RoutingContext:
+    """
+    The plan and owner to route the `task_name` task with `task_kwargs` by.
+
+    They are looked up in a single query, and cached by the repo, owner or
+    comparison the task is for. A DB session is only opened on cache misses.
+    """
+    key = _get_routing_key(task_name, task_kwargs)
+    if key is None:
+        return UNKNOWN_ROUTING_CONTEXT
+
+    context = routing_context_cache.get(key)
+    if context is not None:
+        ROUTING_CONTEXT_LOOKUPS.labels(result="hit").inc()
+        return context
+
+    ROUTING_CONTEXT_LOOKUPS.labels(result="miss").inc()
+    if db_session is None:
+        db_session = get_db_session()
+    kind, value = key
+    context = ROUTING_CONTEXT_LOOKUP_FUNCS[kind](db_session, **{kind: value})
+    routing_context_cache.set(key, context)
+    return context
 
 
 def _get_ownerid_from_task(dbsession, task_name: str, task_kwargs: dict) -> int | None:
-    owner_lookup_funcs = {
-        # from ownerid
-        shared_celery_config.delete_owner_task_name: _get_ownerid_from_ownerid,
-        shared_celery_config.send_email_task_name: _get_ownerid_from_ownerid,
-        shared_celery_config.sync_repos_task_name: _get_ownerid_from_ownerid,
-        shared_celery_config.sync_teams_task_name: _get_ownerid_from_ownerid,
-        # from org_ownerid
-        shared_celery_config.new_user_activated_task_name: _get_ownerid_from_org_ownerid,
-        # from repoid
-        shared_celery_config.pre_process_upload_task_name: _get_ownerid_from_repoid,
-        shared_celery_config.upload_task_name: _get_ownerid_from_repoid,
-        shared_celery_config.upload_processor_task_name: _get_ownerid_from_repoid,
-        shared_celery_config.notify_task_name: _get_ownerid_from_repoid,
-        shared_celery_config.commit_update_task_name: _get_ownerid_from_repoid,
-        shared_celery_config.flush_repo_task_name: _get_ownerid_from_repoid,
-        shared_celery_config.status_set_error_task_name: _get_ownerid_from_repoid,
-        shared_celery_config.status_set_pending_task_name: _get_ownerid_from_repoid,
-        shared_celery_config.pulls_task_name: _get_ownerid_from_repoid,
-        shared_celery_config.upload_finisher_task_name: _get_ownerid_from_repoid,  # didn't want to directly import the task module
-        shared_celery_config.manual_upload_completion_trigger_task_name: _get_ownerid_from_repoid,
-        # from comparison_id
-        shared_celery_config.compute_comparison_task_name: _get_ownerid_from_comparison_id,
-    }
-    func_to_use = owner_lookup_funcs.get(task_name, lambda *args, **kwargs: None)
-    return func_to_use(dbsession, **task_kwargs)
+    key = _get_routing_key(task_name, task_kwargs)
+    if key is None:
+        return None
+    kind, value = key
+    if kind == "ownerid":
+        return value
+    return ROUTING_CONTEXT_LOOKUP_FUNCS[kind](dbsession, **{kind: value}).ownerid
 
 
 def _get_user_plan_from_task(dbsession, task_name: str, task_kwargs: dict) -> str:
-    owner_plan_lookup_funcs = {
-        # from ownerid
-        shared_celery_config.delete_owner_task_name: _get_user_plan_from_ownerid,
-        shared_celery_config.send_email_task_name: _get_user_plan_from_ownerid,
-        shared_celery_config.sync_repos_task_name: _get_user_plan_from_ownerid,
-        shared_celery_config.sync_teams_task_name: _get_user_plan_from_ownerid,
-        # from org_ownerid
-        shared_celery_config.new_user_activated_task_name: _get_user_plan_from_org_ownerid,
-        # from repoid
-        shared_celery_config.pre_process_upload_task_name: _get_user_plan_from_repoid,
-        shared_celery_config.upload_task_name: _get_user_plan_from_repoid,
-        shared_celery_config.upload_processor_task_name: _get_user_plan_from_repoid,
-        shared_celery_config.notify_task_name: _get_user_plan_from_repoid,
-        shared_celery_config.commit_update_task_name: _get_user_plan_from_repoid,
-        shared_celery_config.flush_repo_task_name: _get_user_plan_from_repoid,
-        shared_celery_config.status_set_error_task_name: _get_user_plan_from_repoid,
-        shared_celery_config.status_set_pending_task_name: _get_user_plan_from_repoid,
-        shared_celery_config.pulls_task_name: _get_user_plan_from_repoid,
-        shared_celery_config.upload_finisher_task_name: _get_user_plan_from_repoid,  # didn't want to directly import the task module
-        shared_celery_config.manual_upload_completion_trigger_task_name: _get_user_plan_from_repoid,
-        # from comparison_id
-        shared_celery_config.compute_comparison_task_name: _get_user_plan_from_comparison_id,
-    }
-    func_to_use = owner_plan_lookup_funcs.get(
-        task_name, lambda *args, **kwargs: DEFAULT_FREE_PLAN
-    )
-    return func_to_use(dbsession, **task_kwargs)
+    key = _get_routing_key(task_name, task_kwargs)
+    if key is None:
+        return DEFAULT_FREE_PLAN
+    kind, value = key
+    return ROUTING_CONTEXT_LOOKUP_FUNCS[kind](dbsession, **{kind: value}).user_plan
 
 
 def route_task(name, args, kwargs, options, task=None, **kw):
@@ -144,9 +236,9 @@ def route_task(name, args, kwargs, options, task=None, **kw):
     user_plan = options.get("user_plan")
     ownerid = options.get("ownerid")
     if user_plan is None or ownerid is None:
-        db_session = get_db_session()
+        context = get_routing_context(name, kwargs)
         if user_plan is None:
-            user_plan = _get_user_plan_from_task(db_session, name, kwargs)
+            user_plan = context.user_plan
         if ownerid is None:
-            ownerid = _get_ownerid_from_task(db_session, name, kwargs)
+            ownerid = context.ownerid
     return route_tasks_based_on_user_plan(name, user_plan, ownerid)
@@ -399,3 +399,11 @@ def mock_feature(mocker, request):
         return default
 
     return mocker.patch.object(Feature, "check_value", check_value)
+
+
+@pytest.fixture(autouse=True)
+def clear_routing_context_cache():
+    from celery_task_router import routing_context_cache
+
+    # tests create owners with the same ids, but different plans
+    routing_context_cache.invalidate()
@@ -4,7 +4,7 @@ import logging
 from google.cloud import pubsub_v1
 from sqlalchemy import event, inspect
 
-from database.models.core import Repository
+from database.models.core import Owner, Repository
 from helpers.environment import is_enterprise
 from shared.config import get_config
 
@@ -83,3 +83,27 @@ def after_update_repo(mapper, connection, target: Repository):
                     log.info("After update signal", extra={"repoid": target.repoid})
                     _sync_repo(target)
                     break
+
+
+def _has_changed(target, key: str) -> bool:
+    # the previous value is unknown when the attribute was expired before
+    # being set, in which case it is assumed to have changed
+    history = inspect(target).attrs[key].history
+    return bool(history.added) and list(history.deleted) != list(history.added)
+
+
+@event.listens_for(Owner, "after_update")
+def after_update_owner(mapper, connection, target: Owner):
+    if _has_changed(target, "plan"):
+        # imported here, as the router imports the engine registering these events
+        from celery_task_router import routing_context_cache
+
+        routing_context_cache.invalidate(ownerid=target.ownerid)
+
+
+@event.listens_for(Repository, "after_update")
+def after_update_repo_owner(mapper, connection, target: Repository):
+    if _has_changed(target, "ownerid"):
+        from celery_task_router import routing_context_cache
+
+        routing_context_cache.invalidate(repoid=target.repoid)
@@ -1,7 +1,13 @@
+import hashlib
+import threading
+from collections import OrderedDict
 from collections.abc import Sequence
 from difflib import SequenceMatcher
 from os.path import relpath
 
+# how many trees of TOCs every process keeps around, along with the paths they resolved
+TREE_CACHE_SIZE = 4
+
 
 def _clean_path(path):
     path = relpath(
@@ -29,12 +35,24 @@ def _check_ancestors(path, match, ancestors):
 
 def _get_best_match(path: str, possibilities: list[str]) -> str:
     """
-    Given a `path`, return the most similar one out of `possibilities`.
+    Given a `path`, return the most similar one out of `possibilities`, by
+    `SequenceMatcher.ratio`. Ties go to the first possibility.
+
+    `real_quick_ratio` and `quick_ratio` are upper bounds of `ratio` that are
+    much cheaper to compute, so possibilities they show can't beat the best
+    match so far are skipped without computing their `ratio`.
     """
 
     best_match = (-1.0, "")
+    matcher = SequenceMatcher(None, path)
     for possibility in possibilities:
-        match = SequenceMatcher(None, path, possibility).ratio()
+        matcher.set_seq2(possibility)
+        if (
+            matcher.real_quick_ratio() <= best_match[0]
+            or matcher.quick_ratio() <= best_match[0]
+        ):
+            continue
+        match = matcher.ratio()
         if match > best_match[0]:
             best_match = (match, possibility)
 
@@ -89,6 +107,8 @@ class Tree:
         self.root = Node()
         for path in paths:
             self.insert(path)
+        # the paths resolved so far, by the path and ancestors they were resolved with
+        self._resolved: dict[tuple[str, int | None], str | None] = {}
 
     def insert(self, path: str):
         # the path components, in reverse order
@@ -104,6 +124,12 @@ class Tree:
         node.full_paths.append(path)
 
     def resolve_path(self, path: str, ancestors: int | None = None) -> str | None:
+        key = (path, ancestors)
+        if key not in self._resolved:
+            self._resolved[key] = self._resolve_path(path, ancestors)
+        return self._resolved[key]
+
+    def _resolve_path(self, path: str, ancestors: int | None) -> str | None:
         path = _clean_path(path)
         new_path = self.lookup(path, ancestors)
 
@@ -150,7 +176,7 @@ class Tree:
         if child_node:
             is_end = len(child_node.full_paths) > 0
             if is_end:
-                results = child_node.full_paths
+                results = list(child_node.full_paths)
             return self._recursive_lookup(
                 child_node, components, results, i + 1, is_end, True
             )
@@ -181,3 +207,27 @@ class Tree:
             else:
                 path_hit = _get_best_match(path, list(reversed(results)))
         return path_hit
+
+
+_trees: OrderedDict[str, Tree] = OrderedDict()
+_trees_lock = threading.Lock()
+
+
+def get_tree(paths: Sequence[str]) -> Tree:
+    """
+    The `Tree` of `paths`, shared by everything resolving paths against the
+    same TOC, like all the uploads of a commit, along with the paths it resolved.
+    """
+    key = hashlib.sha256("\n".join(paths).encode()).hexdigest()
+    with _trees_lock:
+        tree = _trees.get(key)
+        if tree is not None:
+            _trees.move_to_end(key)
+            return tree
+
+    tree = Tree(paths)
+    with _trees_lock:
+        _trees[key] = tree
+        while len(_trees) > TREE_CACHE_SIZE:
+            _trees.popitem(last=False)
+    return tree
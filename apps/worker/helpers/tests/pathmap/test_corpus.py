@@ -0,0 +1,246 @@
+"""
+Paths as CI uploads report them, resolved against the TOCs of typical
+repositories. The expected paths are the ones resolved when ambiguous matches
+were still ranked with `difflib.SequenceMatcher`.
+"""
+
+import pytest
+
+from helpers.pathmap import Tree
+
+TOCS = {
+    "js_monorepo": [
+        "index.ts",
+        "packages/ui/src/index.ts",
+        "packages/ui/src/components/Button/index.ts",
+        "packages/ui/src/components/Button/Button.tsx",
+        "packages/ui/src/components/button/styles.ts",
+        "packages/api/src/index.ts",
+        "packages/api/src/handlers/index.ts",
+        "packages/api/src/handlers/users.ts",
+        "packages/shared/src/utils/index.ts",
+        "apps/web/src/pages/index.tsx",
+    ],
+    "python_package": [
+        "__init__.py",
+        "setup.py",
+        "codecov/__init__.py",
+        "codecov/api/__init__.py",
+        "codecov/api/views.py",
+        "codecov/worker/__init__.py",
+        "codecov/worker/tasks/__init__.py",
+        "codecov/worker/tasks/upload.py",
+        "tests/__init__.py",
+        "tests/api/test_views.py",
+    ],
+    "go_module": [
+        "main.go",
+        "cmd/server/main.go",
+        "cmd/cli/main.go",
+        "internal/handler/handler.go",
+        "internal/handler/handler_test.go",
+        "pkg/service/service.go",
+    ],
+    "rust_workspace": [
+        "src/lib.rs",
+        "src/foo/mod.rs",
+        "src/foo/bar/mod.rs",
+        "crates/core/src/lib.rs",
+        "crates/core/src/mod.rs",
+    ],
+    "dotnet_solution": [
+        "src/HeapDump/GCHeapDump.cs",
+        "src/Api/Startup.cs",
+        "src/Api/Controllers/UsersController.cs",
+        "src/api/Program.cs",
+        "tests/Api.Tests/UsersControllerTests.cs",
+    ],
+    "scala_project": [
+        "examples/ChurchNumerals.scala",
+        "tests/src/test/scala/at/logic/gapt/examples/ChurchNumerals.scala",
+        "core/src/main/scala/at/logic/gapt/proofs/Sequent.scala",
+    ],
+}
+
+# (toc, path, resolved with 1 ancestor like `PathFixer` does, and with 2)
+CORPUS = [
+    (
+        "js_monorepo",
+        "/home/runner/work/repo/repo/packages/ui/src/index.ts",
+        ("packages/ui/src/index.ts", "packages/ui/src/index.ts"),
+    ),
+    (
+        "js_monorepo",
+        "packages/ui/src/components/Button/index.ts",
+        (
+            "packages/ui/src/components/Button/index.ts",
+            "packages/ui/src/components/Button/index.ts",
+        ),
+    ),
+    (
+        "js_monorepo",
+        "src/components/Button/Button.tsx",
+        (
+            "packages/ui/src/components/Button/Button.tsx",
+            "packages/ui/src/components/Button/Button.tsx",
+        ),
+    ),
+    ("js_monorepo", "/home/runner/work/repo/repo/index.ts", ("index.ts", "index.ts")),
+    (
+        "js_monorepo",
+        "handlers/index.ts",
+        ("packages/api/src/handlers/index.ts", "packages/api/src/handlers/index.ts"),
+    ),
+    (
+        "js_monorepo",
+        "../handlers/users.ts",
+        ("packages/api/src/handlers/users.ts", None),
+    ),
+    ("js_monorepo", "src/index.ts", ("index.ts", "index.ts")),
+    ("js_monorepo", "utils/index.ts", ("index.ts", "index.ts")),
+    (
+        "js_monorepo",
+        "C:\\a\\repo\\packages\\api\\src\\handlers\\users.ts",
+        ("packages/api/src/handlers/users.ts", "packages/api/src/handlers/users.ts"),
+    ),
+    (
+        "js_monorepo",
+        "/builds/web/src/pages/index.tsx",
+        ("apps/web/src/pages/index.tsx", "apps/web/src/pages/index.tsx"),
+    ),
+    (
+        "js_monorepo",
+        "packages/ui/src/components/BUTTON/Button.tsx",
+        (
+            "packages/ui/src/components/Button/Button.tsx",
+            "packages/ui/src/components/Button/Button.tsx",
+        ),
+    ),
+    ("js_monorepo", "dist/components/Button/index.js", (None, None)),
+    (
+        "python_package",
+        "/usr/lib/python3/site-packages/codecov/api/views.py",
+        ("codecov/api/views.py", "codecov/api/views.py"),
+    ),
+    (
+        "python_package",
+        "site-packages/codecov/__init__.py",
+        ("codecov/__init__.py", "codecov/__init__.py"),
+    ),
+    ("python_package", "api/__init__.py", ("__init__.py", "__init__.py")),
+    ("python_package", "tasks/__init__.py", ("__init__.py", "__init__.py")),
+    ("python_package", "/home/ci/__init__.py", ("__init__.py", "__init__.py")),
+    (
+        "python_package",
+        "worker/tasks/upload.py",
+        ("codecov/worker/tasks/upload.py", "codecov/worker/tasks/upload.py"),
+    ),
+    (
+        "python_package",
+        "tests/api/test_views.py",
+        ("tests/api/test_views.py", "tests/api/test_views.py"),
+    ),
+    ("python_package", "views.py", ("codecov/api/views.py", "codecov/api/views.py")),
+    (
+        "python_package",
+        "/app/codecov/worker/__init__.py",
+        ("codecov/worker/__init__.py", "codecov/worker/__init__.py"),
+    ),
+    ("python_package", "missing/module.py", (None, None)),
+    (
+        "go_module",
+        "github.com/acme/project/cmd/server/main.go",
+        ("cmd/server/main.go", "cmd/server/main.go"),
+    ),
+    ("go_module", "github.com/acme/project/main.go", ("main.go", "main.go")),
+    (
+        "go_module",
+        "github.com/acme/project/internal/handler/handler.go",
+        ("internal/handler/handler.go", "internal/handler/handler.go"),
+    ),
+    ("go_module", "server/main.go", ("cmd/server/main.go", "cmd/server/main.go")),
+    (
+        "go_module",
+        "service/service.go",
+        ("pkg/service/service.go", "pkg/service/service.go"),
+    ),
+    (
+        "go_module",
+        "/go/src/project/pkg/service/service.go",
+        ("pkg/service/service.go", "pkg/service/service.go"),
+    ),
+    (
+        "rust_workspace",
+        "C:\\Users\\ci\\repo\\src\\foo\\mod.rs",
+        ("src/foo/mod.rs", "src/foo/mod.rs"),
+    ),
+    (
+        "rust_workspace",
+        "/home/ci/repo/src/foo/bar/mod.rs",
+        ("src/foo/bar/mod.rs", "src/foo/bar/mod.rs"),
+    ),
+    (
+        "rust_workspace",
+        "core/src/lib.rs",
+        ("crates/core/src/lib.rs", "crates/core/src/lib.rs"),
+    ),
+    ("rust_workspace", "bar/mod.rs", ("src/foo/bar/mod.rs", "src/foo/bar/mod.rs")),
+    ("rust_workspace", "src/lib.rs", ("src/lib.rs", "src/lib.rs")),
+    ("rust_workspace", "mod.rs", (None, None)),
+    (
+        "dotnet_solution",
+        "C:/projects/perfview/src/heapDump/GCHeapDump.cs",
+        ("src/HeapDump/GCHeapDump.cs", "src/HeapDump/GCHeapDump.cs"),
+    ),
+    (
+        "dotnet_solution",
+        "D:\\a\\1\\s\\src\\Api\\Startup.cs",
+        ("src/Api/Startup.cs", "src/Api/Startup.cs"),
+    ),
+    (
+        "dotnet_solution",
+        "/_/src/Api/Controllers/UsersController.cs",
+        (
+            "src/Api/Controllers/UsersController.cs",
+            "src/Api/Controllers/UsersController.cs",
+        ),
+    ),
+    (
+        "dotnet_solution",
+        "src/API/Program.cs",
+        ("src/api/Program.cs", "src/api/Program.cs"),
+    ),
+    (
+        "dotnet_solution",
+        "Api.Tests/UsersControllerTests.cs",
+        (
+            "tests/Api.Tests/UsersControllerTests.cs",
+            "tests/Api.Tests/UsersControllerTests.cs",
+        ),
+    ),
+    (
+        "scala_project",
+        "/home/travis/build/gapt/gapt/examples/ChurchNumerals.scala",
+        ("examples/ChurchNumerals.scala", "examples/ChurchNumerals.scala"),
+    ),
+    (
+        "scala_project",
+        "gapt/examples/ChurchNumerals.scala",
+        ("examples/ChurchNumerals.scala", "examples/ChurchNumerals.scala"),
+    ),
+    (
+        "scala_project",
+        "scala/at/logic/gapt/proofs/Sequent.scala",
+        (
+            "core/src/main/scala/at/logic/gapt/proofs/Sequent.scala",
+            "core/src/main/scala/at/logic/gapt/proofs/Sequent.scala",
+        ),
+    ),
+]
+
+
+@pytest.mark.parametrize("toc, path, expected", CORPUS)
+def test_resolve_corpus(toc, path, expected):
+    tree = Tree(TOCS[toc])
+    resolved = tuple(tree.resolve_path(path, ancestors) for ancestors in (1, 2))
+    assert resolved == expected
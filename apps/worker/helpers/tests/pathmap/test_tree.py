@@ -1,4 +1,11 @@
-from helpers.pathmap import Tree, _get_best_match
+import random
+from difflib import SequenceMatcher
+from unittest.mock import patch
+
+import pytest
+
+from helpers import pathmap
+from helpers.pathmap import Tree, _get_best_match, get_tree
 
 
 def test_get_best_match():
@@ -8,6 +15,76 @@ def test_get_best_match():
     assert _get_best_match(path, possibilities) == "c/bB.py"
 
 
+def test_get_best_match_prefers_shorter_possibilities():
+    path = "hooks/index.ts"
+    possibilities = ["packages/ui/src/hooks/index.ts", "index.ts"]
+
+    assert _get_best_match(path, possibilities) == "index.ts"
+    assert _get_best_match("a/b", ["x/a/b", "y/a/b"]) == "x/a/b"
+
+
+@pytest.mark.parametrize(
+    "toc, path, expected",
+    [
+        (
+            ["util.py", "b/components/core/ab/util.py"],
+            "test/components/ab/util.py",
+            "b/components/core/ab/util.py",
+        ),
+        (
+            ["index.ts", "utils/components/pkg/utils/pkg/index.ts"],
+            "packages/pkg/pkg/index.ts",
+            "utils/components/pkg/utils/pkg/index.ts",
+        ),
+    ],
+)
+def test_get_best_match_keeps_shared_ancestors(toc, path, expected):
+    assert Tree(toc).resolve_path(path, 1) == expected
+
+
+def _reference_best_match(path: str, possibilities: list[str]) -> str:
+    """The plain `SequenceMatcher.ratio` ranking `_get_best_match` must agree with."""
+    best_match = (-1.0, "")
+    for possibility in possibilities:
+        match = SequenceMatcher(None, path, possibility).ratio()
+        if match > best_match[0]:
+            best_match = (match, possibility)
+    return best_match[1]
+
+
+def _random_path(rng: random.Random, min_depth: int) -> str:
+    components = ["packages", "src", "lib", "components", "utils", "core", "pkg"]
+    components += ["a", "ab", "b", "test", "tests", "api", "web"]
+    depth = rng.randint(min_depth, 6)
+    directories = [rng.choice(components) for _ in range(depth)]
+    filename = rng.choice(["index.ts", "util.py", "mod.rs", "main.go", "app.js"])
+    return "/".join([*directories, filename])
+
+
+def test_resolve_path_matches_sequence_matcher():
+    rng = random.Random(44)
+    for _ in range(200):
+        toc = sorted({_random_path(rng, 0) for _ in range(rng.randint(2, 30))})
+        paths = [_random_path(rng, 1) for _ in range(30)] + [
+            f"/ci/{rng.choice(toc)}" for _ in range(10)
+        ]
+        # one tree resolving all paths, as shared by the uploads of a commit
+        tree = Tree(toc)
+        resolved = [
+            tree.resolve_path(path, ancestors)
+            for path in paths
+            for ancestors in (None, 1, 2)
+        ]
+
+        with patch.object(pathmap, "_get_best_match", _reference_best_match):
+            expected = [
+                Tree(toc).resolve_path(path, ancestors)
+                for path in paths
+                for ancestors in (None, 1, 2)
+            ]
+        assert resolved == expected, toc
+
+
 def test_drill():
     tree = Tree(["a/b/c"])
     assert tree._drill(tree.root) == ["a/b/c"]
@@ -41,3 +118,31 @@ def test_lookup():
     tree = Tree(["one/two/three.py"])
 
     assert tree.lookup("two/one/three.py") == "one/two/three.py"
+
+
+def test_lookups_do_not_change_the_tree():
+    tree = Tree(["a/b/c", "a/r/c", "c"])
+
+    assert tree.lookup("r/c") == "a/r/c"
+    assert tree.root.children["c"].full_paths == ["c"]
+    assert tree.lookup("c") == "c"
+
+
+def test_resolve_path_memoized():
+    tree = Tree(["src/components/login.js"])
+
+    assert tree.resolve_path("Src/components/login.js") == "src/components/login.js"
+    assert tree.resolve_path("not/found.py", 1) is None
+    assert tree._resolved == {
+        ("Src/components/login.js", None): "src/components/login.js",
+        ("not/found.py", 1): None,
+    }
+
+
+def test_get_tree():
+    toc = ["src/a.py", "src/b.py"]
+
+    tree = get_tree(toc)
+    assert get_tree(list(toc)) is tree
+    assert get_tree(["src/a.py"]) is not tree
+    assert tree.resolve_path("/ci/src/a.py") == "src/a.py"
@@ -13,6 +13,14 @@ PARALLEL_COMPONENT_COMPARISON = Feature("parallel_component_comparison")
 
 TA_TIMESERIES = Feature("ta_timeseries")
 
+TA_COPY_TESTRUNS = Feature("ta_copy_testruns")
+
+TA_SET_BASED_FLAKES = Feature("ta_set_based_flakes")
+
+TA_INCREMENTAL_ROLLUPS = Feature("ta_incremental_rollups")
+
+SYNC_REPOS_SET_BASED = Feature("sync_repos_set_based")
+
 DISABLE_CROSS_POLLINATION_MESSAGE = Feature("disable_cross_pollination_message")
 
 ALLOW_VITEST_EVALS = Feature("vitest_evals")
@@ -205,18 +205,16 @@ class BundleAnalysisCommentMarkdownStrategy(MessageStrategyInterface):
         configured_threshold: BundleThreshold,
     ) -> list[BundleRow]:
         bundle_rows = []
-        bundle_changes = comparison.bundle_changes()
-        # Calculate bundle change data in one loop since bundle_changes is a generator
-        for bundle_change in bundle_changes:
+        computed = comparison.computed
+        for bundle_change in comparison.bundle_changes():
             # Define row table data
             bundle_name = bundle_change.bundle_name
             if bundle_change.change_type == BundleChange.ChangeType.REMOVED:
                 size = "(removed)"
                 is_cached = False
             else:
-                head_bundle_report = comparison.head_report.bundle_report(bundle_name)
-                size = bytes_readable(head_bundle_report.total_size())
-                is_cached = head_bundle_report.is_cached()
+                size = bytes_readable(computed.head_bundle_sizes[bundle_name])
+                is_cached = computed.head_bundles_cached[bundle_name]
 
             change_size = bundle_change.size_delta
             if change_size == 0:
@@ -305,12 +303,10 @@ class BundleAnalysisCommentMarkdownStrategy(MessageStrategyInterface):
     ) -> list[AssetData]:
         try:
             asset_data = []
-            asset_comparisons = comparison.bundle_comparison(
-                bundle_name
-            ).asset_comparisons()
-            for asset_comparison in asset_comparisons:
-                asset_change = asset_comparison.asset_change()
-
+            asset_changes = comparison.asset_changes_with_modules(
+                bundle_name, pr_changed_files=changed_files
+            )
+            for asset_change, modules in asset_changes:
                 # If not change in size for the asset then we don't show it
                 if asset_change.size_delta == 0:
                     continue
@@ -333,9 +329,6 @@ class BundleAnalysisCommentMarkdownStrategy(MessageStrategyInterface):
                 else:
                     change_icon = ""
 
-                modules = asset_comparison.contributing_modules(
-                    pr_changed_files=changed_files
-                )
                 asset_data.append(
                     AssetData(
                         asset_display_name_1=asset_display_name_1,
@@ -77,6 +77,19 @@ class TestCommentMesage:
             )
         )
 
+        # later notifications of the same reports are built from the persisted
+        # comparison, without downloading either report
+        context = (
+            BundleAnalysisPRCommentContextBuilder()
+            .initialize(head_commit, user_yaml, GITHUB_APP_INSTALLATION_DEFAULT_NAME)
+            .build_context()
+            .get_result()
+        )
+        assert BundleAnalysisCommentMarkdownStrategy().build_message(context) == message
+        comparison = context.bundle_analysis_comparison
+        assert comparison.head_report_db_path is None
+        assert comparison.base_report_db_path is None
+
     def _setup_send_message_tests(
         self, dbsession, mocker, torngit_ghapp_data, bundle_analysis_commentid
     ):
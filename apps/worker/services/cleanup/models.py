@@ -1,4 +1,5 @@
 import dataclasses
+import itertools
 from collections import defaultdict
 from collections.abc import Callable
 from functools import partial
@@ -20,32 +21,56 @@ from shared.django_apps.reports.models import (
 from shared.django_apps.reports.models import ReportSession as Upload
 from shared.django_apps.staticanalysis.models import StaticAnalysisSingleFileSnapshot
 from shared.django_apps.timeseries.models import Dataset, Measurement
-from shared.storage.exceptions import FileNotInStorageError
 from shared.timeseries.helpers import is_timeseries_enabled
 from shared.utils.sessions import SessionType
 
 MANUAL_QUERY_CHUNKSIZE = 1_000
 DELETE_FILES_BATCHSIZE = 50
+# the maximum number of keys in a single S3 `DeleteObjects` request
+STORAGE_DELETE_BATCHSIZE = 1_000
 
 
 @sentry_sdk.trace
 def cleanup_files_batched(
     context: CleanupContext, buckets_paths: dict[str, list[str]]
 ) -> int:
-    def delete_file(bucket_path: tuple[str, str]) -> bool:
+    def delete_files(bucket_paths: tuple[str, tuple[str, ...]]) -> int:
+        bucket, paths = bucket_paths
         try:
-            return context.storage.delete_file(bucket_path[0], bucket_path[1])
-        except FileNotInStorageError:
-            return False
+            return sum(context.storage.delete_files(bucket, list(paths)))
         except Exception as e:
             sentry_sdk.capture_exception(e)
-            return False
+            return 0
 
-    iter = ((bucket, path) for bucket, paths in buckets_paths.items() for path in paths)
-    results = context.threadpool.map(delete_file, iter)
+    # every batch is deleted with a single request, and batches run in parallel
+    iter = (
+        (bucket, batch)
+        for bucket, paths in buckets_paths.items()
+        for batch in itertools.batched(paths, STORAGE_DELETE_BATCHSIZE)
+    )
+    results = context.threadpool.map(delete_files, iter)
     return sum(results)
 
 
+@sentry_sdk.trace
+def list_files_batched(
+    context: CleanupContext, bucket: str, prefixes: list[str]
+) -> list[str]:
+    def list_files(prefix: str) -> list[str]:
+        try:
+            return [
+                obj["name"]
+                for obj in context.storage.list_folder_contents(bucket, prefix)
+            ]
+        except Exception as e:
+            sentry_sdk.capture_exception(e)
+            return []
+
+    return [
+        path for paths in context.threadpool.map(list_files, prefixes) for path in paths
+    ]
+
+
 @sentry_sdk.trace
 def cleanup_with_storage_field(
     path_field: str, context: CleanupContext, query: QuerySet
@@ -111,6 +136,7 @@ def cleanup_commitreport(context: CleanupContext, query: QuerySet):
             break
 
         buckets_paths: dict[str, list[str]] = defaultdict(list)
+        comparison_prefixes: list[str] = []
         for (
             _pk,
             report_type,
@@ -130,12 +156,20 @@ def cleanup_commitreport(context: CleanupContext, query: QuerySet):
 
             # depending on the `report_type`, we have:
             # - a `chunks` file for coverage
-            # - a `bundle_report.sqlite` for BA
+            # - a `bundle_report.sqlite`, its `bundle_report.revision` and
+            #   the persisted comparisons against it for BA
             if report_type == "bundle_analysis":
-                path = StoragePaths.bundle_report.path(
-                    repo_key=repo_hash, report_key=external_id
+                for storage_path in (
+                    StoragePaths.bundle_report,
+                    StoragePaths.bundle_report_revision,
+                ):
+                    path = storage_path.path(repo_key=repo_hash, report_key=external_id)
+                    buckets_paths[context.bundleanalysis_bucket].append(path)
+                comparison_prefixes.append(
+                    StoragePaths.bundle_comparisons.path(
+                        repo_key=repo_hash, report_key=external_id
+                    )
                 )
-                buckets_paths[context.bundleanalysis_bucket].append(path)
             elif report_type == "test_results":
                 # TA has cached rollups, but those are based on `Branch`
                 pass
@@ -149,6 +183,13 @@ def cleanup_commitreport(context: CleanupContext, query: QuerySet):
                 )
                 buckets_paths[context.default_bucket].append(path)
 
+        if comparison_prefixes:
+            buckets_paths[context.bundleanalysis_bucket].extend(
+                list_files_batched(
+                    context, context.bundleanalysis_bucket, comparison_prefixes
+                )
+            )
+
         cleaned_files = cleanup_files_batched(context, buckets_paths)
         context.add_progress(cleaned_files=cleaned_files)
 
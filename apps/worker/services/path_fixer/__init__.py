@@ -5,7 +5,7 @@ from pathlib import PurePosixPath, PureWindowsPath
 
 import sentry_sdk
 
-from helpers.pathmap import Tree
+from helpers.pathmap import Tree, get_tree
 from services.path_fixer.fixpaths import remove_known_bad_paths
 from services.path_fixer.user_path_fixes import UserPathFixes
 from services.path_fixer.user_path_includes import UserPathIncludes
@@ -86,7 +86,7 @@ class PathFixer:
         self.path_matcher = UserPathIncludes(self.path_patterns)
 
         if self.toc and not should_disable_default_pathfixes:
-            self.tree = Tree(self.toc)
+            self.tree = get_tree(self.toc)
         else:
             self.tree = None
 
@@ -1,6 +1,7 @@
 import re
 
 from services.path_fixer.match import regexp_match_one
+from shared.utils.match import compile_patterns
 
 
 class UserPathIncludes:
@@ -45,12 +46,12 @@ class UserPathIncludes:
             self.include_all = True
         else:
             self.include_all = False
-            self.includes = [re.compile(i) for i in includes]
+            self.includes = compile_patterns(includes)
 
         if "!.*" in self.path_patterns:
             self.exclude_all = False
         else:
-            self.excludes = [re.compile(e[1:]) for e in excludes]
+            self.excludes = compile_patterns(e[1:] for e in excludes)
 
     def __call__(self, value: str) -> bool:
         if not self.path_patterns:
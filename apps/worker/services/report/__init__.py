@@ -44,9 +44,15 @@ from services.yaml.reader import get_paths_from_flags, read_yaml_field
 from shared.api_archive.archive import ArchiveService
 from shared.django_apps.reports.models import ReportType
 from shared.reports.carryforward import generate_carryforward_report
+from shared.reports.directory_tree import (
+    DirectoryTree,
+    directory_tree_fingerprint,
+    directory_trees_enabled,
+)
 from shared.reports.enums import UploadState, UploadType
 from shared.reports.resources import Report
 from shared.reports.types import TOTALS_MAP
+from shared.storage.compression import IteratorReader
 from shared.storage.exceptions import FileNotInStorageError
 from shared.torngit.exceptions import TorngitError
 from shared.upload.constants import UploadErrorCode
@@ -638,12 +644,14 @@ class ReportService(BaseReportService):
     def save_report(self, commit: Commit, report: Report):
         archive_service = ArchiveService(commit.repository)
 
-        report_json, chunks, _totals = report.serialize()
+        report_json, chunks, _totals = report.serialize_streaming()
 
-        PYREPORT_REPORT_JSON_SIZE.observe(len(report_json))
-        PYREPORT_CHUNKS_FILE_SIZE.observe(len(chunks))
+        # the chunks are streamed into storage as they are being serialized
+        chunks_reader = IteratorReader(chunks)
+        chunks_url = archive_service.write_chunks(commit.commitid, chunks_reader)
 
-        chunks_url = archive_service.write_chunks(commit.commitid, chunks)
+        PYREPORT_REPORT_JSON_SIZE.observe(len(report_json))
+        PYREPORT_CHUNKS_FILE_SIZE.observe(chunks_reader.tell())
 
         commit.state = "complete" if report else "error"
         commit.totals = legacy_totals(report)
@@ -655,6 +663,12 @@ class ReportService(BaseReportService):
             # temporary measure until we ensure the API and frontend don't expect not-null coverages
             commit.totals["c"] = 0
 
+        report_data = orjson.loads(report_json)
+        if directory_trees_enabled():
+            self.save_directory_tree(
+                archive_service, commit, report, report_data["sessions"]
+            )
+
         log.info(
             "Calling update to Commit.Report",
             extra={
@@ -667,7 +681,7 @@ class ReportService(BaseReportService):
         # `report_json` is an `ArchiveField`, so this will trigger an upload
         # FIXME: we do an unnecessary `loads` roundtrip because of this abstraction,
         # and we should just save the `report_json` to archive storage directly instead.
-        commit.report_json = orjson.loads(report_json)
+        commit.report_json = report_data
 
         # `report` is an accessor which implicitly queries `CommitReport`
         if commit_report := commit.report:
@@ -702,6 +716,32 @@ class ReportService(BaseReportService):
         )
         return {"url": chunks_url}
 
+    @sentry_sdk.trace
+    def save_directory_tree(
+        self,
+        archive_service: ArchiveService,
+        commit: Commit,
+        report: Report,
+        sessions: dict,
+    ):
+        """
+        Stores the `DirectoryTree` of the report next to it, for the file
+        browsers of the API to list directories without going through the
+        whole report. Those build the tree themselves when it is missing, so
+        failing to store it doesn't fail saving the report.
+        """
+        tree = DirectoryTree.from_report(
+            report, fingerprint=directory_tree_fingerprint(commit.totals, sessions)
+        )
+        try:
+            archive_service.write_directory_tree(commit.commitid, tree.serialize())
+        except Exception:
+            log.warning(
+                "Failed to store directory tree",
+                extra={"repoid": commit.repoid, "commit": commit.commitid},
+                exc_info=True,
+            )
+
     @sentry_sdk.trace
     def save_full_report(self, commit: Commit, report: Report) -> dict:
         """
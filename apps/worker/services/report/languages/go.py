@@ -1,6 +1,5 @@
+import re
 from collections import defaultdict
-from io import BytesIO
-from itertools import groupby
 
 import sentry_sdk
 
@@ -11,6 +10,9 @@ from services.report.report_builder import ReportBuilderSession
 from shared.utils import merge
 from shared.utils.merge import LineType, line_type, partials_to_line
 
+# `line.column,line.column numberOfStatements count`, as written by `go test`
+COVERAGE_LINE = re.compile(rb"(\d+)\.(\d+),(\d+)\.(\d+) \d+ (\d+)")
+
 
 class GoProcessor(BaseLanguageProcessor):
     def matches_content(self, content: bytes, first_line: str, name: str) -> bool:
@@ -38,13 +40,11 @@ def from_txt(string: bytes, report_builder_session: ReportBuilderSession) -> Non
             continue
 
         for ln, partials in lines.items():
-            best_in_partials = max(p[2] for p in partials)
-            partials = combine_partials(partials)
-            if partials:
-                cov = partials_to_line(partials)
-                cov_to_use = cov
+            combined = combine_partials(partials)
+            if combined:
+                cov_to_use = partials_to_line(combined)
             else:
-                cov_to_use = best_in_partials
+                cov_to_use = max(p[2] for p in partials)
             if partials_as_hits and line_type(cov_to_use) == LineType.partial:
                 cov_to_use = 1
 
@@ -81,44 +81,55 @@ def process_bytes_into_files(string: bytes) -> dict[str, dict[int, set]]:
     """
 
     files: dict[str, dict[int, set]] = {}
+    # the lines of each file, by its undecoded name
+    file_lines: dict[bytes, dict[int, set]] = {}
 
-    for encoded_line in BytesIO(string):
-        line = encoded_line.decode(errors="replace").rstrip("\n")
-        if not line or line.startswith("mode: "):
+    for line in string.split(b"\n"):
+        if not line or line.startswith(b"mode: "):
             continue
 
-        split = line.split(":", 1)
+        name, _, coverage = line.partition(b":")
         # File outline e.g., "github.com/nfisher/rsqf/rsqf.go:19: calcP 100.0%"
-        if len(split) < 2 or not split[1] or split[1].endswith("%"):
+        if not coverage or coverage.endswith(b"%"):
             continue
 
-        filename = split[0]
-        try:
-            region = parse_coverage(split[1])
-        except ValueError:
-            # FIXME: do we actually want to raise an error here?
-            # Why not just skip over invalid lines, as the coverage file likely
-            # contains other valid lines we can use.
-            raise CorruptRawReportError(
-                "name.go:line.column,line.column numberOfStatements hits",
-                "Go coverage line does not match expected format",
+        if (match := COVERAGE_LINE.fullmatch(coverage)) is not None:
+            start_line, start_column, end_line, end_column, hits = map(
+                int, match.groups()
+            )
+        else:
+            # anything unusual goes through the slower, but more lenient parser
+            try:
+                region = parse_coverage(coverage.decode(errors="replace"))
+            except ValueError:
+                # FIXME: do we actually want to raise an error here?
+                # Why not just skip over invalid lines, as the coverage file likely
+                # contains other valid lines we can use.
+                raise CorruptRawReportError(
+                    "name.go:line.column,line.column numberOfStatements hits",
+                    "Go coverage line does not match expected format",
+                )
+            start_line, start_column = region.start.line, region.start.column
+            end_line, end_column = region.end.line, region.end.column
+            hits = region.hits
+
+        lines = file_lines.get(name)
+        if lines is None:
+            lines = file_lines[name] = files.setdefault(
+                name.decode(errors="replace"), defaultdict(set)
             )
-
-        lines = files.setdefault(filename, defaultdict(set))
 
         # add start of line
-        if region.start.line == region.end.line:
-            lines[region.start.line].add(
-                (region.start.column, region.end.column, region.hits)
-            )
+        if start_line == end_line:
+            lines[start_line].add((start_column, end_column, hits))
         else:
-            lines[region.start.line].add((region.start.column, None, region.hits))
+            lines[start_line].add((start_column, None, hits))
             # add middles
-            for ln in range(region.start.line + 1, region.end.line):
-                lines[ln].add((0, None, region.hits))
-            if region.end.column > 2:
+            for ln in range(start_line + 1, end_line):
+                lines[ln].add((0, None, hits))
+            if end_column > 2:
                 # add end of line
-                lines[region.end.line].add((None, region.end.column, region.hits))
+                lines[end_line].add((None, end_column, hits))
 
     return files
 
@@ -148,39 +159,44 @@ def combine_partials(partials):
     if len(partials) == 1:
         return list(partials)
 
-    columns = defaultdict(list)
-    # fill in the partials WITH end values: (_, X, _)
-    for sc, ec, cov in partials:
-        if ec is not None:
-            for c in range(sc or 0, ec):
-                columns[c].append(cov)
-
+    # the partials WITH end values: (_, X, _), which cover at least one column
+    bounded = [
+        (sc or 0, ec, cov)
+        for sc, ec, cov in partials
+        if ec is not None and (sc or 0) < ec
+    ]
     # get the last column number (+1 for exclusiveness)
-    lc = (
-        max(columns.keys()) if columns else max([sc or 0 for (sc, ec, cov) in partials])
-    ) + 1
+    if bounded:
+        lc = max(ec for _, ec, _ in bounded)
+    else:
+        lc = max([sc or 0 for (sc, ec, cov) in partials]) + 1
+    # the partials WITHOUT end values: (_, None, _), which run until `lc`
+    unbounded = [(sc or 0, cov) for sc, ec, cov in partials if ec is None]
     # hits for (lc, None, eol)
-    eol = []
-
-    # fill in the partials WITHOUT end values: (_, None, _)
-    for sc, ec, cov in partials:
-        if ec is None:
-            for c in range(sc or 0, lc):
-                columns[c].append(cov)
-            eol.append(cov)
-
-    columns = [(c, merge.merge_all(cov)) for c, cov in columns.items()]
-
-    # sum all the line hits && sort and group lines based on hits
-    columns = groupby(sorted(columns), lambda c: c[1])
-
+    eol = [cov for _, cov in unbounded]
+
+    # the columns are covered in runs between the starts and ends of the
+    # partials, so the hits only need merging once per run and not per column
+    bounds = set()
+    for sc, ec, _ in bounded:
+        bounds.update((sc, ec))
+    for sc, _ in unbounded:
+        if sc < lc:
+            bounds.update((sc, lc))
+    bounds = sorted(bounds)
+
+    # sum all the line hits && group consecutive runs based on hits
     results = []
-    for cov, cols in columns:
-        # unpack iter
-        cols = list(cols)
-        # sc from first column
-        # ec from last (or +1 if singular)
-        results.append([cols[0][0], (cols[-1] if cols else cols[0])[0] + 1, cov])
+    for start, end in zip(bounds, bounds[1:]):
+        hits = [cov for sc, ec, cov in bounded if sc <= start and end <= ec]
+        hits.extend(cov for sc, cov in unbounded if sc <= start)
+        if not hits:
+            continue
+        cov = merge.merge_all(hits)
+        if results and results[-1][2] == cov:
+            results[-1][1] = end
+        else:
+            results.append([start, end, cov])
 
     # remove duds
     if results:
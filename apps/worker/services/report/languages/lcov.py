@@ -1,7 +1,6 @@
 import logging
 from collections import defaultdict
 from decimal import Decimal, InvalidOperation
-from io import BytesIO
 
 import sentry_sdk
 
@@ -31,25 +30,34 @@ def from_txt(reports: bytes, report_builder_session: ReportBuilderSession) -> No
             report_builder_session.append(_file)
 
 
+# the whitespace `str.strip` removes from ASCII text, `bytes.strip` only strips
+# the first six of these by default
+ASCII_WHITESPACE = b" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"
+SKIPPED_METHODS = (b"TN", b"LF", b"LH", b"FNF", b"FNH", b"BRF", b"BRH", b"FNDA")
+
+
 def _process_file(
     doc: bytes, report_builder_session: ReportBuilderSession
 ) -> ReportFile | None:
-    branches: dict[str, dict[str, int]] = defaultdict(dict)
-    fn_lines: set[str] = set()  # lines of function definitions
+    """
+    Parses the records of one source file.
+
+    The lines are scanned as `bytes`: only the file name and the ids of missing
+    branches are decoded, and numbers are parsed with `int` directly, falling
+    back to decoding them for anything unusual.
+    """
+    branches: dict[bytes, dict[bytes, int]] = defaultdict(dict)
+    fn_lines: set[bytes] = set()  # lines of function definitions
 
     JS = False
     CPP = False
-    skip_lines: list[str] = []
+    TS = False
+    skip_lines: list[bytes] = []
     _file: ReportFile | None = None
 
-    for encoded_line in BytesIO(doc):
-        line = encoded_line.decode(errors="replace").rstrip("\n")
-        if line == "" or ":" not in line:
-            continue
-
-        method, content = line.split(":", 1)
-        content = content.strip()
-        if method in ("TN", "LF", "LH", "FNF", "FNH", "BRF", "BRH", "FNDA"):
+    for line in doc.split(b"\n"):
+        method, sep, content = line.partition(b":")
+        if not sep or method in SKIPPED_METHODS:
             # TN: test title
             # LF: lines found
             # LH: lines hit
@@ -60,7 +68,12 @@ def _process_file(
             # FNDA: function data
             continue
 
-        if method == "SF":
+        if content.isascii():
+            content = content.strip(ASCII_WHITESPACE)
+        else:
+            content = content.decode(errors="replace").strip().encode()
+
+        if method == b"SF":
             """
             For each source file referenced in the .da file, there is a section
             containing filename and coverage data:
@@ -68,48 +81,51 @@ def _process_file(
             SF:<absolute path to the source file>
             """
             # file name
-            _file = report_builder_session.create_coverage_file(content)
-            JS = content[-3:] == ".js"
-            CPP = content[-4:] == ".cpp"
+            path = content.decode()
+            _file = report_builder_session.create_coverage_file(path)
+            JS = path[-3:] == ".js"
+            CPP = path[-4:] == ".cpp"
+            TS = _file is not None and _file.name.endswith(".ts")
             continue
 
         if _file is None:
             return None
 
-        if method == "DA":
+        if method == b"DA":
             """
             Then there is a list of execution counts for each instrumented line
             (i.e. a line which resulted in executable code):
 
             DA:<line number>,<execution count>[,<checksum>]
             """
-            #  DA:<line number>,<execution count>[,<checksum>]
-            if line.startswith("undefined,"):
-                continue
-
-            split = content.split(",", 2)
+            split = content.split(b",", 2)
             if len(split) < 2:
                 continue
             line_str = split[0]
             hit = split[1]
 
-            if line_str in ("", "undefined") or hit in ("", "undefined"):
+            if line_str in (b"", b"undefined") or hit in (b"", b"undefined"):
                 continue
-            if line_str[0] in ("0", "n") or hit[0] in ("=", "s"):
+            if line_str[:1] in (b"0", b"n") or hit[:1] in (b"=", b"s"):
                 continue
 
             try:
                 ln = int(line_str)
-                cov = parse_int(hit)
-            except (ValueError, InvalidOperation):
-                continue
+                cov = int(hit)
+            except ValueError:
+                try:
+                    ln = int(line_str.decode())
+                    cov = parse_int(hit.decode())
+                except (ValueError, InvalidOperation):
+                    continue
 
-            cov = max(cov, 0)  # clamp to 0
+            if cov < 0:
+                cov = 0  # clamp to 0
 
             _line = report_builder_session.create_coverage_line(cov)
             _file.append(ln, _line)
 
-        elif method == "FN" and not JS:
+        elif method == b"FN" and not JS:
             """
             Following is a list of line numbers for each function name found in the
             source file:
@@ -117,18 +133,17 @@ def _process_file(
             FN:<line number of function start>,<function name>
             """
 
-            split = content.split(",", 1)
-            if len(split) < 2:
+            line_str, sep, name = content.partition(b",")
+            if not sep:
                 continue
-            line_str, name = split
 
-            if CPP and name[:2] in ("_Z", "_G"):
+            if CPP and name[:2] in (b"_Z", b"_G"):
                 skip_lines.append(line_str)
                 continue
 
             fn_lines.add(line_str)
 
-        elif method == "BRDA" and not JS:
+        elif method == b"BRDA" and not JS:
             """
             Branch coverage information is stored with one line per branch:
 
@@ -139,17 +154,17 @@ def _process_file(
             executed or a number indicating how often that branch was taken.
             """
             # BRDA:<line number>,<block number>,<branch number>,<taken>
-            split = content.split(",", 3)
+            split = content.split(b",", 3)
             if len(split) < 4:
                 continue
             line_str, block, branch, taken = split
 
-            if line_str == "1" and _file.name.endswith(".ts"):
+            if line_str == b"1" and TS:
                 continue
 
-            elif line_str not in ("0", ""):
-                branches[line_str][f"{block}:{branch}"] = (
-                    0 if taken in ("-", "0") else 1
+            elif line_str not in (b"0", b""):
+                branches[line_str][block + b":" + branch] = (
+                    0 if taken in (b"-", b"0") else 1
                 )
 
     if _file is None:
@@ -164,11 +179,14 @@ def _process_file(
         try:
             ln = int(line_str)
         except ValueError:
-            continue
+            try:
+                ln = int(line_str.decode())
+            except ValueError:
+                continue
 
-        branch_num = len(br.values())
+        branch_num = len(br)
         branch_sum = sum(br.values())
-        missing_branches = [bid for bid, cov in br.items() if cov == 0]
+        missing_branches = [bid.decode() for bid, cov in br.items() if cov == 0]
 
         coverage = f"{branch_sum}/{branch_num}"
         coverage_type = (
@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from services.report.languages import go, lcov
+from services.report.languages.tests.unit import create_report_builder_session
+
+# (files, lines per file) of the reports, from a small package to a monorepo
+PAYLOAD_SIZES = {"small": (10, 100), "medium": (100, 400), "large": (1000, 400)}
+
+
+def make_lcov(files: int, lines: int) -> bytes:
+    rng = random.Random(0)
+    records = []
+    for f in range(files):
+        record = [f"TN:\nSF:src/module_{f % 20}/file_{f}.ts\n"]
+        record.extend(
+            f"FN:{ln},fn_{ln}\nFNDA:{rng.randint(0, 5)},fn_{ln}\n"
+            for ln in range(1, lines, 20)
+        )
+        record.extend(
+            f"DA:{ln},{rng.choice([0, 0, 1, 2, 15, 300])}\n"
+            for ln in range(1, lines + 1)
+        )
+        for ln in range(5, lines, 10):
+            record.append(f"BRDA:{ln},0,0,{rng.choice(['-', '0', '1', '4'])}\n")
+            record.append(f"BRDA:{ln},0,1,{rng.choice(['-', '0', '3'])}\n")
+        record.append(f"LF:{lines}\nLH:{lines // 2}\nend_of_record\n")
+        records.append("".join(record))
+    return "".join(records).encode()
+
+
+def make_go(files: int, lines: int) -> bytes:
+    rng = random.Random(0)
+    blocks = ["mode: count\n"]
+    for f in range(files):
+        ln = 1
+        while ln < lines:
+            end = ln + rng.randint(0, 4)
+            start_column = rng.randint(2, 20)
+            end_column = rng.randint(2, 40) if end > ln else start_column + 10
+            blocks.append(
+                f"github.com/acme/project/pkg/mod{f % 20}/file{f}.go:"
+                f"{ln}.{start_column},{end}.{end_column} 1 {rng.choice([0, 0, 1, 3])}\n"
+            )
+            # blocks usually start on the line the previous one ended on
+            ln = end + rng.randint(0, 1)
+    return "".join(blocks).encode()
+
+
+@pytest.mark.parametrize("size", list(PAYLOAD_SIZES))
+def test_lcov(benchmark, size):
+    content = make_lcov(*PAYLOAD_SIZES[size])
+
+    def parse():
+        lcov.from_txt(content, create_report_builder_session())
+
+    benchmark(parse)
+
+
+@pytest.mark.parametrize("size", list(PAYLOAD_SIZES))
+def test_go(benchmark, size):
+    content = make_go(*PAYLOAD_SIZES[size])
+
+    def parse():
+        go.from_txt(content, create_report_builder_session())
+
+    benchmark(parse)
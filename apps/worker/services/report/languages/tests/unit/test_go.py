@@ -115,6 +115,24 @@ path/file.go:291.2,292.63 2 1
 path/file.go:300.2,300.15 1 0"""
 
 
+# CRLF line endings, merged profiles, non-UTF-8 bytes and outline lines
+edge_cases_txt = (
+    b"mode: count\n"
+    b"pkg/a.go:1.1,1.10 1 1\n"
+    b"pkg/a.go:1.10,1.20 1 0\n"
+    b"pkg/a.go:1.1,1.10 1 1\n"
+    b"pkg/a.go:3.5,6.2 2 3\r\n"
+    b"pkg/a.go:6.4,6.9 1 0\n"
+    b"pkg/a.go:8.3,10.15 1 -1\n"
+    b"pkg/caf\xc3\xa9.go:2.1,2.8 1 007\n"
+    b"pkg/b\xff.go:2.1,2.8 1 1\n"
+    b"pkg/a.go:12: main 100.0%\n"
+    b"pkg/a.go:\n"
+    b"mode: count\n"
+    b"pkg/a.go:1.1,1.10 1 0\n"
+)
+
+
 class TestGo:
     def test_report(self):
         def fixes(path):
@@ -595,6 +613,31 @@ class TestGo:
             diff=None,
         )
 
+    @pytest.mark.parametrize("partials_as_hits", [False, True])
+    def test_edge_cases(self, partials_as_hits):
+        report_builder_session = create_report_builder_session(
+            current_yaml={"parsers": {"go": {"partials_as_hits": partials_as_hits}}},
+        )
+        go.from_txt(edge_cases_txt, report_builder_session)
+        report = report_builder_session.output_report()
+        processed_report = convert_report_to_better_readable(report)
+
+        first_line = 1 if partials_as_hits else "1/2"
+        assert processed_report["archive"] == {
+            "pkg/a.go": [
+                (1, first_line, None, [[0, first_line]], None, None),
+                (3, 3, None, [[0, 3]], None, None),
+                (4, 3, None, [[0, 3]], None, None),
+                (5, 3, None, [[0, 3]], None, None),
+                (6, 0, None, [[0, 0]], None, None),
+                (8, -1, None, [[0, -1]], None, None),
+                (9, -1, None, [[0, -1]], None, None),
+                (10, -1, None, [[0, -1]], None, None),
+            ],
+            "pkg/b\ufffd.go": [(2, 1, None, [[0, 1]], None, None)],
+            "pkg/café.go": [(2, 7, None, [[0, 7]], None, None)],
+        }
+
     def test_combine_partials(self):
         assert go.combine_partials([(1, 5, 1), (9, 12, 0), (5, 7, 1), (8, 9, 0)]) == [
             [1, 7, 1],
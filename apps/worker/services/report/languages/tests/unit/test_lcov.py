@@ -118,6 +118,38 @@ end_of_record
 """
 
 
+# CRLF line endings, unusual numbers, non-UTF-8 bytes and a record without `SF`
+edge_cases_txt = (
+    b"TN:\r\n"
+    b"SF:src/windows.c\r\n"
+    b"FN:3,main\r\n"
+    b"DA:1,1\r\n"
+    b"DA: 2 , 4 \r\n"
+    b"DA:3,2.0\r\n"
+    b"DA:4,1E+2\r\n"
+    b"DA:5,undefined\r\n"
+    b"DA:undefined,1\r\n"
+    b"DA:6,-2\r\n"
+    b"DA:07,1\r\n"
+    b"DA:8,1_0\r\n"
+    b"DA:9,NaN\r\n"
+    b"BRDA:3,0,0,2\r\n"
+    b"BRDA:3,0,1,-\r\n"
+    b"end_of_record\r\n"
+    b"SF:src/caf\xc3\xa9.ts\n"
+    b"DA:1,\xd9\xa3\n"
+    b"DA:2,3\xc2\xa0\n"
+    b"DA:3,\xff\n"
+    b"BRDA:1,0,0,1\n"
+    b"BRDA:4,\xc3\xa9,0,0\n"
+    b"BRDA:4,\xc3\xa9,1,1\n"
+    b"end_of_record\n"
+    b"DA:1,1\n"
+    b"SF:dropped.c\n"
+    b"end_of_record\n"
+)
+
+
 class TestLcov:
     def test_report(self):
         def fixes(path):
@@ -208,3 +240,25 @@ end_of_record
                 (1047, "1/2", "b", [[0, "1/2", ["0:0"], None, None]], None, None),
             ]
         }
+
+    def test_edge_cases(self):
+        report_builder_session = create_report_builder_session()
+        lcov.from_txt(edge_cases_txt, report_builder_session)
+        report = report_builder_session.output_report()
+        processed_report = convert_report_to_better_readable(report)
+
+        assert processed_report["archive"] == {
+            "src/café.ts": [
+                (1, 3, None, [[0, 3]], None, None),
+                (2, 3, None, [[0, 3]], None, None),
+                (4, "1/2", "b", [[0, "1/2", ["é:0"], None, None]], None, None),
+            ],
+            "src/windows.c": [
+                (1, 1, None, [[0, 1]], None, None),
+                (2, 4, None, [[0, 4]], None, None),
+                (3, "1/2", "m", [[0, "1/2", ["0:1"], None, None]], None, None),
+                (4, 100, None, [[0, 100]], None, None),
+                (6, 0, None, [[0, 0]], None, None),
+                (8, 10, None, [[0, 10]], None, None),
+            ],
+        }
@@ -1,6 +1,8 @@
 from shared.api_archive.archive import ArchiveService
 from shared.django_apps.core.models import Commit
 from shared.django_apps.reports.models import CommitReport, ReportType
+from shared.reports.directory_tree import directory_trees_enabled
+from shared.storage.exceptions import FileNotInStorageError
 
 
 def transplant_commit_report(repo_id: int, from_sha: str, to_sha: str):
@@ -26,6 +28,14 @@ def transplant_commit_report(repo_id: int, from_sha: str, to_sha: str):
 
     archive_service.write_chunks(to_commit.commitid, chunks)
 
+    if directory_trees_enabled():
+        # the tree is built from the same totals, so it stays valid as is
+        try:
+            directory_tree = archive_service.read_directory_tree(from_commit.commitid)
+            archive_service.write_directory_tree(to_commit.commitid, directory_tree)
+        except FileNotInStorageError:
+            pass
+
     to_commit.report = report_json
     to_commit.totals = totals
     to_commit.state = "complete"
@@ -1,7 +1,9 @@
-from datetime import UTC
+from collections.abc import Sequence
+from datetime import UTC, date, datetime, time, timedelta
 from io import BytesIO
 from typing import cast
 
+import orjson
 import polars as pl
 
 import shared.storage
@@ -11,10 +13,18 @@ from services.test_analytics.ta_metrics import (
     rollup_size_summary,
 )
 from services.test_analytics.ta_timeseries import (
+    LOWER_BOUND_NUM_DAYS,
+    BranchSummary,
     get_branch_summary,
     get_summary,
     get_testrun_branch_summary_via_testrun,
 )
+from shared.django_apps.ta_timeseries.models import (
+    TestrunBranchSummary,
+    TestrunSummary,
+)
+from shared.storage.base import BaseStorageService
+from shared.storage.exceptions import FileNotInStorageError
 
 
 def rollup_blob_path(repoid: int, branch: str | None = None) -> str:
@@ -25,6 +35,28 @@ def rollup_blob_path(repoid: int, branch: str | None = None) -> str:
     )
 
 
+def rollup_segments_prefix(repoid: int, branch: str | None = None) -> str:
+    return (
+        f"test_analytics/branch_rollup_segments/{repoid}/{branch}"
+        if branch
+        else f"test_analytics/repo_rollup_segments/{repoid}"
+    )
+
+
+def rollup_manifest_path(repoid: int, branch: str | None = None) -> str:
+    return f"{rollup_segments_prefix(repoid, branch)}/manifest.json"
+
+
+def rollup_segment_path(repoid: int, branch: str | None, day: date) -> str:
+    return f"{rollup_segments_prefix(repoid, branch)}/{day.isoformat()}.arrow"
+
+
+# number of the most recent daily segments that are recomputed on every run of the
+# incremental rollups, as they can still receive new testruns: today, and
+# yesterday for the testruns that are ingested late
+INCREMENTAL_RECOMPUTE_DAYS = 2
+
+
 # version number that the cache rollup task will be writing to GCS
 # if you're creating a new version of the schema, increment this
 VERSION = "1"
@@ -65,18 +97,21 @@ V1_POLARS_SCHEMA = [
 ]
 
 
-def cache_rollups(repoid: int, branch: str | None = None):
-    serialized_table: BytesIO
-
-    with read_rollups_from_db_summary.labels("new").time():
-        if branch:
-            if branch in {"main", "master", "develop"}:
-                summaries = get_branch_summary(repoid, branch)
-            else:
-                summaries = get_testrun_branch_summary_via_testrun(repoid, branch)
+def fetch_summaries(
+    repoid: int, branch: str | None, start: datetime | None = None
+) -> Sequence[TestrunSummary | TestrunBranchSummary | BranchSummary]:
+    if branch:
+        if branch in {"main", "master", "develop"}:
+            return get_branch_summary(repoid, branch, start)
         else:
-            summaries = get_summary(repoid)
+            return get_testrun_branch_summary_via_testrun(repoid, branch, start)
+    else:
+        return get_summary(repoid, start)
+
 
+def summaries_to_table(
+    summaries: Sequence[TestrunSummary | TestrunBranchSummary | BranchSummary],
+) -> pl.DataFrame:
     data = [
         {
             "computed_name": summary.computed_name,
@@ -95,11 +130,20 @@ def cache_rollups(repoid: int, branch: str | None = None):
         for summary in summaries
     ]
 
-    df = pl.DataFrame(
+    return pl.DataFrame(
         data,
         V1_POLARS_SCHEMA,
         orient="row",
     )
+
+
+def cache_rollups(repoid: int, branch: str | None = None):
+    serialized_table: BytesIO
+
+    with read_rollups_from_db_summary.labels("new").time():
+        summaries = fetch_summaries(repoid, branch)
+
+    df = summaries_to_table(summaries)
     serialized_table = df.write_ipc(None)
 
     serialized_table.seek(0)
@@ -112,3 +156,86 @@ def cache_rollups(repoid: int, branch: str | None = None):
         metadata={"version": VERSION},
     )
     rollup_size_summary.labels("new").observe(serialized_table.tell())
+
+
+def cache_rollups_incremental(repoid: int, branch: str | None = None):
+    """
+    Maintains the rollups as one Arrow segment per day, next to a manifest
+    listing the number of rows in each of the daily segments.
+
+    Only the most recent days, and the days that are missing from the manifest,
+    are recomputed, so that after the first run the cost of a run is
+    proportional to the new data rather than to the whole history.
+    Segments of days without any data are not written, and segments that fall
+    out of the `LOWER_BOUND_NUM_DAYS` window are deleted.
+    """
+    storage_service = shared.storage.get_appropriate_storage_service(repoid)
+    bucket = cast(str, settings.GCS_BUCKET_NAME)
+    manifest_path = rollup_manifest_path(repoid, branch)
+
+    try:
+        manifest = orjson.loads(storage_service.read_file(bucket, manifest_path))
+        segments: dict[str, int] = manifest["segments"]
+    except FileNotInStorageError:
+        segments = {}
+
+    today = datetime.now(UTC).date()
+    window = [today - timedelta(days=i) for i in range(LOWER_BOUND_NUM_DAYS)]
+    stale_days = [
+        day
+        for i, day in enumerate(window)
+        if i < INCREMENTAL_RECOMPUTE_DAYS or day.isoformat() not in segments
+    ]
+
+    with read_rollups_from_db_summary.labels("incremental").time():
+        summaries = fetch_summaries(
+            repoid, branch, datetime.combine(min(stale_days), time.min, tzinfo=UTC)
+        )
+
+    partitions = summaries_to_table(summaries).partition_by(
+        "timestamp_bin", as_dict=True
+    )
+
+    written_size = 0
+    for day in stale_days:
+        segment = partitions.get((day,))
+        segment_path = rollup_segment_path(repoid, branch, day)
+        if segment is not None and segment.height:
+            serialized_segment = segment.write_ipc(None)
+            serialized_segment.seek(0)
+            storage_service.write_file(
+                bucket,
+                segment_path,
+                serialized_segment,
+                metadata={"version": VERSION},
+            )
+            written_size += serialized_segment.tell()
+            segments[day.isoformat()] = segment.height
+        else:
+            if segments.get(day.isoformat()):
+                _delete_segment(storage_service, bucket, segment_path)
+            segments[day.isoformat()] = 0
+
+    for day_str in list(segments):
+        if date.fromisoformat(day_str) < window[-1]:
+            if segments.pop(day_str):
+                _delete_segment(
+                    storage_service,
+                    bucket,
+                    rollup_segment_path(repoid, branch, date.fromisoformat(day_str)),
+                )
+
+    storage_service.write_file(
+        bucket,
+        manifest_path,
+        orjson.dumps({"segments": dict(sorted(segments.items()))}),
+        metadata={"version": VERSION},
+    )
+    rollup_size_summary.labels("incremental").observe(written_size)
+
+
+def _delete_segment(storage_service: BaseStorageService, bucket: str, path: str):
+    try:
+        storage_service.delete_file(bucket, path)
+    except FileNotInStorageError:
+        pass
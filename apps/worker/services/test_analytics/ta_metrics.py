@@ -6,6 +6,12 @@ write_tests_summary = Summary(
     ["impl"],
 )
 
+write_tests_rate_summary = Summary(
+    "write_tests_rate_summary",
+    "The number of tests written to the database per second",
+    ["impl"],
+)
+
 read_tests_totals_summary = Summary(
     "read_tests_totals_summary",
     "The time it takes to read tests totals from the database",
@@ -1,9 +1,14 @@
 import logging
 from datetime import datetime
+from itertools import groupby
+from operator import itemgetter
 
+from django.db import connections
 from django.db.models import Q, QuerySet
+from django.db.models.expressions import RawSQL
 from redis.exceptions import LockError
 
+from rollouts import TA_SET_BASED_FLAKES
 from services.test_analytics.ta_metrics import process_flakes_summary
 from shared.django_apps.reports.models import CommitReport, ReportSession
 from shared.django_apps.ta_timeseries.models import Testrun
@@ -17,6 +22,8 @@ FAIL_FILTER = Q(outcome="failure") | Q(outcome="flaky_failure") | Q(outcome="err
 LOCK_NAME = "ta_flake_lock:{}"
 KEY_NAME = "ta_flake_key:{}"
 
+FLAKE_EXPIRY_PASSES = 30
+
 
 def get_relevant_uploads(repo_id: int, commit_id: str) -> QuerySet[ReportSession]:
     return ReportSession.objects.filter(
@@ -50,7 +57,7 @@ def handle_pass(curr_flakes: dict[bytes, Flake], test_id: bytes):
 
     curr_flakes[test_id].recent_passes_count += 1
     curr_flakes[test_id].count += 1
-    if curr_flakes[test_id].recent_passes_count == 30:
+    if curr_flakes[test_id].recent_passes_count == FLAKE_EXPIRY_PASSES:
         curr_flakes[test_id].end_date = datetime.now()
         curr_flakes[test_id].save()
         del curr_flakes[test_id]
@@ -106,16 +113,179 @@ def process_flakes_for_commit(repo_id: int, commit_id: str):
     )
 
 
+def get_candidate_testruns(
+    upload_ids: list[int], curr_flakes: dict[bytes, Flake]
+) -> list[tuple[bytes, int, datetime, str, str]]:
+    """
+    Fetches the `(test_id, upload_id, timestamp, outcome, ctid)` of every
+    testrun in the given uploads that can affect a flake, ordered so that the
+    testruns of each test are contiguous and in processing order.
+
+    Testruns have no unique key (all those of an upload share its timestamp),
+    so the `ctid` of their row is what identifies the failures to rewrite.
+
+    Passes are only relevant for tests that are already flaky, or that become
+    flaky by failing in one of these uploads.
+    """
+    failing_test_ids = (
+        Testrun.objects.filter(upload_id__in=upload_ids)
+        .filter(FAIL_FILTER)
+        .values("test_id")
+    )
+    flaky_pass_filter = Q(outcome="pass") & (
+        Q(test_id__in=curr_flakes.keys()) | Q(test_id__in=failing_test_ids)
+    )
+    return [
+        (bytes(test_id), upload_id, timestamp, outcome, ctid)
+        for test_id, upload_id, timestamp, outcome, ctid in Testrun.objects.filter(
+            Q(upload_id__in=upload_ids) & (FAIL_FILTER | flaky_pass_filter)
+        )
+        .annotate(ctid=RawSQL("ctid::text", []))
+        .order_by("test_id", "upload_id", "timestamp")
+        .values_list("test_id", "upload_id", "timestamp", "outcome", "ctid")
+    ]
+
+
+def apply_test_transitions(
+    repo_id: int,
+    test_id: bytes,
+    flake: Flake | None,
+    testruns: list[tuple[bytes, int, datetime, str, str]],
+) -> tuple[list[Flake], list[tuple[int, datetime, str]]]:
+    """
+    Folds the ordered testruns of a single test into its flake state.
+
+    Returns the flakes that were modified or created, and the
+    `(upload_id, timestamp, ctid)` of the failures that have to be rewritten as
+    `flaky_failure` because they started a new flake.
+    """
+    changed: list[Flake] = []
+    rewrites: list[tuple[int, datetime, str]] = []
+
+    curr_upload_id = None
+    counting_passes = False
+    for _, upload_id, timestamp, outcome, ctid in testruns:
+        # passes are only looked at if the test was flaky when the upload started
+        if upload_id != curr_upload_id:
+            curr_upload_id = upload_id
+            counting_passes = flake is not None
+
+        match outcome:
+            case "pass":
+                if flake is None or not counting_passes:
+                    continue
+                flake.recent_passes_count += 1
+                flake.count += 1
+            case "failure" | "flaky_failure" | "error":
+                if flake is not None:
+                    flake.fail_count += 1
+                    flake.count += 1
+                    flake.recent_passes_count = 0
+                else:
+                    if outcome != "flaky_failure":
+                        rewrites.append((upload_id, timestamp, ctid))
+                    flake = Flake(
+                        repoid=repo_id,
+                        test_id=test_id,
+                        count=1,
+                        fail_count=1,
+                        recent_passes_count=0,
+                        start_date=datetime.now(),
+                    )
+            case _:
+                continue
+
+        if not changed or changed[-1] is not flake:
+            changed.append(flake)
+
+        if flake.recent_passes_count == FLAKE_EXPIRY_PASSES:
+            flake.end_date = datetime.now()
+            flake = None
+
+    return changed, rewrites
+
+
+def mark_flaky_failures(test_runs: list[tuple[bytes, int, datetime, str]]):
+    """
+    Rewrites the given failures as `flaky_failure`. The rows are matched by
+    their `ctid`, along with their test, upload and timestamp so that a row
+    moved or reused since they were read is left alone.
+    """
+    if not test_runs:
+        return
+
+    test_ids, upload_ids, timestamps, ctids = zip(*test_runs)
+    with connections["ta_timeseries"].cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {Testrun._meta.db_table} AS t
+            SET outcome = 'flaky_failure'
+            FROM unnest(%s::bytea[], %s::bigint[], %s::timestamptz[], %s::tid[])
+                AS u (test_id, upload_id, timestamp, ctid)
+            WHERE t.ctid = u.ctid
+                AND t.test_id = u.test_id
+                AND t.upload_id = u.upload_id
+                AND t.timestamp = u.timestamp
+                AND t.outcome IN ('failure', 'error')
+            """,
+            [list(test_ids), list(upload_ids), list(timestamps), list(ctids)],
+        )
+
+
+def process_flakes_for_commit_set_based(repo_id: int, commit_id: str):
+    """
+    Same as `process_flakes_for_commit`, but reads the relevant testruns of all
+    uploads in a single query and writes the resulting flakes and outcomes
+    with a couple of set-based statements, instead of going row by row.
+    """
+    upload_ids = list(
+        get_relevant_uploads(repo_id, commit_id)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    if not upload_ids:
+        return
+
+    curr_flakes = fetch_current_flakes(repo_id)
+    testruns = get_candidate_testruns(upload_ids, curr_flakes)
+
+    changed_flakes: list[Flake] = []
+    flaky_failures: list[tuple[bytes, int, datetime, str]] = []
+    for test_id, test_testruns in groupby(testruns, key=itemgetter(0)):
+        changed, rewrites = apply_test_transitions(
+            repo_id, test_id, curr_flakes.get(test_id), list(test_testruns)
+        )
+        changed_flakes.extend(changed)
+        flaky_failures.extend(
+            (test_id, upload_id, timestamp, ctid)
+            for upload_id, timestamp, ctid in rewrites
+        )
+
+    mark_flaky_failures(flaky_failures)
+
+    Flake.objects.bulk_create(
+        changed_flakes,
+        update_conflicts=True,
+        unique_fields=["id"],
+        update_fields=["end_date", "count", "recent_passes_count", "fail_count"],
+    )
+
+
 def process_flakes_for_repo(repo_id: int):
     redis_client = get_redis_connection()
     lock_name = LOCK_NAME.format(repo_id)
     key_name = KEY_NAME.format(repo_id)
     try:
         with redis_client.lock(lock_name, timeout=300, blocking_timeout=3):
+            if TA_SET_BASED_FLAKES.check_value(repo_id):
+                process_commit, impl = process_flakes_for_commit_set_based, "set_based"
+            else:
+                process_commit, impl = process_flakes_for_commit, "new"
+
             while commit_ids := redis_client.lpop(key_name, 10):
                 for commit_id in commit_ids:
-                    with process_flakes_summary.labels("new").time():
-                        process_flakes_for_commit(repo_id, commit_id.decode())
+                    with process_flakes_summary.labels(impl).time():
+                        process_commit(repo_id, commit_id.decode())
             return True
     except LockError:
         log.warning("Failed to acquire lock for repo %s", repo_id)
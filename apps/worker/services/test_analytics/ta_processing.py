@@ -6,7 +6,12 @@ from typing import Any
 import sentry_sdk
 import test_results_parser
 
-from services.test_analytics.ta_timeseries import get_flaky_tests_set, insert_testrun
+from rollouts import TA_COPY_TESTRUNS
+from services.test_analytics.ta_timeseries import (
+    copy_testruns,
+    get_flaky_tests_set,
+    insert_testrun,
+)
 from services.yaml import UserYaml, read_yaml_field
 from shared.api_archive.archive import ArchiveService
 from shared.config import get_config
@@ -90,9 +95,10 @@ def insert_testruns_timeseries(
     parsing_infos: list[test_results_parser.ParsingInfo],
 ):
     flaky_test_set = get_flaky_tests_set(repoid)
+    insert = copy_testruns if TA_COPY_TESTRUNS.check_value(repoid) else insert_testrun
 
     for parsing_info in parsing_infos:
-        insert_testrun(
+        insert(
             timestamp=upload.created_at,
             repo_id=repoid,
             commit_sha=commitid,
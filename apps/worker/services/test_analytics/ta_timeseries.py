@@ -1,14 +1,20 @@
 from __future__ import annotations
 
+import csv
+import io
+import time
+from collections.abc import Iterator
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import TypedDict
+from typing import Any, TypedDict
 
+import orjson
 import test_results_parser
 from django.db import connections
 from django.db.models import Q
 
-from services.test_analytics.utils import calc_test_id
+from services.test_analytics.ta_metrics import write_tests_rate_summary
+from services.test_analytics.utils import calc_test_id, calc_test_ids
 from services.test_results import FlakeInfo
 from shared.django_apps.ta_timeseries.models import (
     Testrun,
@@ -84,6 +90,175 @@ def insert_testrun(
     Testrun.objects.bulk_create(testruns_to_create)
 
 
+TESTRUN_COPY_COLUMNS = (
+    "timestamp",
+    "test_id",
+    "name",
+    "classname",
+    "testsuite",
+    "computed_name",
+    "outcome",
+    "duration_seconds",
+    "failure_message",
+    "framework",
+    "filename",
+    "properties",
+    "repo_id",
+    "commit_sha",
+    "branch",
+    "flags",
+    "upload_id",
+)
+
+# how many testruns are hashed and encoded together while streaming the `COPY`
+COPY_BATCH_SIZE = 5_000
+
+
+def _array_literal(values: list[str]) -> str:
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"') for v in values)
+    return "{" + ",".join(f'"{v}"' for v in escaped) + "}"
+
+
+def _testrun_copy_rows(
+    timestamp: datetime,
+    repo_id: int | None,
+    commit_sha: str | None,
+    branch: str | None,
+    upload_id: int | None,
+    flags: list[str] | None,
+    parsing_info: test_results_parser.ParsingInfo,
+    flaky_test_ids: set[bytes] | None,
+) -> Iterator[list[tuple[Any, ...]]]:
+    """
+    Yields batches of rows matching `TESTRUN_COPY_COLUMNS`, applying the same
+    outcome rewrites as `insert_testrun`.
+    """
+    timestamp_str = timestamp.isoformat()
+    framework = parsing_info["framework"]
+    flags_literal = _array_literal(flags) if flags is not None else None
+
+    testruns = parsing_info["testruns"]
+    for start in range(0, len(testruns), COPY_BATCH_SIZE):
+        batch = testruns[start : start + COPY_BATCH_SIZE]
+        test_ids = calc_test_ids(
+            (testrun["name"], testrun["classname"], testrun["testsuite"])
+            for testrun in batch
+        )
+
+        rows = []
+        for testrun, test_id in zip(batch, test_ids):
+            outcome = testrun["outcome"]
+            if outcome == "error":
+                outcome = "failure"
+            if outcome == "failure" and flaky_test_ids and test_id in flaky_test_ids:
+                outcome = "flaky_failure"
+
+            properties = testrun.get("properties")
+            rows.append(
+                (
+                    timestamp_str,
+                    "\\x" + test_id.hex(),
+                    testrun["name"],
+                    testrun["classname"],
+                    testrun["testsuite"],
+                    testrun["computed_name"]
+                    or f"{testrun['classname']}::{testrun['name']}",
+                    outcome,
+                    testrun["duration"],
+                    testrun["failure_message"],
+                    framework,
+                    testrun["filename"],
+                    orjson.dumps(properties).decode()
+                    if properties is not None
+                    else None,
+                    repo_id,
+                    commit_sha,
+                    branch,
+                    flags_literal,
+                    upload_id,
+                )
+            )
+        yield rows
+
+
+class CopyRowsStream:
+    """
+    A read-only file-like object that encodes batches of rows as CSV on demand,
+    so that `COPY ... FROM STDIN` can consume them without the whole payload
+    ever being materialized in memory.
+
+    `None` values are written unquoted and everything else quoted, which is
+    how CSV `COPY` tells `NULL` apart from empty strings.
+    """
+
+    def __init__(self, batches: Iterator[list[tuple[Any, ...]]]):
+        self._batches = batches
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(
+            self._buffer, quoting=csv.QUOTE_NOTNULL, lineterminator="\n"
+        )
+        self._pending = ""
+        self.rows = 0
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._pending) < size:
+            batch = next(self._batches, None)
+            if batch is None:
+                break
+            self._writer.writerows(batch)
+            self.rows += len(batch)
+            self._pending += self._buffer.getvalue()
+            self._buffer.seek(0)
+            self._buffer.truncate()
+
+        if size < 0:
+            size = len(self._pending)
+        chunk, self._pending = self._pending[:size], self._pending[size:]
+        return chunk
+
+
+def copy_testruns(
+    timestamp: datetime,
+    repo_id: int | None,
+    commit_sha: str | None,
+    branch: str | None,
+    upload_id: int | None,
+    flags: list[str] | None,
+    parsing_info: test_results_parser.ParsingInfo,
+    flaky_test_ids: set[bytes] | None = None,
+) -> int:
+    """
+    Bulk equivalent of `insert_testrun`: streams the testruns straight into
+    `COPY ta_timeseries_testrun FROM STDIN` instead of building model instances
+    and multi-row `INSERT`s. Returns the number of inserted testruns.
+    """
+    stream = CopyRowsStream(
+        _testrun_copy_rows(
+            timestamp,
+            repo_id,
+            commit_sha,
+            branch,
+            upload_id,
+            flags,
+            parsing_info,
+            flaky_test_ids,
+        )
+    )
+
+    start = time.monotonic()
+    with connections["ta_timeseries"].cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY ta_timeseries_testrun ({', '.join(TESTRUN_COPY_COLUMNS)}) "
+            "FROM STDIN WITH (FORMAT csv)",
+            stream,
+        )
+    elapsed = time.monotonic() - start
+
+    if stream.rows and elapsed > 0:
+        write_tests_rate_summary.labels("copy").observe(stream.rows / elapsed)
+    return stream.rows
+
+
 class TestInstance(TypedDict):
     test_id: bytes
     computed_name: str
@@ -180,18 +355,22 @@ def timestamp_lower_bound():
     return datetime.now() - timedelta(days=LOWER_BOUND_NUM_DAYS)
 
 
-def get_summary(repo_id: int) -> list[TestrunSummary]:
+def get_summary(repo_id: int, start: datetime | None = None) -> list[TestrunSummary]:
     return list(
         TestrunSummary.objects.filter(
-            repo_id=repo_id, timestamp_bin__gte=timestamp_lower_bound()
+            repo_id=repo_id, timestamp_bin__gte=start or timestamp_lower_bound()
         )
     )
 
 
-def get_branch_summary(repo_id: int, branch: str) -> list[TestrunBranchSummary]:
+def get_branch_summary(
+    repo_id: int, branch: str, start: datetime | None = None
+) -> list[TestrunBranchSummary]:
     return list(
         TestrunBranchSummary.objects.filter(
-            repo_id=repo_id, branch=branch, timestamp_bin__gte=timestamp_lower_bound()
+            repo_id=repo_id,
+            branch=branch,
+            timestamp_bin__gte=start or timestamp_lower_bound(),
         )
     )
 
@@ -215,11 +394,16 @@ class BranchSummary:
 
 
 def get_testrun_branch_summary_via_testrun(
-    repo_id: int, branch: str
+    repo_id: int, branch: str, start: datetime | None = None
 ) -> list[BranchSummary]:
+    # the daily segments start at midnight, which belongs to their first bucket
+    if start is None:
+        timestamp_filter, lower_bound = "timestamp > %s", timestamp_lower_bound()
+    else:
+        timestamp_filter, lower_bound = "timestamp >= %s", start
     with connections["ta_timeseries"].cursor() as cursor:
         cursor.execute(
-            """
+            f"""
             select
                 testsuite,
                 classname,
@@ -237,11 +421,11 @@ def get_testrun_branch_summary_via_testrun(
                 MAX(timestamp) AS updated_at,
                 array_merge_dedup_agg(flags) as flags
             from ta_timeseries_testrun
-            where repo_id = %s and branch = %s and timestamp > %s
+            where repo_id = %s and branch = %s and {timestamp_filter}
             group by
                 testsuite, classname, name, timestamp_bin;
             """,
-            [repo_id, branch, timestamp_lower_bound()],
+            [repo_id, branch, lower_bound],
         )
 
         return [
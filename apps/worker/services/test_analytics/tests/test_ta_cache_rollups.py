@@ -1,15 +1,23 @@
 import datetime as dt
 
+import orjson
 import polars as pl
 import pytest
 
-from services.test_analytics.ta_cache_rollups import VERSION
+from rollouts import TA_INCREMENTAL_ROLLUPS
+from services.test_analytics import ta_cache_rollups
+from services.test_analytics.ta_cache_rollups import (
+    VERSION,
+    rollup_manifest_path,
+    rollup_segment_path,
+)
 from services.test_analytics.utils import calc_test_id
 from shared.django_apps.ta_timeseries.models import (
     Testrun,
     TestrunBranchSummary,
     TestrunSummary,
 )
+from shared.storage.exceptions import FileNotInStorageError
 from shared.storage.minio import MinioStorageService
 from tasks.cache_test_rollups import CacheTestRollupsTask
 
@@ -283,3 +291,99 @@ def test_cache_test_rollups_use_timeseries_branch(storage, snapshot):
     del table_dict["timestamp_bin"]
     del table_dict["updated_at"]
     assert snapshot("json") == table_dict
+
+
+def create_summary(days_ago: int, name: str, fail_count: int):
+    TestrunSummary.objects.create(
+        timestamp_bin=dt.datetime.now(dt.UTC) - dt.timedelta(days=days_ago),
+        repo_id=1,
+        name=name,
+        classname="classname",
+        testsuite="testsuite",
+        computed_name=name,
+        failing_commits=fail_count,
+        avg_duration_seconds=100,
+        last_duration_seconds=100,
+        pass_count=0,
+        fail_count=fail_count,
+        skip_count=0,
+        flaky_fail_count=0,
+        updated_at=dt.datetime.now(dt.UTC),
+        flags=["test-rollups"],
+    )
+
+
+@pytest.mark.django_db(databases=["ta_timeseries"], transaction=True)
+def test_cache_test_rollups_incremental(storage, mocker):
+    mocker.patch.object(TA_INCREMENTAL_ROLLUPS, "check_value", return_value=True)
+    get_summary = mocker.spy(ta_cache_rollups, "get_summary")
+    today = dt.datetime.now(dt.UTC).date()
+
+    create_summary(0, "name", 1)
+    create_summary(3, "name2", 2)
+    create_summary(61, "name3", 3)
+
+    CacheTestRollupsTask().run_impl(
+        _db_session=None, repo_id=1, branch=None, impl_type="new"
+    )
+
+    # the first run backfills the whole window
+    assert get_summary.call_args.args[1].date() == today - dt.timedelta(days=59)
+
+    meta = {}
+    manifest = orjson.loads(
+        storage.read_file("archive", rollup_manifest_path(1), metadata_container=meta)
+    )
+    assert meta["version"] == VERSION
+    assert len(manifest["segments"]) == 60
+    assert {day: rows for day, rows in manifest["segments"].items() if rows} == {
+        today.isoformat(): 1,
+        (today - dt.timedelta(days=3)).isoformat(): 1,
+    }
+
+    table = read_table(storage, rollup_segment_path(1, None, today))
+    assert table["computed_name"].to_list() == ["name"]
+    assert table["timestamp_bin"].to_list() == [today]
+
+    create_summary(0, "name4", 4)
+    create_summary(5, "name5", 5)
+
+    CacheTestRollupsTask().run_impl(
+        _db_session=None, repo_id=1, branch=None, impl_type="new"
+    )
+
+    # later runs only recompute the most recent days
+    assert get_summary.call_args.args[1].date() == today - dt.timedelta(days=1)
+
+    table = read_table(storage, rollup_segment_path(1, None, today))
+    assert sorted(table["computed_name"].to_list()) == ["name", "name4"]
+    with pytest.raises(FileNotInStorageError):
+        storage.read_file(
+            "archive", rollup_segment_path(1, None, today - dt.timedelta(days=5))
+        )
+
+
+@pytest.mark.django_db(databases=["ta_timeseries"], transaction=True)
+def test_cache_test_rollups_incremental_expires_segments(storage, mocker):
+    mocker.patch.object(TA_INCREMENTAL_ROLLUPS, "check_value", return_value=True)
+    today = dt.datetime.now(dt.UTC).date()
+    expired_day = today - dt.timedelta(days=60)
+    storage.write_file(
+        "archive", rollup_segment_path(1, "main", expired_day), b"expired"
+    )
+    storage.write_file(
+        "archive",
+        rollup_manifest_path(1, "main"),
+        orjson.dumps({"segments": {expired_day.isoformat(): 1}}),
+    )
+
+    CacheTestRollupsTask().run_impl(
+        _db_session=None, repo_id=1, branch="main", impl_type="new"
+    )
+
+    manifest = orjson.loads(
+        storage.read_file("archive", rollup_manifest_path(1, "main"))
+    )
+    assert expired_day.isoformat() not in manifest["segments"]
+    with pytest.raises(FileNotInStorageError):
+        storage.read_file("archive", rollup_segment_path(1, "main", expired_day))
@@ -3,6 +3,7 @@ from typing import TypedDict
 import pytest
 from django.utils import timezone
 
+from rollouts import TA_SET_BASED_FLAKES
 from services.test_analytics.ta_process_flakes import KEY_NAME, process_flakes_for_repo
 from shared.django_apps.reports.models import CommitReport, ReportSession
 from shared.django_apps.reports.tests.factories import CommitReportFactory
@@ -16,11 +17,16 @@ class TestrunData(TypedDict):
     outcome: str
 
 
-class UploadData(TypedDict):
+class UploadDataRequired(TypedDict):
     state: str
     testruns: list[TestrunData]
 
 
+class UploadData(UploadDataRequired, total=False):
+    # shared by all the testruns of the upload, as when they are processed
+    timestamp: timezone.datetime
+
+
 class FlakeDataRequired(TypedDict):
     test_id: str
 
@@ -68,7 +74,7 @@ def setup_test_data(db):
 
             for testrun_data in upload.get("testruns", []):
                 testrun = Testrun.objects.create(
-                    timestamp=timezone.now(),
+                    timestamp=upload.get("timestamp") or timezone.now(),
                     test_id=testrun_data["test_id"].encode(),
                     outcome=testrun_data["outcome"],
                     repo_id=repo_id,
@@ -308,3 +314,105 @@ def test_testrun_outcome_updates(setup_test_data):
         "test2": "flaky_failure",  # Updated from error
         "test3": "flaky_failure",  # Already flaky_failure, unchanged
     }
+
+
+@pytest.mark.parametrize("set_based", [False, True])
+def test_flake_transitions_across_uploads(setup_test_data, mocker, set_based):
+    mocker.patch.object(TA_SET_BASED_FLAKES, "check_value", return_value=set_based)
+    result = setup_test_data(
+        uploads=[
+            {
+                "state": "processed",
+                "testruns": [
+                    {"test_id": "test1", "outcome": "pass"},
+                    {"test_id": "test1", "outcome": "pass"},
+                    {"test_id": "test1", "outcome": "failure"},
+                    {"test_id": "test2", "outcome": "pass"},
+                    {"test_id": "test3", "outcome": "error"},
+                ],
+            },
+            {
+                "state": "processed",
+                "testruns": [
+                    {"test_id": "test1", "outcome": "pass"},
+                    {"test_id": "test2", "outcome": "failure"},
+                    {"test_id": "test2", "outcome": "pass"},
+                ],
+            },
+        ],
+        existing_flakes=[
+            {
+                "test_id": "test1",
+                "count": 40,
+                "fail_count": 12,
+                "recent_passes_count": 28,
+            },
+            {
+                "test_id": "test3",
+                "count": 10,
+                "fail_count": 5,
+                "recent_passes_count": 5,
+            },
+        ],
+    )
+
+    process_flakes_for_repo(result["repoid"])
+
+    flakes = [
+        (
+            bytes(flake.test_id).decode(),
+            flake.count,
+            flake.fail_count,
+            flake.recent_passes_count,
+            flake.end_date is not None,
+        )
+        for flake in Flake.objects.order_by("test_id", "start_date")
+    ]
+    assert flakes == [
+        ("test1", 42, 12, 30, True),
+        ("test1", 2, 1, 1, False),
+        ("test2", 1, 1, 0, False),
+        ("test3", 11, 6, 0, False),
+    ]
+
+    outcomes = sorted(
+        (bytes(testrun.test_id).decode(), testrun.outcome)
+        for testrun in Testrun.objects.all()
+    )
+    assert outcomes == [
+        ("test1", "flaky_failure"),
+        ("test1", "pass"),
+        ("test1", "pass"),
+        ("test1", "pass"),
+        ("test2", "flaky_failure"),
+        ("test2", "pass"),
+        ("test2", "pass"),
+        ("test3", "error"),
+    ]
+
+
+def test_set_based_rewrites_only_the_failure_starting_a_flake(setup_test_data, mocker):
+    mocker.patch.object(TA_SET_BASED_FLAKES, "check_value", return_value=True)
+    result = setup_test_data(
+        uploads=[
+            {
+                "state": "processed",
+                "timestamp": timezone.now(),
+                # retries of the same test, all at the timestamp of the upload
+                "testruns": [
+                    {"test_id": "test1", "outcome": "failure"},
+                    {"test_id": "test1", "outcome": "pass"},
+                    {"test_id": "test1", "outcome": "failure"},
+                    {"test_id": "test1", "outcome": "pass"},
+                ],
+            }
+        ],
+        existing_flakes=[],
+    )
+
+    process_flakes_for_repo(result["repoid"])
+
+    [flake] = Flake.objects.all()
+    assert (flake.count, flake.fail_count, flake.recent_passes_count) == (2, 2, 0)
+    outcomes = sorted(testrun.outcome for testrun in Testrun.objects.all())
+    assert outcomes == ["failure", "flaky_failure", "pass", "pass"]
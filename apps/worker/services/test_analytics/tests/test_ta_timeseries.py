@@ -6,15 +6,19 @@ from django.db import connections
 from freezegun import freeze_time
 
 from services.test_analytics.ta_timeseries import (
+    CopyRowsStream,
     calc_test_id,
+    copy_testruns,
     get_pr_comment_agg,
     get_pr_comment_failures,
     get_summary,
     get_testrun_branch_summary_via_testrun,
     get_testruns_for_flake_detection,
     insert_testrun,
+    timestamp_lower_bound,
     update_testrun_to_flaky,
 )
+from services.test_analytics.utils import calc_test_ids
 from shared.django_apps.ta_timeseries.models import Testrun
 
 
@@ -527,3 +531,211 @@ def test_get_testrun_branch_summary_via_testrun():
     assert second_test.skip_count == 0
     assert second_test.flaky_fail_count == 0
     assert second_test.flags == ["flag2"]
+
+
+@pytest.mark.integration
+@pytest.mark.django_db(databases=["ta_timeseries"], transaction=True)
+@freeze_time("2025-01-01")
+def test_get_testrun_branch_summary_via_testrun_start():
+    lower_bound = timestamp_lower_bound()
+    insert_testrun(
+        timestamp=lower_bound,
+        repo_id=1,
+        commit_sha="commit_sha",
+        branch="feature-branch",
+        upload_id=1,
+        flags=None,
+        parsing_info={
+            "framework": "Pytest",
+            "testruns": [
+                {
+                    "name": "test_name",
+                    "classname": "test_classname",
+                    "computed_name": "computed_name",
+                    "duration": 1.0,
+                    "outcome": "pass",
+                    "testsuite": "test_suite",
+                    "failure_message": None,
+                    "filename": "test_filename",
+                    "build_url": None,
+                },
+            ],
+        },
+    )
+
+    # the default lower bound is exclusive, an explicit start inclusive
+    assert get_testrun_branch_summary_via_testrun(1, "feature-branch") == []
+    [summary] = get_testrun_branch_summary_via_testrun(
+        1, "feature-branch", start=lower_bound
+    )
+    assert summary.name == "test_name"
+    assert summary.pass_count == 1
+
+
+def test_calc_test_ids():
+    tests = [
+        ("test_name", "test_classname", "test_suite"),
+        ("", "", ""),
+        ("tést_ñame", "", "suite::with::colons"),
+    ]
+    assert calc_test_ids(tests) == [calc_test_id(*test) for test in tests]
+
+
+def test_copy_rows_stream():
+    stream = CopyRowsStream(
+        iter([[(None, "", 'a "quoted",\nvalue', 1.5)], [("b", None, "c", 2)]])
+    )
+
+    chunk = stream.read(10)
+    assert len(chunk) == 10
+    rest = stream.read()
+    assert chunk + rest == ',"","a ""quoted"",\nvalue","1.5"\n"b",,"c","2"\n'
+    assert stream.read() == ""
+    assert stream.rows == 2
+
+
+@pytest.mark.django_db(databases=["ta_timeseries"])
+def test_copy_testruns_matches_insert_testrun():
+    parsing_info = {
+        "framework": "Pytest",
+        "testruns": [
+            {
+                "name": "test_pass",
+                "classname": "test_classname",
+                "computed_name": "computed_name",
+                "duration": 1.0,
+                "outcome": "pass",
+                "testsuite": "test_suite",
+                "failure_message": None,
+                "filename": None,
+                "build_url": None,
+            },
+            {
+                "name": "test_error",
+                "classname": "test_classname",
+                "computed_name": "",
+                "duration": None,
+                "outcome": "error",
+                "testsuite": "test_suite",
+                "failure_message": 'a "quoted",\nmulti-line\\message',
+                "filename": "test_filename",
+                "build_url": None,
+            },
+            {
+                "name": "test_flaky",
+                "classname": "",
+                "computed_name": "test_flaky",
+                "duration": 2.5,
+                "outcome": "failure",
+                "testsuite": "",
+                "failure_message": "",
+                "filename": "test_filename",
+                "build_url": None,
+                "properties": {"key": ["value", 1]},
+            },
+        ],
+    }
+    flaky_test_ids = {calc_test_id("test_flaky", "", "")}
+    fields = [
+        "test_id",
+        "name",
+        "classname",
+        "testsuite",
+        "computed_name",
+        "outcome",
+        "duration_seconds",
+        "failure_message",
+        "framework",
+        "filename",
+        "properties",
+        "repo_id",
+        "commit_sha",
+        "branch",
+        "flags",
+    ]
+
+    insert_testrun(
+        timestamp=datetime.now(),
+        repo_id=1,
+        commit_sha="commit_sha",
+        branch="branch",
+        upload_id=1,
+        flags=["flag1", 'fl"ag\\2', "flag,3"],
+        parsing_info=parsing_info,
+        flaky_test_ids=flaky_test_ids,
+    )
+    assert (
+        copy_testruns(
+            timestamp=datetime.now(),
+            repo_id=1,
+            commit_sha="commit_sha",
+            branch="branch",
+            upload_id=2,
+            flags=["flag1", 'fl"ag\\2', "flag,3"],
+            parsing_info=parsing_info,
+            flaky_test_ids=flaky_test_ids,
+        )
+        == 3
+    )
+
+    def testruns(upload_id):
+        return sorted(
+            (
+                {**testrun, "test_id": bytes(testrun["test_id"])}
+                for testrun in Testrun.objects.filter(upload_id=upload_id).values(
+                    *fields
+                )
+            ),
+            key=lambda testrun: testrun["name"],
+        )
+
+    inserted = testruns(1)
+    assert [testrun["outcome"] for testrun in inserted] == [
+        "failure",
+        "flaky_failure",
+        "pass",
+    ]
+    assert testruns(2) == inserted
+
+
+@pytest.mark.django_db(databases=["ta_timeseries"])
+def test_copy_testruns_without_flags():
+    copy_testruns(
+        timestamp=datetime.now(),
+        repo_id=1,
+        commit_sha=None,
+        branch=None,
+        upload_id=1,
+        flags=None,
+        parsing_info={"framework": None, "testruns": []},
+    )
+    copy_testruns(
+        timestamp=datetime.now(),
+        repo_id=1,
+        commit_sha=None,
+        branch=None,
+        upload_id=1,
+        flags=[],
+        parsing_info={
+            "framework": None,
+            "testruns": [
+                {
+                    "name": "test_name",
+                    "classname": "test_classname",
+                    "computed_name": None,
+                    "duration": 1.0,
+                    "outcome": "skip",
+                    "testsuite": "test_suite",
+                    "failure_message": None,
+                    "filename": None,
+                    "build_url": None,
+                }
+            ],
+        },
+    )
+
+    t = Testrun.objects.get(upload_id=1)
+    assert t.computed_name == "test_classname::test_name"
+    assert t.flags == []
+    assert t.commit_sha is None
+    assert t.framework is None
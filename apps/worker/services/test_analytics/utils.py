@@ -1,3 +1,5 @@
+from collections.abc import Iterable
+
 import mmh3
 
 
@@ -9,3 +11,17 @@ def calc_test_id(name: str, classname: str, testsuite: str) -> bytes:
     test_id_hash = h.digest()
 
     return test_id_hash
+
+
+def calc_test_ids(tests: Iterable[tuple[str, str, str]]) -> list[bytes]:
+    """
+    Computes the `calc_test_id` of many `(name, classname, testsuite)` tuples at once.
+
+    Hashing the concatenated bytes in one call yields the same digest as feeding
+    the parts one by one, at a fraction of the per-test overhead.
+    """
+    digest = mmh3.mmh3_x64_128_digest
+    return [
+        digest(f"{testsuite}{classname}{name}".encode())
+        for name, classname, testsuite in tests
+    ]
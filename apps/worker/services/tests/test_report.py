@@ -11,6 +11,7 @@ from services.processing.merging import clear_carryforward_sessions
 from services.report import NotReadyToBuildReportYetError, ReportService
 from services.report import log as report_log
 from shared.api_archive.archive import ArchiveService
+from shared.reports.directory_tree import DirectoryTree, directory_tree_fingerprint
 from shared.reports.resources import Report, ReportFile, Session, SessionType
 from shared.reports.test_utils import convert_report_to_better_readable
 from shared.reports.types import ReportLine, ReportTotals
@@ -2102,6 +2103,30 @@ class TestReportService:
         )
         assert mock_storage.storage["archive"][res["url"]].decode() == expected_content
 
+    def test_save_report_directory_tree(
+        self, dbsession, mock_storage, sample_report, mock_configuration
+    ):
+        mock_configuration.set_params(
+            {"services": {"directory_trees": {"enabled": True}}}
+        )
+        commit = CommitFactory.create()
+        dbsession.add(commit)
+        dbsession.flush()
+        report_service = ReportService({})
+        report_service.save_report(commit, sample_report)
+
+        archive_service = ArchiveService(commit.repository)
+        tree = DirectoryTree.deserialize(
+            archive_service.read_directory_tree(commit.commitid)
+        )
+        assert tree.fingerprint == directory_tree_fingerprint(
+            commit.totals, commit.report_json["sessions"]
+        )
+        assert tree.files() == ["file_1.go", "file_2.py"]
+        assert DirectoryTree.totals(tree.node("file_1.go")) == (
+            sample_report.get_file_totals("file_1.go")
+        )
+
     def test_initialize_and_save_report_brand_new(self, dbsession, mock_storage):
         commit = CommitFactory.create()
         dbsession.add(commit)
@@ -2,14 +2,18 @@ from yaml import safe_load
 from yaml.error import YAMLError
 
 from shared.validation.exceptions import InvalidYamlException
+from shared.yaml.cache import get_validated_yaml
 from shared.yaml.validation import validate_yaml
 
 
 def parse_yaml_file(content: str, show_secrets_for) -> dict | None:
-    try:
-        yaml_dict = safe_load(content)
-    except YAMLError as e:
-        raise InvalidYamlException("invalid_yaml", e)
-    if yaml_dict is None:
-        return None
-    return validate_yaml(yaml_dict, show_secrets_for=show_secrets_for)
+    def parse_and_validate():
+        try:
+            yaml_dict = safe_load(content)
+        except YAMLError as e:
+            raise InvalidYamlException("invalid_yaml", e)
+        if yaml_dict is None:
+            return None
+        return validate_yaml(yaml_dict, show_secrets_for=show_secrets_for)
+
+    return get_validated_yaml(content, show_secrets_for, parse_and_validate)
@@ -13,7 +13,7 @@ from sqlalchemy.exc import (
 )
 
 from app import celery_app
-from celery_task_router import _get_ownerid_from_task, _get_user_plan_from_task
+from celery_task_router import get_routing_context
 from database.engine import get_db_session
 from database.enums import CommitErrorTypes
 from database.models.core import (
@@ -150,17 +150,25 @@ class BaseCodecovTask(celery_app.Task):
 
     @sentry_sdk.trace
     def apply_async(self, args=None, kwargs=None, **options):
-        db_session = get_db_session()
-        user_plan = _get_user_plan_from_task(db_session, self.name, kwargs)
-        ownerid = _get_ownerid_from_task(db_session, self.name, kwargs)
+        user_plan = options.get("user_plan")
+        ownerid = options.get("ownerid")
+        if user_plan is None or ownerid is None:
+            context = get_routing_context(self.name, kwargs)
+            if user_plan is None:
+                user_plan = context.user_plan
+            if ownerid is None:
+                ownerid = context.ownerid
         route_with_extra_config = route_tasks_based_on_user_plan(
             self.name, user_plan, ownerid
         )
         extra_config = route_with_extra_config.get("extra_config", {})
+        # `user_plan` and `ownerid` are passed along for `route_task`, so that
+        # the router doesn't need to look them up again
         celery_compatible_config = {
             "time_limit": extra_config.get("hard_timelimit", None),
             "soft_time_limit": extra_config.get("soft_timelimit", None),
             "user_plan": user_plan,
+            "ownerid": ownerid,
         }
         options = {**options, **celery_compatible_config}
 
@@ -8,7 +8,11 @@ from redis.exceptions import LockError
 import shared.storage
 from app import celery_app
 from django_scaffold import settings
-from services.test_analytics.ta_cache_rollups import cache_rollups
+from rollouts import TA_INCREMENTAL_ROLLUPS
+from services.test_analytics.ta_cache_rollups import (
+    cache_rollups,
+    cache_rollups_incremental,
+)
 from services.test_analytics.ta_metrics import (
     read_rollups_from_db_summary,
     rollup_size_summary,
@@ -126,8 +130,12 @@ class CacheTestRollupsTask(BaseCodecovTask, name=cache_test_rollups_task_name):
                 f"rollups:{repo_id}:{branch}", timeout=300, blocking_timeout=2
             ):
                 if impl_type == "new" or impl_type == "both":
-                    cache_rollups(repo_id, branch)
-                    cache_rollups(repo_id, None)
+                    if TA_INCREMENTAL_ROLLUPS.check_value(repo_id):
+                        cache_rollups_incremental(repo_id, branch)
+                        cache_rollups_incremental(repo_id, None)
+                    else:
+                        cache_rollups(repo_id, branch)
+                        cache_rollups(repo_id, None)
                     if impl_type == "new":
                         return {"success": True}
 
@@ -4,16 +4,15 @@ from typing import Literal, TypedDict
 import orjson
 import sentry_sdk
 from asgiref.sync import async_to_sync
-from celery import group
 
 from app import celery_app
 from database.enums import CompareCommitError, CompareCommitState
-from database.models import CompareCommit, CompareComponent, CompareFlag
+from database.models import CompareCommit, CompareFlag
 from database.models.reports import RepositoryFlag
 from helpers.comparison import minimal_totals
 from helpers.github_installation import get_installation_name_for_owner_for_task
 from rollouts import PARALLEL_COMPONENT_COMPARISON
-from services.comparison import ComparisonProxy, FilteredComparison
+from services.comparison import ComparisonProxy
 from services.comparison_utils import get_comparison_proxy
 from services.report import ReportService
 from services.yaml import get_current_yaml, get_repo_yaml
@@ -24,7 +23,10 @@ from shared.helpers.flag import Flag
 from shared.torngit.exceptions import TorngitRateLimitError
 from shared.yaml import UserYaml
 from tasks.base import BaseCodecovTask
-from tasks.compute_component_comparison import compute_component_comparison_task
+from tasks.compute_component_comparison import (
+    compute_component_comparison_task,
+    compute_component_comparisons,
+)
 
 log = logging.getLogger(__name__)
 
@@ -250,10 +252,9 @@ class ComputeComparisonTask(BaseCodecovTask, name=compute_comparison_task_name):
         ):
             self.parallel_compute_component_comparison(comparison.id, components)
         else:
-            for component in components:
-                self.compute_component_comparison(
-                    db_session, comparison, comparison_proxy, component
-                )
+            compute_component_comparisons(
+                db_session, comparison, comparison_proxy, components
+            )
 
     @sentry_sdk.trace
     def parallel_compute_component_comparison(
@@ -261,57 +262,16 @@ class ComputeComparisonTask(BaseCodecovTask, name=compute_comparison_task_name):
         comparison_id: int,
         components: list[Component],
     ):
-        task_group = group(
-            [
-                compute_component_comparison_task.s(
-                    comparison_id, component.component_id
-                )
-                for component in components
-            ]
-        )
-        task_group.apply_async()
-
-    def compute_component_comparison(
-        self,
-        db_session,
-        comparison: CompareCommit,
-        comparison_proxy: ComparisonProxy,
-        component: Component,
-    ):
-        component_comparison = (
-            db_session.query(CompareComponent)
-            .filter_by(
-                commit_comparison_id=comparison.id,
-                component_id=component.component_id,
-            )
-            .first()
-        )
-        if not component_comparison:
-            component_comparison = CompareComponent(
-                commit_comparison=comparison,
-                component_id=component.component_id,
-            )
-
-        # filter comparison by component
-        head_report = comparison_proxy.comparison.head.report
-        flags = component.get_matching_flags(head_report.flags.keys())
-        filtered: FilteredComparison = comparison_proxy.get_filtered_comparison(
-            flags=flags, path_patterns=component.paths
-        )
-
-        # component comparison totals
-        component_comparison.base_totals = (
-            filtered.project_coverage_base.report.totals.asdict()
+        # the components are computed together, in a single task that loads the
+        # reports of the comparison once, off of this task
+        if not components:
+            return
+        compute_component_comparison_task.apply_async(
+            kwargs={
+                "comparison_id": comparison_id,
+                "component_ids": [component.component_id for component in components],
+            }
         )
-        component_comparison.head_totals = filtered.head.report.totals.asdict()
-        diff = comparison_proxy.get_diff()
-        if diff:
-            patch_totals = filtered.head.report.apply_diff(diff)
-            if patch_totals:
-                component_comparison.patch_totals = patch_totals.asdict()
-
-        db_session.add(component_comparison)
-        db_session.flush()
 
     @sentry_sdk.trace
     def store_results(self, comparison: CompareCommit, impacted_files):
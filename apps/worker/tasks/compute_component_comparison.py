@@ -6,11 +6,12 @@ from sqlalchemy.orm import Session
 from app import celery_app
 from database.models import CompareCommit, CompareComponent
 from helpers.github_installation import get_installation_name_for_owner_for_task
-from services.comparison import ComparisonProxy, FilteredComparison
+from services.comparison import ComparisonProxy
 from services.comparison_utils import get_comparison_proxy
 from services.report import ReportService
 from services.yaml import get_current_yaml, get_repo_yaml
 from shared.components import Component
+from shared.components.comparison import compare_components
 from shared.utils.enums import TaskConfigGroup
 from shared.yaml import UserYaml
 from tasks.base import BaseCodecovTask
@@ -22,45 +23,55 @@ task_name = (
 )
 
 
-def compute_component_comparison(
+def compute_component_comparisons(
     db_session: Session,
     comparison: CompareCommit,
     comparison_proxy: ComparisonProxy,
-    component: Component,
+    components: list[Component],
 ):
-    component_comparison = (
-        db_session.query(CompareComponent)
-        .filter_by(
-            commit_comparison_id=comparison.id,
-            component_id=component.component_id,
-        )
-        .first()
+    """
+    Computes the comparisons of all `components` together, loading the reports
+    and the diff of the comparison once and saving all the rows in bulk.
+    """
+    if not components:
+        return
+
+    base_report = (
+        comparison_proxy.comparison.project_coverage_base.report
+        if comparison_proxy.has_project_coverage_base_report()
+        else None
     )
-    if not component_comparison:
-        component_comparison = CompareComponent(
-            commit_comparison=comparison,
-            component_id=component.component_id,
-        )
-
-    # filter comparison by component
-    head_report = comparison_proxy.comparison.head.report
-    flags = component.get_matching_flags(head_report.flags.keys())
-    filtered: FilteredComparison = comparison_proxy.get_filtered_comparison(
-        flags=flags, path_patterns=component.paths
+    results = compare_components(
+        comparison_proxy.comparison.head.report,
+        base_report,
+        comparison_proxy.get_diff(),
+        components,
     )
 
-    # component comparison totals
-    component_comparison.base_totals = (
-        filtered.project_coverage_base.report.totals.asdict()
-    )
-    component_comparison.head_totals = filtered.head.report.totals.asdict()
-    diff = comparison_proxy.get_diff()
-    if diff:
-        patch_totals = filtered.head.report.apply_diff(diff)
-        if patch_totals:
-            component_comparison.patch_totals = patch_totals.asdict()
-
-    db_session.add(component_comparison)
+    existing = {
+        component_comparison.component_id: component_comparison
+        for component_comparison in db_session.query(CompareComponent).filter(
+            CompareComponent.commit_comparison_id == comparison.id,
+            CompareComponent.component_id.in_(list(results)),
+        )
+    }
+    new_component_comparisons = []
+    for component_id, totals in results.items():
+        component_comparison = existing.get(component_id)
+        if component_comparison is None:
+            component_comparison = CompareComponent(
+                commit_comparison_id=comparison.id,
+                component_id=component_id,
+            )
+            new_component_comparisons.append(component_comparison)
+
+        component_comparison.head_totals = totals.head_totals.asdict()
+        if totals.base_totals is not None:
+            component_comparison.base_totals = totals.base_totals.asdict()
+        if totals.patch_totals:
+            component_comparison.patch_totals = totals.patch_totals.asdict()
+
+    db_session.bulk_save_objects(new_component_comparisons)
     db_session.flush()
 
 
@@ -69,8 +80,9 @@ class ComputeComponentComparisonTask(BaseCodecovTask, name=task_name):
         self,
         db_session: Session,
         comparison_id: int,
-        component_id: str,
+        component_id: str | None = None,
         *args,
+        component_ids: list[str] | None = None,
         **kwargs,
     ):
         comparison: CompareCommit = db_session.query(CompareCommit).get(comparison_id)
@@ -99,9 +111,14 @@ class ComputeComponentComparisonTask(BaseCodecovTask, name=task_name):
 
         components = yaml.get_components()
 
+        if component_ids is None:
+            component_ids = [component_id]
         component_dict = {c.component_id: c for c in components}
-        compute_component_comparison(
-            db_session, comparison, comparison_proxy, component_dict[component_id]
+        compute_component_comparisons(
+            db_session,
+            comparison,
+            comparison_proxy,
+            [component_dict[component_id] for component_id in component_ids],
         )
 
         log.info("Finished computing component comparison", extra=log_extra)
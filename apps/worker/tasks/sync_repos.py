@@ -4,11 +4,13 @@ from datetime import datetime
 from asgiref.sync import async_to_sync
 from celery.exceptions import SoftTimeLimitExceeded
 from redis.exceptions import LockError
-from sqlalchemy import and_
+from sqlalchemy import and_, bindparam, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm.session import Session
 
 from app import celery_app
 from database.models import Owner, Repository
+from rollouts import SYNC_REPOS_SET_BASED
 from services.owner import get_owner_provider_service
 from shared.celery_config import (
     sync_repo_languages_gql_task_name,
@@ -17,6 +19,7 @@ from shared.celery_config import (
 )
 from shared.config import get_config
 from shared.helpers.redis import get_redis_connection
+from shared.metrics import Histogram
 from shared.torngit.base import TorngitBaseAdapter
 from shared.torngit.exceptions import TorngitClientError, TorngitServerFailureError
 from tasks.base import BaseCodecovTask
@@ -24,6 +27,39 @@ from tasks.base import BaseCodecovTask
 log = logging.getLogger(__name__)
 metrics_scope = "worker.SyncReposTask"
 
+SYNC_REPOS_PAGE_DURATION = Histogram(
+    "worker_tasks_sync_repos_page_duration_seconds",
+    "Time it takes (in seconds) to save a page of repos listed by the git provider",
+    ["impl"],
+    buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60],
+)
+
+# the columns of a repo `upsert_repos` reads and writes
+REPO_SYNC_COLUMNS = (
+    "repoid",
+    "ownerid",
+    "service_id",
+    "name",
+    "private",
+    "language",
+    "deleted",
+    "using_integration",
+    "updatestamp",
+)
+
+# and the ones it sets on the repos it creates
+REPO_INSERT_COLUMNS = (
+    "ownerid",
+    "service_id",
+    "name",
+    "language",
+    "private",
+    "branch",
+    "using_integration",
+    "deleted",
+    "updatestamp",
+)
+
 
 class SyncReposTask(BaseCodecovTask, name=sync_repos_task_name):
     """This task syncs the repos for a user in the same way as the legacy "refresh" task.
@@ -409,9 +445,68 @@ class SyncReposTask(BaseCodecovTask, name=sync_repos_task_name):
                     private_project_ids.append(int(repoid))
                 db_session.commit()
 
+        # Same as `process_repos`, resolving the owners and repos of the whole
+        # page with a handful of queries instead of a few per repo
+        def process_repos_set_based(repos):
+            owner_usernames = {}
+            for repo in repos:
+                owner_usernames[str(repo["owner"]["service_id"])] = repo["owner"][
+                    "username"
+                ]
+                if repo["repo"].get("fork"):
+                    fork_owner = repo["repo"]["fork"]["owner"]
+                    owner_usernames[str(fork_owner["service_id"])] = fork_owner[
+                        "username"
+                    ]
+            ownerids = self.upsert_owners(db_session, service, owner_usernames)
+
+            repos_to_upsert = []
+            forks_to_upsert = []
+            for repo in repos:
+                owners_by_id[
+                    (
+                        service,
+                        repo["owner"]["service_id"],
+                        repo["owner"]["username"],
+                    )
+                ] = ownerids[str(repo["owner"]["service_id"])]
+                repos_to_upsert.append(
+                    (ownerids[str(repo["owner"]["service_id"])], repo["repo"])
+                )
+                if repo["repo"].get("fork"):
+                    fork = repo["repo"]["fork"]
+                    forks_to_upsert.append(
+                        (ownerids[str(fork["owner"]["service_id"])], fork["repo"])
+                    )
+
+            upserted_repoids = self.upsert_repos(
+                db_session, service, repos_to_upsert, using_integration
+            )
+            # like `process_repos`, the repos forked from aren't marked as
+            # being accessed through the integration
+            upserted_fork_repoids = iter(
+                self.upsert_repos(db_session, service, forks_to_upsert)
+            )
+            for repo, repoid in zip(repos, upserted_repoids):
+                repoids.append(repoid)
+                if repo["repo"].get("fork"):
+                    fork_repoid = next(upserted_fork_repoids)
+                    repoids.append(fork_repoid)
+                    if repo["repo"]["fork"]["repo"]["private"]:
+                        private_project_ids.append(int(fork_repoid))
+                if repo["repo"]["private"]:
+                    private_project_ids.append(int(repoid))
+            db_session.commit()
+
+        set_based = SYNC_REPOS_SET_BASED.check_value(ownerid, default=False)
+        impl = "set_based" if set_based else "legacy"
         try:
             async for page in git.list_repos_generator():
-                process_repos(page)
+                with SYNC_REPOS_PAGE_DURATION.labels(impl).time():
+                    if set_based:
+                        process_repos_set_based(page)
+                    else:
+                        process_repos(page)
 
         except (
             SoftTimeLimitExceeded,
@@ -504,6 +599,258 @@ class SyncReposTask(BaseCodecovTask, name=sync_repos_task_name):
 
         return owner.ownerid
 
+    def upsert_owners(
+        self, db_session: Session, service: str, owner_usernames: dict[str, str]
+    ) -> dict[str, int]:
+        """
+        Set-based version of `upsert_owner`.
+
+        `owner_usernames` maps the service_ids of the owners to their usernames,
+        and the ownerids are returned by service_id.
+        """
+        if not owner_usernames:
+            return {}
+        table = Owner.__table__
+        now = datetime.now()
+        db_session.execute(
+            insert(table)
+            .values(
+                [
+                    {
+                        "service": service,
+                        "service_id": service_id,
+                        "username": username,
+                        "createstamp": now,
+                    }
+                    for service_id, username in owner_usernames.items()
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=["service", "service_id"])
+        )
+        owners = db_session.execute(
+            select(table.c.ownerid, table.c.service_id, table.c.username).where(
+                table.c.service == service,
+                table.c.service_id.in_(list(owner_usernames)),
+            )
+        ).fetchall()
+
+        renamed_owners = [
+            {
+                "b_ownerid": owner.ownerid,
+                "b_username": owner_usernames[owner.service_id],
+            }
+            for owner in owners
+            if (owner.username or "").lower()
+            != owner_usernames[owner.service_id].lower()
+        ]
+        if renamed_owners:
+            db_session.execute(
+                table.update()
+                .where(table.c.ownerid == bindparam("b_ownerid"))
+                .values(username=bindparam("b_username")),
+                renamed_owners,
+            )
+
+        return {owner.service_id: owner.ownerid for owner in owners}
+
+    def upsert_repos(
+        self,
+        db_session: Session,
+        service: str,
+        repos: list[tuple[int, dict]],
+        using_integration: bool | None = None,
+    ) -> list[int]:
+        """
+        Set-based version of `upsert_repo`, for a list of (ownerid, repo_data).
+
+        The candidate rows are loaded with one query by service_id and one by
+        (ownerid, name), and `upsert_repo`'s rules are applied to them in memory,
+        one repo after the other, so that renames and moves behave the same.
+        The changes are then written with one bulk UPDATE and one INSERT.
+
+        Returns the repoids in the order of `repos`.
+        """
+        if not repos:
+            return []
+        table = Repository.__table__
+        owners_table = Owner.__table__
+        columns = [table.c[column] for column in REPO_SYNC_COLUMNS]
+
+        service_ids = {str(repo_data["service_id"]) for _, repo_data in repos}
+        slugs = {(ownerid, repo_data["name"]) for ownerid, repo_data in repos}
+        rows_by_service_id = db_session.execute(
+            select(*columns)
+            .select_from(
+                table.join(owners_table, table.c.ownerid == owners_table.c.ownerid)
+            )
+            .where(
+                owners_table.c.service == service,
+                table.c.service_id.in_(list(service_ids)),
+            )
+        ).fetchall()
+        rows_by_slug = db_session.execute(
+            select(*columns).where(
+                tuple_(table.c.ownerid, table.c.name).in_(list(slugs))
+            )
+        ).fetchall()
+
+        # rows are keyed by repoid, and by a placeholder until they are inserted
+        rows: dict[int | tuple[str, int], dict] = {
+            row.repoid: dict(row._mapping) for row in rows_by_service_id + rows_by_slug
+        }
+        updated: set[int] = set()
+        new_rows: list[tuple[str, int]] = []
+        keys = []
+
+        def find_row(predicate):
+            return next(
+                (key for key, row in rows.items() if predicate(row)),
+                None,
+            )
+
+        for ownerid, repo_data in repos:
+            service_id = str(repo_data["service_id"])
+            key = find_row(
+                lambda row: row["ownerid"] == ownerid
+                and str(row["service_id"]) == service_id
+            )
+            if key is not None:
+                # Found the exact repo. Let's just update
+                row = rows[key]
+                changes = {
+                    "private": repo_data["private"],
+                    "language": repo_data["language"],
+                    "name": repo_data["name"],
+                    "deleted": False,
+                }
+                if any(row[column] != value for column, value in changes.items()):
+                    row.update(changes, updatestamp=datetime.now())
+                    updated.add(key)
+                keys.append(key)
+                continue
+
+            # repo was not found, could be a different owner or service_id
+            wrong_owner_key = find_row(
+                lambda row: row["deleted"] is False
+                and str(row["service_id"]) == service_id
+            )
+            wrong_service_id_key = find_row(
+                lambda row: row["ownerid"] == ownerid
+                and row["name"] == repo_data["name"]
+            )
+            if wrong_owner_key is not None and wrong_service_id_key is not None:
+                # But it cannot be both different owner and different service_id
+                log.warning(
+                    "There is a repo with the right service_id and a repo with the right slug, but they are not the same",
+                    extra={
+                        "repo_data": repo_data,
+                        "repo_correct_serviceid_wrong_owner": wrong_owner_key,
+                        "repo_correct_owner_wrong_service_id": wrong_service_id_key,
+                    },
+                )
+                # We will have to assume the user has access to the service_id one, since
+                # the service_id is the Github identity value
+                keys.append(wrong_owner_key)
+            elif wrong_owner_key is not None:
+                rows[wrong_owner_key].update(
+                    ownerid=ownerid,
+                    private=repo_data["private"],
+                    language=repo_data["language"],
+                    name=repo_data["name"],
+                    deleted=False,
+                    updatestamp=datetime.now(),
+                )
+                updated.add(wrong_owner_key)
+                keys.append(wrong_owner_key)
+            elif wrong_service_id_key is not None:
+                # could be correct owner but wrong service_id (repo deleted and recreated)
+                rows[wrong_service_id_key].update(
+                    service_id=repo_data["service_id"],
+                    name=repo_data["name"],
+                    language=repo_data["language"],
+                    private=repo_data["private"],
+                    using_integration=using_integration,
+                    updatestamp=datetime.now(),
+                )
+                updated.add(wrong_service_id_key)
+                keys.append(wrong_service_id_key)
+            else:
+                # repo does not exist, create it
+                key = ("new", len(new_rows))
+                rows[key] = {
+                    "ownerid": ownerid,
+                    "service_id": repo_data["service_id"],
+                    "name": repo_data["name"],
+                    "language": repo_data["language"],
+                    "private": repo_data["private"],
+                    "branch": repo_data["branch"],
+                    "using_integration": using_integration,
+                    "deleted": False,
+                }
+                new_rows.append(key)
+                keys.append(key)
+
+        # placeholders keep any changes made to them after being added above
+        updated.difference_update(new_rows)
+        if updated:
+            db_session.execute(
+                table.update()
+                .where(table.c.repoid == bindparam("b_repoid"))
+                .values(
+                    {
+                        column: bindparam(f"b_{column}")
+                        for column in REPO_SYNC_COLUMNS
+                        if column != "repoid"
+                    }
+                ),
+                [
+                    {f"b_{column}": rows[key][column] for column in REPO_SYNC_COLUMNS}
+                    for key in updated
+                ],
+            )
+
+        inserted_repoids: dict[tuple[str, int], int] = {}
+        if new_rows:
+            inserted = db_session.execute(
+                insert(table)
+                .values(
+                    [
+                        {
+                            column: rows[key].get(column)
+                            for column in REPO_INSERT_COLUMNS
+                        }
+                        for key in new_rows
+                    ]
+                )
+                .on_conflict_do_nothing()
+                .returning(table.c.repoid, table.c.ownerid, table.c.service_id)
+            ).fetchall()
+            repoids_by_service_id = {
+                (row.ownerid, str(row.service_id)): row.repoid for row in inserted
+            }
+            for key in new_rows:
+                row = rows[key]
+                repoid = repoids_by_service_id.get(
+                    (row["ownerid"], str(row["service_id"]))
+                )
+                if repoid is None:
+                    # inserted concurrently by someone else, let the slow path
+                    # figure out what to do with it
+                    repoid = self.upsert_repo(
+                        db_session, service, row["ownerid"], row, using_integration
+                    )
+                inserted_repoids[key] = repoid
+
+        log.info(
+            "Upserted repos",
+            extra={
+                "number_repos": len(repos),
+                "number_updated": len(updated),
+                "number_inserted": len(new_rows),
+            },
+        )
+        return [inserted_repoids.get(key, key) for key in keys]
+
     def upsert_repo(
         self,
         db_session: Session,
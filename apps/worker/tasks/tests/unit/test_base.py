@@ -15,6 +15,7 @@ from sqlalchemy.exc import (
     StatementError,
 )
 
+from celery_task_router import RoutingContext
 from database.enums import CommitErrorTypes
 from database.models.core import GITHUB_APP_INSTALLATION_DEFAULT_NAME
 from database.tests.factories.core import OwnerFactory, RepositoryFactory
@@ -490,8 +491,10 @@ class TestBaseCodecovTaskApplyAsyncOverride:
 
     @pytest.mark.freeze_time("2023-06-13T10:01:01.000123")
     def test_apply_async_override(self, mocker):
-        mock_get_db_session = mocker.patch("tasks.base.get_db_session")
-        mock_celery_task_router = mocker.patch("tasks.base._get_user_plan_from_task")
+        mock_get_routing_context = mocker.patch(
+            "tasks.base.get_routing_context",
+            return_value=RoutingContext(user_plan="users-basic", ownerid=None),
+        )
         mock_route_tasks = mocker.patch(
             "tasks.base.route_tasks_based_on_user_plan",
             return_value={
@@ -506,8 +509,7 @@ class TestBaseCodecovTaskApplyAsyncOverride:
 
         kwargs = {"n": 10}
         task.apply_async(kwargs=kwargs)
-        assert mock_get_db_session.call_count == 1
-        assert mock_celery_task_router.call_count == 1
+        assert mock_get_routing_context.call_count == 1
         assert mock_route_tasks.call_count == 1
         mocked_apply_async.assert_called_with(
             args=None,
@@ -515,13 +517,16 @@ class TestBaseCodecovTaskApplyAsyncOverride:
             headers={"created_timestamp": "2023-06-13T10:01:01.000123"},
             time_limit=400,
             soft_time_limit=200,
-            user_plan=mock_celery_task_router(),
+            user_plan="users-basic",
+            ownerid=None,
         )
 
     @pytest.mark.freeze_time("2023-06-13T10:01:01.000123")
     def test_apply_async_override_with_chain(self, mocker):
-        mock_get_db_session = mocker.patch("tasks.base.get_db_session")
-        mock_celery_task_router = mocker.patch("tasks.base._get_user_plan_from_task")
+        mock_get_routing_context = mocker.patch(
+            "tasks.base.get_routing_context",
+            return_value=RoutingContext(user_plan="users-basic", ownerid=None),
+        )
         mock_route_tasks = mocker.patch(
             "tasks.base.route_tasks_based_on_user_plan",
             return_value={
@@ -537,8 +542,7 @@ class TestBaseCodecovTaskApplyAsyncOverride:
         chain(
             [task.signature(kwargs={"n": 1}), task.signature(kwargs={"n": 10})]
         ).apply_async()
-        assert mock_get_db_session.call_count == 1
-        assert mock_celery_task_router.call_count == 1
+        assert mock_get_routing_context.call_count == 1
         assert mock_route_tasks.call_count == 1
         assert mocked_apply_async.call_count == 1
         _, kwargs = mocked_apply_async.call_args
@@ -576,7 +580,7 @@ class TestBaseCodecovTaskApplyAsyncOverride:
             }
         )
         mock_get_db_session = mocker.patch(
-            "tasks.base.get_db_session", return_value=dbsession
+            "celery_task_router.get_db_session", return_value=dbsession
         )
         task = BaseCodecovTask()
         mocker.patch.object(task, "run", return_value="success")
@@ -597,6 +601,7 @@ class TestBaseCodecovTaskApplyAsyncOverride:
             headers={"created_timestamp": "2023-06-13T10:01:01.000123"},
             time_limit=None,
             user_plan="users-pr-inappm",
+            ownerid=repo.ownerid,
         )
 
     @pytest.mark.freeze_time("2023-06-13T10:01:01.000123")
@@ -623,7 +628,7 @@ class TestBaseCodecovTaskApplyAsyncOverride:
             }
         )
         mock_get_db_session = mocker.patch(
-            "tasks.base.get_db_session", return_value=dbsession
+            "celery_task_router.get_db_session", return_value=dbsession
         )
         task = BaseCodecovTask()
         mocker.patch.object(task, "run", return_value="success")
@@ -644,6 +649,7 @@ class TestBaseCodecovTaskApplyAsyncOverride:
             headers={"created_timestamp": "2023-06-13T10:01:01.000123"},
             time_limit=600,
             user_plan="users-enterprisey",
+            ownerid=repo_enterprise_cloud.ownerid,
         )
 
     @pytest.mark.freeze_time("2023-06-13T10:01:01.000123")
@@ -670,7 +676,7 @@ class TestBaseCodecovTaskApplyAsyncOverride:
             }
         )
         mock_get_db_session = mocker.patch(
-            "tasks.base.get_db_session", return_value=dbsession
+            "celery_task_router.get_db_session", return_value=dbsession
         )
         task = BaseCodecovTask()
         mocker.patch.object(task, "run", return_value="success")
@@ -691,4 +697,32 @@ class TestBaseCodecovTaskApplyAsyncOverride:
             headers={"created_timestamp": "2023-06-13T10:01:01.000123"},
             time_limit=450,
             user_plan="users-enterprisey",
+            ownerid=repo_enterprise_cloud.ownerid,
+        )
+
+    @pytest.mark.django_db
+    def test_apply_async_reuses_routing_context(self, mocker, dbsession, fake_repos):
+        mock_all_plans_and_tiers()
+        mock_get_db_session = mocker.patch(
+            "celery_task_router.get_db_session", return_value=dbsession
         )
+        task = BaseCodecovTask()
+        task.name = upload_task_name
+        mocked_super_apply_async = mocker.patch.object(
+            base_celery_app.Task, "apply_async"
+        )
+        repo, _ = fake_repos
+
+        for commitid in ("abc", "def"):
+            task.apply_async(kwargs={"repoid": repo.repoid, "commitid": commitid})
+        # the plan and owner are looked up once, and handed over to the router
+        assert mock_get_db_session.call_count == 1
+        _, kwargs = mocked_super_apply_async.call_args
+        assert kwargs["user_plan"] == "users-pr-inappm"
+        assert kwargs["ownerid"] == repo.ownerid
+
+        # and not at all when they are given
+        task.apply_async(
+            kwargs={"repoid": 123456}, user_plan="users-pr-inappm", ownerid=1
+        )
+        assert mock_get_db_session.call_count == 1
@@ -1,7 +1,5 @@
 import json
 
-from celery import group
-
 from database.enums import CompareCommitError, CompareCommitState
 from database.models import CompareComponent, CompareFlag, RepositoryFlag
 from database.tests.factories import CompareCommitFactory
@@ -13,6 +11,7 @@ from shared.reports.types import ReportTotals
 from shared.torngit.exceptions import TorngitRateLimitError
 from shared.yaml import UserYaml
 from tasks.compute_comparison import ComputeComparisonTask
+from tasks.compute_component_comparison import compute_component_comparison_task
 
 
 class TestComputeComparisonTask:
@@ -562,7 +561,13 @@ class TestComputeComparisonTask:
     ):
         mocker.patch("tasks.base.get_db_session", return_value=dbsession)
 
-        mocker.patch.object(group, "apply_async", group.apply)
+        apply_async = mocker.patch.object(
+            compute_component_comparison_task,
+            "apply_async",
+            side_effect=lambda kwargs: compute_component_comparison_task.apply(
+                kwargs=kwargs
+            ),
+        )
         mocker.patch.object(
             PARALLEL_COMPONENT_COMPARISON, "check_value", return_value=True
         )
@@ -622,6 +627,13 @@ class TestComputeComparisonTask:
         task = ComputeComparisonTask()
         res = task.run_impl(dbsession, comparison.id)
         assert res == {"successful": True}
+        # all the components are computed together, in a single task
+        apply_async.assert_called_once_with(
+            kwargs={
+                "comparison_id": comparison_id,
+                "component_ids": ["go_files", "unit_flags"],
+            }
+        )
 
         component_comparisons = (
             dbsession.query(CompareComponent)
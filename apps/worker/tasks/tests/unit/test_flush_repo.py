@@ -106,6 +106,14 @@ def test_flush_repo_little_bit_of_everything(mocker, mock_storage):
         archive_service.storage.write_file(
             "bundle-analysis", ba_upload.storage_path, f"ba_upload_data{i}"
         )
+        ba_comparison_path = StoragePaths.bundle_comparison.path(
+            repo_key=archive_service.storage_hash,
+            report_key=ba_report.external_id,
+            base_report_key=f"base{i}",
+        )
+        archive_service.storage.write_file(
+            "bundle-analysis", ba_comparison_path, f"ba_comparison_data{i}"
+        )
 
     for i in range(17):
         PullFactory(repository=repo, pullid=i + 100)
@@ -116,17 +124,17 @@ def test_flush_repo_little_bit_of_everything(mocker, mock_storage):
     archive = mock_storage.storage["archive"]
     ba_archive = mock_storage.storage["bundle-analysis"]
     assert len(archive) == 16
-    assert len(ba_archive) == 16
+    assert len(ba_archive) == 24
 
     task = FlushRepoTask()
     res = task.run_impl({}, repoid=repo.repoid)
 
     assert res == CleanupSummary(
-        CleanupResult(24 + 8 + 16 + 18 + 1 + 16, 16 + 16),
+        CleanupResult(24 + 8 + 16 + 18 + 1 + 16, 24 + 16),
         {
             "Branch": CleanupResult(24),
             "Commit": CleanupResult(8),
-            "CommitReport": CleanupResult(16, 16),
+            "CommitReport": CleanupResult(16, 24),
             "Pull": CleanupResult(18),
             "Repository": CleanupResult(1),
             "ReportSession": CleanupResult(16, 16),
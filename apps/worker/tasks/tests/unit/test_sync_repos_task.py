@@ -1,10 +1,11 @@
 from datetime import datetime
 from pathlib import Path
-from unittest.mock import call
+from unittest.mock import MagicMock, call
 
 import pytest
 import respx
 import vcr
+from asgiref.sync import async_to_sync
 from celery.exceptions import SoftTimeLimitExceeded
 from freezegun import freeze_time
 from redis.exceptions import LockError
@@ -15,6 +16,7 @@ from database.models.core import (
     GithubAppInstallation,
 )
 from database.tests.factories import OwnerFactory, RepositoryFactory
+from rollouts import SYNC_REPOS_SET_BASED
 from shared.celery_config import (
     sync_repo_languages_gql_task_name,
     sync_repo_languages_task_name,
@@ -386,6 +388,183 @@ class TestSyncReposTaskUnit:
         assert new_repo.branch == repo_data.get("branch")
         assert new_repo.private is True
 
+    def test_upsert_owners(self, dbsession):
+        service = "github"
+        existing_owner = OwnerFactory.create(
+            organizations=[],
+            service=service,
+            username="codecov_org",
+            permission=[],
+            service_id="123456",
+        )
+        dbsession.add(existing_owner)
+        dbsession.flush()
+
+        ownerids = SyncReposTask().upsert_owners(
+            dbsession, service, {"123456": "Codecov", "654321": "some_org"}
+        )
+
+        assert ownerids["123456"] == existing_owner.ownerid
+        dbsession.expire_all()
+        owners = (
+            dbsession.query(Owner)
+            .filter(Owner.service == service, Owner.service_id.in_(ownerids))
+            .all()
+        )
+        assert {owner.service_id: owner.username for owner in owners} == {
+            "123456": "Codecov",
+            "654321": "some_org",
+        }
+        assert {owner.ownerid for owner in owners} == set(ownerids.values())
+
+    def test_upsert_repos(self, dbsession):
+        service = "gitlab"
+        user = OwnerFactory.create(
+            organizations=[],
+            service=service,
+            username="1nf1n1t3l00p",
+            permission=[],
+            service_id="45343385",
+        )
+        other_user = OwnerFactory.create(
+            organizations=[],
+            service=service,
+            username="other",
+            permission=[],
+            service_id="40404040",
+        )
+        dbsession.add(user)
+        dbsession.add(other_user)
+        renamed_repo = RepositoryFactory.create(
+            private=True,
+            name="old-name",
+            using_integration=False,
+            service_id="1",
+            owner=user,
+        )
+        moved_repo = RepositoryFactory.create(
+            private=False,
+            name="moved",
+            using_integration=False,
+            service_id="2",
+            owner=other_user,
+        )
+        recreated_repo = RepositoryFactory.create(
+            private=False,
+            name="recreated",
+            using_integration=False,
+            service_id="40404",
+            owner=user,
+        )
+        dbsession.add(renamed_repo)
+        dbsession.add(moved_repo)
+        dbsession.add(recreated_repo)
+        dbsession.flush()
+
+        def repo_data(service_id, name):
+            return {
+                "service_id": service_id,
+                "name": name,
+                "fork": None,
+                "private": True,
+                "language": None,
+                "branch": "main",
+            }
+
+        repoids = SyncReposTask().upsert_repos(
+            dbsession,
+            service,
+            [
+                (user.ownerid, repo_data("1", "new-name")),
+                (user.ownerid, repo_data("2", "moved")),
+                (user.ownerid, repo_data("3", "recreated")),
+                (user.ownerid, repo_data("4", "new")),
+                # listed twice, e.g. once by itself and once as a fork
+                (user.ownerid, repo_data("4", "new")),
+            ],
+        )
+
+        assert repoids[:3] == [
+            renamed_repo.repoid,
+            moved_repo.repoid,
+            recreated_repo.repoid,
+        ]
+        assert repoids[3] == repoids[4]
+        dbsession.expire_all()
+        repos = (
+            dbsession.query(Repository)
+            .filter(Repository.ownerid == user.ownerid)
+            .order_by(Repository.service_id)
+            .all()
+        )
+        assert [(repo.service_id, repo.name) for repo in repos] == [
+            ("1", "new-name"),
+            ("2", "moved"),
+            ("3", "recreated"),
+            ("4", "new"),
+        ]
+        assert all(repo.private for repo in repos)
+        assert repos[3].repoid == repoids[3]
+        assert repos[3].branch == "main"
+
+    @pytest.mark.parametrize("set_based", [False, True])
+    def test_sync_repos_forks_not_using_integration(self, dbsession, mocker, set_based):
+        mocker.patch.object(SYNC_REPOS_SET_BASED, "check_value", return_value=set_based)
+        user = OwnerFactory.create(
+            organizations=[],
+            service="github",
+            username="1nf1n1t3l00p",
+            permission=[],
+            service_id="45343385",
+        )
+        dbsession.add(user)
+        dbsession.flush()
+
+        def repo_data(service_id, name, fork=None):
+            return {
+                "service_id": service_id,
+                "name": name,
+                "fork": fork,
+                "private": True,
+                "language": None,
+                "branch": "main",
+            }
+
+        page = [
+            {
+                "owner": {"service_id": user.service_id, "username": user.username},
+                "repo": repo_data(
+                    "1",
+                    "fork",
+                    fork={
+                        "owner": {"service_id": "40404040", "username": "upstream"},
+                        "repo": repo_data("2", "upstream"),
+                    },
+                ),
+            }
+        ]
+
+        async def list_repos_generator(*args, **kwargs):
+            yield page
+
+        git = MagicMock(service="github", list_repos_generator=list_repos_generator)
+        output = async_to_sync(SyncReposTask().sync_repos)(
+            dbsession, git, user, None, True
+        )
+
+        dbsession.expire_all()
+        repos = {
+            repo.service_id: repo
+            for repo in dbsession.query(Repository).filter(
+                Repository.repoid.in_(output["repoids"])
+            )
+        }
+        assert set(repos) == {"1", "2"}
+        assert repos["1"].using_integration is True
+        assert not repos["2"].using_integration
+        assert repos["2"].owner.username == "upstream"
+        assert sorted(user.permission) == sorted(output["repoids"])
+
     @pytest.mark.django_db
     def test_only_public_repos_already_in_db(self, dbsession):
         token = "ecd73a086eadc85db68747a66bdbd662a785a072"
@@ -0,0 +1,46 @@
+import pytest
+
+import shared.celery_config as shared_celery_config
+from celery_task_router import route_task, routing_context_cache
+from database.tests.factories.core import OwnerFactory, RepositoryFactory
+from tests.helpers import mock_all_plans_and_tiers
+
+# the tasks published for every upload of a commit
+UPLOAD_TASKS = [
+    shared_celery_config.upload_task_name,
+    shared_celery_config.upload_processor_task_name,
+    shared_celery_config.upload_finisher_task_name,
+    shared_celery_config.notify_task_name,
+    shared_celery_config.pulls_task_name,
+]
+
+
+@pytest.fixture
+def repos(dbsession):
+    repos = [RepositoryFactory.create(owner=OwnerFactory.create()) for _ in range(10)]
+    dbsession.add_all(repos)
+    dbsession.flush()
+    return repos
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("cached", [False, True])
+def test_route_upload_burst(benchmark, mocker, dbsession, repos, cached):
+    mock_all_plans_and_tiers()
+    mocker.patch("celery_task_router.get_db_session", return_value=dbsession)
+    # 10 uploads for each of the repos
+    tasks = [
+        (task_name, {"repoid": repo.repoid, "commitid": "abc"})
+        for repo in repos
+        for _ in range(10)
+        for task_name in UPLOAD_TASKS
+    ]
+
+    def route_burst():
+        routing_context_cache.invalidate()
+        for task_name, kwargs in tasks:
+            if not cached:
+                routing_context_cache.invalidate()
+            route_task(task_name, [], kwargs, {})
+
+    benchmark(route_burst)
@@ -2,6 +2,7 @@ import pytest
 
 import shared.celery_config as shared_celery_config
 from celery_task_router import (
+    RoutingContext,
     _get_ownerid_from_comparison_id,
     _get_ownerid_from_ownerid,
     _get_ownerid_from_repoid,
@@ -11,7 +12,9 @@ from celery_task_router import (
     _get_user_plan_from_ownerid,
     _get_user_plan_from_repoid,
     _get_user_plan_from_task,
+    get_routing_context,
     route_task,
+    routing_context_cache,
 )
 from database.tests.factories.core import (
     CommitFactory,
@@ -310,3 +313,108 @@ def test_route_task(mocker, dbsession, fake_repos):
         PlanName.CODECOV_PRO_MONTHLY.value,
         repo.ownerid,
     )
+
+
+def test_get_routing_context(mocker, dbsession, fake_comparison_commit):
+    mock_get_db_session = mocker.patch(
+        "celery_task_router.get_db_session", return_value=dbsession
+    )
+    compare_commit, _, repo, repo_enterprise_cloud = fake_comparison_commit
+
+    context = get_routing_context(
+        shared_celery_config.upload_task_name, {"repoid": repo.repoid}
+    )
+    assert context == (PlanName.CODECOV_PRO_MONTHLY.value, repo.ownerid)
+    context = get_routing_context(
+        shared_celery_config.compute_comparison_task_name,
+        {"comparison_id": compare_commit.id},
+    )
+    assert context == (PlanName.CODECOV_PRO_MONTHLY.value, repo.ownerid)
+    context = get_routing_context(
+        shared_celery_config.new_user_activated_task_name,
+        {"org_ownerid": repo_enterprise_cloud.ownerid, "user_ownerid": 20},
+    )
+    assert context == (
+        PlanName.ENTERPRISE_CLOUD_YEARLY.value,
+        repo_enterprise_cloud.ownerid,
+    )
+    assert mock_get_db_session.call_count == 3
+
+    # the other tasks of the same repo, comparison or owner are routed from cache
+    for task_name in (
+        shared_celery_config.upload_processor_task_name,
+        shared_celery_config.notify_task_name,
+    ):
+        context = get_routing_context(task_name, {"repoid": repo.repoid})
+        assert context == (PlanName.CODECOV_PRO_MONTHLY.value, repo.ownerid)
+    context = get_routing_context(
+        shared_celery_config.sync_repos_task_name,
+        {"ownerid": repo_enterprise_cloud.ownerid},
+    )
+    assert context.user_plan == PlanName.ENTERPRISE_CLOUD_YEARLY.value
+    assert mock_get_db_session.call_count == 3
+
+    # tasks without an owner don't need to be looked up
+    assert get_routing_context("unknown task", {"repoid": repo.repoid}) == (
+        DEFAULT_FREE_PLAN,
+        None,
+    )
+    assert get_routing_context(shared_celery_config.upload_task_name, None) == (
+        DEFAULT_FREE_PLAN,
+        None,
+    )
+    assert mock_get_db_session.call_count == 3
+
+
+def test_routing_context_invalidated_on_plan_change(mocker, dbsession, fake_repos):
+    mocker.patch("celery_task_router.get_db_session", return_value=dbsession)
+    repo, _ = fake_repos
+
+    context = get_routing_context(
+        shared_celery_config.upload_task_name, {"repoid": repo.repoid}
+    )
+    assert context.user_plan == PlanName.CODECOV_PRO_MONTHLY.value
+
+    repo.owner.plan = PlanName.ENTERPRISE_CLOUD_YEARLY.value
+    dbsession.flush()
+
+    context = get_routing_context(
+        shared_celery_config.upload_task_name, {"repoid": repo.repoid}
+    )
+    assert context.user_plan == PlanName.ENTERPRISE_CLOUD_YEARLY.value
+
+
+def test_routing_context_cache_invalidate():
+    routing_context_cache.set(("repoid", 1), RoutingContext(DEFAULT_FREE_PLAN, 10))
+    routing_context_cache.set(("repoid", 2), RoutingContext(DEFAULT_FREE_PLAN, 10))
+    routing_context_cache.set(("ownerid", 10), RoutingContext(DEFAULT_FREE_PLAN, 10))
+    routing_context_cache.set(("repoid", 3), RoutingContext(DEFAULT_FREE_PLAN, 20))
+
+    routing_context_cache.invalidate(repoid=3)
+    assert routing_context_cache.get(("repoid", 3)) is None
+    routing_context_cache.invalidate(ownerid=10)
+    assert routing_context_cache.get(("repoid", 1)) is None
+    assert routing_context_cache.get(("repoid", 2)) is None
+    assert routing_context_cache.get(("ownerid", 10)) is None
+
+
+def test_route_task_with_routing_options(mocker):
+    mock_get_db_session = mocker.patch("celery_task_router.get_db_session")
+    mock_route_tasks_shared = mocker.patch(
+        "celery_task_router.route_tasks_based_on_user_plan",
+        return_value={"queue": "correct queue"},
+    )
+
+    response = route_task(
+        shared_celery_config.upload_task_name,
+        [],
+        {"repoid": 1},
+        {"user_plan": PlanName.ENTERPRISE_CLOUD_YEARLY.value, "ownerid": 2},
+    )
+    assert response == {"queue": "correct queue"}
+    mock_get_db_session.assert_not_called()
+    mock_route_tasks_shared.assert_called_with(
+        shared_celery_config.upload_task_name,
+        PlanName.ENTERPRISE_CLOUD_YEARLY.value,
+        2,
+    )
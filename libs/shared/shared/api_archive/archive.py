@@ -15,6 +15,7 @@ log = logging.getLogger(__name__)
 
 class MinioEndpoints(Enum):
     chunks = "{version}/repos/{repo_hash}/commits/{commitid}/{chunks_file_name}.txt"
+    directory_tree = "{version}/repos/{repo_hash}/commits/{commitid}/directory_trees/{tree_name}.json"
 
     json_data = "{version}/repos/{repo_hash}/commits/{commitid}/json_data/{table}/{field}/{external_id}.json"
     json_data_no_commit = (
@@ -195,3 +196,36 @@ class ArchiveService:
         )
 
         return self.read_file(path).decode(errors="replace")
+
+    def write_directory_tree(
+        self, commit_sha: str, data: bytes, tree_name: str = "report"
+    ) -> str:
+        """
+        Convenience method to write a `DirectoryTree` of a report to storage.
+        """
+        if not self.storage_hash:
+            raise ValueError("No hash key provided")
+        path = MinioEndpoints.directory_tree.get_path(
+            version="v4",
+            repo_hash=self.storage_hash,
+            commitid=commit_sha,
+            tree_name=tree_name,
+        )
+
+        self.write_file(path, data)
+        return path
+
+    def read_directory_tree(self, commit_sha: str, tree_name: str = "report") -> bytes:
+        """
+        Convenience method to read a `DirectoryTree` of a report from the archive.
+        """
+        if not self.storage_hash:
+            raise ValueError("No hash key provided")
+        path = MinioEndpoints.directory_tree.get_path(
+            version="v4",
+            repo_hash=self.storage_hash,
+            commitid=commit_sha,
+            tree_name=tree_name,
+        )
+
+        return self.read_file(path)
@@ -1,9 +1,10 @@
 import logging
 from collections import defaultdict
 from collections.abc import Iterator, MutableSet
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from enum import Enum
 from functools import cached_property
+from typing import Any
 
 import sentry_sdk
 
@@ -14,6 +15,7 @@ from shared.bundle_analysis.report import (
     BundleReport,
     BundleRouteReport,
     ModuleReport,
+    filter_changed_modules,
 )
 from shared.bundle_analysis.storage import BundleAnalysisReportLoader
 from shared.django_apps.core.models import Repository
@@ -21,6 +23,10 @@ from shared.django_apps.reports.models import CommitReport
 
 log = logging.getLogger(__name__)
 
+# Version of the persisted comparison format. Bump it whenever the format or the
+# way changes are computed is modified so that persisted comparisons get recomputed.
+COMPARISON_SCHEMA_VERSION = 2
+
 
 class MissingBaseReportError(Exception):
     pass
@@ -313,9 +319,87 @@ class BundleRoutesComparison:
         return results
 
 
+@dataclass(frozen=True)
+class ContributingModule:
+    """A module of the head report contributing to a changed asset."""
+
+    name: str
+    size: int
+
+
+@dataclass(frozen=True)
+class ComputedComparison:
+    """
+    The result of comparing two bundle analysis reports, in a form that can be
+    persisted next to the head report and reused without loading either report.
+    """
+
+    base_report_key: str
+    bundle_changes: list[BundleChange]
+    asset_changes: dict[str, list[AssetChange]]
+    # the modules of each asset change, or none if the asset didn't change in size
+    asset_modules: dict[str, list[list[ContributingModule]]]
+    route_changes: dict[str, list[RouteChange]]
+    head_bundle_sizes: dict[str, int]
+    head_bundles_cached: dict[str, bool]
+    base_total_size: int
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        for change in data["bundle_changes"]:
+            change["change_type"] = change["change_type"].value
+        for changes in [
+            *data["asset_changes"].values(),
+            *data["route_changes"].values(),
+        ]:
+            for change in changes:
+                change["change_type"] = change["change_type"].value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ComputedComparison":
+        def _change(change_class: type[BaseChange], change: dict[str, Any]) -> Any:
+            return change_class(
+                **{
+                    **change,
+                    "change_type": BaseChange.ChangeType(change["change_type"]),
+                }
+            )
+
+        return cls(
+            base_report_key=data["base_report_key"],
+            bundle_changes=[
+                _change(BundleChange, change) for change in data["bundle_changes"]
+            ],
+            asset_changes={
+                bundle_name: [_change(AssetChange, change) for change in changes]
+                for bundle_name, changes in data["asset_changes"].items()
+            },
+            asset_modules={
+                bundle_name: [
+                    [ContributingModule(**module) for module in modules]
+                    for modules in asset_modules
+                ]
+                for bundle_name, asset_modules in data["asset_modules"].items()
+            },
+            route_changes={
+                bundle_name: [_change(RouteChange, change) for change in changes]
+                for bundle_name, changes in data["route_changes"].items()
+            },
+            head_bundle_sizes=data["head_bundle_sizes"],
+            head_bundles_cached=data["head_bundles_cached"],
+            base_total_size=data["base_total_size"],
+        )
+
+
 class BundleAnalysisComparison:
     """
     Compares two different bundle analysis reports.
+
+    The bundle, asset and route changes are computed once per pair of reports and
+    persisted next to the head report (see `computed`). Later comparisons of the same
+    reports read them back without downloading either report, as long as neither
+    report was saved again in the meantime.
     """
 
     def __init__(
@@ -328,10 +412,24 @@ class BundleAnalysisComparison:
         self.loader = loader
         self.base_report_key = base_report_key
         self.head_report_key = head_report_key
+        self._requested_base_report_key = base_report_key
+
+        # revisions are read before any of the reports is loaded, so a comparison
+        # computed from reports that are concurrently being saved is never persisted
+        # as if it was computed from the newer revisions
+        self._head_revision = self.loader.revision(head_report_key)
+        persisted = self._load_persisted(repository)
+        if persisted is not None:
+            self.base_report_key = persisted["comparison"]["base_report_key"]
+        else:
+            compare_sha_external_id = self._check_compare_sha(repository)
+            if compare_sha_external_id:
+                self.base_report_key = compare_sha_external_id
+        self._base_revision = self.loader.revision(self.base_report_key)
 
-        compare_sha_external_id = self._check_compare_sha(repository)
-        if compare_sha_external_id:
-            self.base_report_key = compare_sha_external_id
+        self._persisted: ComputedComparison | None = None
+        if persisted is not None and persisted["base_revision"] == self._base_revision:
+            self._persisted = ComputedComparison.from_dict(persisted["comparison"])
 
     def _check_compare_sha(self, repository: Repository) -> str | None:
         """
@@ -343,20 +441,153 @@ class BundleAnalysisComparison:
                 MetadataKey.COMPARE_SHA
             )
             if head_report_compare_sha and repository:
-                base_report = CommitReport.objects.filter(
-                    commit__commitid=head_report_compare_sha,
-                    commit__repository=repository,
-                    report_type=CommitReport.ReportType.BUNDLE_ANALYSIS,
-                ).first()
-                if base_report:
-                    return base_report.external_id
-                else:
-                    log.warning(
-                        f"Bundle Analysis compare SHA not found in reports for {head_report_compare_sha}"
-                    )
+                return self._compare_sha_report_key(head_report_compare_sha, repository)
         except MissingHeadReportError:
             pass
 
+    def _compare_sha_report_key(
+        self, compare_sha: str, repository: Repository
+    ) -> str | None:
+        base_report = CommitReport.objects.filter(
+            commit__commitid=compare_sha,
+            commit__repository=repository,
+            report_type=CommitReport.ReportType.BUNDLE_ANALYSIS,
+        ).first()
+        if base_report:
+            return base_report.external_id
+        else:
+            log.warning(
+                f"Bundle Analysis compare SHA not found in reports for {compare_sha}"
+            )
+            return None
+
+    def _load_persisted(self, repository: Repository | None) -> dict[str, Any] | None:
+        """
+        Returns the persisted comparison of these reports if it can still be used:
+        same schema version, head report not saved since it was computed and
+        the compare SHA (if any) still resolving to the same base report.
+        The base report revision is checked by the caller.
+        """
+        data = self.loader.load_comparison(
+            self.head_report_key, self._requested_base_report_key
+        )
+        if data is None or data.get("version") != COMPARISON_SCHEMA_VERSION:
+            return None
+        if data["head_revision"] != self._head_revision:
+            return None
+
+        expected_base_report_key = self._requested_base_report_key
+        if data["compare_sha"] and repository:
+            expected_base_report_key = (
+                self._compare_sha_report_key(data["compare_sha"], repository)
+                or expected_base_report_key
+            )
+        if data["comparison"]["base_report_key"] != expected_base_report_key:
+            return None
+
+        return data
+
+    @cached_property
+    def computed(self) -> ComputedComparison:
+        """
+        The bundle, asset and route changes between the base and head reports.
+        Read from the persisted comparison when valid, otherwise computed from
+        the reports and persisted for later comparisons.
+        """
+        if self._persisted is not None:
+            return self._persisted
+
+        computed = self._compute()
+        try:
+            self.loader.save_comparison(
+                self.head_report_key,
+                self._requested_base_report_key,
+                {
+                    "version": COMPARISON_SCHEMA_VERSION,
+                    "head_revision": self._head_revision,
+                    "base_revision": self._base_revision,
+                    "compare_sha": self.head_report.metadata().get(
+                        MetadataKey.COMPARE_SHA
+                    ),
+                    "comparison": computed.to_dict(),
+                },
+            )
+        except Exception:
+            log.warning(
+                "Failed to persist bundle analysis comparison",
+                extra={
+                    "base_report_key": self.base_report_key,
+                    "head_report_key": self.head_report_key,
+                },
+                exc_info=True,
+            )
+        return computed
+
+    @sentry_sdk.trace
+    def _compute(self) -> ComputedComparison:
+        base_bundle_reports = list(self.base_report.bundle_reports())
+        head_bundle_reports = list(self.head_report.bundle_reports())
+        base_bundle_names = {
+            bundle_report.name for bundle_report in base_bundle_reports
+        }
+
+        asset_changes: dict[str, list[AssetChange]] = {}
+        asset_modules: dict[str, list[list[ContributingModule]]] = {}
+        for bundle_report in head_bundle_reports:
+            if bundle_report.name not in base_bundle_names:
+                continue
+            asset_comparisons = self.bundle_comparison(
+                bundle_report.name
+            ).asset_comparisons()
+            asset_changes[bundle_report.name] = []
+            asset_modules[bundle_report.name] = []
+            for asset_comparison in asset_comparisons:
+                asset_change = asset_comparison.asset_change()
+                asset_changes[bundle_report.name].append(asset_change)
+                asset_modules[bundle_report.name].append(
+                    [
+                        ContributingModule(name=module.name, size=module.size)
+                        for module in asset_comparison.contributing_modules()
+                    ]
+                    if asset_change.size_delta != 0
+                    else []
+                )
+
+        return ComputedComparison(
+            base_report_key=self.base_report_key,
+            bundle_changes=list(self._bundle_changes()),
+            asset_changes=asset_changes,
+            asset_modules=asset_modules,
+            route_changes=self._bundle_routes_changes(),
+            head_bundle_sizes={
+                bundle_report.name: bundle_report.total_size()
+                for bundle_report in head_bundle_reports
+            },
+            head_bundles_cached={
+                bundle_report.name: bundle_report.is_cached()
+                for bundle_report in head_bundle_reports
+            },
+            base_total_size=sum(
+                bundle_report.total_size() for bundle_report in base_bundle_reports
+            ),
+        )
+
+    @property
+    def base_report_db_path(self) -> str | None:
+        """
+        The path of the downloaded base report, or `None` if it was never loaded.
+        """
+        base_report = self.__dict__.get("base_report")
+        return base_report.db_path if base_report is not None else None
+
+    @property
+    def head_report_db_path(self) -> str | None:
+        """
+        The path of the downloaded head report, or `None` if it was never loaded.
+        """
+        head_report = self.__dict__.get("head_report")
+        return head_report.db_path if head_report is not None else None
+
     @cached_property
     def base_report(self) -> BundleAnalysisReport:
         base_report = self.loader.load(self.base_report_key)
@@ -371,11 +602,14 @@ class BundleAnalysisComparison:
             raise MissingHeadReportError()
         return head_report
 
-    @sentry_sdk.trace
     def bundle_changes(self) -> Iterator[BundleChange]:
         """
         Returns a list of changes across the bundles in the base and head reports.
         """
+        return iter(self.computed.bundle_changes)
+
+    @sentry_sdk.trace
+    def _bundle_changes(self) -> Iterator[BundleChange]:
         base_bundle_reports = {
             bundle_report.name: bundle_report
             for bundle_report in self.base_report.bundle_reports()
@@ -429,9 +663,7 @@ class BundleAnalysisComparison:
 
         Percentage is returned as a float 0-100, rounded to 2 decimal places
         """
-        base_size = sum(
-            report.total_size() for report in self.base_report.bundle_reports()
-        )
+        base_size = self.computed.base_total_size
         if base_size == 0:
             return 100.0
         return round((self.total_size_delta / base_size) * 100, 2)
@@ -448,11 +680,39 @@ class BundleAnalysisComparison:
             raise MissingBundleError()
         return BundleComparison(base_bundle_report, head_bundle_report)
 
-    @sentry_sdk.trace
+    def asset_changes(self, bundle_name: str) -> list[AssetChange]:
+        """
+        Changes across the assets of a particular bundle that exists both in
+        the base and head reports.
+        """
+        if bundle_name not in self.computed.asset_changes:
+            raise MissingBundleError()
+        return self.computed.asset_changes[bundle_name]
+
+    def asset_changes_with_modules(
+        self, bundle_name: str, pr_changed_files: list[str] | None = None
+    ) -> list[tuple[AssetChange, list[ContributingModule]]]:
+        """
+        The `asset_changes` of a bundle, along with the modules contributing to
+        each changed asset that are part of the PR's changed files (all of them
+        when those are unknown).
+        """
+        return [
+            (asset_change, filter_changed_modules(modules, pr_changed_files))
+            for asset_change, modules in zip(
+                self.asset_changes(bundle_name),
+                self.computed.asset_modules[bundle_name],
+            )
+        ]
+
     def bundle_routes_changes(self) -> dict[str, list[RouteChange]]:
         """
         Comparison for all the routes available to a pair of bundles.
         """
+        return self.computed.route_changes
+
+    @sentry_sdk.trace
+    def _bundle_routes_changes(self) -> dict[str, list[RouteChange]]:
         comparison_mapping = {}
         base_bundle_reports = {
             bundle_report.name: bundle_report.full_route_report()
@@ -37,6 +37,37 @@ from shared.bundle_analysis.utils import AssetRoute, AssetRoutePluginName
 log = logging.getLogger(__name__)
 
 
+def filter_changed_modules(modules: list, pr_changed_files: list[str] | None) -> list:
+    """
+    The `modules` (anything with a `name`) that are part of the PR's changed
+    files, or all of them when the changed files are unknown.
+
+    We can't simply do an equality match because the module names we store are
+    relative to the root of the app while the PR's file paths are relative to the
+    root of the repo. So we check that any of the PR's files ends with the module.
+    For example,
+        PR changed files: ["abc/def.ts", "ghi/jkl.ts"],
+        modules: ["def.ts", "mno.ts"]
+        -> ["def.ts"]
+    """
+    if pr_changed_files is None:
+        return modules
+
+    normalized_changed_files = [
+        os.path.normpath(path[2:] if path.startswith("./") else path)
+        for path in pr_changed_files
+    ]
+    filtered_modules = {}
+    for file in normalized_changed_files:
+        for module in modules:
+            normalized_module = os.path.normpath(
+                module.name[1:] if file.startswith(".") else module.name
+            )
+            if file.endswith(normalized_module):
+                filtered_modules[id(module)] = module
+    return list(filtered_modules.values())
+
+
 class ModuleReport:
     """
     Report wrapper around a single module (many of which can exist in a single Asset via Chunks)
@@ -102,33 +133,10 @@ class AssetReport:
                 .filter(Asset.id == self.asset.id)
             )
 
-            if pr_changed_files is None:
-                return [ModuleReport(self.db_path, module) for module in query]
-
-            """
-            Apply filter on modules where the module name has to be part of the PR's changed file list.
-            However we can't simply do a simple equality match because the module names we store is relative
-            to the root of the app while the PR's file path is relative to the root of the repo. So we will
-            need to check that any of the PR's file lists ends with any of the modules for the given asset.
-            For example,
-                PR changed files: ["abc/def.ts", "ghi/jkl.ts"],
-                modules: ["def.ts", "mno.ts"]
-                -> ["def.ts"]
-            """
-            normalized_changed_files = [
-                os.path.normpath(path[2:] if path.startswith("./") else path)
-                for path in pr_changed_files
+            return [
+                ModuleReport(self.db_path, module)
+                for module in filter_changed_modules(list(query), pr_changed_files)
             ]
-            filtered_modules = set()
-            for file in normalized_changed_files:
-                for module in query:
-                    normalized_module = os.path.normpath(
-                        module.name[1:] if file.startswith(".") else module.name
-                    )
-                    if file.endswith(normalized_module):
-                        filtered_modules.add(module)
-
-            return [ModuleReport(self.db_path, module) for module in filtered_modules]
 
     def routes(self) -> list[str] | None:
         plugin_name = self.bundle_info.get("plugin_name")
@@ -1,6 +1,9 @@
+import json
 import logging
 import tempfile
+import uuid
 from enum import Enum
+from typing import Any
 
 import sentry_sdk
 
@@ -18,6 +21,11 @@ def get_bucket_name() -> str:
 
 class StoragePaths(Enum):
     bundle_report = "v1/repos/{repo_key}/{report_key}/bundle_report.sqlite"
+    bundle_report_revision = "v1/repos/{repo_key}/{report_key}/bundle_report.revision"
+    bundle_comparison = (
+        "v1/repos/{repo_key}/{report_key}/comparisons/{base_report_key}.json"
+    )
+    bundle_comparisons = "v1/repos/{repo_key}/{report_key}/comparisons/"
     upload = "v1/uploads/{upload_key}.json"
 
     def path(self, **kwargs):
@@ -67,9 +75,63 @@ class BundleAnalysisReportLoader:
         try:
             with open(report.db_path, "rb") as f:
                 self.storage_service.write_file(self.bucket_name, storage_path, f)
+            # every save gets a fresh revision so that persisted comparisons
+            # computed against the previous contents are no longer considered valid
+            revision_path = StoragePaths.bundle_report_revision.path(
+                repo_key=self.repo_key, report_key=report_key
+            )
+            self.storage_service.write_file(
+                self.bucket_name, revision_path, uuid.uuid4().hex
+            )
         except Exception as e:
             log.info(f"Bundle analysis GCS save file error: {e}")
             if "TooManyRequests" in str(e):
                 raise PutRequestRateLimitError("GCS Rate Limit Error for Saving File")
             else:
                 raise e
+
+    def revision(self, report_key: str) -> str | None:
+        """
+        Returns the revision written by the last `save` of the given report key,
+        or `None` if the report was not saved since revisions were introduced.
+        """
+        path = StoragePaths.bundle_report_revision.path(
+            repo_key=self.repo_key, report_key=report_key
+        )
+        try:
+            return self.storage_service.read_file(self.bucket_name, path).decode()
+        except FileNotInStorageError:
+            return None
+
+    @sentry_sdk.trace
+    def load_comparison(
+        self, head_report_key: str, base_report_key: str
+    ) -> dict[str, Any] | None:
+        """
+        Loads the persisted comparison between the given reports, stored next to
+        the head report, or returns `None` if no such comparison was saved.
+        """
+        path = StoragePaths.bundle_comparison.path(
+            repo_key=self.repo_key,
+            report_key=head_report_key,
+            base_report_key=base_report_key,
+        )
+        try:
+            content = self.storage_service.read_file(self.bucket_name, path)
+        except FileNotInStorageError:
+            return None
+        return json.loads(content)
+
+    @sentry_sdk.trace
+    def save_comparison(
+        self, head_report_key: str, base_report_key: str, data: dict[str, Any]
+    ) -> None:
+        """
+        Persists a computed comparison between the given reports next to the head report.
+        """
+        path = StoragePaths.bundle_comparison.path(
+            repo_key=self.repo_key,
+            report_key=head_report_key,
+            base_report_key=base_report_key,
+        )
+        self.storage_service.write_file(self.bucket_name, path, json.dumps(data))
@@ -0,0 +1,187 @@
+"""
+Totals of many components of a comparison, computed together.
+
+Filtering a comparison by each component on its own (`FilteredComparison`)
+matches all the files of both reports against the component's paths, filters
+every file by its flags and walks the diff again for every component. Here,
+the files of each report are matched once per distinct set of paths, and the
+flag-filtered files and their diff totals are shared between all the
+components filtering them the same way.
+"""
+
+import dataclasses
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from shared.components import Component
+from shared.reports.diff import RawDiff, calculate_file_diff
+from shared.reports.filtered import FilteredReport, FilteredReportFile
+from shared.reports.readonly import ReadOnlyReport
+from shared.reports.resources import Report
+from shared.reports.types import ReportTotals
+from shared.utils.match import get_matcher
+from shared.utils.totals import agg_totals, sum_totals
+
+
+@dataclass
+class ComponentTotals:
+    head_totals: ReportTotals
+    base_totals: ReportTotals | None
+    patch_totals: ReportTotals | None
+
+
+class ComponentsReport:
+    """A report, filtered by many components at once."""
+
+    def __init__(self, report: Report | ReadOnlyReport, components: list[Component]):
+        self.report = report
+        self.inner_report: Report = (
+            report.inner_report if isinstance(report, ReadOnlyReport) else report
+        )
+        self.matching_files = self._bucket_files(components)
+        self._session_ids: dict[frozenset[str], frozenset] = {}
+        self._files: dict[tuple[str, frozenset | None], object] = {}
+        self._diff_totals: dict[tuple[str, frozenset | None], ReportTotals | None] = {}
+
+    def _bucket_files(self, components: list[Component]) -> dict[str, set[str]]:
+        """
+        The files matching the paths of each component, by component id.
+
+        Components with the same paths share the matching of the files.
+        """
+        files = list(self.inner_report.files)
+        matching_by_paths: dict[frozenset[str], set[str]] = {}
+        matching_files: dict[str, set[str]] = {}
+        for component in components:
+            if not component.paths:
+                continue
+            paths = frozenset(component.paths)
+            if paths not in matching_by_paths:
+                matched = get_matcher(paths).match_many(files)
+                matching_by_paths[paths] = {
+                    path for path, is_match in zip(files, matched) if is_match
+                }
+            matching_files[component.component_id] = matching_by_paths[paths]
+        return matching_files
+
+    def session_ids(self, flags: list[str]) -> frozenset | None:
+        """The sessions of `flags`, which files are filtered down to."""
+        if not flags:
+            return None
+        key = frozenset(flags)
+        if key not in self._session_ids:
+            filtered = FilteredReport(self.inner_report, None, flags)
+            self._session_ids[key] = frozenset(filtered.session_ids_to_include)
+        return self._session_ids[key]
+
+    def get(self, path: str, session_ids: frozenset | None):
+        """The file at `path`, filtered like `FilteredReport.get` does."""
+        key = (path, session_ids)
+        if key not in self._files:
+            file = self.inner_report.get(path)
+            if file is not None and session_ids is not None:
+                file = FilteredReportFile(file, session_ids)
+            self._files[key] = file
+        return self._files[key]
+
+    def _files_of(self, component: Component) -> Iterable[str]:
+        if component.paths:
+            return self.matching_files[component.component_id]
+        return self.inner_report.files
+
+    def totals(self, component: Component, flags: list[str]) -> ReportTotals:
+        """The totals of the report filtered by `component` and its `flags`."""
+        if not flags and not component.paths:
+            return self.report.totals
+        if isinstance(self.report, ReadOnlyReport):
+            # the totals of the whole files are aggregated by the rust report
+            return self.report.filter(
+                paths=component.paths,
+                flags=flags,
+                matching_files=self.matching_files.get(component.component_id),
+            ).totals
+
+        session_ids = self.session_ids(flags)
+        file_totals = (
+            self.get(path, session_ids).totals for path in self._files_of(component)
+        )
+        totals = agg_totals(
+            totals for totals in file_totals if totals and totals.lines > 0
+        )
+        totals.sessions = (
+            len(session_ids)
+            if session_ids is not None
+            else len(self.inner_report.sessions)
+        )
+        return ReportTotals(*tuple(totals))
+
+    def patch_totals(
+        self, component: Component, flags: list[str], diff: RawDiff | None
+    ) -> ReportTotals | None:
+        """
+        The totals of the lines of `diff` in the report filtered by `component`
+        and its `flags`, like `calculate_report_diff` calculates them.
+        """
+        if not diff or not diff.get("files"):
+            return None
+        session_ids = self.session_ids(flags)
+        matching_files = (
+            self.matching_files[component.component_id] if component.paths else None
+        )
+
+        list_of_file_totals = []
+        for path, data in diff["files"].items():
+            if data["type"] not in ("modified", "new"):
+                continue
+            if matching_files is not None and path not in matching_files:
+                continue
+            file_totals = self._file_diff_totals(path, session_ids, data["segments"])
+            if file_totals is not None:
+                list_of_file_totals.append(file_totals)
+
+        totals = sum_totals(list_of_file_totals)
+        if totals.lines == 0:
+            totals = dataclasses.replace(
+                totals, coverage=None, complexity=None, complexity_total=None
+            )
+        return totals
+
+    def _file_diff_totals(
+        self, path: str, session_ids: frozenset | None, segments: list
+    ) -> ReportTotals | None:
+        key = (path, session_ids)
+        if key not in self._diff_totals:
+            file = self.get(path, session_ids)
+            self._diff_totals[key] = (
+                calculate_file_diff(file, segments) if file else None
+            )
+        return self._diff_totals[key]
+
+
+def compare_components(
+    head_report: Report | ReadOnlyReport,
+    base_report: Report | ReadOnlyReport | None,
+    diff: RawDiff | None,
+    components: list[Component],
+) -> dict[str, ComponentTotals]:
+    """
+    The head, base and patch totals of each of `components`, by component id.
+
+    These are the totals of the comparison filtered by the paths of each
+    component, and by the flags of the head report matching it.
+    """
+    head = ComponentsReport(head_report, components)
+    base = (
+        ComponentsReport(base_report, components) if base_report is not None else None
+    )
+    flag_names = list(head_report.flags.keys())
+
+    results = {}
+    for component in components:
+        flags = component.get_matching_flags(flag_names)
+        results[component.component_id] = ComponentTotals(
+            head_totals=head.totals(component, flags),
+            base_totals=base.totals(component, flags) if base is not None else None,
+            patch_totals=head.patch_totals(component, flags, diff),
+        )
+    return results
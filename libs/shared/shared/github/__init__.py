@@ -102,8 +102,8 @@ def get_github_jwt_token(
 
 
 # The integration tokens are valid for 1h
-# We use 30min of that
-@cache.cache_function(ttl=1800)
+# We use 30min of that, and up to 10 more min while a new one is requested
+@cache.cache_function(ttl=1800, stale_ttl=600, local_ttl=60)
 def get_github_integration_token(
     service,
     integration_id=None,
@@ -2,18 +2,56 @@ import asyncio
 import base64
 import hashlib
 import logging
+import math
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from collections.abc import Callable, Hashable
 from functools import wraps
-from typing import Any
+from typing import Any, NamedTuple
 
 import msgpack
 from redis import Redis, RedisError
 
+from shared.metrics import Counter, Histogram
+
 log = logging.getLogger(__name__)
 
 NO_VALUE = object()
 
 DEFAULT_TTL = 120
+# How long a miss is computed by a single caller before the others give up
+# waiting for it and compute it themselves
+DEFAULT_LOCK_TIMEOUT = 5
+LOCK_POLL_INTERVAL = 0.05
+# The local copies of the values expire between 90% and 100% of their ttl, so
+# that the processes caching a value don't all go back to the backend at once
+LOCAL_TTL_JITTER = 0.1
+# Bump this whenever the format of the cached entries changes
+CACHE_KEY_VERSION = 2
+
+# Deletes the lock only if it's still held with the given token, as it may have
+# expired and been acquired by someone else since
+RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+CACHED_FUNCTION_LOOKUPS = Counter(
+    "shared_cached_function_lookups",
+    "Calls of functions cached with `cache_function`",
+    ["function", "result"],  # local_hit, hit, stale, wait, refresh, miss
+)
+CACHED_FUNCTION_LATENCY = Histogram(
+    "shared_cached_function_latency_seconds",
+    "Duration of the calls of functions cached with `cache_function`",
+    ["function", "result"],
+    buckets=[0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10],
+)
 
 
 def make_hash_sha256(o: Any) -> str:
@@ -68,6 +106,20 @@ class BaseBackend:
     def set(self, key: str, ttl: int, value: Any):
         raise NotImplementedError()
 
+    def acquire_lock(self, key: str, timeout: float) -> str | None:
+        """Tries to acquire the lock `key` for up to `timeout` seconds
+
+        The lock is what makes a single caller compute a missing value while the others wait
+            for it. Backends that can't lock grant every lock, so that everyone computes.
+
+        Returns:
+            str | None: The token to release the lock with, or None if someone else holds it
+        """
+        return uuid.uuid4().hex
+
+    def release_lock(self, key: str, token: str):
+        pass
+
 
 class NullBackend(BaseBackend):
     """
@@ -89,6 +141,9 @@ class NullBackend(BaseBackend):
 class RedisBackend(BaseBackend):
     def __init__(self, redis_connection: Redis):
         self.redis_connection = redis_connection
+        self._release_lock_script = redis_connection.register_script(
+            RELEASE_LOCK_SCRIPT
+        )
 
     def get(self, key: str) -> Any:
         try:
@@ -114,6 +169,66 @@ class RedisBackend(BaseBackend):
                 f"Attempted to cache a type that is not JSON-serializable: {value}"
             )
 
+    def acquire_lock(self, key: str, timeout: float) -> str | None:
+        token = uuid.uuid4().hex
+        try:
+            acquired = self.redis_connection.set(
+                key, token, nx=True, px=max(1, int(timeout * 1000))
+            )
+        except RedisError:
+            log.warning("Unable to acquire cache lock on redis", exc_info=True)
+            return token
+        return token if acquired else None
+
+    def release_lock(self, key: str, token: str):
+        try:
+            self._release_lock_script(keys=[key], args=[token])
+        except RedisError:
+            log.warning("Unable to release cache lock on redis", exc_info=True)
+
+
+class LocalCache:
+    """
+    A size-bounded, in-process, LRU of cached values, in front of the backend.
+
+    Values are kept serialized, so that every caller gets its own copy, and each of them
+        expires after its own (jittered) ttl.
+    """
+
+    def __init__(self, maxsize: int, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.clock = clock
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return NO_VALUE
+            expires_at, serialized_value = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                return NO_VALUE
+            self._entries.move_to_end(key)
+        return msgpack.loads(serialized_value)
+
+    def set(self, key: str, ttl: float, value: Any):
+        try:
+            serialized_value = msgpack.dumps(value)
+        except TypeError:
+            return
+        expires_at = self.clock() + ttl * random.uniform(1 - LOCAL_TTL_JITTER, 1)
+        with self._lock:
+            self._entries[key] = (expires_at, serialized_value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
 
 class OurOwnCache:
     """
@@ -146,6 +261,9 @@ class OurOwnCache:
         instances can be plugged in easily, once needed. A backend is any implementation
         of `BaseBackend`, which is described at their docstrings.
 
+    `cache.configure(backend, local_maxsize=1024)` also keeps up to that many values in
+        the memory of the process, for the functions cached with a `local_ttl`.
+
     When `cache.cache_function()` is called, a `FunctionCacher` is returned. They do the heavy
         lifting of actually decorating the function properly, dealign with sync-async context.
 
@@ -153,23 +271,43 @@ class OurOwnCache:
 
     def __init__(self):
         self._backend = NullBackend()
+        self._local_cache: LocalCache | None = None
 
-    def configure(self, backend: BaseBackend):
+    def configure(self, backend: BaseBackend, local_maxsize: int = 0):
         self._backend = backend
+        self._local_cache = LocalCache(local_maxsize) if local_maxsize > 0 else None
 
     def get_backend(self) -> BaseBackend:
         return self._backend
 
-    def cache_function(self, ttl: int = DEFAULT_TTL) -> "FunctionCacher":
+    def get_local_cache(self) -> LocalCache | None:
+        return self._local_cache
+
+    def cache_function(
+        self,
+        ttl: int = DEFAULT_TTL,
+        stale_ttl: int = 0,
+        local_ttl: float = 0,
+        lock_timeout: float = DEFAULT_LOCK_TIMEOUT,
+        beta: float = 1.0,
+    ) -> "FunctionCacher":
         """Creates a FunctionCacher with all the needed configuration to cache a function
 
         Args:
             ttl (int, optional): The time-to-live of the cache
+            stale_ttl (int, optional): For how long after `ttl` the value is still served,
+                while a single caller computes the new one
+            local_ttl (float, optional): For how long the value is also kept in the memory
+                of the process, when the cache is configured with a `local_maxsize`
+            lock_timeout (float, optional): For how long the callers missing a value wait
+                for the single one computing it, before computing it themselves
+            beta (float, optional): How early values are refreshed before they expire. 0
+                disables early refreshes, and more than 1 makes them earlier
 
         Returns:
             FunctionCacher: A FunctionCacher that can decorate any callable
         """
-        return FunctionCacher(self, ttl)
+        return FunctionCacher(self, ttl, stale_ttl, local_ttl, lock_timeout, beta)
 
 
 cache = OurOwnCache()
@@ -177,44 +315,219 @@ cache = OurOwnCache()
 # cache.configure(RedisBackend(get_redis_connection()))
 
 
+class CacheEntry(NamedTuple):
+    value: Any
+    expires_at: float  # unix timestamp
+    delta: float  # how long computing the value took, in seconds
+
+    @classmethod
+    def from_cached(cls, cached: Any) -> "CacheEntry | None":
+        if isinstance(cached, list | tuple) and len(cached) == 3:
+            return cls(*cached)
+        return None
+
+    def should_refresh(self, now: float, beta: float) -> bool:
+        """
+        Whether to compute the value again, which gets more likely as it gets closer to
+        expiring (the "XFetch" algorithm), so that hot values are refreshed by a single
+        caller before they expire, instead of by all of them once they are.
+        """
+        if now >= self.expires_at:
+            return True
+        if beta <= 0 or self.delta <= 0:
+            return False
+        return now - self.delta * beta * math.log(1.0 - random.random()) >= (
+            self.expires_at
+        )
+
+
+class _Lookup:
+    """Times a call of a cached function, and counts it by `result`."""
+
+    def __init__(self, function_name: str):
+        self.function_name = function_name
+        self.result = "miss"
+
+    def __enter__(self) -> "_Lookup":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        CACHED_FUNCTION_LOOKUPS.labels(
+            function=self.function_name, result=self.result
+        ).inc()
+        CACHED_FUNCTION_LATENCY.labels(
+            function=self.function_name, result=self.result
+        ).observe(time.perf_counter() - self.start)
+
+
 class FunctionCacher:
-    def __init__(self, cache_instance: OurOwnCache, ttl: int):
+    """
+    Caches the results of a function in the backend of `cache_instance`, and optionally in
+        the memory of the process too.
+
+    The values are stored along with when they expire and how long they took to compute,
+        for `ttl + stale_ttl` seconds. A missing, stale, or soon expiring, value is computed
+        by a single caller holding a short lock in the backend:
+
+    - while waiting for a missing value, the other callers poll the backend for it, and
+        compute it themselves if it doesn't show up within `lock_timeout`
+    - the other callers keep getting the stale or soon expiring value meanwhile
+    """
+
+    def __init__(
+        self,
+        cache_instance: OurOwnCache,
+        ttl: int,
+        stale_ttl: int = 0,
+        local_ttl: float = 0,
+        lock_timeout: float = DEFAULT_LOCK_TIMEOUT,
+        beta: float = 1.0,
+    ):
         self.cache_instance = cache_instance
         self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.local_ttl = local_ttl
+        self.lock_timeout = lock_timeout
+        self.beta = beta
 
     def __call__(self, func) -> Callable:
         if asyncio.iscoroutinefunction(func):
             return self.cache_async_function(func)
         return self.cache_synchronous_function(func)
 
+    def generate_key(self, func, args, kwargs) -> str:
+        func_name = make_hash_sha256(func.__name__)
+        tupled_args = make_hash_sha256(args)
+        frozen_kwargs = make_hash_sha256(kwargs)
+        return ":".join(
+            ["cache", f"v{CACHE_KEY_VERSION}", func_name, tupled_args, frozen_kwargs]
+        )
+
+    def _get_local_cache(self) -> LocalCache | None:
+        if self.local_ttl <= 0:
+            return None
+        return self.cache_instance.get_local_cache()
+
+    def _get_entry(self, key: str) -> CacheEntry | None:
+        entry = CacheEntry.from_cached(self.cache_instance.get_backend().get(key))
+        if entry is None or time.time() >= entry.expires_at + self.stale_ttl:
+            return None
+        return entry
+
+    def _serve(self, key: str, entry: CacheEntry) -> Any:
+        local_cache = self._get_local_cache()
+        if local_cache is not None:
+            # the local copy never outlives the fresh value
+            local_ttl = min(self.local_ttl, entry.expires_at - time.time())
+            if local_ttl > 0:
+                local_cache.set(key, local_ttl, entry.value)
+        return entry.value
+
+    def _lookup(self, key: str, lookup: _Lookup) -> tuple[Any, str | None]:
+        """
+        Returns the value to serve right away, if any, or the token of the lock to compute
+            it with, if acquired. Callers getting neither have to wait for the value.
+        """
+        local_cache = self._get_local_cache()
+        if local_cache is not None:
+            value = local_cache.get(key)
+            if value is not NO_VALUE:
+                lookup.result = "local_hit"
+                return value, None
+
+        entry = self._get_entry(key)
+        if entry is not None and not entry.should_refresh(time.time(), self.beta):
+            lookup.result = "hit"
+            return self._serve(key, entry), None
+
+        token = self.cache_instance.get_backend().acquire_lock(
+            self._lock_key(key), self.lock_timeout
+        )
+        if token is not None:
+            lookup.result = "miss" if entry is None else "refresh"
+            return NO_VALUE, token
+        if entry is not None:
+            # someone else is refreshing it
+            lookup.result = "stale" if time.time() >= entry.expires_at else "hit"
+            return entry.value, None
+        lookup.result = "wait"
+        return NO_VALUE, None
+
+    def _poll(self, key: str, lookup: _Lookup) -> tuple[Any, str | None]:
+        """Checks once whether the value being waited on is there, or the lock is free."""
+        entry = self._get_entry(key)
+        if entry is not None:
+            return self._serve(key, entry), None
+        token = self.cache_instance.get_backend().acquire_lock(
+            self._lock_key(key), self.lock_timeout
+        )
+        if token is not None:
+            lookup.result = "miss"
+        return NO_VALUE, token
+
+    def _lock_key(self, key: str) -> str:
+        return f"{key}:lock"
+
+    def _store(self, key: str, value: Any, delta: float):
+        entry = CacheEntry(value, time.time() + self.ttl, delta)
+        self.cache_instance.get_backend().set(
+            key, self.ttl + self.stale_ttl, list(entry)
+        )
+        self._serve(key, entry)
+
+    def _release(self, key: str, token: str | None):
+        if token is not None:
+            self.cache_instance.get_backend().release_lock(self._lock_key(key), token)
+
     def cache_synchronous_function(self, func: Callable) -> Callable:
+        function_name = f"{func.__module__}.{func.__qualname__}"
+
         @wraps(func)
         def wrapped(*args, **kwargs):
-            key = self.generate_key(func, args, kwargs)
-            value = self.cache_instance.get_backend().get(key)
-            if value is not NO_VALUE:
-                return value
-            result = func(*args, **kwargs)
-            self.cache_instance.get_backend().set(key, self.ttl, result)
-            return result
+            with _Lookup(function_name) as lookup:
+                key = self.generate_key(func, args, kwargs)
+                value, token = self._lookup(key, lookup)
+                if value is not NO_VALUE:
+                    return value
+                deadline = time.monotonic() + self.lock_timeout
+                while token is None and time.monotonic() < deadline:
+                    time.sleep(LOCK_POLL_INTERVAL)
+                    value, token = self._poll(key, lookup)
+                    if value is not NO_VALUE:
+                        return value
+                try:
+                    start = time.perf_counter()
+                    result = func(*args, **kwargs)
+                    self._store(key, result, time.perf_counter() - start)
+                    return result
+                finally:
+                    self._release(key, token)
 
         return wrapped
 
-    def generate_key(self, func, args, kwargs) -> str:
-        func_name = make_hash_sha256(func.__name__)
-        tupled_args = make_hash_sha256(args)
-        frozen_kwargs = make_hash_sha256(kwargs)
-        return ":".join(["cache", func_name, tupled_args, frozen_kwargs])
-
     def cache_async_function(self, func: Callable) -> Callable:
+        function_name = f"{func.__module__}.{func.__qualname__}"
+
         @wraps(func)
         async def wrapped(*args, **kwargs):
-            key = self.generate_key(func, args, kwargs)
-            value = self.cache_instance.get_backend().get(key)
-            if value is not NO_VALUE:
-                return value
-            result = await func(*args, **kwargs)
-            self.cache_instance.get_backend().set(key, self.ttl, result)
-            return result
+            with _Lookup(function_name) as lookup:
+                key = self.generate_key(func, args, kwargs)
+                value, token = self._lookup(key, lookup)
+                if value is not NO_VALUE:
+                    return value
+                deadline = time.monotonic() + self.lock_timeout
+                while token is None and time.monotonic() < deadline:
+                    await asyncio.sleep(LOCK_POLL_INTERVAL)
+                    value, token = self._poll(key, lookup)
+                    if value is not NO_VALUE:
+                        return value
+                try:
+                    start = time.perf_counter()
+                    result = await func(*args, **kwargs)
+                    self._store(key, result, time.perf_counter() - start)
+                    return result
+                finally:
+                    self._release(key, token)
 
         return wrapped
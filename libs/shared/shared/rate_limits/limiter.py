@@ -0,0 +1,271 @@
+"""
+Rate limiting of requests by user, IP, owner or upload token.
+
+Every check is a single atomic operation of the backend: with Redis, one Lua
+script that reads, decides and records the request in one round-trip. Two
+requests checking the same key at the same time can't both see the last
+remaining slot, so the limit is never overshot.
+
+Two algorithms are available:
+
+- a sliding window, allowing `limit` requests in any `window` seconds
+- a token bucket, holding up to `limit` tokens and refilling at `limit` tokens
+  per `window` seconds, which allows bursts of up to `limit` requests
+"""
+
+import hashlib
+import logging
+import math
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from enum import Enum
+from functools import cache
+
+from redis import Redis, RedisError
+
+from shared.helpers.redis import get_redis_connection
+
+log = logging.getLogger(__name__)
+
+RATE_LIMIT_KEY_PREFIX = "rate_limit"
+
+
+class RateLimitAlgorithm(Enum):
+    sliding_window = "sliding_window"
+    token_bucket = "token_bucket"
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    limit: int
+    window: int  # in seconds
+    algorithm: RateLimitAlgorithm = RateLimitAlgorithm.sliding_window
+
+    @property
+    def window_ms(self) -> int:
+        return self.window * 1000
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int  # in seconds, 0 when the request is allowed
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """The headers telling the client about the rate limit."""
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(self.retry_after)
+        return headers
+
+
+def _retry_after_seconds(retry_after_ms: int) -> int:
+    return max(1, math.ceil(retry_after_ms / 1000))
+
+
+def user_key(scope: str, user_id: int) -> str:
+    return f"{RATE_LIMIT_KEY_PREFIX}:{scope}:user:{user_id}"
+
+
+def ip_key(scope: str, ip: str) -> str:
+    return f"{RATE_LIMIT_KEY_PREFIX}:{scope}:ip:{ip}"
+
+
+def owner_key(scope: str, ownerid: int) -> str:
+    return f"{RATE_LIMIT_KEY_PREFIX}:{scope}:owner:{ownerid}"
+
+
+def upload_token_key(scope: str, token: str) -> str:
+    # upload tokens are secrets, so only a digest of them ends up in the keys
+    digest = hashlib.sha256(str(token).encode()).hexdigest()[:32]
+    return f"{RATE_LIMIT_KEY_PREFIX}:{scope}:token:{digest}"
+
+
+class BaseRateLimitBackend:
+    """
+    This is the interface a class needs to honor in order to work as a backend.
+
+    `check` records a request for `key` if the rate limit allows it, and must
+    do both atomically.
+    """
+
+    def check(self, key: str, rate_limit: RateLimit) -> RateLimitResult:
+        raise NotImplementedError()
+
+
+# Both scripts take the time from the Redis server, so that all the clients
+# checking a key agree on it. They return {allowed, remaining, retry_after_ms}.
+SLIDING_WINDOW_SCRIPT = """
+if redis.replicate_commands then
+    redis.replicate_commands()
+end
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local time = redis.call("TIME")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+redis.call("ZREMRANGEBYSCORE", key, "-inf", now - window)
+local count = redis.call("ZCARD", key)
+if count < limit then
+    redis.call("ZADD", key, now, ARGV[3])
+    redis.call("PEXPIRE", key, window)
+    return {1, limit - count - 1, 0}
+end
+local oldest = redis.call("ZRANGE", key, 0, 0, "WITHSCORES")
+return {0, 0, tonumber(oldest[2]) + window - now}
+"""
+
+TOKEN_BUCKET_SCRIPT = """
+if redis.replicate_commands then
+    redis.replicate_commands()
+end
+local key = KEYS[1]
+local capacity = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local time = redis.call("TIME")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local bucket = redis.call("HMGET", key, "tokens", "ts")
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * capacity / window)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = math.ceil((1 - tokens) * window / capacity)
+end
+redis.call("HSET", key, "tokens", tostring(tokens), "ts", now)
+redis.call("PEXPIRE", key, window)
+return {allowed, math.floor(tokens), retry_after}
+"""
+
+
+class RedisRateLimitBackend(BaseRateLimitBackend):
+    def __init__(self, redis_connection: Redis):
+        self.redis_connection = redis_connection
+        # the scripts are loaded on first use, and then run by their sha
+        self._scripts = {
+            RateLimitAlgorithm.sliding_window: redis_connection.register_script(
+                SLIDING_WINDOW_SCRIPT
+            ),
+            RateLimitAlgorithm.token_bucket: redis_connection.register_script(
+                TOKEN_BUCKET_SCRIPT
+            ),
+        }
+
+    def check(self, key: str, rate_limit: RateLimit) -> RateLimitResult:
+        args = [rate_limit.limit, rate_limit.window_ms]
+        if rate_limit.algorithm == RateLimitAlgorithm.sliding_window:
+            # the member of the request in the window
+            args.append(uuid.uuid4().hex)
+        try:
+            allowed, remaining, retry_after_ms = self._scripts[rate_limit.algorithm](
+                keys=[key], args=args
+            )
+        except RedisError:
+            # not being able to rate limit should not take the service down
+            log.warning(
+                "Unable to check rate limit on redis", extra={"key": key}, exc_info=True
+            )
+            return RateLimitResult(
+                allowed=True, limit=rate_limit.limit, remaining=0, retry_after=0
+            )
+        return RateLimitResult(
+            allowed=bool(allowed),
+            limit=rate_limit.limit,
+            remaining=int(remaining),
+            retry_after=0 if allowed else _retry_after_seconds(int(retry_after_ms)),
+        )
+
+
+class InMemoryRateLimitBackend(BaseRateLimitBackend):
+    """
+    Keeps the rate limits in the memory of the process, with the same
+    algorithms as the Redis backend. Meant for tests and local development.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._windows: dict[str, deque[int]] = {}
+        self._buckets: dict[str, tuple[float, int]] = {}
+
+    def _now_ms(self) -> int:
+        return int(self.clock() * 1000)
+
+    def check(self, key: str, rate_limit: RateLimit) -> RateLimitResult:
+        with self._lock:
+            if rate_limit.algorithm == RateLimitAlgorithm.sliding_window:
+                allowed, remaining, retry_after_ms = self._sliding_window(
+                    key, rate_limit
+                )
+            else:
+                allowed, remaining, retry_after_ms = self._token_bucket(key, rate_limit)
+        return RateLimitResult(
+            allowed=allowed,
+            limit=rate_limit.limit,
+            remaining=remaining,
+            retry_after=0 if allowed else _retry_after_seconds(retry_after_ms),
+        )
+
+    def _sliding_window(self, key: str, rate_limit: RateLimit):
+        now = self._now_ms()
+        window = self._windows.setdefault(key, deque())
+        while window and window[0] <= now - rate_limit.window_ms:
+            window.popleft()
+        if len(window) < rate_limit.limit:
+            window.append(now)
+            return True, rate_limit.limit - len(window), 0
+        return False, 0, window[0] + rate_limit.window_ms - now
+
+    def _token_bucket(self, key: str, rate_limit: RateLimit):
+        now = self._now_ms()
+        capacity, window = rate_limit.limit, rate_limit.window_ms
+        tokens, ts = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + max(0, now - ts) * capacity / window)
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            return True, math.floor(tokens - 1), 0
+        self._buckets[key] = (tokens, now)
+        return False, 0, math.ceil((1 - tokens) * window / capacity)
+
+
+class RateLimiter:
+    def __init__(self, backend: BaseRateLimitBackend, rate_limit: RateLimit):
+        self.backend = backend
+        self.rate_limit = rate_limit
+
+    def check(self, key: str) -> RateLimitResult:
+        """Records a request for `key`, returning whether it is allowed."""
+        result = self.backend.check(key, self.rate_limit)
+        if not result.allowed:
+            log.warning(
+                "Rate limit reached",
+                extra={
+                    "key": key,
+                    "limit": self.rate_limit.limit,
+                    "window": self.rate_limit.window,
+                },
+            )
+        return result
+
+
+@cache
+def get_rate_limit_backend() -> BaseRateLimitBackend:
+    """The backend of the process, sharing its Redis connection and scripts."""
+    return RedisRateLimitBackend(get_redis_connection())
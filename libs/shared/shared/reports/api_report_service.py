@@ -1,17 +1,44 @@
 import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from functools import cache
+from typing import Any
 
 import sentry_sdk
 from django.utils.functional import cached_property
 
 from shared.api_archive.archive import ArchiveService
+from shared.config import get_config
 from shared.django_apps.core.models import Commit
 from shared.helpers.flag import Flag
+from shared.metrics import Counter, Gauge
+from shared.reports.directory_tree import directory_tree_fingerprint
 from shared.reports.readonly import ReadOnlyReport as SharedReadOnlyReport
 from shared.reports.resources import Report
 from shared.storage.exceptions import FileNotInStorageError
 
 log = logging.getLogger(__name__)
 
+PARSED_REPORT_CACHE_LOOKUPS = Counter(
+    "api_parsed_report_cache_lookups",
+    "Lookups of parsed commit reports in the cache of the process",
+    ["report_class", "result"],  # hit, wait, miss
+)
+PARSED_REPORT_CACHE_EVICTIONS = Counter(
+    "api_parsed_report_cache_evictions",
+    "Parsed commit reports dropped from the cache of the process",
+    ["reason"],  # size, outdated
+)
+PARSED_REPORT_CACHE_SIZE = Gauge(
+    "api_parsed_report_cache_size_bytes",
+    "Estimated memory used by the parsed commit reports in the cache of the process",
+)
+
+DEFAULT_PARSED_REPORT_CACHE_MAX_SIZE = 256 * 1024 * 1024
+# A parsed report takes roughly this many times the size of its chunks in memory
+PARSED_REPORT_SIZE_RATIO = 4
+
 
 class ReportMixin:
     @cached_property
@@ -40,14 +67,10 @@ class ReadOnlyReport(ReportMixin, SharedReadOnlyReport):
     pass
 
 
-@sentry_sdk.trace
-def build_report_from_commit(commit: Commit, report_class=None):
-    """
-    Builds a `shared.reports.resources.Report` from a given commit.
-    """
-
+def _build_report_from_commit(commit: Commit, report_class) -> tuple[Any, int]:
+    """The report of `commit` if any, and an estimate of its size in memory."""
     if not commit.report:
-        return None
+        return None, 0
 
     files = commit.report["files"]
     sessions = commit.report["sessions"]
@@ -60,10 +83,149 @@ def build_report_from_commit(commit: Commit, report_class=None):
             "File for chunks not found in storage",
             extra={"commit": commit.commitid, "repo": commit.repository_id},
         )
-        return None
+        return None, 0
 
     if report_class is None:
         report_class = SerializableReport
-    return report_class.from_chunks(
+    report = report_class.from_chunks(
         chunks=chunks, files=files, sessions=sessions, totals=totals
     )
+    return report, len(chunks) * PARSED_REPORT_SIZE_RATIO
+
+
+@sentry_sdk.trace
+def build_report_from_commit(commit: Commit, report_class=None):
+    """
+    Builds a `shared.reports.resources.Report` from a given commit.
+    """
+    report, _size = _build_report_from_commit(commit, report_class)
+    return report
+
+
+class ParsedReportCache:
+    """
+    A process-wide LRU of parsed commit reports, bounded by their estimated size.
+
+    Reports are cached by commit and report class, along with the version of the report
+    they were parsed from. Every write of the report of a commit changes its sessions,
+    so the first lookup after that parses the new version, which replaces the previous
+    one. That version, a fingerprint of the commit totals and report sessions, is all
+    that keeps the cached reports fresh: uploads are processed by the worker, which
+    can't reach the caches of the API processes to invalidate them.
+
+    The reports are shared by all the requests of the process, so they must never be
+    changed. A report is loaded by a single request at a time: the others looking it up
+    meanwhile wait for it instead of parsing it again.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.size = 0
+        self._entries: OrderedDict[tuple, tuple[Any, int]] = OrderedDict()
+        # the version of the report of each commit in `_entries`
+        self._versions: dict[tuple, str] = {}
+        self._loading: dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: tuple, version: str) -> Any:
+        if self._versions.get(key) != version:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key][0]
+
+    def _pop(self, key: tuple, reason: str):
+        _report, size = self._entries.pop(key)
+        del self._versions[key]
+        self.size -= size
+        PARSED_REPORT_CACHE_EVICTIONS.labels(reason=reason).inc()
+
+    def _set(self, key: tuple, version: str, report: Any, size: int):
+        if key in self._entries:
+            self._pop(key, "outdated")
+        self._entries[key] = (report, size)
+        self._versions[key] = version
+        self.size += size
+        while self.size > self.max_size:
+            self._pop(next(iter(self._entries)), "size")
+        PARSED_REPORT_CACHE_SIZE.set(self.size)
+
+    def get_or_load(
+        self, key: tuple, version: str, load: Callable[[], tuple[Any, int]]
+    ) -> Any:
+        """
+        The report cached for `key` at `version`, or the one returned by `load()`,
+        which is cached unless it is missing or larger than the cache.
+        """
+        with self._lock:
+            report = self._get(key, version)
+            if report is not None:
+                PARSED_REPORT_CACHE_LOOKUPS.labels(
+                    report_class=key[-1], result="hit"
+                ).inc()
+                return report
+            loading = self._loading.setdefault((key, version), threading.Lock())
+
+        with loading:
+            with self._lock:
+                report = self._get(key, version)
+            if report is not None:
+                PARSED_REPORT_CACHE_LOOKUPS.labels(
+                    report_class=key[-1], result="wait"
+                ).inc()
+                return report
+
+            PARSED_REPORT_CACHE_LOOKUPS.labels(
+                report_class=key[-1], result="miss"
+            ).inc()
+            try:
+                report, size = load()
+                if report is not None and size <= self.max_size:
+                    with self._lock:
+                        self._set(key, version, report, size)
+            finally:
+                with self._lock:
+                    self._loading.pop((key, version), None)
+            return report
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self.size = 0
+            PARSED_REPORT_CACHE_SIZE.set(self.size)
+
+
+def get_parsed_report_cache_config() -> dict:
+    return get_config("services", "parsed_report_cache", default={})
+
+
+@cache
+def get_parsed_report_cache(max_size: int) -> ParsedReportCache:
+    return ParsedReportCache(max_size)
+
+
+@sentry_sdk.trace
+def get_cached_report_from_commit(commit: Commit, report_class=None):
+    """
+    The report of `commit`, like `build_report_from_commit`, but shared with the other
+    requests of the process when the parsed report cache is enabled.
+
+    The report must never be changed: use `build_report_from_commit` to get a report to
+    change, e.g. to `apply_diff` to it.
+    """
+    cache_config = get_parsed_report_cache_config()
+    if not cache_config.get("enabled"):
+        return build_report_from_commit(commit, report_class)
+
+    if report_class is None:
+        report_class = SerializableReport
+    parsed_reports = get_parsed_report_cache(
+        cache_config.get("max_size", DEFAULT_PARSED_REPORT_CACHE_MAX_SIZE)
+    )
+    return parsed_reports.get_or_load(
+        (commit.repository_id, commit.commitid, report_class.__name__),
+        directory_tree_fingerprint(
+            commit.totals, (commit.report or {}).get("sessions")
+        ),
+        lambda: _build_report_from_commit(commit, report_class),
+    )
@@ -3,7 +3,7 @@ import re
 from collections.abc import Mapping, Sequence
 
 from shared.reports.resources import Report
-from shared.utils.match import Matcher
+from shared.utils.match import get_matcher
 from shared.utils.sessions import SessionType
 
 log = logging.getLogger(__name__)
@@ -43,9 +43,13 @@ def generate_carryforward_report(
     The sessions that are matching the `flags` are being flagged as `carriedforward`,
     and other sessions are removed from the report."""
     if paths:
-        matcher = Matcher(paths)
+        filenames = list(report._files.keys())
         files_to_delete = {
-            filename for filename in report._files.keys() if not matcher.match(filename)
+            filename
+            for filename, matched in zip(
+                filenames, get_matcher(paths).match_many(filenames)
+            )
+            if not matched
         }
         for filename in files_to_delete:
             del report[filename]
@@ -0,0 +1,212 @@
+"""
+A compact tree of the directories of a report, with the totals of every file
+and the totals of every directory aggregated from the files below it.
+
+File browsers list one directory at a time: with the tree, that is a lookup of
+the directory's node and its children instead of a walk over all the files of
+the report. The tree is built once when a report is saved, and stored next to
+its chunks (see `ArchiveService.write_directory_tree`).
+
+Nodes are plain lists and dicts so that the tree (de)serializes cheaply:
+
+- a file is its `ReportTotals` as a list
+- a directory is `{"t": [lines, hits, misses, partials], "c": {name: node}}`
+
+Children keep the order their first file has in the report.
+"""
+
+import hashlib
+import logging
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any
+
+import orjson
+
+from shared.config import get_config
+from shared.reports.types import ReportTotals
+from shared.utils.match import get_matcher
+
+log = logging.getLogger(__name__)
+
+# Bump this whenever the format of the nodes changes, so that the trees stored
+# by the previous version are rebuilt instead of being read
+DIRECTORY_TREE_VERSION = 1
+
+Node = list | dict[str, Any]
+
+
+def directory_trees_enabled() -> bool:
+    return bool(get_config("services", "directory_trees", "enabled", default=False))
+
+
+def directory_tree_name(flags: Sequence[str] | None = None) -> str:
+    """The name the tree of a report, filtered by `flags`, is stored under."""
+    if not flags:
+        return "report"
+    digest = hashlib.sha256(orjson.dumps(sorted(set(flags)))).hexdigest()
+    return f"flags_{digest[:32]}"
+
+
+def directory_tree_fingerprint(
+    commit_totals: dict | None, sessions: dict | None
+) -> str:
+    """
+    Identifies the report a tree was built from by the totals of its commit and
+    the sessions of its report, as stored in `commit.report["sessions"]`.
+
+    The totals alone can stay the same when the report changes, e.g. when a
+    carried forward session is replaced by an upload with the same coverage,
+    but every write of the report changes its sessions.
+    """
+    serialized = orjson.dumps(
+        {"totals": commit_totals, "sessions": sessions}, option=orjson.OPT_SORT_KEYS
+    )
+    return hashlib.sha256(serialized).hexdigest()
+
+
+def _new_dir() -> dict[str, Any]:
+    return {"t": [0, 0, 0, 0], "c": {}}
+
+
+def is_file_node(node: Node) -> bool:
+    return isinstance(node, list)
+
+
+class DirectoryTree:
+    def __init__(self, root: dict[str, Any] | None = None, fingerprint: str = ""):
+        self.root = root if root is not None else _new_dir()
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def build(
+        cls, files: Iterable[tuple[str, ReportTotals]], fingerprint: str = ""
+    ) -> "DirectoryTree":
+        """Builds the tree of `files`, pairs of a path and the totals of that file."""
+        tree = cls(fingerprint=fingerprint)
+        for path, totals in files:
+            tree._add(path, totals)
+        return tree
+
+    @classmethod
+    def from_report(cls, report, fingerprint: str = "") -> "DirectoryTree":
+        """
+        Builds the tree of a `Report`. Only the file totals of the report are
+        needed, so none of its chunks are parsed.
+        """
+        return cls.build(
+            ((path, report.get_file_totals(path)) for path in report.files),
+            fingerprint,
+        )
+
+    def _add(self, path: str, totals: ReportTotals | None):
+        if totals is None:
+            totals = ReportTotals.default_totals()
+        *dirnames, filename = path.split("/")
+        parents = [self.root]
+        node = self.root
+        for dirname in dirnames:
+            child = node["c"].get(dirname)
+            if child is None:
+                child = node["c"][dirname] = _new_dir()
+            elif is_file_node(child):
+                log.warning("Path conflicts with another file", extra={"path": path})
+                return
+            node = child
+            parents.append(node)
+        if filename in node["c"]:
+            log.warning("Path conflicts with another file", extra={"path": path})
+            return
+
+        node["c"][filename] = list(totals.astuple())
+        for parent in parents:
+            parent_totals = parent["t"]
+            parent_totals[0] += totals.lines or 0
+            parent_totals[1] += totals.hits or 0
+            parent_totals[2] += totals.misses or 0
+            parent_totals[3] += totals.partials or 0
+
+    def serialize(self) -> bytes:
+        return orjson.dumps(
+            {
+                "version": DIRECTORY_TREE_VERSION,
+                "fingerprint": self.fingerprint,
+                "root": self.root,
+            }
+        )
+
+    @classmethod
+    def deserialize(cls, data: bytes | str) -> "DirectoryTree | None":
+        """The serialized tree, or `None` if it was stored by another version."""
+        content = orjson.loads(data)
+        if content.get("version") != DIRECTORY_TREE_VERSION:
+            return None
+        return cls(content["root"], content["fingerprint"])
+
+    def node(self, path: str | None = None) -> Node | None:
+        """The node at `path` (the root when empty), if there is one."""
+        node = self.root
+        if not path:
+            return node
+        for name in path.split("/"):
+            if is_file_node(node):
+                return None
+            node = node["c"].get(name)
+            if node is None:
+                return None
+        return node
+
+    def children(self, path: str | None = None) -> list[tuple[str, Node]]:
+        """The full paths and nodes of the direct children of the directory at `path`."""
+        node = self.node(path)
+        if node is None or is_file_node(node):
+            return []
+        prefix = f"{path}/" if path else ""
+        return [(f"{prefix}{name}", child) for name, child in node["c"].items()]
+
+    def iter_files(self, path: str | None = None) -> Iterator[tuple[str, list]]:
+        """The full paths and nodes of all the files at or below `path`."""
+        node = self.node(path)
+        if node is None:
+            return
+        if is_file_node(node):
+            yield path, node
+            return
+        stack = [(f"{path}/" if path else "", iter(node["c"].items()))]
+        while stack:
+            prefix, children = stack[-1]
+            for name, child in children:
+                if is_file_node(child):
+                    yield f"{prefix}{name}", child
+                else:
+                    stack.append((f"{prefix}{name}/", iter(child["c"].items())))
+                    break
+            else:
+                stack.pop()
+
+    def files(self) -> list[str]:
+        return [path for path, _node in self.iter_files()]
+
+    def filter(self, paths: Sequence[str] | None) -> "DirectoryTree":
+        """The tree of the files matching the `paths` patterns."""
+        if not paths:
+            return self
+        file_nodes = dict(self.iter_files())
+        return DirectoryTree.build(
+            (
+                (path, self.totals(file_nodes[path]))
+                for path in get_matcher(paths).filter(file_nodes)
+            ),
+            self.fingerprint,
+        )
+
+    @staticmethod
+    def totals(node: Node) -> ReportTotals:
+        """
+        The totals of a node. Those of a directory only have the line counts,
+        which are the sum of those of the files below it.
+        """
+        if is_file_node(node):
+            return ReportTotals(*node)
+        totals = ReportTotals.default_totals()
+        totals.lines, totals.hits, totals.misses, totals.partials = node["t"]
+        return totals
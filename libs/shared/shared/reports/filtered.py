@@ -11,7 +11,7 @@ from shared.reports.diff import (
 from shared.reports.totals import get_line_totals
 from shared.reports.types import EMPTY, ReportTotals
 from shared.utils.make_network_file import make_network_file
-from shared.utils.match import Matcher
+from shared.utils.match import get_matcher
 from shared.utils.merge import get_complexity_from_sessions, merge_all
 from shared.utils.totals import agg_totals
 
@@ -96,7 +96,9 @@ class FilteredReport:
     def __init__(self, report, path_patterns, flags):
         self.report = report
         self.path_patterns = path_patterns
-        self._matcher = Matcher(path_patterns)
+        self._matcher = get_matcher(path_patterns)
+        # whether each path was included, as paths are checked over and over
+        self._included: dict[str, bool] = {}
         self.flags = flags
         self._totals = None
         self._sessions_to_include = None
@@ -121,7 +123,10 @@ class FilteredReport:
         return self._sessions_to_include
 
     def should_include(self, filename):
-        return self._matcher.match(filename)
+        included = self._included.get(filename)
+        if included is None:
+            included = self._included[filename] = self._matcher.match(filename)
+        return included
 
     @property
     def network(self):
@@ -7,7 +7,7 @@ from cc_rustyribs import FilterAnalyzer, SimpleAnalyzer, parse_report
 
 from shared.helpers.flag import Flag
 from shared.reports.resources import END_OF_HEADER, Report, ReportTotals
-from shared.utils.match import Matcher
+from shared.utils.match import get_matcher
 
 log = logging.getLogger(__name__)
 
@@ -142,11 +142,17 @@ class ReadOnlyReport:
     def get_file_totals(self, path):
         return self.inner_report.get_file_totals(path)
 
-    def filter(self, paths=None, flags=None):
+    def filter(self, paths=None, flags=None, matching_files=None):
+        """
+        The report filtered by `paths` and `flags`. `matching_files` are the
+        files matching `paths`, for callers that already matched them.
+        """
         if paths is None and flags is None:
             return self
-        matcher = Matcher(paths)
-        matching_files = {f for f in self.files if matcher.match(f)} if paths else None
+        if matching_files is None and paths:
+            matching_files = set(get_matcher(paths).filter(self.files))
+        elif not paths:
+            matching_files = None
         rust_analyzer = FilterAnalyzer(
             files=matching_files, flags=flags if flags else None
         )
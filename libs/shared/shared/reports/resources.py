@@ -1,5 +1,6 @@
 import dataclasses
 import logging
+from collections.abc import Iterator
 from copy import copy
 from typing import Any
 
@@ -18,7 +19,12 @@ from shared.utils.migrate import migrate_totals
 from shared.utils.sessions import Session, SessionType
 from shared.utils.totals import agg_totals
 
-from .serde import END_OF_CHUNK, END_OF_HEADER, serialize_report
+from .serde import (
+    END_OF_CHUNK,
+    END_OF_HEADER,
+    serialize_report,
+    serialize_report_streaming,
+)
 
 log = logging.getLogger(__name__)
 
@@ -320,6 +326,17 @@ class Report:
         """
         return serialize_report(self, with_totals)
 
+    def serialize_streaming(
+        self, with_totals=True
+    ) -> tuple[bytes, Iterator[bytes], ReportTotals | None]:
+        """
+        Serializes a report as `(report_json, chunks, totals)`, where the `chunks`
+        are lazily encoded, to be streamed into storage.
+
+        The `chunks` have to be consumed before the report is modified any further.
+        """
+        return serialize_report_streaming(self, with_totals)
+
     @sentry_sdk.trace
     def flare(self, changes=None, color=None):
         if changes is not None:
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import dataclasses
+from collections.abc import Iterable, Iterator
 from decimal import Decimal
 from fractions import Fraction
 from types import GeneratorType
@@ -29,10 +30,22 @@ def serialize_report(
 
     The `totals` is either a `ReportTotals`, or `None`, depending on the `with_totals` flag.
     """
+    report_json, chunks, totals = serialize_report_streaming(report, with_totals)
+    return (report_json, b"".join(chunks), totals)
 
-    indexed_files = list(enumerate(report._files.values()))
 
-    chunks = END_OF_CHUNK.join(_encode_chunk(file) for i, file in indexed_files)
+def serialize_report_streaming(
+    report: Report, with_totals=True
+) -> tuple[bytes, Iterator[bytes], ReportTotals | None]:
+    """
+    Like `serialize_report`, except that the `chunks` are encoded lazily, one file at a
+    time, so that they can be streamed into storage without ever holding them
+    in memory as a whole.
+
+    The `chunks` have to be consumed before the `report` is modified any further.
+    """
+
+    indexed_files = list(enumerate(report._files.values()))
 
     if with_totals:
         totals = report.totals
@@ -53,7 +66,15 @@ def serialize_report(
         option=orjson_option,
     )
 
-    return (report_json, chunks.encode(), totals)
+    return (report_json, _encode_chunks(file for _, file in indexed_files), totals)
+
+
+def _encode_chunks(files: Iterable[ReportFile]) -> Iterator[bytes]:
+    end_of_chunk = END_OF_CHUNK.encode()
+    for i, file in enumerate(files):
+        if i:
+            yield end_of_chunk
+        yield _encode_chunk(file).encode()
 
 
 def report_default(obj):
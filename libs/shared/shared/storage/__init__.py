@@ -1,7 +1,27 @@
+import os
+import tempfile
+
 from shared.config import get_config
+from shared.storage.cache import CachingStorageService, get_disk_cache
 from shared.storage.minio import MinioStorageService
 
+DEFAULT_CACHE_MAX_BYTES = 1024 * 1024 * 1024  # 1GiB
+
 
-def get_appropriate_storage_service(*_args, **_kwargs) -> MinioStorageService:
+def get_appropriate_storage_service(
+    *_args, **_kwargs
+) -> MinioStorageService | CachingStorageService:
     minio_config = get_config("services", "minio", default={})
-    return MinioStorageService(minio_config)
+    storage_service = MinioStorageService(minio_config)
+
+    cache_config = get_config("services", "storage_cache", default={})
+    if cache_config.get("enabled"):
+        disk_cache = get_disk_cache(
+            cache_config.get(
+                "directory", os.path.join(tempfile.gettempdir(), "storage_cache")
+            ),
+            cache_config.get("max_bytes", DEFAULT_CACHE_MAX_BYTES),
+        )
+        return CachingStorageService(storage_service, disk_cache)
+
+    return storage_service
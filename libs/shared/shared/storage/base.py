@@ -1,10 +1,16 @@
 from abc import ABC, abstractmethod
-from typing import BinaryIO, overload
+from collections.abc import Iterator
+from typing import BinaryIO, TypedDict, overload
 
 CHUNK_SIZE = 1024 * 32
 PART_SIZE = 1024 * 1024 * 20  # 20MiB
 
 
+class StorageObject(TypedDict):
+    name: str
+    size: int
+
+
 # Interface class for interfacing with codecov's underlying storage layer
 class BaseStorageService(ABC):
     @abstractmethod
@@ -40,7 +46,8 @@ class BaseStorageService(ABC):
         Args:
             bucket_name (str): The name of the bucket for the file to be created on
             path (str): The desired path of the file
-            data (str): The data to be written to the file
+            data (str | bytes | file-like | Iterable[bytes]): The data to be written to the file,
+                file-like objects and iterables (like generators) are streamed
             reduced_redundancy (bool): Whether a reduced redundancy mode should be used (default: {False})
             is_already_gzipped (bool): Whether the file is already gzipped (default: {False})
 
@@ -101,6 +108,67 @@ class BaseStorageService(ABC):
         """
         raise NotImplementedError()
 
+    @abstractmethod
+    def delete_files(self, bucket_name: str, paths: list[str]) -> list[bool]:
+        """Deletes a batch of files from the storage
+
+        This should be preferred over `delete_file` when deleting many files,
+        as implementations can delete many files with a single request.
+        Like `delete_file`, not all implementations tell apart files
+        that did not exist in the first place.
+
+        Args:
+            bucket_name (str): The name of the bucket the files live in
+            paths (list[str]): The paths of the files to be deleted
+
+        Raises:
+            NotImplementedError: If the current instance did not implement this method
+
+        Returns:
+            list[bool]: Whether the deletion was successful, for each of the `paths`
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def list_folder_contents(
+        self, bucket_name: str, prefix: str | None = None
+    ) -> Iterator[StorageObject]:
+        """Lists all the files whose path starts with `prefix`, recursively
+
+        The listing is lazy, so it is fine to use this on large folders.
+
+        Args:
+            bucket_name (str): The name of the bucket the files live in
+            prefix (str): The prefix of the paths to list, or `None` to list all files
+
+        Raises:
+            NotImplementedError: If the current instance did not implement this method
+
+        Returns:
+            Iterator[StorageObject]: The `name` (full path) and `size` of each file
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def get_file_etag(self, bucket_name: str, path: str) -> str:
+        """Returns the ETag of a file, without reading its contents
+
+        The ETag changes whenever the file is written again, so it can be used
+        to validate copies of the file (or of things derived from it).
+
+        Args:
+            bucket_name (str): The name of the bucket for the file lives
+            path (str): The path of the file
+
+        Raises:
+            NotImplementedError: If the current instance did not implement this method
+            FileNotInStorageError: If the file does not exist
+
+        Returns:
+            str: The ETag of the file
+        """
+        raise NotImplementedError()
+
 
 class PresignedURLService(ABC):
     @abstractmethod
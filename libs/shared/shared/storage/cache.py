@@ -0,0 +1,259 @@
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from dataclasses import dataclass
+from functools import cache
+from typing import BinaryIO, cast, overload
+
+from shared.metrics import Counter
+from shared.storage.base import (
+    CHUNK_SIZE,
+    BaseStorageService,
+    PresignedURLService,
+    StorageObject,
+)
+from shared.storage.exceptions import FileNotInStorageError
+
+STORAGE_CACHE_LOOKUPS = Counter(
+    "shared_storage_cache_lookups",
+    "Reads going through the local disk cache of the storage service",
+    ["bucket", "result"],  # hit, miss, uncacheable
+)
+
+CacheKey = tuple[str, str]
+
+
+@dataclass
+class DiskCacheEntry:
+    filename: str
+    etag: str
+    size: int
+    metadata: dict[str, str]
+
+
+class DiskCache:
+    """
+    A size-bounded directory of files downloaded from storage, evicting the least
+    recently used files first.
+
+    Each entry remembers the ETag of the file it was downloaded from, so that
+    readers can check that it is still current.
+    The index of the cache lives in memory, so every process uses a directory of
+    its own, which is removed when the process exits.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = tempfile.mkdtemp(prefix="storage_cache_", dir=directory)
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[CacheKey, DiskCacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        atexit.register(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def get(self, key: CacheKey, etag: str) -> DiskCacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.etag != etag:
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def new_file(self) -> tuple[int, str]:
+        return tempfile.mkstemp(dir=self.directory)
+
+    def set(
+        self, key: CacheKey, etag: str, filename: str, metadata: dict[str, str]
+    ) -> DiskCacheEntry | None:
+        size = os.path.getsize(filename)
+        if size > self.max_bytes:
+            return None
+
+        entry = DiskCacheEntry(
+            filename=filename, etag=etag, size=size, metadata=metadata
+        )
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = entry
+            self.size += size
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._remove(evicted)
+        return entry
+
+    def discard(self, key: CacheKey):
+        with self._lock:
+            self._discard(key)
+
+    def _discard(self, key: CacheKey):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._remove(entry)
+
+    def _remove(self, entry: DiskCacheEntry):
+        self.size -= entry.size
+        # readers that already opened the file keep reading it just fine
+        try:
+            os.unlink(entry.filename)
+        except FileNotFoundError:
+            pass
+
+
+@cache
+def get_disk_cache(directory: str, max_bytes: int) -> DiskCache:
+    return DiskCache(directory, max_bytes)
+
+
+class CachingStorageService(BaseStorageService, PresignedURLService):
+    """
+    Wraps another storage service with a read-through cache on local disk.
+
+    Every read first asks the wrapped service for the ETag of the file, and only
+    downloads the file if the cached copy is missing or outdated.
+    Writes and deletions going through this service also invalidate the cached
+    copy right away.
+    """
+
+    def __init__(self, backend: BaseStorageService, disk_cache: DiskCache):
+        self.backend = backend
+        self.disk_cache = disk_cache
+
+    def create_root_storage(self, bucket_name="archive", region="us-east-1"):
+        return self.backend.create_root_storage(bucket_name, region)
+
+    def write_file(self, bucket_name, path, data, *args, **kwargs):
+        try:
+            return self.backend.write_file(bucket_name, path, data, *args, **kwargs)
+        finally:
+            self.disk_cache.discard((bucket_name, path))
+
+    @overload
+    def read_file(
+        self,
+        bucket_name: str,
+        path: str,
+        file_obj: None = None,
+        metadata_container: dict[str, str] | None = None,
+    ) -> bytes: ...
+
+    @overload
+    def read_file(
+        self,
+        bucket_name: str,
+        path: str,
+        file_obj: BinaryIO,
+        metadata_container: dict[str, str] | None = None,
+    ) -> None: ...
+
+    def read_file(
+        self,
+        bucket_name: str,
+        path: str,
+        file_obj: BinaryIO | None = None,
+        metadata_container: dict[str, str] | None = None,
+    ) -> bytes | None:
+        key = (bucket_name, path)
+        try:
+            # the ETag is read before the file itself, so that a file written in
+            # between is cached with the older ETag and gets downloaded again
+            etag = self.backend.get_file_etag(bucket_name, path)
+        except FileNotInStorageError:
+            self.disk_cache.discard(key)
+            raise
+
+        entry = self.disk_cache.get(key, etag)
+        if entry is not None:
+            try:
+                cached_file = open(entry.filename, "rb")
+            except FileNotFoundError:
+                # evicted by another thread in the meantime
+                pass
+            else:
+                with cached_file:
+                    STORAGE_CACHE_LOOKUPS.labels(bucket_name, "hit").inc()
+                    return self._read_cached(
+                        cached_file, entry.metadata, file_obj, metadata_container
+                    )
+
+        fd, filename = self.disk_cache.new_file()
+        metadata: dict[str, str] = {}
+        try:
+            with os.fdopen(fd, "wb") as f:
+                self.backend.read_file(
+                    bucket_name,
+                    path,
+                    file_obj=f,
+                    metadata_container=metadata,
+                )
+        except BaseException:
+            os.unlink(filename)
+            raise
+
+        # the file is opened before it is added to the cache, as it can be evicted
+        # right away, which unlinks it without affecting the open file
+        with open(filename, "rb") as cached_file:
+            if self.disk_cache.set(key, etag, filename, metadata):
+                STORAGE_CACHE_LOOKUPS.labels(bucket_name, "miss").inc()
+            else:
+                # larger than the whole cache, serve it once and forget about it
+                STORAGE_CACHE_LOOKUPS.labels(bucket_name, "uncacheable").inc()
+                os.unlink(filename)
+            return self._read_cached(
+                cached_file, metadata, file_obj, metadata_container
+            )
+
+    def _read_cached(
+        self,
+        cached_file: BinaryIO,
+        metadata: dict[str, str],
+        file_obj: BinaryIO | None,
+        metadata_container: dict[str, str] | None,
+    ) -> bytes | None:
+        if metadata_container is not None:
+            metadata_container.update(metadata)
+
+        if file_obj is None:
+            return cached_file.read()
+
+        file_obj.seek(0)
+        while chunk := cached_file.read(CHUNK_SIZE):
+            file_obj.write(chunk)
+        return None
+
+    def delete_file(self, bucket_name, path):
+        try:
+            return self.backend.delete_file(bucket_name, path)
+        finally:
+            self.disk_cache.discard((bucket_name, path))
+
+    def delete_files(self, bucket_name: str, paths: list[str]) -> list[bool]:
+        try:
+            return self.backend.delete_files(bucket_name, paths)
+        finally:
+            for path in paths:
+                self.disk_cache.discard((bucket_name, path))
+
+    def list_folder_contents(
+        self, bucket_name: str, prefix: str | None = None
+    ) -> Iterator[StorageObject]:
+        return self.backend.list_folder_contents(bucket_name, prefix)
+
+    def get_file_etag(self, bucket_name: str, path: str) -> str:
+        return self.backend.get_file_etag(bucket_name, path)
+
+    def create_presigned_put(self, bucket: str, path: str, expires: int) -> str:
+        return cast(PresignedURLService, self.backend).create_presigned_put(
+            bucket, path, expires
+        )
+
+    def create_presigned_get(self, bucket: str, path: str, expires: int) -> str:
+        return cast(PresignedURLService, self.backend).create_presigned_get(
+            bucket, path, expires
+        )
@@ -1,20 +1,33 @@
-import gzip
 import importlib.metadata
+import zlib
+from collections.abc import Iterable
 from typing import IO
 
 
 class GZipStreamReader:
+    """
+    Gzip-compresses a file object on the fly, as a single gzip stream.
+    """
+
     def __init__(self, fileobj: IO[bytes]):
         self.data = fileobj
         self.bytes_compressed = 0
+        self._compressor = zlib.compressobj(wbits=31)  # 16 + 15: gzip container
+        self._buffer = b""
+        self._finished = False
 
     def read(self, size: int = -1, /) -> bytes:
-        curr_data = self.data.read(size)
-
-        if not curr_data:
-            return b""
+        while not self._finished and (size < 0 or len(self._buffer) < size):
+            curr_data = self.data.read(size)
+            if curr_data:
+                self._buffer += self._compressor.compress(curr_data)
+            else:
+                self._buffer += self._compressor.flush()
+                self._finished = True
 
-        compressed = gzip.compress(curr_data)
+        if size < 0:
+            size = len(self._buffer)
+        compressed, self._buffer = self._buffer[:size], self._buffer[size:]
         self.bytes_compressed += len(compressed)
         return compressed
 
@@ -22,6 +35,40 @@ class GZipStreamReader:
         return self.bytes_compressed
 
 
+class IteratorReader:
+    """
+    Exposes an iterable of `bytes` (like a generator) as a readable file object,
+    pulling from the iterable only as much as is being read.
+    """
+
+    def __init__(self, iterable: Iterable[bytes]):
+        self._iterator = iter(iterable)
+        self._buffer = b""
+        self.bytes_read = 0
+
+    def read(self, size: int = -1, /) -> bytes:
+        if size < 0:
+            data = self._buffer + b"".join(self._iterator)
+            self._buffer = b""
+        else:
+            pieces = [self._buffer]
+            buffered = len(self._buffer)
+            while buffered < size:
+                piece = next(self._iterator, None)
+                if piece is None:
+                    break
+                pieces.append(piece)
+                buffered += len(piece)
+            buffer = b"".join(pieces)
+            data, self._buffer = buffer[:size], buffer[size:]
+
+        self.bytes_read += len(data)
+        return data
+
+    def tell(self) -> int:
+        return self.bytes_read
+
+
 def zstd_decoded_by_default() -> bool:
     try:
         version = importlib.metadata.version("urllib3")
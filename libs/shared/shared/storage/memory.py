@@ -1,6 +1,8 @@
+import hashlib
 from collections import defaultdict
+from collections.abc import Iterator
 
-from shared.storage.base import CHUNK_SIZE, BaseStorageService
+from shared.storage.base import CHUNK_SIZE, BaseStorageService, StorageObject
 from shared.storage.exceptions import BucketAlreadyExistsError, FileNotInStorageError
 
 
@@ -17,6 +19,7 @@ class MemoryStorageService(BaseStorageService):
         self.config = config
         self.root_storage_created = False
         self.storage = defaultdict(dict)
+        self.metadata = defaultdict(dict)
 
     def create_root_storage(self, bucket_name="archive", region="us-east-1"):
         """
@@ -43,6 +46,7 @@ class MemoryStorageService(BaseStorageService):
         reduced_redundancy=False,
         *,
         is_already_gzipped: bool = False,
+        metadata: dict[str, str] | None = None,
     ):
         """
             Writes a new file with the contents of `data`
@@ -52,29 +56,39 @@ class MemoryStorageService(BaseStorageService):
         Args:
             bucket_name (str): The name of the bucket for the file to be created on
             path (str): The desired path of the file
-            data (str): The data to be written to the file
+            data (str | bytes | file-like | Iterable[bytes]): The data to be written to the file
             reduced_redundancy (bool): Whether a reduced redundancy mode should be used (default: {False})
             is_already_gzipped (bool): Whether the file is already gzipped (default: {False})
+            metadata (dict): Metadata to store along the file, returned by `read_file`
 
         Raises:
             NotImplementedError: If the current instance did not implement this method
         """
+        self.metadata[bucket_name][path] = {
+            k: v for k, v in (metadata or {}).items() if v is not None
+        }
         if isinstance(data, str):
             data = data.encode()
         if isinstance(data, bytes):
             self.storage[bucket_name][path] = data
-        else:
+        elif hasattr(data, "read"):
             # data is a file-like object
-            data.seek(0)
+            if hasattr(data, "seek"):
+                data.seek(0)
             self.storage[bucket_name][path] = data.read()
+        else:
+            # data is an iterable of bytes
+            self.storage[bucket_name][path] = b"".join(data)
         return True
 
-    def read_file(self, bucket_name, path, file_obj=None):
+    def read_file(self, bucket_name, path, file_obj=None, metadata_container=None):
         """Reads the content of a file
 
         Args:
             bucket_name (str): The name of the bucket for the file lives
             path (str): The path of the file
+            file_obj (file like): A file-like object in which to write the contents
+            metadata_container (dict): A dict that gets filled with the file metadata
 
         Raises:
             NotImplementedError: If the current instance did not implement this method
@@ -85,6 +99,8 @@ class MemoryStorageService(BaseStorageService):
         """
         try:
             data = self.storage[bucket_name][path]
+            if metadata_container is not None:
+                metadata_container.update(self.metadata[bucket_name].get(path, {}))
             if file_obj is None:
                 return data
             else:
@@ -119,6 +135,60 @@ class MemoryStorageService(BaseStorageService):
         """
         try:
             del self.storage[bucket_name][path]
+            self.metadata[bucket_name].pop(path, None)
         except KeyError:
             raise FileNotInStorageError()
         return True
+
+    def delete_files(self, bucket_name: str, paths: list[str]) -> list[bool]:
+        """Deletes a batch of files from the storage
+
+        Args:
+            bucket_name (str): The name of the bucket the files live in
+            paths (list[str]): The paths of the files to be deleted
+
+        Returns:
+            list[bool]: For each of the `paths`, whether the file existed and was deleted
+        """
+        results = []
+        for path in paths:
+            try:
+                results.append(self.delete_file(bucket_name, path))
+            except FileNotInStorageError:
+                results.append(False)
+        return results
+
+    def list_folder_contents(
+        self, bucket_name: str, prefix: str | None = None
+    ) -> Iterator[StorageObject]:
+        """Lists all the files whose path starts with `prefix`, in path order
+
+        Args:
+            bucket_name (str): The name of the bucket the files live in
+            prefix (str): The prefix of the paths to list, or `None` to list all files
+
+        Returns:
+            Iterator[StorageObject]: The `name` (full path) and `size` of each file
+        """
+        # the listing is taken upfront, so that files can be deleted while iterating
+        for path, data in sorted(self.storage[bucket_name].items()):
+            if prefix is None or path.startswith(prefix):
+                yield {"name": path, "size": len(data)}
+
+    def get_file_etag(self, bucket_name, path):
+        """Returns the ETag of a file, without reading its contents
+
+        Args:
+            bucket_name (str): The name of the bucket for the file lives
+            path (str): The path of the file
+
+        Raises:
+            FileNotInStorageError: If the file does not exist
+
+        Returns:
+            str: The MD5 of the file contents, like S3 does for single part uploads
+        """
+        try:
+            return hashlib.md5(self.storage[bucket_name][path]).hexdigest()
+        except KeyError:
+            raise FileNotInStorageError()
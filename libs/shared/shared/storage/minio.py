@@ -1,6 +1,8 @@
+import itertools
 import json
 import logging
 import os
+from collections.abc import Iterable, Iterator
 from datetime import timedelta
 from functools import cache
 from io import BytesIO
@@ -16,6 +18,7 @@ from minio.credentials.providers import (
     EnvMinioProvider,
     IamAwsProvider,
 )
+from minio.deleteobjects import DeleteObject
 from minio.error import MinioException, S3Error
 from minio.helpers import ObjectWriteResult
 from urllib3 import HTTPResponse, Retry
@@ -26,8 +29,13 @@ from shared.storage.base import (
     PART_SIZE,
     BaseStorageService,
     PresignedURLService,
+    StorageObject,
+)
+from shared.storage.compression import (
+    GZipStreamReader,
+    IteratorReader,
+    zstd_decoded_by_default,
 )
-from shared.storage.compression import GZipStreamReader, zstd_decoded_by_default
 from shared.storage.exceptions import BucketAlreadyExistsError, FileNotInStorageError
 
 log = logging.getLogger(__name__)
@@ -35,6 +43,8 @@ log = logging.getLogger(__name__)
 CONNECT_TIMEOUT = 10
 READ_TIMEOUT = 60
 
+DELETE_OBJECTS_BATCH_SIZE = 1000
+
 
 def init_minio_client(
     host: str,
@@ -195,7 +205,7 @@ class MinioStorageService(BaseStorageService, PresignedURLService):
         self,
         bucket_name: str,
         path: str,
-        data: IO[bytes] | str | bytes,
+        data: IO[bytes] | str | bytes | Iterable[bytes],
         reduced_redundancy: bool = False,
         *,
         is_already_gzipped: bool = False,  # deprecated
@@ -203,10 +213,15 @@ class MinioStorageService(BaseStorageService, PresignedURLService):
         compression_type: str | None = "zstd",
         metadata: dict[str, str] | None = None,
     ) -> ObjectWriteResult | Literal[True]:
+        # everything is streamed to storage as a multipart upload of unknown length,
+        # so `data` is never buffered (or compressed) as a whole in memory
         if isinstance(data, str):
             data = BytesIO(data.encode())
         elif isinstance(data, bytes | bytearray | memoryview):
             data = BytesIO(data)
+        elif not hasattr(data, "read"):
+            # an iterable of `bytes`, like a generator
+            data = cast(IO[bytes], IteratorReader(data))
 
         if is_already_gzipped:
             is_compressed = True
@@ -338,6 +353,37 @@ class MinioStorageService(BaseStorageService, PresignedURLService):
                 )
             raise e
 
+    def delete_files(self, bucket_name: str, paths: list[str]) -> list[bool]:
+        results: list[bool] = []
+        # S3 accepts at most 1000 keys per `DeleteObjects` request
+        for batch in itertools.batched(paths, DELETE_OBJECTS_BATCH_SIZE):
+            errors = self.minio_client.remove_objects(
+                bucket_name, [DeleteObject(path) for path in batch]
+            )
+            # `remove_objects` is lazy, the request is only sent when iterating
+            failed = {error.name for error in errors}
+            results.extend(path not in failed for path in batch)
+        return results
+
+    def list_folder_contents(
+        self, bucket_name: str, prefix: str | None = None
+    ) -> Iterator[StorageObject]:
+        for obj in self.minio_client.list_objects(
+            bucket_name, prefix=prefix, recursive=True
+        ):
+            yield {"name": cast(str, obj.object_name), "size": cast(int, obj.size)}
+
+    def get_file_etag(self, bucket_name: str, path: str) -> str:
+        try:
+            stat = self.minio_client.stat_object(bucket_name, path)
+        except S3Error as e:
+            if e.code in ("NoSuchKey", "NoSuchObject"):
+                raise FileNotInStorageError(
+                    f"File {path} does not exist in {bucket_name}"
+                )
+            raise e
+        return cast(str, stat.etag)
+
     def create_presigned_put(self, bucket: str, path: str, expires: int) -> str:
         expires_td = timedelta(seconds=expires)
         return self.minio_client.presigned_put_object(bucket, path, expires_td)
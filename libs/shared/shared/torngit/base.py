@@ -1,10 +1,18 @@
 import re
 from enum import Enum
+from functools import cached_property
 
 import httpx
 
 from shared.django_apps.core.models import Repository
 from shared.torngit.enums import Endpoints
+from shared.torngit.http_pool import get_shared_transport
+from shared.torngit.response_cache import (
+    CachedResponse,
+    ResponseCache,
+    endpoint_label,
+    get_response_cache,
+)
 from shared.torngit.response_types import ProviderPull
 from shared.typings.oauth_token_types import (
     OauthConsumerToken,
@@ -77,6 +85,10 @@ class TorngitBaseAdapter:
             timeout = httpx.Timeout(timeouts[1], connect=timeouts[0])
         else:
             timeout = httpx.Timeout(self._timeouts[1], connect=self._timeouts[0])
+        # reuse the connections of the process across clients when possible
+        transport = get_shared_transport(self.verify_ssl)
+        if transport is not None:
+            return httpx.AsyncClient(transport=transport, timeout=timeout)
         return httpx.AsyncClient(
             verify=(
                 self.verify_ssl
@@ -86,6 +98,53 @@ class TorngitBaseAdapter:
             timeout=timeout,
         )
 
+    @cached_property
+    def response_cache(self) -> ResponseCache | None:
+        return get_response_cache(self.service)
+
+    def prepare_conditional_request(
+        self, method: str, url: str, headers: dict[str, str], token: Token | None
+    ) -> tuple[str | None, CachedResponse | None]:
+        """
+        Looks up the cached response of a `GET` request, adding the headers that
+        make the request conditional on it to `headers`.
+
+        Returns the cache key of the request (`None` when it is not cacheable),
+        and the cached response if there is one.
+        """
+        if self.response_cache is None or method.upper() != "GET":
+            return None, None
+        if "If-None-Match" in headers or "If-Modified-Since" in headers:
+            # the caller is doing conditional requests of its own
+            return None, None
+        key = self.response_cache.key(token, url, headers.get("Accept"))
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            headers.update(cached.conditional_headers())
+        return key, cached
+
+    def resolve_conditional_response(
+        self,
+        key: str | None,
+        cached: CachedResponse | None,
+        url: str,
+        res: httpx.Response,
+    ) -> httpx.Response:
+        """
+        Answers a `304 Not Modified` from the cached response, or caches the
+        response of a request prepared with `prepare_conditional_request`.
+        """
+        if key is None or self.response_cache is None:
+            return res
+        endpoint = endpoint_label(url, self.slug)
+        if res.status_code == 304 and cached is not None:
+            self.response_cache.touch(key)
+            self.response_cache.record(endpoint, "hit")
+            return cached.to_response(res)
+        self.response_cache.record(endpoint, "miss" if cached is None else "stale")
+        self.response_cache.set(key, res)
+        return res
+
     def get_token_by_type(self, token_type: TokenType):
         if self._token_type_mapping.get(token_type) is not None:
             return self._token_type_mapping.get(token_type)
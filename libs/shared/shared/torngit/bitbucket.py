@@ -64,6 +64,11 @@ class Bitbucket(TorngitBaseAdapter):
             oauth_body = body
 
         token_to_use = token or self.token
+        # the cache is keyed on the URL before signing, as signatures are unique
+        cache_url = url
+        cache_key, cached_response = self.prepare_conditional_request(
+            method, cache_url, headers, token_to_use
+        )
         oauth_client = oauth1.Client(
             self._oauth_consumer_token()["key"],
             client_secret=self._oauth_consumer_token()["secret"],
@@ -100,6 +105,9 @@ class Bitbucket(TorngitBaseAdapter):
             )
         except (httpx.NetworkError, httpx.TimeoutException):
             raise TorngitServerUnreachableError("Bitbucket was not able to be reached.")
+        res = self.resolve_conditional_response(
+            cache_key, cached_response, cache_url, res
+        )
         if res.status_code == 599:
             raise TorngitServerUnreachableError(
                 "Bitbucket was not able to be reached, server timed out."
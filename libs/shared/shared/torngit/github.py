@@ -5,6 +5,7 @@ import os
 from base64 import b64decode
 from datetime import UTC, datetime
 from string import Template
+from typing import Any
 from urllib.parse import parse_qs, urlencode
 
 import httpx
@@ -32,6 +33,13 @@ from shared.torngit.exceptions import (
     TorngitServerUnreachableError,
     TorngitUnauthorizedError,
 )
+from shared.torngit.pagination import (
+    fetch_pages_in_order,
+    get_last_page,
+    get_prefetch_concurrency,
+    iter_pages,
+    set_page,
+)
 from shared.torngit.response_types import ProviderPull
 from shared.torngit.status import Status
 from shared.typings.oauth_token_types import OauthConsumerToken
@@ -640,6 +648,15 @@ class Github(TorngitBaseAdapter):
         """
         Makes a single http request to GitHub and returns the parsed response
         """
+        result, _ = await self.api_with_response(*args, token=token, **kwargs)
+        return result
+
+    async def api_with_response(
+        self, *args, token=None, **kwargs
+    ) -> tuple[Any, Response]:
+        """
+        Like `api`, but also returns the response itself, for its headers
+        """
         token_to_use = token or self.token
 
         log.info(
@@ -654,14 +671,15 @@ class Github(TorngitBaseAdapter):
         if not token_to_use:
             raise TorngitMisconfiguredCredentials()
         response = await self.make_http_call(*args, token_to_use=token_to_use, **kwargs)
-        return self._parse_response(response)
+        return self._parse_response(response), response
 
     async def paginated_api_generator(
         self, client, method, url_name, token=None, **kwargs
     ):
         """
-        Generator that requests pages from GitHub and yields each page as they come.
-        Continues to request pages while there's a link to the next page.
+        Generator that requests pages from GitHub and yields each page in order.
+        If the first page links to the last one, the remaining pages are fetched
+        concurrently, otherwise it follows the links to the next page one by one.
         """
         token_to_use = token or self.token
         if not token_to_use:
@@ -669,19 +687,36 @@ class Github(TorngitBaseAdapter):
         url = self.count_and_get_url_template(
             url_name=url_name
         ).substitute()  # counts first call
-        page = 1
-        while url:
-            args = [client, method, url]
-            response = await self.make_http_call(
-                *args, token_to_use=token_to_use, **kwargs
+        response = await self.make_http_call(
+            client, method, url, token_to_use=token_to_use, **kwargs
+        )
+        yield self._parse_response(response)
+
+        async def fetch_page(page_url: str):
+            _ = self.count_and_get_url_template(
+                url_name=url_name
+            ).substitute()  # counts subsequent calls
+            page_response = await self.make_http_call(
+                client, method, page_url, token_to_use=token_to_use, **kwargs
             )
+            return page_response
+
+        last_page = get_last_page(response)
+        if last_page is not None:
+            last_url = response.links["last"]["url"]
+            async for page_response in fetch_pages_in_order(
+                lambda page: fetch_page(set_page(last_url, page)),
+                range(2, last_page + 1),
+                get_prefetch_concurrency(response, last_page - 1),
+            ):
+                yield self._parse_response(page_response)
+            return
+
+        url = response.links.get("next", {}).get("url", "")
+        while url:
+            response = await fetch_page(url)
             yield self._parse_response(response)
             url = response.links.get("next", {}).get("url", "")
-            if page > 1:
-                _ = self.count_and_get_url_template(
-                    url_name=url_name
-                ).substitute()  # counts subsequent calls
-            page += 1
 
     def _parse_response(self, res: Response):
         if res.status_code == 204:
@@ -819,6 +854,10 @@ class Github(TorngitBaseAdapter):
         elif url.startswith(self.service_url) and self.host_header is not None:
             _headers["Host"] = self.host_header
 
+        cache_key, cached_response = self.prepare_conditional_request(
+            method, url, _headers, token_to_use
+        )
+
         kwargs = {
             "json": body if body else None,
             "headers": _headers,
@@ -946,6 +985,9 @@ class Github(TorngitBaseAdapter):
                 or res.status_code not in statuses_to_retry
                 or current_retry >= max_number_retries  # Last retry
             ):
+                res = self.resolve_conditional_response(
+                    cache_key, cached_response, url, res
+                )
                 if res.status_code == 599:
                     raise TorngitServerUnreachableError(
                         "Github was not able to be reached, server timed out."
@@ -1051,15 +1093,13 @@ class Github(TorngitBaseAdapter):
     async def get_branches(self, token=None):
         async with self.get_client() as client:
             token = self.get_token_by_type_if_none(token, TokenType.read)
+
             # https://developer.github.com/v3/repos/#list-branches
-            page = 0
-            branches = []
-            while True:
-                page += 1
+            async def fetch_page(page: int):
                 url = self.count_and_get_url_template(
                     url_name="get_branches"
                 ).substitute(slug=self.slug)
-                res = await self.api(
+                return await self.api_with_response(
                     client,
                     "get",
                     url,
@@ -1067,11 +1107,10 @@ class Github(TorngitBaseAdapter):
                     page=page,
                     token=token,
                 )
-                if len(res) == 0:
-                    break
+
+            branches = []
+            async for res in iter_pages(fetch_page, lambda res: len(res) == 100):
                 branches.extend([(b["name"], b["commit"]["sha"]) for b in res])
-                if len(res) < 100:
-                    break
             return branches
 
     async def get_branch(self, branch_name: str, token=None):
@@ -1228,12 +1267,12 @@ class Github(TorngitBaseAdapter):
 
     async def _fetch_page_of_repos_using_installation(
         self, client, page_size=100, page=1
-    ):
+    ) -> tuple[list[dict], Response]:
         # https://docs.github.com/en/rest/apps/installations?apiVersion=2022-11-28
         url = self.count_and_get_url_template(
             url_name="fetch_page_of_repos_using_installation"
         ).substitute(page_size=page_size, page=page)
-        res = await self.api(
+        res, response = await self.api_with_response(
             client,
             "get",
             url,
@@ -1253,22 +1292,21 @@ class Github(TorngitBaseAdapter):
             },
         )
 
-        return self._process_repository_page(repos)
+        return self._process_repository_page(repos), response
 
     async def _fetch_page_of_repos(
         self, client, username, token, page_size=100, page=1
-    ):
+    ) -> tuple[list[dict], Response]:
         # https://developer.github.com/v3/repos/#list-your-repositories
         if username is None:
             url = self.count_and_get_url_template(
                 url_name="fetch_page_of_repos_without_username"
             ).substitute(page_size=page_size, page=page)
-            repos = await self.api(client, "get", url, token=token)
         else:
             url = self.count_and_get_url_template(
                 url_name="fetch_page_of_repos_with_username"
             ).substitute(username=username, page_size=page_size, page=page)
-            repos = await self.api(client, "get", url, token=token)
+        repos, response = await self.api_with_response(client, "get", url, token=token)
 
         log.info(
             "Fetched page of repos",
@@ -1282,7 +1320,7 @@ class Github(TorngitBaseAdapter):
             },
         )
 
-        return self._process_repository_page(repos)
+        return self._process_repository_page(repos), response
 
     async def _get_owner_from_nodeid(self, client, token, owner_node_id: str):
         query = self.graphql.prepare(
@@ -1364,21 +1402,11 @@ class Github(TorngitBaseAdapter):
         returns list of repositories included in this integration
         """
         data = []
-        page = 0
-        page_size = 50
-        async with self.get_client() as client:
-            while True:
-                page += 1
-                repos = await self._fetch_page_of_repos_using_installation(
-                    client, page=page, page_size=page_size
-                )
-
-                data.extend(repos)
-
-                if len(repos) < page_size:
-                    break
-
-            return data
+        async for repos in self.list_repos_generator(
+            username=username, using_installation=True
+        ):
+            data.extend(repos)
+        return data
 
     async def list_repos_using_installation_generator(self, username=None):
         """
@@ -1395,23 +1423,10 @@ class Github(TorngitBaseAdapter):
         GitHub includes all visible repos through
         the same endpoint.
         """
-        token = self.get_token_by_type_if_none(token, TokenType.read)
-        page = 0
-        page_size = 50
         data = []
-        async with self.get_client() as client:
-            while True:
-                page += 1
-                repos = await self._fetch_page_of_repos(
-                    client, username, token, page=page, page_size=page_size
-                )
-
-                data.extend(repos)
-
-                if len(repos) < page_size:
-                    break
-
-            return data
+        async for repos in self.list_repos_generator(username=username, token=token):
+            data.extend(repos)
+        return data
 
     async def list_repos_generator(
         self, username=None, token=None, using_installation=False
@@ -1423,25 +1438,22 @@ class Github(TorngitBaseAdapter):
         token = self.get_token_by_type_if_none(token, TokenType.read)
         page_size = 50
         async with self.get_client() as client:
-            page = 0
-            while True:
-                page += 1
 
-                repos = (
-                    await self._fetch_page_of_repos_using_installation(
+            async def fetch_page(page: int):
+                if using_installation:
+                    return await self._fetch_page_of_repos_using_installation(
                         client, page=page, page_size=page_size
                     )
-                    if using_installation
-                    else await self._fetch_page_of_repos(
-                        client, username, token, page=page, page_size=page_size
-                    )
+                return await self._fetch_page_of_repos(
+                    client, username, token, page=page, page_size=page_size
                 )
 
+            # later pages are downloaded while the caller handles the earlier ones
+            async for repos in iter_pages(
+                fetch_page, lambda repos: len(repos) >= page_size
+            ):
                 yield repos
 
-                if len(repos) < page_size:
-                    break
-
     # GH App Installation
     async def get_gh_app_installation(self, installation_id: int) -> dict:
         """
@@ -1483,16 +1495,18 @@ class Github(TorngitBaseAdapter):
     async def list_teams(self, token=None):
         token = self.get_token_by_type_if_none(token, TokenType.admin)
         # https://developer.github.com/v3/orgs/#list-your-organizations
-        page, data = 0, []
+        data = []
         async with self.get_client() as client:
-            while True:
-                page += 1
+
+            async def fetch_page(page: int):
                 url = self.count_and_get_url_template(
                     url_name="list_teams"
                 ).substitute()
-                orgs = await self.api(client, "get", url, page=page, token=token)
-                if len(orgs) == 0:
-                    break
+                return await self.api_with_response(
+                    client, "get", url, page=page, token=token
+                )
+
+            async for orgs in iter_pages(fetch_page, lambda orgs: len(orgs) >= 30):
                 # organization names
                 for org in orgs:
                     try:
@@ -1514,8 +1528,6 @@ class Github(TorngitBaseAdapter):
                             "Unable to load organization",
                             extra={"url": organization["url"]},
                         )
-                if len(orgs) < 30:
-                    break
 
             return data
 
@@ -1534,7 +1546,8 @@ class Github(TorngitBaseAdapter):
         all_commits = []
         MAX_RESULTS_PER_PAGE = 100
         async with self.get_client() as client:
-            for page_number in [1, 2, 3]:
+
+            async def fetch_page(page_number: int):
                 url = self.count_and_get_url_template(
                     url_name="get_raw_pull_request_commits"
                 ).substitute(
@@ -1543,11 +1556,14 @@ class Github(TorngitBaseAdapter):
                     max=MAX_RESULTS_PER_PAGE,
                     page_n=page_number,
                 )
-                page_results = await self.api(client, "get", url, token=token)
-                if len(page_results):
-                    all_commits.extend(page_results)
-                if len(page_results) < MAX_RESULTS_PER_PAGE:
-                    break
+                return await self.api_with_response(client, "get", url, token=token)
+
+            async for page_results in iter_pages(
+                fetch_page,
+                lambda page_results: len(page_results) >= MAX_RESULTS_PER_PAGE,
+                max_pages=3,
+            ):
+                all_commits.extend(page_results)
         return all_commits
 
     # Webhook
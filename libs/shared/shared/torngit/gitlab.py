@@ -430,6 +430,10 @@ class Gitlab(TorngitBaseAdapter):
             body = json.dumps(body)
         url = url_concat(url_path, args).replace(" ", "%20")
 
+        cache_key, cached_response = self.prepare_conditional_request(
+            method, url, headers, token or self.token
+        )
+
         max_retries = 2
         for current_retry in range(1, max_retries + 1):
             if token or self.token:
@@ -454,6 +458,9 @@ class Gitlab(TorngitBaseAdapter):
                     extra=dict(body=logged_body, **_log),
                 )
 
+                res = self.resolve_conditional_response(
+                    cache_key, cached_response, url, res
+                )
                 if res.status_code == 599:
                     raise TorngitServerUnreachableError(
                         "Gitlab was not able to be reached, server timed out."
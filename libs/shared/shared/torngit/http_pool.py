@@ -0,0 +1,194 @@
+import asyncio
+import os
+import threading
+from importlib.util import find_spec
+
+import httpx
+
+from shared.config import get_config
+from shared.metrics import Counter, Gauge
+
+TORNGIT_HTTP_POOLS_CREATED = Counter(
+    "git_provider_http_pools_created",
+    "Connection pools created to talk to git providers",
+    ["host"],
+)
+
+TORNGIT_HTTP_POOL_REQUESTS_IN_FLIGHT = Gauge(
+    "git_provider_http_pool_requests_in_flight",
+    "Requests in flight through the connection pool to a git provider host",
+    ["host"],
+)
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30  # seconds
+
+# HTTP/2 needs the optional `h2` package (`httpx[http2]`)
+HTTP2_AVAILABLE = find_spec("h2") is not None
+
+
+def get_pool_config() -> dict:
+    return get_config("services", "torngit_http_pool", default={})
+
+
+def get_pool_limits(pool_config: dict, host: str) -> httpx.Limits:
+    host_config = {**pool_config, **pool_config.get("hosts", {}).get(host, {})}
+    return httpx.Limits(
+        max_connections=host_config.get("max_connections", DEFAULT_MAX_CONNECTIONS),
+        max_keepalive_connections=host_config.get(
+            "max_keepalive_connections", DEFAULT_MAX_KEEPALIVE_CONNECTIONS
+        ),
+        keepalive_expiry=host_config.get("keepalive_expiry", DEFAULT_KEEPALIVE_EXPIRY),
+    )
+
+
+class PoolLoop:
+    """
+    An event loop running in a thread of its own for the lifetime of the process,
+    which the pooled connections belong to.
+
+    Connections can only be used from the loop that opened them, and
+    `async_to_sync` runs every call in a new loop, so the pools live in this one
+    and the requests of the other loops are handed over to it.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, name="torngit-http-pool", daemon=True
+        )
+        self._thread.start()
+
+    async def run(self, coro):
+        """Runs `coro` in the pool loop and waits for it from the running loop."""
+        return await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(coro, self.loop)
+        )
+
+    def run_sync(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+class SharedTransport(httpx.AsyncBaseTransport):
+    """
+    Routes requests to a keep-alive connection pool per host, and outlives the
+    clients using it.
+
+    The requests are sent from the pool loop, where their responses are read in
+    full before being handed back to the loop of the client. The clients handed
+    out by `TorngitBaseAdapter.get_client` close their transport when their
+    `async with` block ends, which is a no-op here: the pools last as long as the
+    process.
+    """
+
+    def __init__(self, verify, pool_config: dict, pool_loop: PoolLoop):
+        self.verify = verify
+        self.pool_config = pool_config
+        self.pool_loop = pool_loop
+        # only used from the pool loop
+        self._pools: dict[str, httpx.AsyncHTTPTransport] = {}
+
+    def _get_pool(self, host: str) -> httpx.AsyncHTTPTransport:
+        pool = self._pools.get(host)
+        if pool is None:
+            pool = httpx.AsyncHTTPTransport(
+                verify=self.verify,
+                http2=HTTP2_AVAILABLE and self.pool_config.get("http2", True),
+                limits=get_pool_limits(self.pool_config, host),
+            )
+            self._pools[host] = pool
+            TORNGIT_HTTP_POOLS_CREATED.labels(host=host).inc()
+        return pool
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        pool = self._get_pool(host)
+        with TORNGIT_HTTP_POOL_REQUESTS_IN_FLIGHT.labels(host=host).track_inprogress():
+            response = await pool.handle_async_request(request)
+            try:
+                # still encoded, the client decodes it
+                content = b"".join([chunk async for chunk in response.stream])
+            finally:
+                await response.aclose()
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=httpx.ByteStream(content),
+            extensions={
+                key: value
+                for key, value in response.extensions.items()
+                if key in ("http_version", "reason_phrase")
+            },
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self.pool_loop.run(self._send(request))
+
+    async def aclose(self) -> None:
+        pass
+
+    async def close_pools(self) -> None:
+        pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            await pool.aclose()
+
+
+class TransportRegistry:
+    """
+    The shared transports of the process, and the loop their pools run in, which
+    are created on first use.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._pool_loop: PoolLoop | None = None
+        self._transports: dict[object, SharedTransport] = {}
+
+    def get(self, verify, pool_config: dict) -> SharedTransport:
+        with self._lock:
+            if os.getpid() != self._pid:
+                # forked from a process that had pools already (celery prefork):
+                # its pool thread is gone, and sharing its sockets would mix up
+                # both processes' requests
+                self._pool_loop = None
+                self._transports = {}
+                self._pid = os.getpid()
+            if self._pool_loop is None:
+                self._pool_loop = PoolLoop()
+            transport = self._transports.get(verify)
+            if transport is None:
+                transport = SharedTransport(verify, pool_config, self._pool_loop)
+                self._transports[verify] = transport
+            return transport
+
+    def close(self):
+        """Closes the pools and stops their loop, e.g. when shutting down."""
+        with self._lock:
+            pool_loop, self._pool_loop = self._pool_loop, None
+            transports, self._transports = self._transports, {}
+        if pool_loop is None:
+            return
+        for transport in transports.values():
+            pool_loop.run_sync(transport.close_pools())
+        pool_loop.close()
+
+
+_registry = TransportRegistry()
+
+
+def get_shared_transport(verify) -> SharedTransport | None:
+    """
+    Returns the transport shared by all the torngit clients of the process, or
+    `None` when pooling is disabled.
+    """
+    pool_config = get_pool_config()
+    if not pool_config.get("enabled", True):
+        return None
+    return _registry.get(verify, pool_config)
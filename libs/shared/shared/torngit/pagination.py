@@ -0,0 +1,117 @@
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from typing import TypeVar
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from httpx import Response
+
+T = TypeVar("T")
+
+# how many pages are fetched ahead of the page being consumed
+PAGE_PREFETCH_CONCURRENCY = 4
+# when the rate limit gets this low, pages are fetched one at a time again,
+# to leave the remaining budget to the rest of the work
+PAGE_PREFETCH_MIN_RATE_LIMIT_REMAINING = 500
+
+
+def get_last_page(response: Response) -> int | None:
+    """
+    The number of the last page of a paginated listing, from its `Link` header.
+    This is `None` for listings that aren't paginated by page number.
+    """
+    last_url = response.links.get("last", {}).get("url")
+    if not last_url:
+        return None
+    page = dict(parse_qsl(urlparse(last_url).query)).get("page")
+    return int(page) if page and page.isdigit() else None
+
+
+def set_page(url: str, page: int) -> str:
+    parsed = urlparse(url)
+    query = dict(parse_qsl(parsed.query))
+    query["page"] = str(page)
+    return urlunparse(parsed._replace(query=urlencode(query)))
+
+
+def get_prefetch_concurrency(response: Response, pages: int) -> int:
+    remaining = response.headers.get("X-RateLimit-Remaining")
+    if (
+        remaining is not None
+        and remaining.isdigit()
+        and int(remaining) - pages < PAGE_PREFETCH_MIN_RATE_LIMIT_REMAINING
+    ):
+        return 1
+    return PAGE_PREFETCH_CONCURRENCY
+
+
+async def fetch_pages_in_order(
+    fetch_page: Callable[[int], Awaitable[T]],
+    pages: Iterable[int],
+    concurrency: int = PAGE_PREFETCH_CONCURRENCY,
+) -> AsyncIterator[T]:
+    """
+    Fetches `pages` with up to `concurrency` requests in flight, yielding them in
+    order as soon as they (and all the pages before them) are available.
+
+    Pages are only fetched `concurrency` pages ahead of the consumer, and any
+    error cancels the pages still in flight.
+    """
+    remaining_pages = iter(pages)
+    in_flight: deque[asyncio.Future[T]] = deque()
+
+    def fetch_next_page():
+        page = next(remaining_pages, None)
+        if page is not None:
+            in_flight.append(asyncio.ensure_future(fetch_page(page)))
+
+    try:
+        for _ in range(max(concurrency, 1)):
+            fetch_next_page()
+        while in_flight:
+            result = await in_flight.popleft()
+            fetch_next_page()
+            yield result
+    finally:
+        for future in in_flight:
+            future.cancel()
+        await asyncio.gather(*in_flight, return_exceptions=True)
+
+
+async def iter_pages(
+    fetch_page: Callable[[int], Awaitable[tuple[T, Response]]],
+    has_next_page: Callable[[T], bool],
+    max_pages: int | None = None,
+) -> AsyncIterator[T]:
+    """
+    Yields the pages of a listing paginated by page number, in order.
+
+    The first page tells how many pages there are, and the remaining ones are
+    then fetched concurrently. Without that information, pages are fetched one
+    after the other for as long as `has_next_page` says so.
+    """
+    result, response = await fetch_page(1)
+    yield result
+
+    last_page = get_last_page(response)
+    if max_pages is not None and last_page is not None:
+        last_page = min(last_page, max_pages)
+
+    if last_page is None:
+        page = 1
+        while has_next_page(result) and (max_pages is None or page < max_pages):
+            page += 1
+            result, _ = await fetch_page(page)
+            yield result
+        return
+
+    async def fetch_result(page: int) -> T:
+        result, _ = await fetch_page(page)
+        return result
+
+    async for result in fetch_pages_in_order(
+        fetch_result,
+        range(2, last_page + 1),
+        get_prefetch_concurrency(response, last_page - 1),
+    ):
+        yield result
@@ -0,0 +1,267 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cache
+from urllib.parse import unquote, urlparse
+
+import httpx
+from redis import Redis
+from redis.exceptions import RedisError
+
+from shared.config import get_config
+from shared.helpers.redis import get_redis_connection
+from shared.metrics import Counter
+from shared.typings.oauth_token_types import Token
+
+log = logging.getLogger(__name__)
+
+TORNGIT_RESPONSE_CACHE_LOOKUPS = Counter(
+    "git_provider_response_cache_lookups",
+    "Lookups of cached git provider responses for GET requests",
+    ["service", "endpoint", "result"],  # hit, stale, miss
+)
+
+TORNGIT_RATE_LIMIT_SAVED = Counter(
+    "git_provider_rate_limit_saved",
+    "Requests answered from the response cache without using any rate limit budget",
+    ["service", "endpoint"],
+)
+
+DEFAULT_TTL = 24 * 60 * 60  # 1 day
+DEFAULT_MAX_LOCAL_ENTRIES = 512
+DEFAULT_MAX_ENTRY_BYTES = 5 * 1024 * 1024  # 5MiB
+
+# GitHub doesn't count `304 Not Modified` responses against the rate limit
+# https://docs.github.com/en/rest/using-the-rest-api/best-practices-for-using-the-rest-api#use-conditional-requests-if-appropriate
+FREE_REVALIDATION_SERVICES = {"github", "github_enterprise"}
+
+# these describe the transfer of the original response, not its (decoded) content
+_UNCACHED_HEADERS = {
+    "content-encoding",
+    "content-length",
+    "transfer-encoding",
+    "connection",
+    "set-cookie",
+}
+
+_API_PREFIX = re.compile(r"^/(api/v?\d+(\.\d+)?|v\d+)(?=/)")
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-f]{40}|[0-9a-f]{64})$")
+ENDPOINT_SEGMENTS = 3
+
+
+def endpoint_label(url: str, slug: str | None = None) -> str:
+    """
+    Turns the URL of a request into a metrics label of bounded cardinality,
+    like `/repos/:slug/commits` for `/repos/codecov/worker/commits/<sha>`.
+    """
+    path = unquote(urlparse(url).path)
+    path = _API_PREFIX.sub("", path)
+    if slug:
+        path = path.replace(f"/{slug}/", "/:slug/")
+        if path.endswith(f"/{slug}"):
+            path = path.removesuffix(slug) + ":slug"
+    segments = [
+        ":id" if _ID_SEGMENT.match(segment) else segment
+        for segment in path.strip("/").split("/")
+    ]
+    return "/" + "/".join(segments[:ENDPOINT_SEGMENTS])
+
+
+@dataclass
+class CachedResponse:
+    etag: str | None
+    last_modified: str | None
+    headers: list[tuple[str, str]]
+    content: bytes
+
+    @classmethod
+    def from_response(cls, response: httpx.Response) -> "CachedResponse":
+        return cls(
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            headers=[
+                (name, value)
+                for name, value in response.headers.items()
+                if name.lower() not in _UNCACHED_HEADERS
+            ],
+            content=response.content,
+        )
+
+    @classmethod
+    def deserialize(cls, data: bytes) -> "CachedResponse":
+        header, _, content = data.partition(b"\n")
+        fields = json.loads(header)
+        return cls(
+            etag=fields["etag"],
+            last_modified=fields["last_modified"],
+            headers=[tuple(h) for h in fields["headers"]],
+            content=content,
+        )
+
+    def serialize(self) -> bytes:
+        header = json.dumps(
+            {
+                "etag": self.etag,
+                "last_modified": self.last_modified,
+                "headers": self.headers,
+            }
+        )
+        return header.encode() + b"\n" + self.content
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self, not_modified: httpx.Response) -> httpx.Response:
+        """
+        Builds the `200` response that a `304 Not Modified` stands in for.
+
+        The headers of the `304` win over the cached ones, so that things like
+        the remaining rate limit are up to date.
+        """
+        headers = httpx.Headers(self.headers)
+        headers.update(
+            (name, value)
+            for name, value in not_modified.headers.items()
+            if name.lower() not in _UNCACHED_HEADERS
+        )
+        return httpx.Response(
+            200,
+            headers=headers,
+            content=self.content,
+            request=not_modified.request,
+        )
+
+
+class LocalResponseCache:
+    """
+    An in-process LRU of cached responses, kept in front of Redis to skip the
+    round-trip for the responses a process asks for over and over.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CachedResponse):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+@cache
+def get_local_response_cache(max_entries: int) -> LocalResponseCache:
+    return LocalResponseCache(max_entries)
+
+
+class ResponseCache:
+    """
+    Caches the responses of `GET` requests to git providers along with their
+    `ETag` / `Last-Modified` validators, so that later requests for the same URL
+    can be made conditional, and a `304 Not Modified` be answered from the cache.
+
+    Responses are cached per token scope, as what a request returns depends on
+    who is asking. The cache is best-effort: any Redis error is logged and the
+    request simply goes through unconditionally.
+    """
+
+    def __init__(
+        self,
+        service: str,
+        redis_connection: Redis,
+        local_cache: LocalResponseCache,
+        ttl: int = DEFAULT_TTL,
+        max_entry_bytes: int = DEFAULT_MAX_ENTRY_BYTES,
+    ):
+        self.service = service
+        self.redis_connection = redis_connection
+        self.local_cache = local_cache
+        self.ttl = ttl
+        self.max_entry_bytes = max_entry_bytes
+
+    def key(self, token: Token | None, url: str, accept: str | None) -> str:
+        if token is None:
+            scope = "anonymous"
+        elif token.get("entity_name"):
+            scope = token["entity_name"]
+        else:
+            scope = hashlib.sha256(token["key"].encode()).hexdigest()
+        digest = hashlib.sha256(f"{accept}|{url}".encode()).hexdigest()
+        return f"torngit_response_cache/{self.service}/{scope}/{digest}"
+
+    def get(self, key: str) -> CachedResponse | None:
+        entry = self.local_cache.get(key)
+        if entry is not None:
+            return entry
+        try:
+            data = self.redis_connection.get(key)
+        except RedisError:
+            log.warning("Failed to read cached git provider response", exc_info=True)
+            return None
+        if data is None:
+            return None
+        entry = CachedResponse.deserialize(data)
+        self.local_cache.set(key, entry)
+        return entry
+
+    def set(self, key: str, response: httpx.Response):
+        if response.status_code != 200 or not (
+            response.headers.get("ETag") or response.headers.get("Last-Modified")
+        ):
+            return
+        if len(response.content) > self.max_entry_bytes:
+            return
+        entry = CachedResponse.from_response(response)
+        self.local_cache.set(key, entry)
+        try:
+            self.redis_connection.set(key, entry.serialize(), ex=self.ttl)
+        except RedisError:
+            log.warning("Failed to cache git provider response", exc_info=True)
+
+    def touch(self, key: str):
+        try:
+            self.redis_connection.expire(key, self.ttl)
+        except RedisError:
+            log.warning("Failed to refresh cached git provider response", exc_info=True)
+
+    def record(self, endpoint: str, result: str):
+        TORNGIT_RESPONSE_CACHE_LOOKUPS.labels(
+            service=self.service, endpoint=endpoint, result=result
+        ).inc()
+        if result == "hit" and self.service in FREE_REVALIDATION_SERVICES:
+            TORNGIT_RATE_LIMIT_SAVED.labels(
+                service=self.service, endpoint=endpoint
+            ).inc()
+
+
+def get_response_cache(service: str) -> ResponseCache | None:
+    cache_config = get_config("services", "torngit_response_cache", default={})
+    if not cache_config.get("enabled"):
+        return None
+    return ResponseCache(
+        service,
+        get_redis_connection(),
+        get_local_response_cache(
+            cache_config.get("max_local_entries", DEFAULT_MAX_LOCAL_ENTRIES)
+        ),
+        ttl=cache_config.get("ttl", DEFAULT_TTL),
+        max_entry_bytes=cache_config.get("max_entry_bytes", DEFAULT_MAX_ENTRY_BYTES),
+    )
@@ -1,28 +1,63 @@
 import re
-from collections.abc import Sequence
+from collections.abc import Iterable, Sequence
+from functools import lru_cache
+
+# backreferences are numbered / named per pattern, so patterns using them can't
+# be merged with other patterns into one regex
+_BACKREFERENCE = re.compile(r"\\\d|\(\?P=")
+
+
+def compile_patterns(patterns: Iterable[str]) -> list[re.Pattern]:
+    """
+    Compiles `patterns` into as few regexes as possible, for matching a string
+    against any of them.
+
+    The patterns are merged into a single alternation, which `re` tries in one
+    call instead of one call per pattern. Patterns that can't be merged (using
+    backreferences, global inline flags, or conflicting group names) are kept
+    as regexes of their own.
+    """
+    compiled = [re.compile(pattern) for pattern in patterns]
+    mergeable = [
+        regex.pattern for regex in compiled if not _BACKREFERENCE.search(regex.pattern)
+    ]
+    if len(mergeable) < 2:
+        return compiled
+    try:
+        merged = re.compile("|".join(f"(?:{pattern})" for pattern in mergeable))
+    except re.error:
+        return compiled
+    return [merged] + [
+        regex for regex in compiled if _BACKREFERENCE.search(regex.pattern)
+    ]
+
+
+def _match_one(regexes: list[re.Pattern], s: str) -> bool:
+    return any(regex.match(s) for regex in regexes)
 
 
 class Matcher:
     def __init__(self, patterns: Sequence[str] | None):
         self._patterns = set(patterns or [])
-        self._is_initialized = False
-        # a list of patterns that will result in `True` on a match
-        self._positives: list[re.Pattern] = []
-        # a list of patterns that will result in `False` on a match
-        self._negatives: list[re.Pattern] = []
+        # (positives, negatives), compiled on first use
+        self._matchers: tuple[list[re.Pattern], list[re.Pattern]] | None = None
 
     def _get_matchers(self) -> tuple[list[re.Pattern], list[re.Pattern]]:
-        if not self._is_initialized:
+        if self._matchers is None:
+            # patterns that will result in `True` on a match
+            positives = []
+            # patterns that will result in `False` on a match
+            negatives = []
             for pattern in self._patterns:
                 if not pattern:
                     continue
                 if pattern.startswith(("^!", "!")):
-                    self._negatives.append(re.compile(pattern.replace("!", "")))
+                    negatives.append(pattern.replace("!", ""))
                 else:
-                    self._positives.append(re.compile(pattern))
-            self._is_initialized = True
+                    positives.append(pattern)
+            self._matchers = compile_patterns(positives), compile_patterns(negatives)
 
-        return self._positives, self._negatives
+        return self._matchers
 
     def match(self, s: str) -> bool:
         if not self._patterns or s in self._patterns:
@@ -31,23 +66,25 @@ class Matcher:
         positives, negatives = self._get_matchers()
 
         # must not match
-        for pattern in negatives:
-            # matched a negative search
-            if pattern.match(s):
-                return False
+        if negatives and _match_one(negatives, s):
+            return False
 
         if positives:
-            for pattern in positives:
-                # match was found
-                if pattern.match(s):
-                    return True
+            # must match one of the required patterns
+            return _match_one(positives, s)
 
-            # did not match any required paths
-            return False
+        # no positives: everything else is ok
+        return True
 
-        else:
-            # no positives: everything else is ok
-            return True
+    def match_many(self, strings: Iterable[str]) -> list[bool]:
+        """
+        Matches all of `strings`, returning whether each one of them matched.
+        """
+        return [self.match(s) for s in strings]
+
+    def filter(self, strings: Iterable[str]) -> list[str]:
+        strings = list(strings)
+        return [s for s, matched in zip(strings, self.match_many(strings)) if matched]
 
     def match_any(self, strings: Sequence[str] | None) -> bool:
         if not strings:
@@ -55,6 +92,19 @@ class Matcher:
         return any(self.match(s) for s in strings)
 
 
+@lru_cache(maxsize=256)
+def _get_matcher(patterns: frozenset[str]) -> Matcher:
+    return Matcher(patterns)
+
+
+def get_matcher(patterns: Iterable[str] | None) -> Matcher:
+    """
+    A `Matcher` for `patterns`, shared with everything else matching the same
+    patterns along with its compiled regexes.
+    """
+    return _get_matcher(frozenset(patterns or ()))
+
+
 def match(patterns: Sequence[str] | None, string: str):
     matcher = Matcher(patterns)
     return matcher.match(string)
@@ -0,0 +1,239 @@
+"""
+Memoization of the expensive steps of getting the yaml of a commit.
+
+Most commits of a repo have the exact same yaml, which is parsed and validated
+(a full Cerberus pass) every time it's fetched, and then deep-merged with the
+site and owner yamls on every task. Both results only depend on their inputs,
+so they are cached by a hash of those, and handed out as immutable objects that
+all callers share instead of copies.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from copy import deepcopy
+from functools import cache
+from typing import Any
+
+import msgpack
+from redis.exceptions import RedisError
+
+from shared.config import get_config
+from shared.helpers.redis import get_redis_connection
+from shared.metrics import Counter
+
+log = logging.getLogger(__name__)
+
+YAML_CACHE_LOOKUPS = Counter(
+    "shared_yaml_cache_lookups",
+    "Lookups of memoized validated and final user yamls",
+    ["cache", "result"],  # local_hit, redis_hit, miss
+)
+
+# Bump this whenever the validation of the yaml changes, so that the
+# documents validated by the previous version in Redis aren't used anymore
+YAML_CACHE_VERSION = 1
+
+DEFAULT_MAX_LOCAL_ENTRIES = 1024
+DEFAULT_REDIS_TTL = 24 * 60 * 60  # 1 day
+
+_MISSING = object()
+
+
+def _immutable(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} is immutable, copy it to change it")
+
+
+class FrozenDict(dict):
+    """
+    A dict that can't be changed. It is still a `dict` for everything reading it
+    (`isinstance`, `json.dumps`, comparisons), and any copy of it is a plain,
+    mutable, dict.
+    """
+
+    __setitem__ = __delitem__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+    __ior__ = _immutable
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return {deepcopy(k, memo): deepcopy(v, memo) for k, v in self.items()}
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+class FrozenList(list):
+    """The `list` counterpart of `FrozenDict`."""
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+    append = clear = extend = insert = pop = remove = reverse = sort = _immutable
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return [deepcopy(v, memo) for v in self]
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+
+def freeze(value: Any) -> Any:
+    if isinstance(value, FrozenDict | FrozenList):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(v) for v in value)
+    return value
+
+
+def hash_key(*parts: Any) -> str:
+    serialized = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+class MemoizedYamls:
+    """
+    A local LRU of frozen yamls, optionally backed by Redis so that the
+    processes of a deployment share their work.
+    """
+
+    def __init__(self, name: str, max_local_entries: int = DEFAULT_MAX_LOCAL_ENTRIES):
+        self.name = name
+        self.max_local_entries = max_local_entries
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_local(self, key: str) -> Any:
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is not _MISSING:
+                self._entries.move_to_end(key)
+            return value
+
+    def _set_local(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_local_entries:
+                self._entries.popitem(last=False)
+
+    def _redis_key(self, key: str) -> str:
+        return f"yaml_cache/{self.name}/v{YAML_CACHE_VERSION}/{key}"
+
+    def _get_redis(self, key: str) -> Any:
+        try:
+            data = get_redis_connection().get(self._redis_key(key))
+        except RedisError:
+            log.warning("Failed to read memoized yaml", exc_info=True)
+            return _MISSING
+        if data is None:
+            return _MISSING
+        return msgpack.loads(data, strict_map_key=False)
+
+    def _set_redis(self, key: str, value: Any, ttl: int):
+        try:
+            get_redis_connection().set(
+                self._redis_key(key), msgpack.dumps(value), ex=ttl
+            )
+        except RedisError:
+            log.warning("Failed to memoize yaml", exc_info=True)
+        except TypeError:
+            log.warning("Yaml can't be memoized in Redis", exc_info=True)
+
+    def get_or_compute(
+        self, key: str, compute: Callable[[], Any], redis_ttl: int | None = None
+    ) -> Any:
+        """
+        The frozen result of `compute()`, memoized by `key`. It is also stored in
+        Redis for `redis_ttl` seconds when given.
+        """
+        value = self._get_local(key)
+        if value is not _MISSING:
+            YAML_CACHE_LOOKUPS.labels(cache=self.name, result="local_hit").inc()
+            return value
+
+        if redis_ttl is not None:
+            value = self._get_redis(key)
+            if value is not _MISSING:
+                YAML_CACHE_LOOKUPS.labels(cache=self.name, result="redis_hit").inc()
+                value = freeze(value)
+                self._set_local(key, value)
+                return value
+
+        YAML_CACHE_LOOKUPS.labels(cache=self.name, result="miss").inc()
+        value = freeze(compute())
+        self._set_local(key, value)
+        if redis_ttl is not None:
+            self._set_redis(key, value, redis_ttl)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def get_yaml_cache_config() -> dict:
+    return get_config("services", "yaml_cache", default={})
+
+
+@cache
+def get_memoized_yamls(name: str, max_local_entries: int) -> MemoizedYamls:
+    return MemoizedYamls(name, max_local_entries)
+
+
+def get_validated_yaml(
+    content: str,
+    show_secrets_for: tuple | None,
+    parse_and_validate: Callable[[], dict | None],
+) -> dict | None:
+    """
+    Returns `parse_and_validate()`, the validated yaml of the raw yaml
+    `content`, memoized by `content` when the yaml cache is enabled.
+
+    Errors (like `InvalidYamlException`) aren't memoized, and yamls with
+    secrets decrypted for `show_secrets_for` are never stored in Redis.
+    """
+    cache_config = get_yaml_cache_config()
+    if not cache_config.get("enabled"):
+        return parse_and_validate()
+    key = hash_key(
+        "validated",
+        YAML_CACHE_VERSION,
+        show_secrets_for and list(show_secrets_for),
+        content,
+    )
+    redis_ttl = None
+    if cache_config.get("redis") and not (show_secrets_for and "secret:" in content):
+        redis_ttl = cache_config.get("redis_ttl", DEFAULT_REDIS_TTL)
+    memoized_yamls = get_memoized_yamls(
+        "validated",
+        cache_config.get("max_local_entries", DEFAULT_MAX_LOCAL_ENTRIES),
+    )
+    return memoized_yamls.get_or_compute(key, parse_and_validate, redis_ttl)
+
+
+def get_final_yaml_dict(
+    key_parts: tuple, merge: Callable[[], dict[str, Any]]
+) -> dict[str, Any]:
+    """
+    Returns `merge()`, the final yaml made from `key_parts`, memoized by those
+    when the yaml cache is enabled. See `UserYaml.get_final_yaml`.
+
+    These are only kept in memory: merging is cheap enough that a Redis round
+    trip wouldn't save anything.
+    """
+    cache_config = get_yaml_cache_config()
+    if not cache_config.get("enabled"):
+        return merge()
+    memoized_yamls = get_memoized_yamls(
+        "final", cache_config.get("max_local_entries", DEFAULT_MAX_LOCAL_ENTRIES)
+    )
+    return memoized_yamls.get_or_compute(hash_key("final", *key_parts), merge)
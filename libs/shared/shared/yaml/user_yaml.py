@@ -10,6 +10,7 @@ from shared.config import (
     PATCH_CENTRIC_DEFAULT_TIME_START,
     get_config,
 )
+from shared.yaml.cache import get_final_yaml_dict
 
 log = logging.getLogger(__name__)
 
@@ -150,24 +151,39 @@ class UserYaml:
             # Ownerid is kept as an arg to avoid breaking change to the interface of the function
             # Passing the info in the owner_context is preferred.
             ownerid = owner_context.ownerid if owner_context else None
-        resulting_yaml = get_config("site", default={})
+        site_yaml = get_config("site", default={})
         if ownerid is not None and get_config("additional_user_yamls", default={}):
             additional_yaml = _get_possible_additional_user_yaml(ownerid)
-            resulting_yaml = merge_yamls(resulting_yaml, additional_yaml)
-
-        if owner_context and owner_context.owner_onboarding_date:
-            resulting_yaml = _fix_yaml_defaults_based_on_owner_onboarding_date(
-                resulting_yaml, owner_context.owner_onboarding_date
+            site_yaml = merge_yamls(site_yaml, additional_yaml)
+
+        onboarding_date = owner_context.owner_onboarding_date if owner_context else None
+        repo_level_yaml = commit_yaml if commit_yaml is not None else repo_yaml
+
+        def merge():
+            resulting_yaml = site_yaml
+            if onboarding_date:
+                resulting_yaml = _fix_yaml_defaults_based_on_owner_onboarding_date(
+                    resulting_yaml, onboarding_date
+                )
+            if owner_yaml is not None:
+                resulting_yaml = merge_yamls(resulting_yaml, owner_yaml)
+            if repo_level_yaml is not None:
+                resulting_yaml = merge_yamls(resulting_yaml, repo_level_yaml)
+            return resulting_yaml
+
+        # the onboarding date only matters for which side of the patch-centric
+        # defaults cutoff it falls on
+        patch_centric_defaults = (
+            onboarding_date > PATCH_CENTRIC_DEFAULT_TIME_START
+            if onboarding_date
+            else None
+        )
+        return cls(
+            get_final_yaml_dict(
+                (site_yaml, patch_centric_defaults, owner_yaml, repo_level_yaml),
+                merge,
             )
-
-        if owner_yaml is not None:
-            resulting_yaml = merge_yamls(resulting_yaml, owner_yaml)
-
-        if commit_yaml is not None:
-            resulting_yaml = merge_yamls(resulting_yaml, commit_yaml)
-        elif repo_yaml is not None:
-            resulting_yaml = merge_yamls(resulting_yaml, repo_yaml)
-        return cls(resulting_yaml)
+        )
 
 
 def _get_possible_additional_user_yaml(ownerid):
@@ -0,0 +1,108 @@
+import random
+
+import pytest
+
+from shared.components import Component
+from shared.components.comparison import compare_components
+from shared.reports.readonly import ReadOnlyReport
+from shared.reports.resources import Report, ReportFile
+from shared.reports.types import ReportLine
+from shared.utils.sessions import Session
+
+FILE_COUNT = 20_000
+TEAMS = [f"team_{i}" for i in range(40)]
+
+
+def make_report(seed: int) -> ReadOnlyReport:
+    rng = random.Random(seed)
+    report = Report()
+    sessions = [
+        report.add_session(Session(flags=[f"{team}-{kind}"]))[0]
+        for team in TEAMS[:10]
+        for kind in ("unit", "integration")
+    ]
+    for i in range(FILE_COUNT):
+        file = ReportFile(
+            f"{rng.choice(TEAMS)}/module_{rng.randint(0, 30)}/file_{i}.{rng.choice(['py', 'go', 'ts'])}"
+        )
+        for ln in range(1, 11):
+            session = rng.choice(sessions)
+            hits = rng.randint(0, 1)
+            file.append(ln, ReportLine.create(hits, sessions=[[session, hits]]))
+        report.append(file)
+    return ReadOnlyReport.create_from_report(report)
+
+
+def make_diff(report: ReadOnlyReport) -> dict:
+    rng = random.Random(1)
+    return {
+        "files": {
+            path: {
+                "type": "modified",
+                "segments": [
+                    {"header": ["1", "5", "1", "6"], "lines": ["+", " ", "+", "+"]}
+                ],
+            }
+            for path in rng.sample(report.files, 200)
+        }
+    }
+
+
+# the components of a larger monorepo: one per team, per team and language, and
+# per team of its tests
+COMPONENTS = (
+    [
+        Component.from_dict({"component_id": team, "paths": [f"{team}/.*"]})
+        for team in TEAMS
+    ]
+    + [
+        Component.from_dict(
+            {"component_id": f"{team}-go", "paths": [f"{team}/.*\\.go"]}
+        )
+        for team in TEAMS
+    ]
+    + [
+        Component.from_dict(
+            {
+                "component_id": f"{team}-unit",
+                "paths": [f"{team}/.*"],
+                "flag_regexes": [f"{team}-unit"],
+            }
+        )
+        for team in TEAMS
+    ]
+)
+
+
+@pytest.fixture(scope="module")
+def comparison():
+    head, base = make_report(1), make_report(2)
+    return head, base, make_diff(head)
+
+
+def compare_each_component(head, base, diff, components):
+    """Filters the comparison by each component on its own, like `FilteredComparison`."""
+    results = {}
+    flag_names = list(head.flags.keys())
+    for component in components:
+        flags = component.get_matching_flags(flag_names)
+        filtered_head = head.filter(flags=flags, paths=component.paths)
+        filtered_base = base.filter(flags=flags, paths=component.paths)
+        results[component.component_id] = (
+            filtered_head.totals,
+            filtered_base.totals,
+            filtered_head.apply_diff(diff, _save=False),
+        )
+    return results
+
+
+@pytest.mark.parametrize("implementation", ["each_component", "all_components"])
+def test_compare_components(benchmark, comparison, implementation):
+    head, base, diff = comparison
+    compare = (
+        compare_each_component
+        if implementation == "each_component"
+        else compare_components
+    )
+
+    benchmark(lambda: compare(head, base, diff, COMPONENTS))
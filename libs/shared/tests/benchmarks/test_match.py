@@ -0,0 +1,80 @@
+import random
+import re
+
+import pytest
+
+from shared.utils.match import Matcher
+
+
+class LegacyMatcher:
+    """`Matcher` as it was before its patterns were merged, to compare against."""
+
+    def __init__(self, patterns):
+        patterns = set(patterns)
+        self._patterns = patterns
+        self._positives = [
+            re.compile(p) for p in patterns if p and not p.startswith(("^!", "!"))
+        ]
+        self._negatives = [
+            re.compile(p.replace("!", ""))
+            for p in patterns
+            if p.startswith(("^!", "!"))
+        ]
+
+    def match(self, s):
+        if s in self._patterns:
+            return True
+        for pattern in self._negatives:
+            if pattern.match(s):
+                return False
+        if self._positives:
+            return any(pattern.match(s) for pattern in self._positives)
+        return True
+
+
+def make_paths(count: int) -> list[str]:
+    rng = random.Random(1234)
+    dirs = ["src", "lib", "tests", "vendor", "docs", "api", "worker", "services"]
+    extensions = ["py", "go", "ts", "js", "rs"]
+    return [
+        "/".join(rng.choice(dirs) for _ in range(rng.randint(1, 4)))
+        + f"/file_{i}.{rng.choice(extensions)}"
+        for i in range(count)
+    ]
+
+
+# a components / flags setup of a larger monorepo
+PATTERNS = [f"{d}/module_{i}/.*" for d in ["src", "lib", "api"] for i in range(10)] + [
+    ".*\\.py",
+    "worker/.*",
+    "!vendor/.*",
+    "!.*_pb2\\.py",
+    "!docs/.*",
+]
+PATHS = make_paths(50_000)
+
+
+def test_matcher_matches_like_legacy():
+    assert [Matcher(PATTERNS).match(p) for p in PATHS] == [
+        LegacyMatcher(PATTERNS).match(p) for p in PATHS
+    ]
+
+
+@pytest.mark.parametrize("implementation", ["legacy", "compiled"])
+def test_match_paths(benchmark, implementation):
+    def bench_fn():
+        matcher = (
+            LegacyMatcher(PATTERNS) if implementation == "legacy" else Matcher(PATTERNS)
+        )
+        return [matcher.match(p) for p in PATHS]
+
+    benchmark(bench_fn)
+
+
+def test_match_many(benchmark):
+    matcher = Matcher(PATTERNS)
+
+    def bench_fn():
+        return matcher.match_many(PATHS)
+
+    benchmark(bench_fn)
@@ -409,6 +409,22 @@ def test_serialize(mocker):
     assert totals2 is None
 
 
+def test_serialize_streaming():
+    report = Report(
+        files={"file.py": [0, ReportTotals()], "other.py": [1, ReportTotals()]},
+        chunks="null\n[1]\n[1]\n<<<<< end_of_chunk >>>>>\nnull\n[0]",
+    )
+    report_json, chunks, totals = report.serialize_streaming()
+
+    assert not isinstance(chunks, bytes)
+    assert list(chunks) == [
+        b"null\n[1]\n[1]",
+        b"\n<<<<< end_of_chunk >>>>>\n",
+        b"null\n[0]",
+    ]
+    assert (report_json, totals) == report.serialize()[::2]
+
+
 @pytest.mark.integration
 @pytest.mark.parametrize(
     "diff, future, future_diff, res",
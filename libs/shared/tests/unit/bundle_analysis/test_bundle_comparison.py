@@ -965,3 +965,139 @@ def test_bundle_analysis_zero_asset_size_base_sized_head(mock_storage):
         size_base=0,
         size_head=294,
     )
+
+
+def _save_reports(loader, base_stats_path, head_stats_path):
+    try:
+        base_report = BundleAnalysisReport()
+        base_report.ingest(base_stats_path)
+
+        head_report = BundleAnalysisReport()
+        head_report.ingest(head_stats_path)
+
+        loader.save(base_report, "base-report")
+        loader.save(head_report, "head-report")
+    finally:
+        base_report.cleanup()
+        head_report.cleanup()
+
+
+def test_bundle_analysis_comparison_persisted(mock_storage, mocker):
+    loader = BundleAnalysisReportLoader(None)
+    _save_reports(loader, base_report_bundle_stats_path, head_report_bundle_stats_path)
+
+    comparison = BundleAnalysisComparison(
+        loader=loader,
+        base_report_key="base-report",
+        head_report_key="head-report",
+    )
+    bundle_changes = list(comparison.bundle_changes())
+    route_changes = comparison.bundle_routes_changes()
+    asset_changes = comparison.asset_changes("sample")
+    assert comparison.total_size_delta == 1100
+    assert comparison.percentage_delta == 0.73
+    assert comparison.computed.head_bundle_sizes == {"sample": 151672}
+    assert comparison.computed.head_bundles_cached == {"sample": False}
+    assert {(change.asset_name, change.size_base) for change in asset_changes} == {
+        (
+            asset_comparison.asset_change().asset_name,
+            asset_comparison.asset_change().size_base,
+        )
+        for asset_comparison in comparison.bundle_comparison(
+            "sample"
+        ).asset_comparisons()
+    }
+
+    def modules_by_asset(pr_changed_files):
+        return sorted(
+            (asset_change.asset_name, sorted((m.name, m.size) for m in modules))
+            for asset_change, modules in comparison.asset_changes_with_modules(
+                "sample", pr_changed_files
+            )
+            if asset_change.size_delta != 0
+        )
+
+    def report_modules_by_asset(pr_changed_files):
+        return sorted(
+            (
+                asset_comparison.asset_change().asset_name,
+                sorted(
+                    (m.name, m.size)
+                    for m in asset_comparison.contributing_modules(pr_changed_files)
+                ),
+            )
+            for asset_comparison in comparison.bundle_comparison(
+                "sample"
+            ).asset_comparisons()
+            if asset_comparison.asset_change().size_delta != 0
+        )
+
+    all_modules = modules_by_asset(None)
+    assert all_modules == report_modules_by_asset(None)
+    assert any(modules for _, modules in all_modules)
+    changed_module = next(modules for _, modules in all_modules if modules)[0][0]
+    changed_files = [f"app/{changed_module.removeprefix('./')}"]
+    changed_modules = modules_by_asset(changed_files)
+    assert changed_modules == report_modules_by_asset(changed_files)
+    assert changed_modules != all_modules
+
+    # the comparison is persisted next to the head report
+    assert (
+        "v1/repos/None/head-report/comparisons/base-report.json"
+        in mock_storage.storage["bundle-analysis"]
+    )
+
+    # a later comparison of the same reports does not load any of them
+    load = mocker.spy(loader, "load")
+    persisted = BundleAnalysisComparison(
+        loader=loader,
+        base_report_key="base-report",
+        head_report_key="head-report",
+    )
+    assert list(persisted.bundle_changes()) == bundle_changes
+    assert persisted.bundle_routes_changes() == route_changes
+    assert persisted.asset_changes("sample") == asset_changes
+    assert persisted.asset_changes_with_modules(
+        "sample"
+    ) == comparison.asset_changes_with_modules("sample")
+    assert persisted.total_size_delta == 1100
+    assert persisted.percentage_delta == 0.73
+    assert persisted.base_report_db_path is None
+    assert persisted.head_report_db_path is None
+    assert load.call_count == 0
+
+    with pytest.raises(MissingBundleError):
+        persisted.asset_changes("new")
+
+
+def test_bundle_analysis_comparison_persisted_invalidated(mock_storage, mocker):
+    loader = BundleAnalysisReportLoader(None)
+    _save_reports(loader, base_report_bundle_stats_path, head_report_bundle_stats_path)
+
+    comparison = BundleAnalysisComparison(
+        loader=loader,
+        base_report_key="base-report",
+        head_report_key="head-report",
+    )
+    assert comparison.total_size_delta == 1100
+
+    # saving either report again invalidates the persisted comparison
+    _save_reports(loader, head_report_bundle_stats_path, head_report_bundle_stats_path)
+    load = mocker.spy(loader, "load")
+    comparison = BundleAnalysisComparison(
+        loader=loader,
+        base_report_key="base-report",
+        head_report_key="head-report",
+    )
+    assert comparison.total_size_delta == 0
+    assert load.call_count == 2
+
+    # and so does a schema version bump
+    mocker.patch("shared.bundle_analysis.comparison.COMPARISON_SCHEMA_VERSION", 0)
+    comparison = BundleAnalysisComparison(
+        loader=loader,
+        base_report_key="base-report",
+        head_report_key="head-report",
+    )
+    assert comparison.total_size_delta == 0
+    assert load.call_count == 4
@@ -0,0 +1,128 @@
+import pytest
+
+from shared.components import Component
+from shared.components.comparison import ComponentsReport, compare_components
+from shared.reports.readonly import ReadOnlyReport
+from shared.reports.resources import Report, ReportFile
+from shared.reports.types import ReportLine
+from shared.utils.sessions import Session
+
+COMPONENTS = [
+    Component.from_dict({"component_id": "go", "paths": [r".*\.go"]}),
+    Component.from_dict({"component_id": "unit", "flag_regexes": [r"unit.*"]}),
+    Component.from_dict(
+        {
+            "component_id": "api_unit",
+            "paths": ["api/.*"],
+            "flag_regexes": [r"unit"],
+        }
+    ),
+    Component.from_dict({"component_id": "api", "paths": ["api/.*", "!.*_test.py"]}),
+    Component.from_dict({"component_id": "everything"}),
+    Component.from_dict({"component_id": "nothing", "paths": ["missing/.*"]}),
+]
+
+DIFF = {
+    "files": {
+        "api/views.py": {
+            "type": "modified",
+            "segments": [
+                {"header": ["1", "3", "1", "4"], "lines": ["+", "+", " ", "+"]}
+            ],
+        },
+        "worker/main.go": {
+            "type": "new",
+            "segments": [{"header": ["0", "0", "1", "3"], "lines": ["+", "+", "+"]}],
+        },
+        "api/gone.py": {"type": "deleted", "segments": []},
+        "not_in_report.py": {
+            "type": "new",
+            "segments": [{"header": ["0", "0", "1", "1"], "lines": ["+"]}],
+        },
+    }
+}
+
+
+def make_report(hits: int) -> Report:
+    report = Report()
+    unit, _ = report.add_session(Session(flags=["unit"]))
+    integration, _ = report.add_session(Session(flags=["integration"]))
+    for path in [
+        "api/views.py",
+        "api/views_test.py",
+        "api/models.go",
+        "worker/main.go",
+        "README.md",
+    ]:
+        file = ReportFile(path)
+        for ln in range(1, 6):
+            sessions = [[unit, hits if ln % 2 else 0]]
+            if ln > 3:
+                sessions.append([integration, 1])
+            file.append(ln, ReportLine.create(sessions[-1][1], sessions=sessions))
+        report.append(file)
+    return report
+
+
+def expected_totals(head: Report, base: Report, component: Component):
+    """The totals, computed one component at a time like `FilteredComparison`."""
+    flags = component.get_matching_flags(list(head.flags.keys()))
+    if not flags and not component.paths:
+        filtered_head, filtered_base = head, base
+    else:
+        filtered_head = head.filter(flags=flags, paths=component.paths)
+        filtered_base = base.filter(flags=flags, paths=component.paths)
+    return (
+        filtered_head.totals,
+        filtered_base.totals,
+        filtered_head.apply_diff(DIFF, _save=False),
+    )
+
+
+@pytest.mark.parametrize("report_class", [Report, ReadOnlyReport])
+def test_compare_components(report_class):
+    head, base = make_report(hits=1), make_report(hits=0)
+    if report_class is ReadOnlyReport:
+        head = ReadOnlyReport.create_from_report(head)
+        base = ReadOnlyReport.create_from_report(base)
+
+    results = compare_components(head, base, DIFF, COMPONENTS)
+
+    assert list(results) == [component.component_id for component in COMPONENTS]
+    for component in COMPONENTS:
+        result = results[component.component_id]
+        assert (
+            result.head_totals,
+            result.base_totals,
+            result.patch_totals,
+        ) == expected_totals(head, base, component), component.component_id
+
+
+def test_compare_components_without_base_or_diff():
+    results = compare_components(make_report(hits=1), None, None, COMPONENTS)
+
+    assert results["go"].base_totals is None
+    assert results["go"].patch_totals is None
+    assert results["go"].head_totals.files == 2
+
+
+def test_files_and_diff_shared_between_components():
+    report = ComponentsReport(make_report(hits=1), COMPONENTS)
+
+    assert report.matching_files == {
+        "go": {"api/models.go", "worker/main.go"},
+        "api_unit": {"api/views.py", "api/views_test.py", "api/models.go"},
+        "api": {"api/views.py", "api/models.go"},
+        "nothing": set(),
+    }
+
+    for component in COMPONENTS:
+        report.patch_totals(component, ["unit"], DIFF)
+    # each file of the diff is only filtered once, for all the components
+    unit_sessions = report.session_ids(["unit"])
+    assert unit_sessions == {0}
+    assert set(report._diff_totals) == {
+        ("api/views.py", unit_sessions),
+        ("worker/main.go", unit_sessions),
+        ("not_in_report.py", unit_sessions),
+    }
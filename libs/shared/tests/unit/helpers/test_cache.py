@@ -1,11 +1,20 @@
+import asyncio
+import threading
+import time
 import unittest
+from unittest.mock import MagicMock
 
+import fakeredis
 import pytest
-from redis.exceptions import TimeoutError
+from redis.exceptions import RedisError, TimeoutError
 
 from shared.helpers.cache import (
+    CACHED_FUNCTION_LOOKUPS,
     NO_VALUE,
+    RELEASE_LOCK_SCRIPT,
     BaseBackend,
+    CacheEntry,
+    LocalCache,
     OurOwnCache,
     RedisBackend,
     make_hash_sha256,
@@ -52,6 +61,9 @@ class FakeRedis:
     def __init__(self):
         self.all_keys = {}
 
+    def register_script(self, script):
+        return MagicMock()
+
     def get(self, key):
         return self.all_keys.get(key)
 
@@ -66,6 +78,27 @@ class FakeRedisWithIssues:
     def setex(self, key, expire, value):
         raise TimeoutError()
 
+    def set(self, key, value, **kwargs):
+        raise TimeoutError()
+
+    def register_script(self, script):
+        return MagicMock(side_effect=TimeoutError())
+
+
+class FakeStrictRedisWithScripts(fakeredis.FakeStrictRedis):
+    """fakeredis can't run Lua, so the lock release script is run in Python"""
+
+    def register_script(self, script):
+        assert script == RELEASE_LOCK_SCRIPT
+
+        def release_lock(keys, args):
+            [key], [token] = keys, args
+            if self.get(key) == token.encode():
+                return self.delete(key)
+            return 0
+
+        return release_lock
+
 
 class TestRedisBackend(unittest.TestCase):
     def test_simple_redis_call(self):
@@ -190,3 +223,275 @@ class TestCache:
         assert (
             make_hash_sha256(this_set) == "aoU2Of3YNk0/iW1hqfSkXPbhIAzGMHCSCoxsiLI2b8U="
         )
+
+
+@pytest.fixture
+def redis_cache():
+    cache = OurOwnCache()
+    cache.configure(RedisBackend(FakeStrictRedisWithScripts()), local_maxsize=10)
+    return cache
+
+
+def lookups(func, result):
+    name = f"{func.__module__}.{func.__qualname__}"
+    return CACHED_FUNCTION_LOOKUPS.labels(function=name, result=result)._value.get()
+
+
+class TestRedisBackendLocks:
+    def test_lock(self):
+        backend = RedisBackend(FakeStrictRedisWithScripts())
+        token = backend.acquire_lock("lock", 5)
+        assert token is not None
+        assert backend.acquire_lock("lock", 5) is None
+        # only the holder can release it
+        backend.release_lock("lock", "someone else")
+        assert backend.acquire_lock("lock", 5) is None
+        backend.release_lock("lock", token)
+        assert backend.acquire_lock("lock", 5) is not None
+
+    def test_lock_expires(self):
+        backend = RedisBackend(FakeStrictRedisWithScripts())
+        assert backend.acquire_lock("lock", 0.01) is not None
+        time.sleep(0.05)
+        assert backend.acquire_lock("lock", 5) is not None
+
+    def test_lock_redis_error(self):
+        # without redis, everyone computes their values
+        backend = RedisBackend(FakeRedisWithIssues())
+        assert backend.acquire_lock("lock", 5) is not None
+        assert backend.acquire_lock("lock", 5) is not None
+        backend.release_lock("lock", "token")
+
+    def test_release_lock_in_one_script_call(self):
+        redis = MagicMock()
+        script = MagicMock(return_value=1)
+        redis.register_script.return_value = script
+        backend = RedisBackend(redis)
+        redis.register_script.assert_called_once_with(RELEASE_LOCK_SCRIPT)
+
+        backend.release_lock("lock", "token")
+        script.assert_called_once_with(keys=["lock"], args=["token"])
+        redis.get.assert_not_called()
+        redis.delete.assert_not_called()
+
+        script.side_effect = RedisError
+        backend.release_lock("lock", "token")
+
+
+class TestLocalCache:
+    def test_lru(self):
+        local_cache = LocalCache(maxsize=2)
+        local_cache.set("a", 60, 1)
+        local_cache.set("b", 60, 2)
+        assert local_cache.get("a") == 1
+        local_cache.set("c", 60, 3)
+        assert local_cache.get("b") is NO_VALUE
+        assert local_cache.get("a") == 1
+        assert local_cache.get("c") == 3
+
+    def test_ttl(self):
+        now = [1000.0]
+        local_cache = LocalCache(maxsize=2, clock=lambda: now[0])
+        local_cache.set("a", 10, 1)
+        now[0] += 8.9
+        assert local_cache.get("a") == 1
+        now[0] += 1.1
+        assert local_cache.get("a") is NO_VALUE
+
+    def test_values_are_copies(self):
+        local_cache = LocalCache(maxsize=2)
+        local_cache.set("a", 60, {"b": [1]})
+        local_cache.get("a")["b"].append(2)
+        assert local_cache.get("a") == {"b": [1]}
+
+
+class TestCacheEntry:
+    def test_should_refresh(self, mocker):
+        entry = CacheEntry("value", expires_at=1000, delta=1)
+        assert entry.should_refresh(1000, beta=1)
+        assert not entry.should_refresh(900, beta=0)
+        mocker.patch("shared.helpers.cache.random.random", return_value=0.5)
+        # -log(0.5) ~= 0.69 seconds early
+        assert not entry.should_refresh(999.2, beta=1)
+        assert entry.should_refresh(999.4, beta=1)
+        assert entry.should_refresh(998.7, beta=2)
+
+
+class TestTwoTierCache:
+    def test_local_hit(self, redis_cache):
+        counter = RandomCounter()
+
+        def count():
+            return counter.call_function()
+
+        cached_function = redis_cache.cache_function(local_ttl=60)(count)
+        assert cached_function() == 1
+        redis_cache.get_backend().redis_connection.flushall()
+        assert cached_function() == 1
+        assert lookups(count, "local_hit") == 1
+        assert lookups(count, "miss") == 1
+
+    def test_no_local_ttl(self, redis_cache):
+        counter = RandomCounter()
+
+        def count():
+            return counter.call_function()
+
+        cached_function = redis_cache.cache_function()(count)
+        assert cached_function() == 1
+        assert cached_function() == 1
+        assert redis_cache.get_local_cache().get(self._key(redis_cache, count)) is (
+            NO_VALUE
+        )
+        assert lookups(count, "hit") == 1
+        redis_cache.get_backend().redis_connection.flushall()
+        assert cached_function() == 2
+
+    def test_expired_value(self, redis_cache, mocker):
+        counter = RandomCounter()
+
+        def count():
+            return counter.call_function()
+
+        cached_function = redis_cache.cache_function(ttl=10, beta=0)(count)
+        assert cached_function() == 1
+        mocker.patch("shared.helpers.cache.time.time", return_value=time.time() + 11)
+        assert cached_function() == 2
+
+    def test_single_flight(self, redis_cache):
+        calls = []
+
+        def slow(arg):
+            calls.append(arg)
+            time.sleep(0.2)
+            return arg * 2
+
+        cached_function = redis_cache.cache_function()(slow)
+        results = []
+        barrier = threading.Barrier(5)
+
+        def call():
+            barrier.wait()
+            results.append(cached_function(21))
+
+        threads = [threading.Thread(target=call) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert calls == [21]
+        assert results == [42] * 5
+        assert lookups(slow, "miss") == 1
+        assert lookups(slow, "wait") == 4
+
+    def test_waiters_compute_after_lock_timeout(self, redis_cache):
+        counter = RandomCounter()
+
+        def count():
+            return counter.call_function()
+
+        cached_function = redis_cache.cache_function(lock_timeout=0.1)(count)
+        # someone else holds the lock, and never sets the value
+        redis_cache.get_backend().acquire_lock(
+            self._key(redis_cache, count) + ":lock", 60
+        )
+        assert cached_function() == 1
+        assert lookups(count, "wait") == 1
+
+    def test_waiters_compute_when_holder_fails(self, redis_cache):
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) == 1:
+                time.sleep(0.1)
+                raise ValueError()
+            return "value"
+
+        cached_function = redis_cache.cache_function()(flaky)
+        errors, results = [], []
+
+        def call():
+            try:
+                results.append(cached_function())
+            except ValueError:
+                errors.append(1)
+
+        first = threading.Thread(target=call)
+        first.start()
+        time.sleep(0.02)
+        call()
+        first.join()
+        assert errors == [1]
+        assert results == ["value"]
+        assert len(attempts) == 2
+
+    def test_stale_while_revalidate(self, redis_cache, mocker):
+        counter = RandomCounter()
+
+        def count():
+            return counter.call_function()
+
+        cached_function = redis_cache.cache_function(ttl=10, stale_ttl=60, beta=0)(
+            count
+        )
+        assert cached_function() == 1
+        mocker.patch("shared.helpers.cache.time.time", return_value=time.time() + 11)
+        # someone else is refreshing it
+        lock = redis_cache.get_backend().acquire_lock(
+            self._key(redis_cache, count) + ":lock", 60
+        )
+        assert cached_function() == 1
+        assert lookups(count, "stale") == 1
+        redis_cache.get_backend().release_lock(
+            self._key(redis_cache, count) + ":lock", lock
+        )
+        assert cached_function() == 2
+        assert lookups(count, "refresh") == 1
+        assert cached_function() == 2
+
+    def test_early_refresh(self, redis_cache, mocker):
+        counter = RandomCounter()
+
+        def count():
+            return counter.call_function()
+
+        cached_function = redis_cache.cache_function(ttl=10)(count)
+        assert cached_function() == 1
+        mocker.patch("shared.helpers.cache.random.random", return_value=0.0)
+        mocker.patch.object(CacheEntry, "should_refresh", return_value=True)
+        assert cached_function() == 2
+        assert lookups(count, "refresh") == 1
+
+    def test_local_copy_does_not_outlive_value(self, redis_cache, mocker):
+        counter = RandomCounter()
+
+        def count():
+            return counter.call_function()
+
+        cached_function = redis_cache.cache_function(ttl=10, local_ttl=600)(count)
+        assert cached_function() == 1
+        local_cache = redis_cache.get_local_cache()
+        mocker.patch.object(local_cache, "clock", return_value=local_cache.clock() + 11)
+        assert cached_function() == 1
+        assert lookups(count, "local_hit") == 0
+
+    @pytest.mark.asyncio
+    async def test_async_single_flight(self, redis_cache):
+        calls = []
+
+        async def slow(arg):
+            calls.append(arg)
+            await asyncio.sleep(0.2)
+            return arg * 2
+
+        cached_function = redis_cache.cache_function(local_ttl=60)(slow)
+        results = await asyncio.gather(*(cached_function(21) for _ in range(5)))
+        assert calls == [21]
+        assert results == [42] * 5
+        assert await cached_function(21) == 42
+        assert lookups(slow, "local_hit") == 1
+
+    def _key(self, cache, func):
+        return cache.cache_function().generate_key(func, (), {})
@@ -0,0 +1,198 @@
+import threading
+import uuid
+from unittest.mock import MagicMock
+
+import pytest
+from redis import RedisError
+
+from shared.helpers.redis import get_redis_connection
+from shared.rate_limits.limiter import (
+    SLIDING_WINDOW_SCRIPT,
+    TOKEN_BUCKET_SCRIPT,
+    InMemoryRateLimitBackend,
+    RateLimit,
+    RateLimitAlgorithm,
+    RateLimiter,
+    RateLimitResult,
+    RedisRateLimitBackend,
+    ip_key,
+    upload_token_key,
+    user_key,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_sliding_window():
+    clock = FakeClock()
+    limiter = RateLimiter(
+        InMemoryRateLimitBackend(clock), RateLimit(limit=3, window=60)
+    )
+
+    remaining = []
+    for _ in range(3):
+        remaining.append(limiter.check("key").remaining)
+        clock.now += 10
+    assert remaining == [2, 1, 0]
+    result = limiter.check("key")
+    assert result == RateLimitResult(
+        allowed=False, limit=3, remaining=0, retry_after=30
+    )
+    # other keys are limited on their own
+    assert limiter.check("other").allowed
+
+    # the first request leaves the window 60 seconds after it was made
+    clock.now += 30
+    assert limiter.check("key").allowed
+    assert not limiter.check("key").allowed
+
+
+def test_token_bucket():
+    clock = FakeClock()
+    limiter = RateLimiter(
+        InMemoryRateLimitBackend(clock),
+        RateLimit(limit=10, window=10, algorithm=RateLimitAlgorithm.token_bucket),
+    )
+
+    # a burst of up to the capacity of the bucket
+    assert all(limiter.check("key").allowed for _ in range(10))
+    result = limiter.check("key")
+    assert not result.allowed
+    assert result.retry_after == 1
+
+    # refills at 1 token per second
+    clock.now += 2.5
+    assert limiter.check("key").allowed
+    assert limiter.check("key").allowed
+    assert not limiter.check("key").allowed
+
+    # never holds more than its capacity
+    clock.now += 1000
+    assert sum(limiter.check("key").allowed for _ in range(20)) == 10
+
+
+def test_headers():
+    assert RateLimitResult(
+        allowed=True, limit=10, remaining=4, retry_after=0
+    ).headers == {"X-RateLimit-Limit": "10", "X-RateLimit-Remaining": "4"}
+    assert RateLimitResult(
+        allowed=False, limit=10, remaining=0, retry_after=12
+    ).headers == {
+        "X-RateLimit-Limit": "10",
+        "X-RateLimit-Remaining": "0",
+        "Retry-After": "12",
+    }
+
+
+@pytest.fixture
+def redis_key():
+    redis_connection = get_redis_connection()
+    key = f"rate_limit:test:{uuid.uuid4().hex}"
+    yield key
+    redis_connection.delete(key)
+
+
+def test_redis_sliding_window(redis_key):
+    limiter = RateLimiter(
+        RedisRateLimitBackend(get_redis_connection()), RateLimit(limit=3, window=60)
+    )
+
+    assert [limiter.check(redis_key).remaining for _ in range(3)] == [2, 1, 0]
+    assert limiter.check(redis_key) == RateLimitResult(
+        allowed=False, limit=3, remaining=0, retry_after=60
+    )
+
+
+def test_redis_token_bucket(redis_key):
+    limiter = RateLimiter(
+        RedisRateLimitBackend(get_redis_connection()),
+        RateLimit(limit=10, window=10, algorithm=RateLimitAlgorithm.token_bucket),
+    )
+
+    results = [limiter.check(redis_key) for _ in range(10)]
+    assert all(result.allowed for result in results)
+    assert [result.remaining for result in results] == list(range(9, -1, -1))
+    # refills at 1 token per second
+    assert limiter.check(redis_key) == RateLimitResult(
+        allowed=False, limit=10, remaining=0, retry_after=1
+    )
+
+
+@pytest.mark.parametrize("backend", ["in_memory", "redis"])
+@pytest.mark.parametrize("algorithm", list(RateLimitAlgorithm))
+def test_concurrent_checks_do_not_overshoot(backend, algorithm, request):
+    if backend == "redis":
+        key = request.getfixturevalue("redis_key")
+        rate_limit_backend = RedisRateLimitBackend(get_redis_connection())
+    else:
+        key = "key"
+        rate_limit_backend = InMemoryRateLimitBackend()
+    limiter = RateLimiter(
+        rate_limit_backend, RateLimit(limit=100, window=3600, algorithm=algorithm)
+    )
+    allowed = []
+    barrier = threading.Barrier(20)
+
+    def make_requests():
+        barrier.wait()
+        results = [limiter.check(key).allowed for _ in range(25)]
+        allowed.append(sum(results))
+
+    threads = [threading.Thread(target=make_requests) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(allowed) == 100
+
+
+def test_redis_backend_checks_in_one_script_call():
+    redis = MagicMock()
+    scripts = {
+        SLIDING_WINDOW_SCRIPT: MagicMock(return_value=[1, 4, 0]),
+        TOKEN_BUCKET_SCRIPT: MagicMock(return_value=[0, 0, 1500]),
+    }
+    redis.register_script.side_effect = scripts.get
+    backend = RedisRateLimitBackend(redis)
+
+    result = backend.check("key", RateLimit(limit=5, window=60))
+    assert result == RateLimitResult(allowed=True, limit=5, remaining=4, retry_after=0)
+    sliding_window = scripts[SLIDING_WINDOW_SCRIPT]
+    sliding_window.assert_called_once()
+    assert sliding_window.call_args.kwargs["keys"] == ["key"]
+    assert sliding_window.call_args.kwargs["args"][:2] == [5, 60000]
+
+    result = backend.check(
+        "key",
+        RateLimit(limit=5, window=60, algorithm=RateLimitAlgorithm.token_bucket),
+    )
+    assert result == RateLimitResult(allowed=False, limit=5, remaining=0, retry_after=2)
+    scripts[TOKEN_BUCKET_SCRIPT].assert_called_once_with(keys=["key"], args=[5, 60000])
+    # nothing else is sent to redis
+    assert redis.method_calls == [
+        ("register_script", (SLIDING_WINDOW_SCRIPT,), {}),
+        ("register_script", (TOKEN_BUCKET_SCRIPT,), {}),
+    ]
+
+
+def test_redis_backend_allows_on_redis_error():
+    redis = MagicMock()
+    redis.register_script.return_value = MagicMock(side_effect=RedisError)
+    backend = RedisRateLimitBackend(redis)
+
+    assert backend.check("key", RateLimit(limit=5, window=60)).allowed
+
+
+def test_keys():
+    assert user_key("graphql", 12) == "rate_limit:graphql:user:12"
+    assert ip_key("graphql", "127.0.0.1") == "rate_limit:graphql:ip:127.0.0.1"
+    key = upload_token_key("upload", "d0a5b6c2-secret")
+    assert key.startswith("rate_limit:upload:token:")
+    assert "secret" not in key
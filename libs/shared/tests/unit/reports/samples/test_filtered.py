@@ -117,6 +117,15 @@ class TestFilteredReport:
         assert isinstance(filtered_report_file_2, FilteredReportFile)
         assert filtered_report_file_1 == filtered_report_file_2
 
+    def test_should_include_cached(self, sample_report, mocker):
+        filtered_report = sample_report.filter(paths=["file_1.go"])
+        spy = mocker.spy(filtered_report._matcher, "match")
+        assert filtered_report.files == ["file_1.go"]
+        assert filtered_report.get("file_1.go") is not None
+        assert filtered_report.get_file_totals("location/file_1.py") is None
+        assert not filtered_report.is_empty()
+        assert spy.call_count == len(sample_report.files)
+
     def test_normal_totals(self, sample_report):
         assert sample_report.totals == ReportTotals(
             files=3,
@@ -0,0 +1,132 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from shared.reports.api_report_service import (
+    ParsedReportCache,
+    get_cached_report_from_commit,
+    get_parsed_report_cache,
+)
+
+KEY = (1, "abc", "ReadOnlyReport")
+
+
+class Loader:
+    def __init__(self, report="report", size=10, delay=0):
+        self.report = report
+        self.size = size
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.report, self.size
+
+
+def test_get_or_load():
+    cache = ParsedReportCache(max_size=100)
+    load = Loader()
+    assert cache.get_or_load(KEY, "v1", load) == "report"
+    assert cache.get_or_load(KEY, "v1", load) == "report"
+    assert load.calls == 1
+    assert cache.size == 10
+
+
+def test_new_version_replaces_previous_one():
+    cache = ParsedReportCache(max_size=100)
+    cache.get_or_load(KEY, "v1", Loader("old"))
+    assert cache.get_or_load(KEY, "v2", Loader("new")) == "new"
+    assert cache.size == 10
+    # the previous version is gone
+    load = Loader("old again")
+    assert cache.get_or_load(KEY, "v1", load) == "old again"
+    assert load.calls == 1
+
+
+def test_eviction_by_size():
+    cache = ParsedReportCache(max_size=25)
+    cache.get_or_load((1, "a", "Report"), "v1", Loader("a"))
+    cache.get_or_load((1, "b", "Report"), "v1", Loader("b"))
+    # "a" was used last
+    cache.get_or_load((1, "a", "Report"), "v1", Loader())
+    cache.get_or_load((1, "c", "Report"), "v1", Loader("c"))
+    assert cache.size == 20
+    assert cache.get_or_load((1, "a", "Report"), "v1", Loader()) == "a"
+    assert cache.get_or_load((1, "b", "Report"), "v1", Loader("reloaded")) == (
+        "reloaded"
+    )
+
+
+def test_missing_and_too_large_reports_are_not_cached():
+    cache = ParsedReportCache(max_size=100)
+    missing = Loader(report=None)
+    assert cache.get_or_load(KEY, "v1", missing) is None
+    assert cache.get_or_load(KEY, "v1", missing) is None
+    assert missing.calls == 2
+
+    too_large = Loader(size=101)
+    cache.get_or_load(KEY, "v1", too_large)
+    cache.get_or_load(KEY, "v1", too_large)
+    assert too_large.calls == 2
+    assert cache.size == 0
+
+
+def test_single_flight():
+    cache = ParsedReportCache(max_size=100)
+    load = Loader(delay=0.1)
+    results = []
+    barrier = threading.Barrier(5)
+
+    def get():
+        barrier.wait()
+        results.append(cache.get_or_load(KEY, "v1", load))
+
+    threads = [threading.Thread(target=get) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["report"] * 5
+    assert load.calls == 1
+
+
+def test_failed_load_is_retried():
+    cache = ParsedReportCache(max_size=100)
+
+    def fail():
+        raise FileNotFoundError()
+
+    with pytest.raises(FileNotFoundError):
+        cache.get_or_load(KEY, "v1", fail)
+    assert cache.get_or_load(KEY, "v1", Loader()) == "report"
+
+
+def test_cached_report_reloaded_when_sessions_change(mock_configuration, mocker):
+    mock_configuration.set_params(
+        {"services": {"parsed_report_cache": {"enabled": True}}}
+    )
+    get_parsed_report_cache.cache_clear()
+    build = mocker.patch(
+        "shared.reports.api_report_service._build_report_from_commit",
+        side_effect=lambda commit, report_class: (dict(commit.report), 10),
+    )
+    commit = MagicMock(
+        repository_id=1,
+        commitid="abc",
+        totals={"f": 1, "n": 10, "h": 5},
+        report={"sessions": {"0": {"st": "carriedforward"}}},
+    )
+
+    report = get_cached_report_from_commit(commit)
+    assert get_cached_report_from_commit(commit) is report
+    assert build.call_count == 1
+
+    # replaced by an upload with the same totals
+    commit.report = {"sessions": {"0": {"st": "uploaded"}}}
+    assert get_cached_report_from_commit(commit) == commit.report
+    assert build.call_count == 2
+    get_parsed_report_cache.cache_clear()
@@ -0,0 +1,179 @@
+import orjson
+
+from shared.reports.directory_tree import (
+    DIRECTORY_TREE_VERSION,
+    DirectoryTree,
+    directory_tree_fingerprint,
+    directory_tree_name,
+)
+from shared.reports.resources import Report, ReportFile
+from shared.reports.types import ReportLine, ReportTotals
+
+
+def file_totals(lines, hits, misses, partials=0):
+    return ReportTotals(
+        files=1,
+        lines=lines,
+        hits=hits,
+        misses=misses,
+        partials=partials,
+        coverage=f"{hits / lines * 100:.5f}",
+    )
+
+
+FILES = [
+    ("src/app.py", file_totals(10, 8, 2)),
+    ("README.md", file_totals(1, 0, 1)),
+    ("src/utils/a.py", file_totals(4, 2, 1, 1)),
+    ("tests/test_app.py", file_totals(5, 5, 0)),
+    ("src/utils/b.py", file_totals(6, 3, 3)),
+]
+
+
+def test_build():
+    tree = DirectoryTree.build(FILES, fingerprint="abc")
+
+    assert tree.fingerprint == "abc"
+    assert [path for path, _node in tree.children()] == [
+        "src",
+        "README.md",
+        "tests",
+    ]
+    assert [path for path, _node in tree.children("src")] == [
+        "src/app.py",
+        "src/utils",
+    ]
+    assert tree.children("src/app.py") == []
+    assert tree.children("missing") == []
+
+
+def test_totals():
+    tree = DirectoryTree.build(FILES)
+
+    assert DirectoryTree.totals(tree.node("src/utils/a.py")) == file_totals(4, 2, 1, 1)
+
+    src_totals = DirectoryTree.totals(tree.node("src"))
+    assert (
+        src_totals.lines,
+        src_totals.hits,
+        src_totals.misses,
+        src_totals.partials,
+    ) == (20, 13, 6, 1)
+
+    root_totals = DirectoryTree.totals(tree.node())
+    assert (root_totals.lines, root_totals.hits) == (26, 18)
+
+
+def test_node():
+    tree = DirectoryTree.build(FILES)
+
+    assert tree.node("") is tree.root
+    assert tree.node("src/utils") is not None
+    assert tree.node("src/util") is None
+    assert tree.node("src/app.py/more") is None
+
+
+def test_iter_files():
+    tree = DirectoryTree.build(FILES)
+
+    assert tree.files() == [
+        "src/app.py",
+        "src/utils/a.py",
+        "src/utils/b.py",
+        "README.md",
+        "tests/test_app.py",
+    ]
+    assert [path for path, _node in tree.iter_files("src/utils")] == [
+        "src/utils/a.py",
+        "src/utils/b.py",
+    ]
+    assert [path for path, _node in tree.iter_files("README.md")] == ["README.md"]
+    assert list(tree.iter_files("missing")) == []
+
+
+def test_conflicting_paths():
+    tree = DirectoryTree.build(
+        [
+            ("a", file_totals(1, 1, 0)),
+            ("a/b.py", file_totals(1, 1, 0)),
+            ("c/d.py", file_totals(1, 1, 0)),
+            ("c", file_totals(1, 1, 0)),
+            ("c/d.py", file_totals(1, 1, 0)),
+        ]
+    )
+
+    assert tree.files() == ["a", "c/d.py"]
+    assert DirectoryTree.totals(tree.node()).lines == 2
+
+
+def test_filter():
+    tree = DirectoryTree.build(FILES, fingerprint="abc")
+
+    filtered = tree.filter(["src/utils/.*", "README.md"])
+
+    assert filtered.files() == ["src/utils/a.py", "src/utils/b.py", "README.md"]
+    assert filtered.fingerprint == "abc"
+    assert DirectoryTree.totals(filtered.node("src")).lines == 10
+    assert tree.filter([]) is tree
+
+
+def test_serialize():
+    tree = DirectoryTree.build(FILES, fingerprint="abc")
+
+    deserialized = DirectoryTree.deserialize(tree.serialize())
+
+    assert deserialized.fingerprint == "abc"
+    assert deserialized.root == tree.root
+    assert deserialized.files() == tree.files()
+    assert DirectoryTree.totals(deserialized.node("src/app.py")) == file_totals(
+        10, 8, 2
+    )
+
+
+def test_deserialize_other_version():
+    data = orjson.dumps(
+        {"version": DIRECTORY_TREE_VERSION + 1, "fingerprint": "", "root": {}}
+    )
+    assert DirectoryTree.deserialize(data) is None
+
+
+def test_from_report():
+    report = Report()
+    first_file = ReportFile("foo/file1.py")
+    first_file.append(1, ReportLine.create(1, sessions=[[0, 1]]))
+    first_file.append(2, ReportLine.create(0, sessions=[[0, 0]]))
+    second_file = ReportFile("bar/file2.py")
+    second_file.append(1, ReportLine.create(1, sessions=[[0, 1]]))
+    report.append(first_file)
+    report.append(second_file)
+
+    tree = DirectoryTree.from_report(report)
+
+    assert tree.files() == ["foo/file1.py", "bar/file2.py"]
+    assert DirectoryTree.totals(tree.node("foo/file1.py")) == report.get_file_totals(
+        "foo/file1.py"
+    )
+    assert DirectoryTree.totals(tree.node("foo")).hits == 1
+
+
+def test_directory_tree_name():
+    assert directory_tree_name() == "report"
+    assert directory_tree_name([]) == "report"
+    assert directory_tree_name(["unit", "integration"]) == directory_tree_name(
+        ["integration", "unit", "unit"]
+    )
+    assert directory_tree_name(["unit"]) != directory_tree_name(["integration"])
+
+
+def test_directory_tree_fingerprint():
+    totals = {"f": 3, "n": 20, "h": 10, "s": 1}
+    sessions = {"0": {"t": [3, 20, 10], "d": 1700000000, "st": "uploaded"}}
+    fingerprint = directory_tree_fingerprint(totals, sessions)
+    assert fingerprint == directory_tree_fingerprint(
+        {"s": 1, "h": 10, "n": 20, "f": 3}, sessions
+    )
+    assert fingerprint != directory_tree_fingerprint({**totals, "s": 2}, sessions)
+    # the report changed, but not its totals
+    assert fingerprint != directory_tree_fingerprint(
+        totals, {"0": {**sessions["0"], "d": 1700000001}}
+    )
@@ -0,0 +1,97 @@
+import os
+from io import BytesIO
+
+import pytest
+
+from shared.storage.cache import CachingStorageService, DiskCache
+from shared.storage.exceptions import FileNotInStorageError
+from shared.storage.memory import MemoryStorageService
+
+BUCKET_NAME = "archivetest"
+
+
+@pytest.fixture
+def backend():
+    return MemoryStorageService({})
+
+
+def make_storage(
+    backend: MemoryStorageService, tmp_path, max_bytes: int = 1024
+) -> CachingStorageService:
+    return CachingStorageService(backend, DiskCache(str(tmp_path), max_bytes))
+
+
+def test_read_file_is_cached(backend, tmp_path, mocker):
+    storage = make_storage(backend, tmp_path)
+    backend.write_file(BUCKET_NAME, "file", "data", metadata={"version": "1"})
+    read_file = mocker.spy(backend, "read_file")
+
+    assert storage.read_file(BUCKET_NAME, "file") == b"data"
+    metadata = {}
+    assert (
+        storage.read_file(BUCKET_NAME, "file", metadata_container=metadata) == b"data"
+    )
+    assert metadata == {"version": "1"}
+
+    file_obj = BytesIO()
+    storage.read_file(BUCKET_NAME, "file", file_obj=file_obj)
+    assert file_obj.getvalue() == b"data"
+
+    assert read_file.call_count == 1
+    assert storage.disk_cache.size == 4
+
+
+def test_read_file_validates_etag(backend, tmp_path, mocker):
+    storage = make_storage(backend, tmp_path)
+    backend.write_file(BUCKET_NAME, "file", "data")
+    assert storage.read_file(BUCKET_NAME, "file") == b"data"
+
+    # written behind the back of the cache
+    backend.write_file(BUCKET_NAME, "file", "new data")
+    assert storage.read_file(BUCKET_NAME, "file") == b"new data"
+
+    backend.delete_file(BUCKET_NAME, "file")
+    with pytest.raises(FileNotInStorageError):
+        storage.read_file(BUCKET_NAME, "file")
+    assert storage.disk_cache.size == 0
+    assert os.listdir(storage.disk_cache.directory) == []
+
+
+def test_write_and_delete_invalidate(backend, tmp_path):
+    storage = make_storage(backend, tmp_path)
+    storage.write_file(BUCKET_NAME, "file", "data")
+    assert storage.read_file(BUCKET_NAME, "file") == b"data"
+
+    storage.write_file(BUCKET_NAME, "file", "new data")
+    assert storage.disk_cache.size == 0
+    assert storage.read_file(BUCKET_NAME, "file") == b"new data"
+
+    storage.delete_files(BUCKET_NAME, ["file", "other"])
+    assert storage.disk_cache.size == 0
+    with pytest.raises(FileNotInStorageError):
+        storage.read_file(BUCKET_NAME, "file")
+
+
+def test_evicts_least_recently_used(backend, tmp_path, mocker):
+    storage = make_storage(backend, tmp_path, max_bytes=10)
+    for name in ("a", "b", "c"):
+        backend.write_file(BUCKET_NAME, name, name * 4)
+
+    storage.read_file(BUCKET_NAME, "a")
+    storage.read_file(BUCKET_NAME, "b")
+    storage.read_file(BUCKET_NAME, "a")
+    storage.read_file(BUCKET_NAME, "c")
+    assert storage.disk_cache.size == 8
+    assert len(os.listdir(storage.disk_cache.directory)) == 2
+
+    read_file = mocker.spy(backend, "read_file")
+    assert storage.read_file(BUCKET_NAME, "a") == b"aaaa"
+    assert read_file.call_count == 0
+    assert storage.read_file(BUCKET_NAME, "b") == b"bbbb"
+    assert read_file.call_count == 1
+
+    # files larger than the whole cache are passed through
+    backend.write_file(BUCKET_NAME, "large", "x" * 11)
+    assert storage.read_file(BUCKET_NAME, "large") == b"x" * 11
+    assert storage.disk_cache.size == 8
+    assert len(os.listdir(storage.disk_cache.directory)) == 2
@@ -0,0 +1,32 @@
+import gzip
+import zlib
+from io import BytesIO
+
+from shared.storage.compression import GZipStreamReader, IteratorReader
+
+
+def test_gzip_stream_reader_single_member():
+    data = b"lorem ipsum dolor sit amet " * 1000
+    reader = GZipStreamReader(BytesIO(data))
+
+    compressed = b""
+    while chunk := reader.read(100):
+        assert len(chunk) <= 100
+        compressed += chunk
+
+    assert reader.tell() == len(compressed)
+    assert gzip.decompress(compressed) == data
+    # a single gzip member, instead of one per `read`
+    decompressor = zlib.decompressobj(wbits=31)
+    assert decompressor.decompress(compressed) == data
+    assert decompressor.eof and decompressor.unused_data == b""
+
+
+def test_iterator_reader():
+    reader = IteratorReader(piece for piece in [b"abc", b"", b"defgh", b"i"])
+
+    assert reader.read(2) == b"ab"
+    assert reader.read(4) == b"cdef"
+    assert reader.read() == b"ghi"
+    assert reader.read(1) == b""
+    assert reader.tell() == 9
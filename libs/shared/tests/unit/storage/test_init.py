@@ -1,4 +1,5 @@
 from shared.storage import get_appropriate_storage_service
+from shared.storage.cache import CachingStorageService
 from shared.storage.minio import MinioStorageService
 
 minio_config = {
@@ -20,3 +21,15 @@ class TestStorageInitialization:
         res = get_appropriate_storage_service()
         assert isinstance(res, MinioStorageService)
         assert res.minio_config == minio_config
+
+    def test_get_appropriate_storage_service_cached(self, mock_configuration, tmp_path):
+        mock_configuration.params["services"] = {
+            "minio": minio_config,
+            "storage_cache": {"enabled": True, "directory": str(tmp_path)},
+        }
+        res = get_appropriate_storage_service()
+        assert isinstance(res, CachingStorageService)
+        assert isinstance(res.backend, MinioStorageService)
+        assert res.disk_cache.directory.startswith(str(tmp_path))
+        # all the services share the same cache
+        assert get_appropriate_storage_service().disk_cache is res.disk_cache
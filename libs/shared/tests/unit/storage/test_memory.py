@@ -98,3 +98,74 @@ def test_delete_file_doesnt_exist():
     ensure_bucket(storage)
     with pytest.raises(FileNotInStorageError):
         storage.delete_file(BUCKET_NAME, path)
+
+
+def test_write_then_read_file_metadata():
+    storage = make_storage()
+    path = f"test_write_then_read_file_metadata/{uuid4().hex}"
+
+    ensure_bucket(storage)
+    storage.write_file(BUCKET_NAME, path, "data", metadata={"version": "1"})
+
+    metadata = {}
+    assert storage.read_file(BUCKET_NAME, path, metadata_container=metadata) == b"data"
+    assert metadata == {"version": "1"}
+
+
+def test_get_file_etag():
+    storage = make_storage()
+    path = f"test_get_file_etag/{uuid4().hex}"
+
+    ensure_bucket(storage)
+    with pytest.raises(FileNotInStorageError):
+        storage.get_file_etag(BUCKET_NAME, path)
+
+    storage.write_file(BUCKET_NAME, path, "data")
+    etag = storage.get_file_etag(BUCKET_NAME, path)
+    assert etag == storage.get_file_etag(BUCKET_NAME, path)
+
+    storage.write_file(BUCKET_NAME, path, "other data")
+    assert storage.get_file_etag(BUCKET_NAME, path) != etag
+
+
+def test_delete_files():
+    storage = make_storage()
+    prefix = f"test_delete_files/{uuid4().hex}"
+    paths = [f"{prefix}/{i}" for i in range(3)]
+
+    ensure_bucket(storage)
+    for path in paths[:2]:
+        storage.write_file(BUCKET_NAME, path, "lorem ipsum")
+
+    results = storage.delete_files(BUCKET_NAME, paths)
+    assert len(results) == 3
+    assert results[:2] == [True, True]
+    for path in paths:
+        with pytest.raises(FileNotInStorageError):
+            storage.read_file(BUCKET_NAME, path)
+
+
+def test_list_folder_contents():
+    storage = make_storage()
+    prefix = f"test_list_folder_contents/{uuid4().hex}"
+
+    ensure_bucket(storage)
+    storage.write_file(BUCKET_NAME, f"{prefix}/a", "a")
+    storage.write_file(BUCKET_NAME, f"{prefix}/nested/b", "bb")
+    storage.write_file(BUCKET_NAME, f"{prefix}_sibling/c", "c")
+
+    contents = sorted(
+        storage.list_folder_contents(BUCKET_NAME, f"{prefix}/"),
+        key=lambda obj: obj["name"],
+    )
+    assert [obj["name"] for obj in contents] == [f"{prefix}/a", f"{prefix}/nested/b"]
+    assert list(storage.list_folder_contents(BUCKET_NAME, f"{prefix}/nope/")) == []
+
+
+def test_write_then_read_generator():
+    storage = make_storage()
+    path = f"test_write_then_read_generator/{uuid4().hex}"
+
+    ensure_bucket(storage)
+    storage.write_file(BUCKET_NAME, path, (piece for piece in [b"lorem ", b"ipsum"]))
+    assert storage.read_file(BUCKET_NAME, path) == b"lorem ipsum"
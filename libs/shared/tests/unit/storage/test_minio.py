@@ -286,6 +286,22 @@ def test_delete_file_doesnt_exist():
         pass
 
 
+def test_get_file_etag():
+    storage = make_storage()
+    path = f"test_get_file_etag/{uuid4().hex}"
+
+    ensure_bucket(storage)
+    with pytest.raises(FileNotInStorageError):
+        storage.get_file_etag(BUCKET_NAME, path)
+
+    storage.write_file(BUCKET_NAME, path, "lorem ipsum dolor test_get_file_etag á")
+    etag = storage.get_file_etag(BUCKET_NAME, path)
+    assert etag == storage.get_file_etag(BUCKET_NAME, path)
+
+    storage.write_file(BUCKET_NAME, path, "something else entirely")
+    assert storage.get_file_etag(BUCKET_NAME, path) != etag
+
+
 def test_minio_without_ports():
     minio_no_ports_config = {
         "access_key_id": "hodor",
@@ -344,3 +360,37 @@ def test_write_then_read_file_with_metadata():
     )
     assert reading_result.decode() == data
     assert metadata_container == {"test": "test"}
+
+
+def test_delete_files():
+    storage = make_storage()
+    prefix = f"test_delete_files/{uuid4().hex}"
+    paths = [f"{prefix}/{i}" for i in range(3)]
+
+    ensure_bucket(storage)
+    for path in paths[:2]:
+        storage.write_file(BUCKET_NAME, path, "lorem ipsum")
+
+    results = storage.delete_files(BUCKET_NAME, paths)
+    assert len(results) == 3
+    assert results[:2] == [True, True]
+    for path in paths:
+        with pytest.raises(FileNotInStorageError):
+            storage.read_file(BUCKET_NAME, path)
+
+
+def test_list_folder_contents():
+    storage = make_storage()
+    prefix = f"test_list_folder_contents/{uuid4().hex}"
+
+    ensure_bucket(storage)
+    storage.write_file(BUCKET_NAME, f"{prefix}/a", "a")
+    storage.write_file(BUCKET_NAME, f"{prefix}/nested/b", "bb")
+    storage.write_file(BUCKET_NAME, f"{prefix}_sibling/c", "c")
+
+    contents = sorted(
+        storage.list_folder_contents(BUCKET_NAME, f"{prefix}/"),
+        key=lambda obj: obj["name"],
+    )
+    assert [obj["name"] for obj in contents] == [f"{prefix}/a", f"{prefix}/nested/b"]
+    assert list(storage.list_folder_contents(BUCKET_NAME, f"{prefix}/nope/")) == []
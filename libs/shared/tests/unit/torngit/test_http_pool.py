@@ -0,0 +1,152 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+import respx
+from asgiref.sync import async_to_sync
+from prometheus_client import REGISTRY
+
+from shared.torngit.github import Github
+from shared.torngit.http_pool import (
+    DEFAULT_MAX_CONNECTIONS,
+    SharedTransport,
+    TransportRegistry,
+    _registry,
+    get_pool_limits,
+    get_shared_transport,
+)
+
+
+def test_get_pool_limits_per_host():
+    pool_config = {
+        "max_connections": 50,
+        "hosts": {"api.github.com": {"max_keepalive_connections": 40}},
+    }
+    github_limits = get_pool_limits(pool_config, "api.github.com")
+    assert github_limits.max_connections == 50
+    assert github_limits.max_keepalive_connections == 40
+
+    gitlab_limits = get_pool_limits(pool_config, "gitlab.com")
+    assert gitlab_limits.max_connections == 50
+    assert gitlab_limits.max_keepalive_connections == 20
+
+    assert get_pool_limits({}, "gitlab.com").max_connections == DEFAULT_MAX_CONNECTIONS
+
+
+@pytest.fixture
+def registry(mocker):
+    registry = TransportRegistry()
+    mocker.patch("shared.torngit.http_pool._registry", registry)
+    yield registry
+    registry.close()
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    server.connections = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_shared_transport_disabled(mock_configuration):
+    mock_configuration.params["services"]["torngit_http_pool"] = {"enabled": False}
+    assert get_shared_transport(None) is None
+
+
+def test_get_shared_transport(mock_configuration, registry):
+    transport = get_shared_transport(None)
+    assert isinstance(transport, SharedTransport)
+    assert get_shared_transport(None) is transport
+    assert get_shared_transport(False) is not transport
+
+    async def get_transport():
+        return get_shared_transport(None)
+
+    # the same transport outlives the loops of `async_to_sync`
+    assert async_to_sync(get_transport)() is transport
+    assert async_to_sync(get_transport)() is transport
+
+
+def test_get_shared_transport_after_fork(mock_configuration, registry, mocker):
+    transport = get_shared_transport(None)
+    mocker.patch("shared.torngit.http_pool.os.getpid", return_value=-1)
+    assert get_shared_transport(None) is not transport
+
+
+def test_connections_reused_across_async_to_sync_calls(
+    mock_configuration, registry, server
+):
+    url = f"http://127.0.0.1:{server.server_address[1]}/repos"
+
+    async def get():
+        async with httpx.AsyncClient(transport=get_shared_transport(None)) as client:
+            response = await client.get(url)
+            return response.status_code, response.json()
+
+    # `async_to_sync` runs every call in a loop of its own
+    assert async_to_sync(get)() == (200, {"ok": True})
+    assert async_to_sync(get)() == (200, {"ok": True})
+    assert server.connections == 1
+
+
+@pytest.mark.asyncio
+async def test_clients_share_connections(mock_configuration, registry):
+    handler = Github(
+        repo={"name": "worker"},
+        owner={"username": "codecov"},
+        token={"key": "some_key"},
+    )
+    with respx.mock:
+        respx.get("https://api.github.com/repos/codecov/worker").mock(
+            return_value=httpx.Response(
+                200, headers={"Content-Type": "application/json"}, json={}
+            )
+        )
+        async with handler.get_client() as client:
+            await handler.api(client, "get", "/repos/codecov/worker")
+        # leaving the `async with` block doesn't close the shared pools
+        async with handler.get_client() as other_client:
+            await handler.api(other_client, "get", "/repos/codecov/worker")
+
+    assert client._transport is other_client._transport
+    assert list(client._transport._pools) == ["api.github.com"]
+    assert (
+        REGISTRY.get_sample_value(
+            "git_provider_http_pool_requests_in_flight",
+            labels={"host": "api.github.com"},
+        )
+        == 0
+    )
+
+
+def test_close(mock_configuration, registry):
+    transport = get_shared_transport(None)
+    pool_loop = transport.pool_loop
+    registry.close()
+    assert pool_loop.loop.is_closed()
+    assert get_shared_transport(None) is not transport
+    assert _registry is not registry
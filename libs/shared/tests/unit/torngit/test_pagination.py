@@ -0,0 +1,149 @@
+import asyncio
+
+import httpx
+import pytest
+import respx
+
+from shared.torngit.github import Github
+from shared.torngit.pagination import (
+    PAGE_PREFETCH_CONCURRENCY,
+    fetch_pages_in_order,
+    get_last_page,
+    get_prefetch_concurrency,
+    iter_pages,
+    set_page,
+)
+
+
+def link_response(last_page: int | None = None, remaining: int | None = None):
+    headers = {}
+    if last_page is not None:
+        headers["Link"] = (
+            '<https://api.github.com/user/repos?per_page=50&page=2>; rel="next", '
+            f'<https://api.github.com/user/repos?per_page=50&page={last_page}>; rel="last"'
+        )
+    if remaining is not None:
+        headers["X-RateLimit-Remaining"] = str(remaining)
+    return httpx.Response(200, headers=headers)
+
+
+def test_get_last_page():
+    assert get_last_page(link_response(7)) == 7
+    assert get_last_page(link_response()) is None
+
+
+def test_set_page():
+    assert (
+        set_page("https://api.github.com/user/repos?per_page=50&page=7", 3)
+        == "https://api.github.com/user/repos?per_page=50&page=3"
+    )
+
+
+def test_get_prefetch_concurrency():
+    assert get_prefetch_concurrency(link_response(), 10) == PAGE_PREFETCH_CONCURRENCY
+    assert (
+        get_prefetch_concurrency(link_response(remaining=5000), 10)
+        == PAGE_PREFETCH_CONCURRENCY
+    )
+    assert get_prefetch_concurrency(link_response(remaining=505), 10) == 1
+
+
+@pytest.mark.asyncio
+async def test_fetch_pages_in_order():
+    in_flight, max_in_flight = 0, 0
+
+    async def fetch_page(page):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        # later pages finish first
+        await asyncio.sleep((10 - page) / 1000)
+        in_flight -= 1
+        return page
+
+    pages = [page async for page in fetch_pages_in_order(fetch_page, range(10), 3)]
+    assert pages == list(range(10))
+    assert max_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_fetch_pages_in_order_error_cancels_pending_pages():
+    fetched = []
+
+    async def fetch_page(page):
+        if page == 1:
+            raise ValueError(page)
+        if page > 1:
+            await asyncio.sleep(0.01)
+        fetched.append(page)
+        return page
+
+    with pytest.raises(ValueError):
+        async for page in fetch_pages_in_order(fetch_page, range(10), 3):
+            assert page == 0
+    await asyncio.sleep(0.02)
+    assert fetched == [0]
+
+
+@pytest.mark.asyncio
+async def test_iter_pages_without_last_page():
+    requested = []
+
+    async def fetch_page(page):
+        requested.append(page)
+        return [page] * (2 if page < 3 else 1), link_response()
+
+    pages = [p async for p in iter_pages(fetch_page, lambda res: len(res) == 2)]
+    assert pages == [[1, 1], [2, 2], [3]]
+    assert requested == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_iter_pages_max_pages():
+    async def fetch_page(page):
+        return [page], link_response(last_page=10)
+
+    pages = [p async for p in iter_pages(fetch_page, lambda _: True, max_pages=3)]
+    assert pages == [[1], [2], [3]]
+
+
+@pytest.mark.asyncio
+async def test_list_repos_generator_prefetches_pages(mock_configuration):
+    handler = Github(
+        repo={"name": "worker"},
+        owner={"username": "codecov"},
+        token={"key": "some_key"},
+    )
+
+    def repos_page(request):
+        page = int(request.url.params["page"])
+        repos = [
+            {
+                "id": page * 100 + i,
+                "name": f"repo-{page}-{i}",
+                "language": None,
+                "private": False,
+                "default_branch": "main",
+                "owner": {"id": 1, "login": "codecov"},
+            }
+            for i in range(50 if page < 3 else 10)
+        ]
+        return httpx.Response(
+            200,
+            headers={
+                "Content-Type": "application/json",
+                "Link": '<https://api.github.com/user/repos?per_page=50&page=3>; rel="last"',
+            },
+            json=repos,
+        )
+
+    with respx.mock:
+        route = respx.get("https://api.github.com/user/repos").mock(
+            side_effect=repos_page
+        )
+        pages = [page async for page in handler.list_repos_generator()]
+
+    assert route.call_count == 3
+    assert [len(page) for page in pages] == [50, 50, 10]
+    assert pages[1][0]["repo"]["name"] == "repo-2-0"
+    assert pages[2][-1]["repo"]["name"] == "repo-3-9"
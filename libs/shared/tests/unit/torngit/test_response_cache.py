@@ -0,0 +1,268 @@
+import gzip
+from unittest.mock import MagicMock
+
+import fakeredis
+import httpx
+import pytest
+import respx
+from prometheus_client import REGISTRY
+from redis.exceptions import RedisError
+
+from shared.torngit.github import Github
+from shared.torngit.gitlab import Gitlab
+from shared.torngit.response_cache import (
+    CachedResponse,
+    LocalResponseCache,
+    ResponseCache,
+    endpoint_label,
+    get_response_cache,
+)
+
+
+@pytest.fixture
+def response_cache_config(mock_configuration, mocker):
+    mock_configuration.params["services"]["torngit_response_cache"] = {"enabled": True}
+    redis_connection = fakeredis.FakeStrictRedis()
+    mocker.patch(
+        "shared.torngit.response_cache.get_redis_connection",
+        return_value=redis_connection,
+    )
+    mocker.patch(
+        "shared.torngit.response_cache.get_local_response_cache",
+        side_effect=lambda max_entries: LocalResponseCache(max_entries),
+    )
+    return redis_connection
+
+
+@pytest.mark.parametrize(
+    "url, slug, expected",
+    [
+        (
+            "https://api.github.com/repos/codecov/worker/commits/"
+            + "a" * 40
+            + "?page=2",
+            "codecov/worker",
+            "/repos/:slug/commits",
+        ),
+        ("/repos/codecov/worker", "codecov/worker", "/repos/:slug"),
+        (
+            "https://ghe.example.com/api/v3/repos/codecov/worker/contents/src/app.py",
+            "codecov/worker",
+            "/repos/:slug/contents",
+        ),
+        (
+            "https://gitlab.com/api/v4/projects/187725/repository/compare",
+            None,
+            "/projects/:id/repository",
+        ),
+        ("https://bitbucket.org/api/2.0/user", None, "/user"),
+    ],
+)
+def test_endpoint_label(url, slug, expected):
+    assert endpoint_label(url, slug) == expected
+
+
+def test_cached_response_roundtrip():
+    response = httpx.Response(
+        200,
+        headers={
+            "ETag": '"abc"',
+            "Content-Type": "application/json",
+            "Content-Encoding": "gzip",
+            "Link": '<https://api.github.com/x?page=2>; rel="next"',
+        },
+        content=gzip.compress(b'{"a": 1}\n{"b": 2}'),
+    )
+    entry = CachedResponse.deserialize(
+        CachedResponse.from_response(response).serialize()
+    )
+    assert entry.etag == '"abc"'
+    assert entry.last_modified is None
+    assert entry.content == b'{"a": 1}\n{"b": 2}'
+    assert entry.conditional_headers() == {"If-None-Match": '"abc"'}
+
+    not_modified = httpx.Response(
+        304,
+        headers={"ETag": '"abc"', "X-RateLimit-Remaining": "4999"},
+        request=httpx.Request("GET", "https://api.github.com/x"),
+    )
+    res = entry.to_response(not_modified)
+    assert res.status_code == 200
+    assert res.content == b'{"a": 1}\n{"b": 2}'
+    # the content is not encoded anymore
+    assert "Content-Encoding" not in res.headers
+    assert res.headers["X-RateLimit-Remaining"] == "4999"
+    assert res.links["next"]["url"] == "https://api.github.com/x?page=2"
+
+
+def test_local_response_cache_evicts_least_recently_used():
+    local_cache = LocalResponseCache(max_entries=2)
+    entries = [CachedResponse(str(i), None, [], b"") for i in range(3)]
+    local_cache.set("a", entries[0])
+    local_cache.set("b", entries[1])
+    assert local_cache.get("a") is entries[0]
+    local_cache.set("c", entries[2])
+    assert local_cache.get("b") is None
+    assert local_cache.get("a") is entries[0]
+    assert local_cache.get("c") is entries[2]
+
+
+def test_response_cache_key_scopes():
+    cache = ResponseCache("github", MagicMock(), LocalResponseCache(10))
+    url = "https://api.github.com/repos/a/b"
+    app_token = {"key": "one", "entity_name": "123_456"}
+    rotated_app_token = {"key": "two", "entity_name": "123_456"}
+    user_token = {"key": "three"}
+    assert cache.key(app_token, url, None) == cache.key(rotated_app_token, url, None)
+    assert cache.key(app_token, url, None) != cache.key(user_token, url, None)
+    assert "three" not in cache.key(user_token, url, None)
+    assert cache.key(user_token, url, "application/vnd.github.v3.diff") != cache.key(
+        user_token, url, None
+    )
+
+
+def test_response_cache_only_caches_validated_responses():
+    redis_connection = fakeredis.FakeStrictRedis()
+    cache = ResponseCache(
+        "github", redis_connection, LocalResponseCache(10), max_entry_bytes=10
+    )
+    cache.set("no_validator", httpx.Response(200, content=b"a"))
+    cache.set("error", httpx.Response(404, headers={"ETag": "x"}, content=b"a"))
+    cache.set(
+        "too_large", httpx.Response(200, headers={"ETag": "x"}, content=b"a" * 11)
+    )
+    cache.set("ok", httpx.Response(200, headers={"Last-Modified": "x"}, content=b"a"))
+    assert redis_connection.keys() == [b"ok"]
+
+    # the local cache is populated from redis
+    other_process = ResponseCache("github", redis_connection, LocalResponseCache(10))
+    assert other_process.get("ok").last_modified == "x"
+    assert other_process.local_cache.get("ok") is not None
+
+
+def test_response_cache_ignores_redis_errors():
+    redis_connection = MagicMock()
+    redis_connection.get.side_effect = RedisError
+    redis_connection.set.side_effect = RedisError
+    cache = ResponseCache("github", redis_connection, LocalResponseCache(10))
+    cache.set("key", httpx.Response(200, headers={"ETag": "x"}, content=b"a"))
+    assert cache.get("missing") is None
+
+
+def test_get_response_cache_disabled_by_default(mock_configuration):
+    assert get_response_cache("github") is None
+
+
+@pytest.mark.asyncio
+async def test_github_conditional_requests(response_cache_config):
+    handler = Github(
+        repo={"name": "worker"},
+        owner={"username": "codecov"},
+        token={"key": "some_key", "entity_name": "123_456"},
+    )
+    before_hits = REGISTRY.get_sample_value(
+        "git_provider_response_cache_lookups_total",
+        labels={"service": "github", "endpoint": "/repos/:slug", "result": "hit"},
+    )
+    before_saved = REGISTRY.get_sample_value(
+        "git_provider_rate_limit_saved_total",
+        labels={"service": "github", "endpoint": "/repos/:slug"},
+    )
+
+    with respx.mock:
+        route = respx.get("https://api.github.com/repos/codecov/worker").mock(
+            side_effect=[
+                httpx.Response(
+                    200,
+                    headers={"ETag": '"v1"', "Content-Type": "application/json"},
+                    json={"name": "worker"},
+                ),
+                httpx.Response(304, headers={"ETag": '"v1"'}),
+                httpx.Response(
+                    200,
+                    headers={"ETag": '"v2"', "Content-Type": "application/json"},
+                    json={"name": "renamed"},
+                ),
+            ]
+        )
+        async with handler.get_client() as client:
+            assert await handler.api(client, "get", "/repos/codecov/worker") == {
+                "name": "worker"
+            }
+            assert await handler.api(client, "get", "/repos/codecov/worker") == {
+                "name": "worker"
+            }
+            assert await handler.api(client, "get", "/repos/codecov/worker") == {
+                "name": "renamed"
+            }
+
+    requests = [call.request for call in route.calls]
+    assert "If-None-Match" not in requests[0].headers
+    assert requests[1].headers["If-None-Match"] == '"v1"'
+    assert requests[2].headers["If-None-Match"] == '"v1"'
+    assert (
+        REGISTRY.get_sample_value(
+            "git_provider_response_cache_lookups_total",
+            labels={"service": "github", "endpoint": "/repos/:slug", "result": "hit"},
+        )
+        == (before_hits or 0) + 1
+    )
+    assert (
+        REGISTRY.get_sample_value(
+            "git_provider_rate_limit_saved_total",
+            labels={"service": "github", "endpoint": "/repos/:slug"},
+        )
+        == (before_saved or 0) + 1
+    )
+
+
+@pytest.mark.asyncio
+async def test_github_does_not_cache_writes(response_cache_config):
+    handler = Github(
+        repo={"name": "worker"},
+        owner={"username": "codecov"},
+        token={"key": "some_key"},
+    )
+    with respx.mock:
+        respx.post("https://api.github.com/repos/codecov/worker/statuses/abc").mock(
+            return_value=httpx.Response(
+                201,
+                headers={"ETag": '"v1"', "Content-Type": "application/json"},
+                json={"id": 1},
+            )
+        )
+        async with handler.get_client() as client:
+            await handler.api(
+                client, "post", "/repos/codecov/worker/statuses/abc", body={}
+            )
+    assert response_cache_config.keys() == []
+
+
+@pytest.mark.asyncio
+async def test_gitlab_conditional_requests(response_cache_config):
+    handler = Gitlab(
+        repo={"service_id": "187725"},
+        owner={"username": "codecov"},
+        token={"key": "some_key"},
+    )
+    with respx.mock:
+        route = respx.get(
+            "https://gitlab.com/api/v4/projects/187725/repository/branches"
+        ).mock(
+            side_effect=[
+                httpx.Response(
+                    200,
+                    headers={"ETag": 'W/"v1"', "Content-Type": "application/json"},
+                    json=[{"name": "main"}],
+                ),
+                httpx.Response(304, headers={"ETag": 'W/"v1"'}),
+            ]
+        )
+        assert await handler.api("get", "/projects/187725/repository/branches") == [
+            {"name": "main"}
+        ]
+        assert await handler.api("get", "/projects/187725/repository/branches") == [
+            {"name": "main"}
+        ]
+
+    assert route.calls[1].request.headers["If-None-Match"] == 'W/"v1"'
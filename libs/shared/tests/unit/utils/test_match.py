@@ -45,3 +45,47 @@ def test_match(patterns, string, boolean):
 )
 def test_match_any(patterns, match_any_of_these, boolean):
     assert match_any(patterns, match_any_of_these) is boolean
+
+
+@pytest.mark.parametrize(
+    "patterns, string, boolean",
+    [
+        (["(?i)README.*", "src/.*"], "readme.md", True),
+        (["(?i)README.*", "src/.*"], "src/a.py", True),
+        (["(?i)README.*", "src/.*"], "lib/a.py", False),
+        ([r"(a)\1/.*", "src/.*"], "aa/b", True),
+        ([r"(a)\1/.*", "src/.*"], "ab/b", False),
+        (["(?P<dir>src)/.*", "(?P<dir>lib)/.*"], "lib/a.py", True),
+        ([".*", "!tests/.*", "!.*_test.py"], "src/a_test.py", False),
+        ([".*", "!tests/.*", "!.*_test.py"], "src/a.py", True),
+    ],
+)
+def test_match_patterns_that_cannot_be_merged(patterns, string, boolean):
+    assert match(patterns, string) is boolean
+
+
+def test_compile_patterns():
+    regexes = compile_patterns(["src/.*", "lib/.*", r"(a)\1"])
+    assert len(regexes) == 2
+    assert [bool(regex.match("lib/a.py")) for regex in regexes] == [True, False]
+    assert [bool(regex.match("aa")) for regex in regexes] == [False, True]
+
+    assert len(compile_patterns(["(?i)src/.*", "lib/.*"])) == 2
+    assert compile_patterns([]) == []
+
+
+def test_match_many():
+    matcher = Matcher(["src/.*", "!src/vendor/.*"])
+    paths = ["src/a.py", "src/vendor/b.py", "lib/c.py"]
+
+    assert matcher.match_many(paths) == [True, False, False]
+    assert matcher.filter(paths) == ["src/a.py"]
+    assert Matcher(None).match_many(paths) == [True, True, True]
+    assert matcher.match_many([]) == []
+
+
+def test_get_matcher():
+    matcher = get_matcher(["src/.*", "lib/.*"])
+    assert get_matcher(("lib/.*", "src/.*")) is matcher
+    assert get_matcher(["src/.*"]) is not matcher
+    assert get_matcher(None).match("anything")
@@ -0,0 +1,201 @@
+import copy
+import datetime
+import json
+import pickle
+from unittest.mock import MagicMock
+
+import fakeredis
+import msgpack
+import pytest
+from prometheus_client import REGISTRY
+
+from shared.config import PATCH_CENTRIC_DEFAULT_TIME_START
+from shared.encryption.yaml_secret import yaml_secret_encryptor
+from shared.yaml import UserYaml
+from shared.yaml.cache import (
+    FrozenDict,
+    FrozenList,
+    MemoizedYamls,
+    freeze,
+    get_validated_yaml,
+)
+from shared.yaml.user_yaml import OwnerContext
+from shared.yaml.validation import validate_yaml
+
+
+@pytest.fixture
+def yaml_cache_config(mock_configuration, mocker):
+    mock_configuration.params["services"]["yaml_cache"] = {
+        "enabled": True,
+        "redis": True,
+    }
+    redis_connection = fakeredis.FakeStrictRedis()
+    mocker.patch(
+        "shared.yaml.cache.get_redis_connection", return_value=redis_connection
+    )
+    # nothing memoized by the other tests
+    memoized = {}
+    mocker.patch(
+        "shared.yaml.cache.get_memoized_yamls",
+        side_effect=lambda name, max_local_entries: memoized.setdefault(
+            name, MemoizedYamls(name, max_local_entries)
+        ),
+    )
+    return redis_connection
+
+
+def lookups(cache, result):
+    return (
+        REGISTRY.get_sample_value(
+            "shared_yaml_cache_lookups_total",
+            labels={"cache": cache, "result": result},
+        )
+        or 0
+    )
+
+
+def test_freeze():
+    frozen = freeze({"coverage": {"status": {"project": True}}, "ignore": ["a"]})
+    assert isinstance(frozen, FrozenDict)
+    assert isinstance(frozen["ignore"], FrozenList)
+    assert frozen == {"coverage": {"status": {"project": True}}, "ignore": ["a"]}
+    assert json.loads(json.dumps(frozen)) == frozen
+    assert msgpack.loads(msgpack.dumps(frozen)) == frozen
+
+    with pytest.raises(TypeError):
+        frozen["coverage"]["status"] = None
+    with pytest.raises(TypeError):
+        frozen.update(ignore=[])
+    with pytest.raises(TypeError):
+        frozen["ignore"].append("b")
+
+    # copies can be changed
+    copied = copy.deepcopy(frozen)
+    assert type(copied) is dict
+    assert type(copied["ignore"]) is list
+    copied["ignore"].append("b")
+    assert type(pickle.loads(pickle.dumps(frozen))) is dict
+
+
+def test_get_validated_yaml_disabled(mock_configuration):
+    parse_and_validate = MagicMock(return_value={"codecov": {}})
+    assert get_validated_yaml("codecov: {}", None, parse_and_validate) == {
+        "codecov": {}
+    }
+    assert get_validated_yaml("codecov: {}", None, parse_and_validate) == {
+        "codecov": {}
+    }
+    assert parse_and_validate.call_count == 2
+
+
+def test_get_validated_yaml(yaml_cache_config):
+    content = "coverage:\n  precision: 3\n"
+    parse_and_validate = MagicMock(
+        side_effect=lambda: validate_yaml({"coverage": {"precision": 3}})
+    )
+    misses, hits = lookups("validated", "miss"), lookups("validated", "local_hit")
+
+    first = get_validated_yaml(content, None, parse_and_validate)
+    second = get_validated_yaml(content, None, parse_and_validate)
+
+    assert first == {"coverage": {"precision": 3}}
+    assert second is first
+    assert isinstance(first, FrozenDict)
+    assert parse_and_validate.call_count == 1
+    assert lookups("validated", "miss") == misses + 1
+    assert lookups("validated", "local_hit") == hits + 1
+
+    # other yamls, or the same one validated for another repo, are validated again
+    get_validated_yaml(content + "\n", None, parse_and_validate)
+    get_validated_yaml(content, ("github", "1", "2"), parse_and_validate)
+    assert parse_and_validate.call_count == 3
+
+
+def test_get_validated_yaml_from_redis(yaml_cache_config, mocker):
+    content = "coverage:\n  precision: 3\n"
+    get_validated_yaml(content, None, lambda: {"coverage": {"precision": 3}})
+    # a new process, with nothing memoized locally
+    mocker.patch(
+        "shared.yaml.cache.get_memoized_yamls",
+        return_value=MemoizedYamls("validated", 10),
+    )
+    hits = lookups("validated", "redis_hit")
+    parse_and_validate = MagicMock()
+
+    assert get_validated_yaml(content, None, parse_and_validate) == {
+        "coverage": {"precision": 3}
+    }
+    parse_and_validate.assert_not_called()
+    assert lookups("validated", "redis_hit") == hits + 1
+
+
+def test_get_validated_yaml_with_secrets_not_in_redis(yaml_cache_config):
+    secret = "secret:" + yaml_secret_encryptor.encode("github/1/2/token").decode()
+    content = f"codecov:\n  token: {secret}\n"
+
+    get_validated_yaml(content, ("github", "1", "2"), lambda: {"codecov": {}})
+
+    assert yaml_cache_config.keys() == []
+
+
+def test_get_validated_yaml_errors_not_memoized(yaml_cache_config):
+    parse_and_validate = MagicMock(side_effect=ValueError)
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            get_validated_yaml("codecov: [", None, parse_and_validate)
+    assert parse_and_validate.call_count == 2
+
+
+def test_get_final_yaml_memoized(yaml_cache_config, mock_configuration):
+    mock_configuration._params["site"] = {"codecov": {"max_report_age": 86400}}
+    owner_yaml = {"coverage": {"precision": 2}}
+    commit_yaml = {"coverage": {"round": "up"}}
+    expected = {
+        "codecov": {"max_report_age": 86400},
+        "coverage": {"precision": 2, "round": "up"},
+    }
+
+    first = UserYaml.get_final_yaml(owner_yaml=owner_yaml, commit_yaml=commit_yaml)
+    second = UserYaml.get_final_yaml(
+        owner_yaml={"coverage": {"precision": 2}},
+        commit_yaml={"coverage": {"round": "up"}},
+    )
+
+    assert first.to_dict() == expected
+    assert second.inner_dict is first.inner_dict
+    # the repo yaml doesn't matter when there is a commit yaml
+    assert (
+        UserYaml.get_final_yaml(
+            owner_yaml=owner_yaml, repo_yaml={"a": 1}, commit_yaml=commit_yaml
+        ).inner_dict
+        is first.inner_dict
+    )
+    assert (
+        UserYaml.get_final_yaml(owner_yaml=owner_yaml, repo_yaml=commit_yaml).inner_dict
+        is first.inner_dict
+    )
+    assert UserYaml.get_final_yaml(owner_yaml=owner_yaml).to_dict() != expected
+
+
+def test_get_final_yaml_memoized_by_onboarding_cutoff(yaml_cache_config):
+    def final_yaml(onboarding_date):
+        return UserYaml.get_final_yaml(
+            owner_context=OwnerContext(owner_onboarding_date=onboarding_date)
+        )
+
+    before = final_yaml(PATCH_CENTRIC_DEFAULT_TIME_START - datetime.timedelta(days=2))
+    after = final_yaml(PATCH_CENTRIC_DEFAULT_TIME_START + datetime.timedelta(days=1))
+
+    assert before.to_dict() != after.to_dict()
+    assert (
+        final_yaml(
+            PATCH_CENTRIC_DEFAULT_TIME_START - datetime.timedelta(days=1)
+        ).inner_dict
+        is before.inner_dict
+    )
+    assert (
+        final_yaml(
+            PATCH_CENTRIC_DEFAULT_TIME_START + datetime.timedelta(days=3)
+        ).inner_dict
+        is after.inner_dict
+    )